@@ -14,7 +14,9 @@ import argparse
 import logging
 import os
 import os.path
+import subprocess
 import sys
+from multiprocessing.pool import ThreadPool
 
 from manic.externals_description import create_externals_description
 from manic.externals_description import read_externals_description_file
@@ -292,6 +294,37 @@ of the externals description file or examine the output of
                         '%(prog)s. By default only summary information '
                         'is provided. Use the verbose option to see details.')
 
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help='Checkout up to this many independent externals '
+                        'at a time. Each external is checked out (with its '
+                        'sub-externals) by its own %(prog)s process, and its '
+                        'output is shown once it is done, in the usual order. '
+                        'Default: %(default)s.')
+
+    parser.add_argument('--depth', type=int, default=None,
+                        help='Make shallow git clones with this many commits '
+                        'of history when an external is a tag or a full '
+                        '40 character hash. Branches and abbreviated hashes '
+                        'are cloned in full. Git submodules of the externals '
+                        'are also cloned with this depth. Ignored for '
+                        'externals cloned with a mirror (see --mirror-dir).')
+
+    parser.add_argument('--filter', default=None,
+                        help='Make partial git clones with this object '
+                        'filter, e.g. "blob:none" to fetch file contents '
+                        'only when they are checked out. Also applies to git '
+                        'submodules. The repository server must support '
+                        'partial clones.')
+
+    parser.add_argument('--mirror-dir', default=None,
+                        help='Directory of bare mirrors of the git '
+                        'repositories, shared by all checkouts. A mirror is '
+                        'created or updated (once per run) when an '
+                        'external is cloned, and new clones reference its '
+                        'objects rather than copying them. The mirrors must '
+                        'be kept as long as the checkouts using them. Git '
+                        'submodules of the externals do not use mirrors.')
+
     parser.add_argument('-v', '--verbose', action='count', default=0,
                         help='Output additional information to '
                         'the screen and log file. This flag can be '
@@ -333,6 +366,68 @@ of the externals description file or examine the output of
     return options
 
 
+# ---------------------------------------------------------------------
+#
+# parallel checkout
+#
+# ---------------------------------------------------------------------
+CHECKOUT_EXE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                            'checkout_externals')
+
+
+def _checkout_group(args, group):
+    """Checkout a group of externals with a separate checkout_externals
+    process, run from the current directory.
+
+    Returns a tuple (group, status, output) with the exit status and the
+    combined output of the process.
+
+    """
+    cmd = [sys.executable, CHECKOUT_EXE, '--externals', args.externals]
+    if args.optional:
+        cmd.append('--optional')
+    if args.svn_ignore_ancestry:
+        cmd.append('--svn-ignore-ancestry')
+    if args.depth:
+        cmd += ['--depth', str(args.depth)]
+    if args.filter:
+        cmd += ['--filter', args.filter]
+    if args.mirror_dir:
+        cmd += ['--mirror-dir', args.mirror_dir]
+    cmd += ['--verbose'] * args.verbose
+    cmd += group
+    logging.info('Checking out %s with: %s', ', '.join(group), ' '.join(cmd))
+    process = subprocess.Popen(cmd, stdout=subprocess.PIPE,
+                               stderr=subprocess.STDOUT)
+    output = process.communicate()[0]
+    return group, process.returncode, output.decode('utf-8', 'replace')
+
+
+def checkout_parallel(args, groups):
+    """Checkout groups of externals that do not depend on each other (see
+    SourceTree.independent_groups), up to args.jobs groups at a time.
+
+    Processes are used rather than threads because the checkout changes
+    the current directory of its process. The output of each group is
+    printed in one piece, in order, once the group and the groups before
+    it are done.
+
+    """
+    failed = []
+    pool = ThreadPool(min(args.jobs, len(groups)))
+    try:
+        for group, status, output in pool.imap(
+                lambda group: _checkout_group(args, group), groups):
+            printlog(output.rstrip('\n'))
+            if status != 0:
+                failed.append(', '.join(group))
+    finally:
+        pool.close()
+        pool.join()
+    if failed:
+        fatal_error('Checkout failed for: {0}'.format('; '.join(failed)))
+
+
 # ---------------------------------------------------------------------
 #
 # main
@@ -373,7 +468,14 @@ def main(args):
                 "No component {} found in {}".format(
                     comp, args.externals))
 
-    source_tree = SourceTree(root_dir, external, svn_ignore_ancestry=args.svn_ignore_ancestry)
+    mirror_dir = args.mirror_dir
+    if mirror_dir:
+        mirror_dir = os.path.abspath(mirror_dir)
+    git_clone_options = {'depth': args.depth, 'filter': args.filter,
+                         'mirror_dir': mirror_dir}
+    source_tree = SourceTree(root_dir, external,
+                             svn_ignore_ancestry=args.svn_ignore_ancestry,
+                             git_clone_options=git_clone_options)
     printlog('Checking status of externals: ', end='')
     tree_status = source_tree.status()
     printlog('')
@@ -428,6 +530,12 @@ directory, then run "rm -rf [directory]" before rerunning the
             printlog('-' * 70)
             printlog(msg)
             printlog('-' * 70)
+        elif args.jobs > 1:
+            groups = source_tree.independent_groups(
+                load_all, load_comps=args.components or None)
+            if groups:
+                checkout_parallel(args, groups)
+            printlog('')
         else:
             if not args.components:
                 source_tree.checkout(args.verbose, load_all)
@@ -11,14 +11,18 @@ from .externals_description import ExternalsDescription
 from .utils import fatal_error
 
 
-def create_repository(component_name, repo_info, svn_ignore_ancestry=False):
+def create_repository(component_name, repo_info, svn_ignore_ancestry=False,
+                      git_clone_options=None):
     """Determine what type of repository we have, i.e. git or svn, and
     create the appropriate object.
 
+    git_clone_options is passed on to GitRepository.
+
     """
     protocol = repo_info[ExternalsDescription.PROTOCOL].lower()
     if protocol == 'git':
-        repo = GitRepository(component_name, repo_info)
+        repo = GitRepository(component_name, repo_info,
+                             clone_options=git_clone_options)
     elif protocol == 'svn':
         repo = SvnRepository(component_name, repo_info, ignore_ancestry=svn_ignore_ancestry)
     elif protocol == 'externals_only':
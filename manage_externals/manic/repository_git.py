@@ -7,6 +7,13 @@ from __future__ import print_function
 
 import copy
 import os
+import re
+
+try:
+    import fcntl
+except ImportError:
+    # file locking is not available on windows
+    fcntl = None
 
 from .global_constants import EMPTY_STR, LOCAL_PATH_INDICATOR
 from .global_constants import VERBOSITY_VERBOSE
@@ -37,13 +44,26 @@ class GitRepository(Repository):
 
     """
 
-    def __init__(self, component_name, repo):
+    # Mirrors already updated by this process, see _update_mirror
+    _updated_mirrors = set()
+
+    def __init__(self, component_name, repo, clone_options=None):
         """
         Parse repo (a <repo> XML element).
+
+        clone_options is an optional dict with the 'depth' of shallow
+        clones, the 'filter' of partial clones (e.g. 'blob:none') and
+        the absolute path 'mirror_dir' of the bare mirrors referenced
+        by new clones.
         """
         Repository.__init__(self, component_name, repo)
         self._gitmodules = None
         self._submods = None
+        if clone_options is None:
+            clone_options = {}
+        self._depth = clone_options.get('depth')
+        self._filter = clone_options.get('filter')
+        self._mirror_dir = clone_options.get('mirror_dir')
 
     # ----------------------------------------------------------------
     #
@@ -103,9 +123,67 @@ class GitRepository(Repository):
         """
         cwd = os.getcwd()
         os.chdir(base_dir_path)
-        self._git_clone(self._url, repo_dir_name, verbosity)
+        reference = None
+        if self._mirror_dir:
+            reference = self._update_mirror(verbosity)
+        if reference is None and self._shallow_refspec():
+            # Only the ref is fetched, by _checkout_external_ref
+            self._git_init(repo_dir_name, verbosity)
+        else:
+            self._git_clone(self._url, repo_dir_name, verbosity,
+                            reference=reference, filter_spec=self._filter)
         os.chdir(cwd)
 
+    def _shallow_refspec(self):
+        """Return the refspec to fetch for a shallow clone, or None if
+        shallow clones were not requested or the ref can not be fetched
+        on its own: branches, and abbreviated hashes that git servers
+        will not resolve.
+        """
+        if not self._depth:
+            return None
+        if self._tag:
+            return '+refs/tags/{0}:refs/tags/{0}'.format(self._tag)
+        if self._hash and re.match('^[0-9a-f]{40}$', self._hash):
+            return self._hash
+        return None
+
+    def _update_mirror(self, verbosity):
+        """Create or update the bare mirror of the repository in the
+        mirror directory, at most once per process, and return its path.
+
+        Clones reference the objects of the mirror instead of copying
+        them, so the mirror never prunes unreachable objects. Local
+        repositories (LOCAL_PATH_INDICATOR) have no mirror and None is
+        returned.
+        """
+        url = self._url.strip()
+        if url == LOCAL_PATH_INDICATOR:
+            return None
+        if not is_remote_url(url):
+            url = os.path.abspath(url)
+        name = re.sub(r'^[a-z+]+://', '', url)
+        name = re.sub(r'^[^/@]*@', '', name)
+        name = re.sub(r'[^\w.-]+', '_', name.strip('/'))
+        if not name.endswith('.git'):
+            name += '.git'
+        mirror = os.path.join(self._mirror_dir, name)
+        if mirror in GitRepository._updated_mirrors:
+            return mirror
+
+        if not os.path.isdir(self._mirror_dir):
+            os.makedirs(self._mirror_dir)
+        with open(mirror + '.lock', 'w') as lock:
+            # Other checkouts using the mirror wait for the update
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            if os.path.exists(mirror):
+                self._git_mirror_fetch(mirror, verbosity)
+            else:
+                self._git_clone_mirror(url, mirror, verbosity)
+        GitRepository._updated_mirrors.add(mirror)
+        return mirror
+
     def _current_ref(self):
         """Determine the *name* associated with HEAD.
 
@@ -335,7 +413,8 @@ class GitRepository(Repository):
             ref = self._hash
 
         self._check_for_valid_ref(ref)
-        self._git_checkout_ref(ref, verbosity, submodules)
+        self._git_checkout_ref(ref, verbosity, submodules,
+                               depth=self._depth, filter_spec=self._filter)
 
     def _checkout_external_ref(self, verbosity, submodules):
         """Checkout the reference from a remote repository
@@ -353,7 +432,14 @@ class GitRepository(Repository):
         if not remote_name:
             remote_name = self._create_remote_name()
             self._git_remote_add(remote_name, self._url)
-        self._git_fetch(remote_name)
+        refspec = self._shallow_refspec()
+        if refspec and (self._git_is_shallow() or
+                        not self._git_current_hash()[0]):
+            # Keep a new or shallow clone shallow
+            self._git_fetch_shallow(remote_name, refspec, self._depth,
+                                    filter_spec=self._filter)
+        else:
+            self._git_fetch(remote_name)
 
         # NOTE(bja, 2018-03) we need to send separate ref and remote
         # name to check_for_vaild_ref, but the combined name to
@@ -362,7 +448,8 @@ class GitRepository(Repository):
 
         if self._branch:
             ref = '{0}/{1}'.format(remote_name, ref)
-        self._git_checkout_ref(ref, verbosity, submodules)
+        self._git_checkout_ref(ref, verbosity, submodules,
+                               depth=self._depth, filter_spec=self._filter)
 
     def _sparse_checkout(self, repo_dir, verbosity):
         """Use git read-tree to thin the working tree."""
@@ -730,6 +817,14 @@ class GitRepository(Repository):
         git_output = execute_subprocess(cmd, output_to_caller=True)
         return git_output
 
+    @staticmethod
+    def _git_is_shallow():
+        """Return True if the repository is a shallow clone.
+        """
+        cmd = ['git', 'rev-parse', '--is-shallow-repository']
+        git_output = execute_subprocess(cmd, output_to_caller=True)
+        return git_output.strip() == 'true'
+
     @staticmethod
     def has_submodules(repo_dir_path=None):
         """Return True iff the repository at <repo_dir_path> (or the current
@@ -749,11 +844,20 @@ class GitRepository(Repository):
     #
     # ----------------------------------------------------------------
     @staticmethod
-    def _git_clone(url, repo_dir_name, verbosity):
+    def _git_clone(url, repo_dir_name, verbosity, reference=None,
+                   filter_spec=None):
         """Run git clone for the side effect of creating a repository.
+
+        If <reference> is given, the clone borrows the objects of that
+        repository. If <filter_spec> is given, a partial clone is made
+        and the filtered objects are fetched on demand.
         """
         cmd = ['git', 'clone', '--quiet']
         subcmd = None
+        if reference:
+            cmd.extend(['--reference', reference])
+        if filter_spec:
+            cmd.extend(['--filter', filter_spec])
 
         cmd.extend([url, repo_dir_name])
         if verbosity >= VERBOSITY_VERBOSE:
@@ -763,6 +867,37 @@ class GitRepository(Repository):
             os.chdir(repo_dir_name)
             execute_subprocess(subcmd)
 
+    @staticmethod
+    def _git_init(repo_dir_name, verbosity):
+        """Run git init for the side effect of creating an empty repository.
+        """
+        cmd = ['git', 'init', '--quiet', repo_dir_name]
+        if verbosity >= VERBOSITY_VERBOSE:
+            printlog('    {0}'.format(' '.join(cmd)))
+        execute_subprocess(cmd)
+
+    @staticmethod
+    def _git_clone_mirror(url, mirror, verbosity):
+        """Run git clone for the side effect of creating a bare mirror
+        whose unreachable objects are never pruned.
+        """
+        cmd = ['git', 'clone', '--quiet', '--mirror', url, mirror]
+        if verbosity >= VERBOSITY_VERBOSE:
+            printlog('    {0}'.format(' '.join(cmd)))
+        execute_subprocess(cmd)
+        cmd = ['git', '--git-dir', mirror, 'config', 'gc.pruneExpire',
+               'never']
+        execute_subprocess(cmd)
+
+    @staticmethod
+    def _git_mirror_fetch(mirror, verbosity):
+        """Run git fetch for the side effect of updating a bare mirror
+        """
+        cmd = ['git', '--git-dir', mirror, 'fetch', '--quiet', 'origin']
+        if verbosity >= VERBOSITY_VERBOSE:
+            printlog('    {0}'.format(' '.join(cmd)))
+        execute_subprocess(cmd)
+
     @staticmethod
     def _git_remote_add(name, url):
         """Run the git remote command for the side effect of adding a remote
@@ -778,19 +913,36 @@ class GitRepository(Repository):
         execute_subprocess(cmd)
 
     @staticmethod
-    def _git_checkout_ref(ref, verbosity, submodules):
+    def _git_fetch_shallow(remote_name, refspec, depth, filter_spec=None):
+        """Run the git fetch command for the side effect of fetching only
+        the last <depth> commits of a single ref, filtered by <filter_spec>
+        if given
+        """
+        cmd = ['git', 'fetch', '--quiet', '--no-tags',
+               '--depth', str(depth)]
+        if filter_spec:
+            cmd.extend(['--filter', filter_spec])
+        cmd.extend([remote_name, refspec])
+        execute_subprocess(cmd)
+
+    @staticmethod
+    def _git_checkout_ref(ref, verbosity, submodules, depth=None,
+                          filter_spec=None):
         """Run the git checkout command for the side effect of updating the repo
 
         Param: ref is a reference to a local or remote object in the
         form 'origin/my_feature', or 'tag1'.
 
+        depth and filter_spec are passed on to _git_update_submodules.
+
         """
         cmd = ['git', 'checkout', '--quiet', ref]
         if verbosity >= VERBOSITY_VERBOSE:
             printlog('    {0}'.format(' '.join(cmd)))
         execute_subprocess(cmd)
         if submodules:
-            GitRepository._git_update_submodules(verbosity)
+            GitRepository._git_update_submodules(verbosity, depth=depth,
+                                                 filter_spec=filter_spec)
 
     @staticmethod
     def _git_sparse_checkout(verbosity):
@@ -805,13 +957,21 @@ class GitRepository(Repository):
         execute_subprocess(cmd)
 
     @staticmethod
-    def _git_update_submodules(verbosity):
+    def _git_update_submodules(verbosity, depth=None, filter_spec=None):
         """Run git submodule update for the side effect of updating this
         repo's submodules.
+
+        If <depth> is given, the submodules are cloned shallow, and if
+        <filter_spec> is given, they are partial clones. Mirrors are not
+        used for submodules.
         """
         # First, verify that we have a .gitmodules file
         if os.path.exists(ExternalsDescription.GIT_SUBMODULES_FILENAME):
             cmd = ['git', 'submodule', 'update', '--init', '--recursive']
+            if depth:
+                cmd.extend(['--depth', str(depth)])
+            if filter_spec:
+                cmd.extend(['--filter', filter_spec])
             if verbosity >= VERBOSITY_VERBOSE:
                 printlog('    {0}'.format(' '.join(cmd)))
 
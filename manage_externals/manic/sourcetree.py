@@ -24,7 +24,8 @@ class _External(object):
 
     # pylint: disable=R0902
 
-    def __init__(self, root_dir, name, ext_description, svn_ignore_ancestry):
+    def __init__(self, root_dir, name, ext_description, svn_ignore_ancestry,
+                 git_clone_options=None):
         """Parse an external description file into a dictionary of externals.
 
         Input:
@@ -39,6 +40,9 @@ class _External(object):
 
             svn_ignore_ancestry : bool - use --ignore-externals with svn switch
 
+            git_clone_options : dict - how new git clones are made, see
+            GitRepository. Also used for the sub-externals.
+
         """
         self._name = name
         self._repo = None
@@ -46,6 +50,7 @@ class _External(object):
         self._externals_sourcetree = None
         self._stat = ExternalStatus()
         self._sparse = None
+        self._git_clone_options = git_clone_options
         # Parse the sub-elements
 
         # _path : local path relative to the containing source tree
@@ -69,7 +74,8 @@ class _External(object):
 
         repo = create_repository(
             name, ext_description[ExternalsDescription.REPO],
-            svn_ignore_ancestry=svn_ignore_ancestry)
+            svn_ignore_ancestry=svn_ignore_ancestry,
+            git_clone_options=git_clone_options)
         if repo:
             self._repo = repo
 
@@ -261,7 +267,9 @@ class _External(object):
                                                      self._externals)
         externals = create_externals_description(model_data,
                                                  parent_repo=self._repo)
-        self._externals_sourcetree = SourceTree(externals_root, externals)
+        self._externals_sourcetree = SourceTree(
+            externals_root, externals,
+            git_clone_options=self._git_clone_options)
         os.chdir(cwd)
 
 class SourceTree(object):
@@ -269,7 +277,8 @@ class SourceTree(object):
     SourceTree represents a group of managed externals
     """
 
-    def __init__(self, root_dir, model, svn_ignore_ancestry=False):
+    def __init__(self, root_dir, model, svn_ignore_ancestry=False,
+                 git_clone_options=None):
         """
         Build a SourceTree object from a model description
         """
@@ -277,7 +286,8 @@ class SourceTree(object):
         self._all_components = {}
         self._required_compnames = []
         for comp in model:
-            src = _External(self._root_dir, comp, model[comp], svn_ignore_ancestry)
+            src = _External(self._root_dir, comp, model[comp],
+                            svn_ignore_ancestry, git_clone_options)
             self._all_components[comp] = src
             if model[comp][ExternalsDescription.REQUIRED]:
                 self._required_compnames.append(comp)
@@ -316,6 +326,45 @@ class SourceTree(object):
 
         return summary
 
+    def _load_comps(self, load_all, load_comp=None):
+        """
+        Return the components to checkout, as for checkout(), sorted
+        by path so that if paths are nested the parent repo is checked
+        out first.
+        """
+        if load_all:
+            tmp_comps = self._all_components.keys()
+        elif load_comp is not None:
+            tmp_comps = [load_comp]
+        else:
+            tmp_comps = self._required_compnames
+        return sorted(tmp_comps, key=lambda comp: self._all_components[comp].get_local_path())
+
+    def independent_groups(self, load_all, load_comps=None):
+        """
+        Return the components to checkout, as for checkout(), in
+        groups that can be checked out independently of each other.
+
+        A component whose path is inside the path of another component
+        depends on it, so it is in the group of that component, after
+        it. load_comps is an optional list of components to load; by
+        default the components are selected as for checkout().
+        """
+        if load_comps is None:
+            load_comps = self._load_comps(load_all)
+        else:
+            load_comps = sorted(load_comps, key=lambda comp: self._all_components[comp].get_local_path())
+        groups = {}
+        for comp in load_comps:
+            path = os.path.normpath(self._all_components[comp].get_local_path())
+            for root in groups:
+                if path.startswith(root + os.sep):
+                    groups[root].append(comp)
+                    break
+            else:
+                groups[path] = [comp]
+        return sorted(groups.values(), key=lambda group: load_comps.index(group[0]))
+
     def checkout(self, verbosity, load_all, load_comp=None):
         """
         Checkout or update indicated components into the the configured
@@ -330,15 +379,7 @@ class SourceTree(object):
         else:
             printlog('Checking out externals: ', end='')
 
-        if load_all:
-            tmp_comps = self._all_components.keys()
-        elif load_comp is not None:
-            tmp_comps = [load_comp]
-        else:
-            tmp_comps = self._required_compnames
-        # Sort by path so that if paths are nested the
-        # parent repo is checked out first.
-        load_comps = sorted(tmp_comps, key=lambda comp: self._all_components[comp].get_local_path())
+        load_comps = self._load_comps(load_all, load_comp)
         # checkout the primary externals
         for comp in load_comps:
             if verbosity < VERBOSITY_VERBOSE:
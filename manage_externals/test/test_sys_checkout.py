@@ -1456,6 +1456,141 @@ class TestSysCheckout(BaseTestSysCheckout):
                                                 self.status_args)
         self._check_container_component_post_checkout2(overall, tree)
 
+    def test_container_parallel(self):
+        """Verify that checking out independent externals in parallel
+        gives the same result as checking them out one at a time, also
+        when the externals are nested.
+
+        """
+        # create the test repository
+        under_test_dir = self.setup_test_repo(CONTAINER_REPO_NAME)
+
+        # create the top level externals file
+        self._generator.container_full(under_test_dir)
+
+        checkout_args = ['--jobs', '3']
+        checkout_args.extend(self.checkout_args)
+        overall, tree = self.execute_cmd_in_dir(under_test_dir,
+                                                checkout_args)
+        self._check_container_full_pre_checkout(overall, tree)
+
+        overall, tree = self.execute_cmd_in_dir(under_test_dir,
+                                                self.status_args)
+        self._check_container_full_post_checkout(overall, tree)
+
+        # nested externals, listed before the external they are in
+        order = [2, 1, 0]
+        dest_dir = os.path.join(os.environ[MANIC_TEST_TMP_REPO_ROOT],
+                                self._test_id, 'nested')
+        under_test_dir = self.setup_test_repo(CONTAINER_REPO_NAME,
+                                              dest_dir_in=dest_dir)
+        self._generator.container_nested_required(under_test_dir, order)
+
+        overall, tree = self.execute_cmd_in_dir(under_test_dir,
+                                                checkout_args)
+        self._check_container_nested_required_checkout(overall, tree, order)
+
+        overall, tree = self.execute_cmd_in_dir(under_test_dir,
+                                                self.status_args)
+        self._check_container_nested_required_post_checkout(overall, tree, order)
+
+    @staticmethod
+    def _git_output(repo_dir, args):
+        """Return the output of a git command run in repo_dir
+        """
+        cwd = os.getcwd()
+        os.chdir(repo_dir)
+        git_output = execute_subprocess(['git'] + args, output_to_caller=True)
+        os.chdir(cwd)
+        return git_output.strip()
+
+    def test_container_shallow(self):
+        """Verify that with --depth, tags and full hashes are cloned
+        shallow, branches are cloned in full, and that a shallow clone
+        stays shallow when its tag changes.
+
+        """
+        # create the test repository
+        under_test_dir = self.setup_test_repo(CONTAINER_REPO_NAME)
+
+        # create the top level externals file, with a full hash
+        self._generator.container_full(under_test_dir)
+        full_hash = self._git_output(
+            os.path.join(self._bare_root, SIMPLE_REPO_NAME),
+            ['rev-parse', '60b1cc1a38d63'])
+        self._generator.create_section(SIMPLE_REPO_NAME, 'simp_hash',
+                                       ref_hash=full_hash)
+        self._generator.write_config(under_test_dir)
+
+        checkout_args = ['--depth', '1']
+        checkout_args.extend(self.checkout_args)
+        overall, tree = self.execute_cmd_in_dir(under_test_dir,
+                                                checkout_args)
+        self._check_container_full_pre_checkout(overall, tree)
+
+        overall, tree = self.execute_cmd_in_dir(under_test_dir,
+                                                self.status_args)
+        self._check_container_full_post_checkout(overall, tree)
+        self._check_generic_ok_clean_required(
+            tree, './{0}/simp_hash'.format(EXTERNALS_NAME))
+
+        externals_dir = os.path.join(under_test_dir, EXTERNALS_NAME)
+        for name, shallow in [('simp_tag', 'true'), ('simp_hash', 'true'),
+                              ('simp_branch', 'false')]:
+            self.assertEqual(self._git_output(
+                os.path.join(externals_dir, name),
+                ['rev-parse', '--is-shallow-repository']), shallow)
+
+        # a new tag is fetched on its own
+        self._generator.update_tag(under_test_dir, 'simp_tag', 'tag2')
+        overall, tree = self.execute_cmd_in_dir(under_test_dir,
+                                                checkout_args)
+        overall, tree = self.execute_cmd_in_dir(under_test_dir,
+                                                self.status_args)
+        self._check_simple_tag_ok(tree)
+        simp_tag_dir = os.path.join(externals_dir, 'simp_tag')
+        self.assertEqual(self._git_output(
+            simp_tag_dir, ['rev-parse', '--is-shallow-repository']), 'true')
+        self.assertEqual(self._git_output(simp_tag_dir, ['tag']), 'tag1\ntag2')
+
+    def test_container_mirror(self):
+        """Verify that with --mirror-dir, externals are cloned with
+        references to bare mirrors, which are shared between checkouts.
+
+        """
+        mirror_dir = os.path.join(os.environ[MANIC_TEST_TMP_REPO_ROOT],
+                                  self._test_id, 'mirrors')
+        checkout_args = ['--mirror-dir', mirror_dir]
+        checkout_args.extend(self.checkout_args)
+        for checkout_name in ['first', 'second']:
+            dest_dir = os.path.join(os.environ[MANIC_TEST_TMP_REPO_ROOT],
+                                    self._test_id, checkout_name)
+            under_test_dir = self.setup_test_repo(CONTAINER_REPO_NAME,
+                                                  dest_dir_in=dest_dir)
+            self._generator.container_full(under_test_dir)
+
+            overall, tree = self.execute_cmd_in_dir(under_test_dir,
+                                                    checkout_args)
+            self._check_container_full_pre_checkout(overall, tree)
+
+            overall, tree = self.execute_cmd_in_dir(under_test_dir,
+                                                    self.status_args)
+            self._check_container_full_post_checkout(overall, tree)
+
+            alternates = os.path.join(under_test_dir, EXTERNALS_NAME,
+                                      'simp_tag', '.git', 'objects', 'info',
+                                      'alternates')
+            with open(alternates) as alternates_file:
+                mirror = alternates_file.read().strip()
+            self.assertEqual(os.path.dirname(os.path.dirname(mirror)),
+                             mirror_dir)
+            self.assertTrue(mirror.endswith('{0}/objects'.format(
+                SIMPLE_REPO_NAME)))
+
+        mirrors = sorted(name for name in os.listdir(mirror_dir)
+                         if name.endswith('.git'))
+        self.assertEqual(len(mirrors), 2)
+
     def test_container_exclude_component(self):
         """Verify that exclude component checkout works
         """
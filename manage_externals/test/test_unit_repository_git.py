@@ -14,8 +14,11 @@ from __future__ import print_function
 
 import os
 import shutil
+import tempfile
 import unittest
 
+import manic.repository_git
+
 from manic.repository_git import GitRepository
 from manic.externals_status import ExternalStatus
 from manic.externals_description import ExternalsDescription
@@ -804,5 +807,143 @@ class TestValidRef(unittest.TestCase):
         self.assertTrue(received)
 
 
+class TestGitShallowRefspec(unittest.TestCase):
+    """Test the _shallow_refspec method on the GitRepository class
+    """
+
+    def setUp(self):
+        """Common infrastructure for testing _shallow_refspec
+        """
+        self._rdata = {ExternalsDescription.PROTOCOL: 'git',
+                       ExternalsDescription.REPO_URL:
+                       'https://www.github.com/very_nice_org/useful_repo',
+                       ExternalsDescription.TAG: 'very_useful_tag',
+                       ExternalsDescription.BRANCH: EMPTY_STR,
+                       ExternalsDescription.HASH: EMPTY_STR,
+                       ExternalsDescription.SPARSE: EMPTY_STR, }
+        self._repo = GitRepository('test', self._rdata,
+                                   clone_options={'depth': 1})
+
+    def test_shallow_tag(self):
+        """Verify a tag is fetched by its full ref
+        """
+        self.assertEqual(self._repo._shallow_refspec(),
+                         '+refs/tags/very_useful_tag:refs/tags/very_useful_tag')
+
+    def test_shallow_hash(self):
+        """Verify a full hash is fetched, an abbreviated one is not
+        """
+        self._repo._tag = EMPTY_STR
+        self._repo._hash = '56cc0b539426eb26810af9e56cc0b539426eb268'
+        self.assertEqual(self._repo._shallow_refspec(), self._repo._hash)
+        self._repo._hash = '56cc0b5394'
+        self.assertIsNone(self._repo._shallow_refspec())
+
+    def test_shallow_branch(self):
+        """Verify a branch is not fetched shallow
+        """
+        self._repo._tag = EMPTY_STR
+        self._repo._branch = 'feature2'
+        self.assertIsNone(self._repo._shallow_refspec())
+
+    def test_not_shallow(self):
+        """Verify nothing is fetched shallow without a depth
+        """
+        repo = GitRepository('test', self._rdata)
+        self.assertIsNone(repo._shallow_refspec())
+
+
+class TestGitUpdateSubmodules(unittest.TestCase):
+    """Test the command run by _git_update_submodules
+    """
+
+    def setUp(self):
+        """Run in a directory with a .gitmodules file and record the commands
+        instead of executing them
+        """
+        self._cwd = os.getcwd()
+        self._tmpdir = tempfile.mkdtemp()
+        os.chdir(self._tmpdir)
+        with open(ExternalsDescription.GIT_SUBMODULES_FILENAME, 'w') as fhandle:
+            fhandle.write('')
+        self._commands = []
+        self._execute_subprocess = manic.repository_git.execute_subprocess
+        manic.repository_git.execute_subprocess = self._mock_execute_subprocess
+
+    def tearDown(self):
+        """Restore execute_subprocess and clean up
+        """
+        manic.repository_git.execute_subprocess = self._execute_subprocess
+        os.chdir(self._cwd)
+        shutil.rmtree(self._tmpdir, ignore_errors=True)
+
+    def _mock_execute_subprocess(self, cmd, **kwargs):
+        """Record the command
+        """
+        # pylint: disable=unused-argument
+        self._commands.append(cmd)
+        return 0
+
+    def test_submodules_default(self):
+        """Verify submodules are cloned in full by default
+        """
+        GitRepository._git_update_submodules(0)
+        self.assertEqual(self._commands,
+                         [['git', 'submodule', 'update', '--init',
+                           '--recursive']])
+
+    def test_submodules_depth_filter(self):
+        """Verify the depth and filter are passed on to the submodules
+        """
+        GitRepository._git_update_submodules(0, depth=1,
+                                              filter_spec='blob:none')
+        self.assertEqual(self._commands,
+                         [['git', 'submodule', 'update', '--init',
+                           '--recursive', '--depth', '1',
+                           '--filter', 'blob:none']])
+
+
+class TestGitFetchShallow(unittest.TestCase):
+    """Test the command run by _git_fetch_shallow
+    """
+
+    def setUp(self):
+        """Record the commands instead of executing them
+        """
+        self._commands = []
+        self._execute_subprocess = manic.repository_git.execute_subprocess
+        manic.repository_git.execute_subprocess = self._mock_execute_subprocess
+
+    def tearDown(self):
+        """Restore execute_subprocess
+        """
+        manic.repository_git.execute_subprocess = self._execute_subprocess
+
+    def _mock_execute_subprocess(self, cmd, **kwargs):
+        """Record the command
+        """
+        # pylint: disable=unused-argument
+        self._commands.append(cmd)
+        return 0
+
+    def test_fetch_shallow(self):
+        """Verify a single ref is fetched with the depth
+        """
+        GitRepository._git_fetch_shallow('origin', 'abc123', 1)
+        self.assertEqual(self._commands,
+                         [['git', 'fetch', '--quiet', '--no-tags',
+                           '--depth', '1', 'origin', 'abc123']])
+
+    def test_fetch_shallow_filter(self):
+        """Verify the filter is passed on to a shallow fetch
+        """
+        GitRepository._git_fetch_shallow('origin', 'abc123', 1,
+                                         filter_spec='blob:none')
+        self.assertEqual(self._commands,
+                         [['git', 'fetch', '--quiet', '--no-tags',
+                           '--depth', '1', '--filter', 'blob:none',
+                           'origin', 'abc123']])
+
+
 if __name__ == '__main__':
     unittest.main()
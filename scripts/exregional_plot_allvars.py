@@ -44,28 +44,50 @@
 ################################################################################
 
 # -------------Import modules --------------------------#
-import pygrib
 import cartopy.crs as ccrs
 from cartopy.mpl.gridliner import LONGITUDE_FORMATTER, LATITUDE_FORMATTER
 import cartopy.feature as cfeature
 import matplotlib
 
 matplotlib.use("Agg")
-import io
 import matplotlib.pyplot as plt
 import dateutil.relativedelta, dateutil.parser
-from PIL import Image
 from matplotlib.gridspec import GridSpec
 import numpy as np
-import time, os, sys, multiprocessing
+import copy, time, os, sys, multiprocessing
 import multiprocessing.pool
-from scipy import ndimage
-import pyproj
 import argparse
 import cartopy
 import logging
 import warnings
 
+# Shared plotting utilities are in ush/plot_utils
+sys.path.append(
+    os.environ.get(
+        "USHdir", os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "ush")
+    )
+)
+from plot_utils import (
+    GribReader,
+    PNG_MODES,
+    PRODUCT_FIELDS,
+    PngWriter,
+    background_key,
+    decimate_mesh,
+    follow_files,
+    gaussian_smooth,
+    grid_geometry,
+    load_background,
+    lod_factor,
+    map_region,
+    plot_fields,
+    render_background,
+    render_figure,
+    save_background,
+    set_background,
+    wind_rotation,
+)
+
 # --------------Define some functions ------------------#
 
 
@@ -115,12 +137,11 @@ def clear_plotables(ax, keep_ax_lst, fig):
 
 def compress_and_save(filename):
     #### - compress and save the image - ####
-    ram = io.BytesIO()
-    plt.savefig(ram, format="png", bbox_inches="tight", dpi=150)
-    ram.seek(0)
-    im = Image.open(ram)
-    im2 = im.convert("RGB")  # .convert('P', palette=Image.ADAPTIVE)
-    im2.save(filename, format="PNG")
+    # The plots of a product and domain have the same bounding box at all
+    # forecast hours, so it is only found for the first one
+    name = os.path.basename(filename).rsplit("_f", 1)[0]
+    image, _boxes[name] = render_figure(plt.gcf(), 150, _boxes.get(name))
+    _writer.save(filename, image)
 
 
 def cmap_t2m():
@@ -186,7 +207,9 @@ def cmap_q2m():
     return cmap_q2m_coltbl
 
 
-def rotate_wind(true_lat, lov_lon, earth_lons, uin, vin, proj, inverse=False):
+def rotate_wind(
+    true_lat, lov_lon, earth_lons, uin, vin, proj, inverse=False, rotation=None
+):
     #  Rotate winds from LCC relative to earth relative (or vice-versa if inverse==true)
     #   This routine is vectorized and *should* work on any size 2D vg and ug arrays.
     #   Program will quit if dimensions are too large.
@@ -201,6 +224,8 @@ def rotate_wind(true_lat, lov_lon, earth_lons, uin, vin, proj, inverse=False):
     #
     #  earth_lons = Earth relative longitudes (can be an array, in degrees)
     #  uin, vin     = Input winds to rotate
+    #  rotation = (sin, cos) of the rotation angles, if already computed for
+    #             these earth_lons (see plot_utils.wind_rotation)
     #
     # Returns:
     #  uout, vout = Output, rotated winds
@@ -212,10 +237,6 @@ def rotate_wind(true_lat, lov_lon, earth_lons, uin, vin, proj, inverse=False):
     if ndims > 2:
         # Raise error and quit!
         raise SystemExit("Input winds for rotation have greater than 2 dimensions!")
-    if lov_lon > 0.0:
-        lov_lon = lov_lon - 360.0
-    dtr = np.pi / 180.0  # Degrees to radians
-
     if not isinstance(inverse, bool):
         raise TypeError("**kwarg inverse must be of type bool.")
 
@@ -224,18 +245,12 @@ def rotate_wind(true_lat, lov_lon, earth_lons, uin, vin, proj, inverse=False):
     # of a polar stereographic projection, this is one.
     # See the following pdf for excellent documentation
     # http://www.dtcenter.org/met/users/docs/write_ups/velocity.pdf
-    if proj.lower() == "lcc":
-        rotcon_p = np.sin(true_lat * dtr)
-    elif proj.lower() in ["stere", "spstere", "npstere"]:
-        rotcon_p = 1.0
-    else:
-        raise SystemExit(
-            "Unsupported map projection: " + proj.lower() + " for wind rotation."
-        )
-
-    angles = rotcon_p * (earth_lons - lov_lon) * dtr
-    sinx2 = np.sin(angles)
-    cosx2 = np.cos(angles)
+    if rotation is None:
+        try:
+            rotation = wind_rotation(true_lat, lov_lon, earth_lons, proj)
+        except ValueError as e:
+            raise SystemExit(str(e))
+    sinx2, cosx2 = rotation
 
     # Steps below are elementwise products, not matrix mutliplies
     if inverse == False:
@@ -263,9 +278,1161 @@ def setup_logging(debug=False):
     if debug:
         logging.info("Logging level set to DEBUG")
 
-# -------------Start of script -------------------------#
-if __name__ == "__main__":
+# --------------Plotting processes ---------------------#
+
+# Settings of the run being plotted. They are set by init_worker() in each
+# plotting process.
+CYCLE = None
+COMOUT = None
+CARTOPY_DIR = None
+POST_OUTPUT_DOMAIN_NAME = None
+CACHE_DIR = None
+QUALITY = "full"
+PLOT_PRODUCTS = None
+
+# The data of the forecast hour being plotted and the map of each domain are
+# kept by each process and reused for the following products
+_hour = {}
+_maps = {}
+
+# The bounding boxes of the plots and the writer of the PNG files of each
+# process
+_boxes = {}
+_writer = None
+
+
+def init_worker(settings, debug=False):
+    """Set up a plotting process.
+
+    Args:
+        settings: dictionary with the cycle (YYYYMMDDHH), COMOUT, CARTOPY_DIR
+                  and POST_OUTPUT_DOMAIN_NAME of the run and the directory
+                  of cached map backgrounds and grid geometry (cache_dir, None
+                  for no cache) and the quality of the plots
+                  (quality, "full" or "display", see lod_mesh()) and of the
+                  PNG files (png_mode, see plot_utils.PNG_MODES) and the
+                  names of the products to plot (products)
+        debug: print debug messages
+    """
+    global CYCLE, COMOUT, CARTOPY_DIR, POST_OUTPUT_DOMAIN_NAME, CACHE_DIR, QUALITY
+    global PLOT_PRODUCTS, _writer
+    CYCLE = settings["cycle"]
+    COMOUT = settings["comout"]
+    CARTOPY_DIR = settings["cartopy_dir"]
+    POST_OUTPUT_DOMAIN_NAME = settings["domain"]
+    CACHE_DIR = settings["cache_dir"]
+    QUALITY = settings["quality"]
+    PLOT_PRODUCTS = settings["products"]
+
+    # The PNG files of each product are written by the end of plot_product();
+    # the thread of the writer is stopped when the process exits
+    _writer = PngWriter(settings["png_mode"])
+    multiprocessing.util.Finalize(_writer, _writer.close, exitpriority=10)
+
+    setup_logging(debug)
+    # Throw away python warnings (mostly depreciation.)
+    warnings.simplefilter("ignore")
+
+
+def post_file(fhr):
+    """Get the path of the post output file of a forecast hour."""
+    return (
+        COMOUT
+        + "/rrfs.t"
+        + CYCLE[8:10]
+        + "z.prslev.f"
+        + str(fhr).zfill(3)
+        + "."
+        + POST_OUTPUT_DOMAIN_NAME
+        + ".grib2"
+    )
+
+
+def open_hour(fhr):
+    """Get the data of a forecast hour. The GRIB file is indexed once per
+    process and forecast hour, for the fields of the products being
+    plotted only; fields are decoded when a plot needs them.
+
+    Returns:
+        dictionary with fhr, fhour, itime, vtime, the GribReader of the post
+        output file (data) and the grid geometry (see plot_utils.grid_geometry())
+    """
+    if _hour.get("fhr") == fhr:
+        return _hour
+
+    t1a = time.perf_counter()
+    fhour = str(fhr).zfill(3)
+    _hour.clear()
+    data = GribReader(post_file(fhr), plot_fields(fhr, PLOT_PRODUCTS))
+    _hour.update(
+        fhr=fhr,
+        fhour=fhour,
+        itime=CYCLE,
+        vtime=ndate(CYCLE, int(fhr)),
+        data=data,
+        **grid_geometry(data.grid_message, CACHE_DIR),
+    )
+    logging.info(_hour["Lat0"])
+    logging.info(_hour["Lon0"])
+
+    t2a = time.perf_counter()
+    t3a = round(t2a - t1a, 3)
+    logging.info(("%.3f seconds to index forecast hour " + fhour) % t3a)
+    return _hour
+
+
+def setup_map(dom, hour):
+    """Set up the map of a domain. The map is drawn once per process and
+    domain, and its background is taken from the cache of map backgrounds
+    if it is there.
+
+    Returns:
+        dictionary with the figure (fig), the map axes (ax), the artists of
+        the map (keep_ax_lst), the transform of the data, the part of the
+        grid on the map (region, see plot_utils.map_region()) and the
+        colorbar of the last plot (cbar)
+    """
+    if dom in _maps:
+        return _maps[dom]
+
+    lat, lon = hour["lat"], hour["lon"]
+    Lat0, Lon0 = hour["Lat0"], hour["Lon0"]
 
+    # Map corners for each domain
+    if dom == "conus":
+        llcrnrlon = -120.5
+        llcrnrlat = 21.0
+        urcrnrlon = -64.5
+        urcrnrlat = 49.0
+        lat_0 = 35.4
+        lon_0 = -97.6
+        extent = [llcrnrlon - 3, urcrnrlon - 6, llcrnrlat - 1, urcrnrlat + 2]
+    elif dom == "regional":
+        llcrnrlon = np.min(lon)
+        llcrnrlat = np.min(lat)
+        urcrnrlon = np.max(lon)
+        urcrnrlat = np.max(lat)
+        lat_0 = Lat0
+        lon_0 = Lon0
+        extent = [llcrnrlon, urcrnrlon, llcrnrlat - 1, urcrnrlat]
+
+    # create figure and axes instances
+    fig = plt.figure(figsize=(10, 10))
+    ax1 = fig.add_axes([0.1, 0.1, 0.8, 0.8])
+
+    # Define where Cartopy Maps are located
+    cartopy.config["data_dir"] = CARTOPY_DIR
+
+    back_res = "50m"
+    back_img = "on"
+
+    # set up the map background with cartopy
+    myproj = ccrs.LambertConformal(
+        central_longitude=lon_0,
+        central_latitude=lat_0,
+        false_easting=0.0,
+        false_northing=0.0,
+        secant_latitudes=None,
+        standard_parallels=None,
+        globe=None,
+    )
+    ax = plt.axes(projection=myproj)
+    ax.set_extent(extent)
+
+    fline_wd = 0.5  # line width
+    falpha = 0.3  # transparency
+
+    # natural_earth
+    #  land=cfeature.NaturalEarthFeature('physical','land',back_res,
+    #                    edgecolor='face',facecolor=cfeature.COLORS['land'],
+    #                    alpha=falpha)
+    lakes = cfeature.NaturalEarthFeature(
+        "physical",
+        "lakes",
+        back_res,
+        edgecolor="blue",
+        facecolor="none",
+        linewidth=fline_wd,
+        alpha=falpha,
+    )
+    coastline = cfeature.NaturalEarthFeature(
+        "physical",
+        "coastline",
+        back_res,
+        edgecolor="blue",
+        facecolor="none",
+        linewidth=fline_wd,
+        alpha=falpha,
+    )
+    states = cfeature.NaturalEarthFeature(
+        "cultural",
+        "admin_1_states_provinces",
+        back_res,
+        edgecolor="black",
+        facecolor="none",
+        linewidth=fline_wd,
+        linestyle=":",
+        alpha=falpha,
+    )
+    borders = cfeature.NaturalEarthFeature(
+        "cultural",
+        "admin_0_countries",
+        back_res,
+        edgecolor="red",
+        facecolor="none",
+        linewidth=fline_wd,
+        alpha=falpha,
+    )
+
+    # All lat lons are earth relative, so setup the associated projection correct for that data
+    transform = ccrs.PlateCarree()
+
+    # The map background is drawn once per domain and cached as images,
+    # which are drawn with the data of every plot
+    key = background_key(fig, ax, extent, 150, [CARTOPY_DIR, back_res, back_img])
+    background = load_background(CACHE_DIR, key)
+    if background is None:
+        keep_ax_lst = ax.get_children()[:]
+
+        # high-resolution background images
+        if back_img == "on":
+            img = plt.imread(CARTOPY_DIR + "/raster_files/NE1_50M_SR_W.tif")
+            ax.imshow(img, origin="upper", transform=transform)
+        background = {"image": render_background(fig, ax, 150)}
+        clear_plotables(ax, keep_ax_lst, fig)
+
+        #  ax.add_feature(land)
+        ax.add_feature(lakes)
+        ax.add_feature(states)
+        ax.add_feature(borders)
+        ax.add_feature(coastline)
+        background["features"] = render_background(fig, ax, 150, transparent=True)
+        clear_plotables(ax, keep_ax_lst, fig)
+
+        save_background(CACHE_DIR, key, background)
+    set_background(ax, background)
+
+    # Map/figure has been set up here, save axes instances for use again later
+    keep_ax_lst = ax.get_children()[:]
+
+    _maps[dom] = {
+        "fig": fig,
+        "ax": ax,
+        "keep_ax_lst": keep_ax_lst,
+        "transform": transform,
+        "region": map_region(ax, lon, lat, transform),
+        "cbar": None,
+    }
+    return _maps[dom]
+
+
+def lod_mesh(ax, x, y, field, how="mean"):
+    """Decimate a field and its grid to about the resolution of the saved
+    plot (see plot_utils.decimate_mesh()) when plots are made at display
+    quality.
+
+    Args:
+        ax: the map axes the field is plotted on
+        x, y: lon/lat of the grid
+        field: the field
+        how: reduction of the blocks of the grid ("mean" for smooth fields,
+             "max" or "absmax" to keep extremes)
+    Returns:
+        (x, y, field) tuple, as given if plots are made at full quality
+    """
+    if QUALITY == "full":
+        return x, y, field
+    return decimate_mesh(x, y, field, lod_factor(ax, _hour["dx"], 150), how)
+
+
+def smooth(dom, field, sigma):
+    """Smooth the part of a field on the map of a domain with a Gaussian
+    filter of standard deviation sigma (grid points), see
+    plot_utils.gaussian_smooth(). The field is masked off the map."""
+    return gaussian_smooth(field, sigma, region=_maps[dom]["region"])
+
+
+def plot_slp(dom, hour, ax, transform):
+    """Plot sea level pressure"""
+    fhour, itime, vtime = hour["fhour"], hour["itime"], hour["vtime"]
+    lon_shift, lat_shift = hour["lon_shift"], hour["lat_shift"]
+    data = hour["data"]
+
+    # Sea level pressure
+    slp = data.values("slp") * 0.01
+    slpsmooth = smooth(dom, slp, 13.78)
+
+    units = "mb"
+    clevs = [
+        976,
+        980,
+        984,
+        988,
+        992,
+        996,
+        1000,
+        1004,
+        1008,
+        1012,
+        1016,
+        1020,
+        1024,
+        1028,
+        1032,
+        1036,
+        1040,
+        1044,
+        1048,
+        1052,
+    ]
+    cm = plt.cm.Spectral_r
+    norm = matplotlib.colors.BoundaryNorm(clevs, cm.N)
+
+    cs1_a = plt.pcolormesh(
+        *lod_mesh(ax, lon_shift, lat_shift, slp, "mean"),
+        transform=transform,
+        cmap=cm,
+        norm=norm,
+    )
+    cbar1 = plt.colorbar(
+        cs1_a, orientation="horizontal", pad=0.05, shrink=0.6, extend="both"
+    )
+    cbar1.set_label(units, fontsize=8)
+    cbar1.ax.tick_params(labelsize=8)
+    cs1_b = plt.contour(
+        lon_shift,
+        lat_shift,
+        slpsmooth,
+        np.arange(940, 1060, 4),
+        colors="black",
+        linewidths=1.25,
+        transform=transform,
+    )
+    plt.clabel(cs1_b, np.arange(940, 1060, 4), inline=1, fmt="%d", fontsize=8)
+    ax.text(
+        0.5,
+        1.03,
+        "FV3-LAM SLP ("
+        + units
+        + ") \n initialized: "
+        + itime
+        + " valid: "
+        + vtime
+        + " (f"
+        + fhour
+        + ")",
+        horizontalalignment="center",
+        fontsize=8,
+        transform=ax.transAxes,
+        bbox=dict(facecolor="white", alpha=0.85, boxstyle="square,pad=0.2"),
+    )
+
+    compress_and_save(
+        COMOUT + "/slp_" + dom + "_f" + fhour + ".png"
+    )
+
+    return cbar1
+
+
+def plot_t2m(dom, hour, ax, transform):
+    """Plot 2-m temperature"""
+    fhour, itime, vtime = hour["fhour"], hour["itime"], hour["vtime"]
+    lon_shift, lat_shift = hour["lon_shift"], hour["lat_shift"]
+    data = hour["data"]
+
+    # 2-m temperature
+    tmp2m = data.values("tmp2m")
+    tmp2m = (tmp2m - 273.15) * 1.8 + 32.0
+
+    units = "\xb0" "F"
+    clevs = np.linspace(-16, 134, 51)
+    cm = copy.copy(plt.cm.Spectral_r)  # cmap_t2m()
+    norm = matplotlib.colors.BoundaryNorm(clevs, cm.N)
+
+    cs_1 = plt.pcolormesh(
+        *lod_mesh(ax, lon_shift, lat_shift, tmp2m, "mean"),
+        transform=transform,
+        cmap=cm,
+        norm=norm,
+    )
+    cs_1.cmap.set_under("white")
+    cs_1.cmap.set_over("white")
+    cbar1 = plt.colorbar(
+        cs_1,
+        orientation="horizontal",
+        pad=0.05,
+        shrink=0.6,
+        ticks=[-16, -4, 8, 20, 32, 44, 56, 68, 80, 92, 104, 116, 128],
+        extend="both",
+    )
+    cbar1.set_label(units, fontsize=8)
+    cbar1.ax.tick_params(labelsize=8)
+    ax.text(
+        0.5,
+        1.03,
+        "FV3-LAM 2-m Temperature ("
+        + units
+        + ") \n initialized: "
+        + itime
+        + " valid: "
+        + vtime
+        + " (f"
+        + fhour
+        + ")",
+        horizontalalignment="center",
+        fontsize=8,
+        transform=ax.transAxes,
+        bbox=dict(facecolor="white", alpha=0.85, boxstyle="square,pad=0.2"),
+    )
+
+    compress_and_save(
+        COMOUT + "/2mt_" + dom + "_f" + fhour + ".png"
+    )
+
+    return cbar1
+
+
+def plot_dew2m(dom, hour, ax, transform):
+    """Plot 2-m dew point temperature"""
+    fhour, itime, vtime = hour["fhour"], hour["itime"], hour["vtime"]
+    lon_shift, lat_shift = hour["lon_shift"], hour["lat_shift"]
+    data = hour["data"]
+
+    # 2-m dew point temperature
+    dew2m = data.values("dew2m")
+    dew2m = (dew2m - 273.15) * 1.8 + 32.0
+
+    units = "\xb0" "F"
+    clevs = np.linspace(-5, 80, 35)
+    cm = cmap_q2m()
+    norm = matplotlib.colors.BoundaryNorm(clevs, cm.N)
+
+    cs_1 = plt.pcolormesh(
+        *lod_mesh(ax, lon_shift, lat_shift, dew2m, "mean"),
+        transform=transform,
+        cmap=cm,
+        norm=norm,
+    )
+    cbar1 = plt.colorbar(
+        cs_1, orientation="horizontal", pad=0.05, shrink=0.6, extend="both"
+    )
+    cbar1.set_label(units, fontsize=8)
+    cbar1.ax.tick_params(labelsize=8)
+    ax.text(
+        0.5,
+        1.03,
+        "FV3-LAM 2-m Dew Point Temperature ("
+        + units
+        + ") \n initialized: "
+        + itime
+        + " valid: "
+        + vtime
+        + " (f"
+        + fhour
+        + ")",
+        horizontalalignment="center",
+        fontsize=8,
+        transform=ax.transAxes,
+        bbox=dict(facecolor="white", alpha=0.85, boxstyle="square,pad=0.2"),
+    )
+
+    compress_and_save(
+        COMOUT + "/2mdew_" + dom + "_f" + fhour + ".png"
+    )
+
+    return cbar1
+
+
+def plot_wind10m(dom, hour, ax, transform):
+    """Plot 10-m wind speed and barbs"""
+    fhour, itime, vtime = hour["fhour"], hour["itime"], hour["vtime"]
+    lon_shift, lat_shift = hour["lon_shift"], hour["lat_shift"]
+    lon, Lat0, Lon0, dx = hour["lon"], hour["Lat0"], hour["Lon0"], hour["dx"]
+    rotation = hour["sinx"], hour["cosx"]
+    data = hour["data"]
+
+    # 10-m wind speed
+    uwind = data.values("u10m") * 1.94384
+    vwind = data.values("v10m") * 1.94384
+    # Rotate winds from grid relative to Earth relative
+    uwind, vwind = rotate_wind(
+        Lat0, Lon0, lon, uwind, vwind, "lcc", inverse=False, rotation=rotation
+    )
+    wspd10m = np.sqrt(uwind**2 + vwind**2)
+
+    units = "kts"
+    # Places a wind barb every ~180 km, optimized for CONUS domain
+    skip = round(177.28 * (dx / 1000.0) ** -0.97)
+    logging.info("skipping every " + str(skip) + " grid points to plot")
+    barblength = 4
+
+    clevs = [5, 10, 15, 20, 25, 30, 35, 40, 45, 50, 55, 60]
+    colorlist = [
+        "turquoise",
+        "dodgerblue",
+        "blue",
+        "#FFF68F",
+        "#E3CF57",
+        "peru",
+        "brown",
+        "crimson",
+        "red",
+        "fuchsia",
+        "DarkViolet",
+    ]
+    cm = matplotlib.colors.ListedColormap(colorlist)
+    norm = matplotlib.colors.BoundaryNorm(clevs, cm.N)
+
+    cs_1 = plt.pcolormesh(
+        *lod_mesh(ax, lon_shift, lat_shift, wspd10m, "mean"),
+        transform=transform,
+        cmap=cm,
+        vmin=5,
+        norm=norm,
+    )
+    cs_1.cmap.set_under("white", alpha=0.0)
+    cs_1.cmap.set_over("black")
+    cbar1 = plt.colorbar(
+        cs_1,
+        orientation="horizontal",
+        pad=0.05,
+        shrink=0.6,
+        ticks=clevs,
+        extend="max",
+    )
+    cbar1.set_label(units, fontsize=8)
+    cbar1.ax.tick_params(labelsize=8)
+    plt.barbs(
+        lon_shift[::skip, ::skip],
+        lat_shift[::skip, ::skip],
+        uwind[::skip, ::skip],
+        vwind[::skip, ::skip],
+        length=barblength,
+        linewidth=0.5,
+        color="black",
+        transform=transform,
+    )
+    ax.text(
+        0.5,
+        1.03,
+        "FV3-LAM 10-m Winds ("
+        + units
+        + ") \n initialized: "
+        + itime
+        + " valid: "
+        + vtime
+        + " (f"
+        + fhour
+        + ")",
+        horizontalalignment="center",
+        fontsize=8,
+        transform=ax.transAxes,
+        bbox=dict(facecolor="white", alpha=0.85, boxstyle="square,pad=0.2"),
+    )
+
+    compress_and_save(
+        COMOUT + "/10mwind_" + dom + "_f" + fhour + ".png"
+    )
+
+    return cbar1
+
+
+def plot_sfcape(dom, hour, ax, transform):
+    """Plot surface-based CAPE and CIN"""
+    fhour, itime, vtime = hour["fhour"], hour["itime"], hour["vtime"]
+    lon_shift, lat_shift = hour["lon_shift"], hour["lat_shift"]
+    data = hour["data"]
+
+    # Surface-based CAPE
+    cape = data.values("cape")
+
+    # Surface-based CIN
+    cin = data.values("cin")
+
+    units = "J/kg"
+    clevs = [100, 250, 500, 1000, 1500, 2000, 2500, 3000, 3500, 4000, 4500, 5000]
+    clevs2 = [-2000, -500, -250, -100, -25]
+    colorlist = [
+        "blue",
+        "dodgerblue",
+        "cyan",
+        "mediumspringgreen",
+        "#FAFAD2",
+        "#EEEE00",
+        "#EEC900",
+        "darkorange",
+        "crimson",
+        "darkred",
+        "darkviolet",
+    ]
+    cm = matplotlib.colors.ListedColormap(colorlist)
+    norm = matplotlib.colors.BoundaryNorm(clevs, cm.N)
+
+    cs_1 = plt.pcolormesh(
+        *lod_mesh(ax, lon_shift, lat_shift, cape, "mean"),
+        transform=transform,
+        cmap=cm,
+        vmin=100,
+        norm=norm,
+    )
+    cs_1.cmap.set_under("white", alpha=0.0)
+    cs_1.cmap.set_over("black")
+    cbar1 = plt.colorbar(
+        cs_1,
+        orientation="horizontal",
+        pad=0.05,
+        shrink=0.6,
+        ticks=clevs,
+        extend="max",
+    )
+    cbar1.set_label(units, fontsize=8)
+    cbar1.ax.tick_params(labelsize=8)
+    plt.contourf(
+        lon_shift,
+        lat_shift,
+        cin,
+        clevs2,
+        colors="none",
+        hatches=["**", "++", "////", ".."],
+        transform=transform,
+    )
+    ax.text(
+        0.5,
+        1.05,
+        "FV3-LAM Surface-Based CAPE (shaded) and CIN (hatched) ("
+        + units
+        + ") \n <-500 (*), -500<-250 (+), -250<-100 (/), -100<-25 (.) \n initialized: "
+        + itime
+        + " valid: "
+        + vtime
+        + " (f"
+        + fhour
+        + ")",
+        horizontalalignment="center",
+        fontsize=8,
+        transform=ax.transAxes,
+        bbox=dict(facecolor="white", alpha=0.85, boxstyle="square,pad=0.2"),
+    )
+
+    compress_and_save(
+        COMOUT + "/sfcape_" + dom + "_f" + fhour + ".png"
+    )
+
+    return cbar1
+
+
+def plot_500mb(dom, hour, ax, transform):
+    """Plot 500 mb heights, winds and vorticity"""
+    fhour, itime, vtime = hour["fhour"], hour["itime"], hour["vtime"]
+    lon_shift, lat_shift = hour["lon_shift"], hour["lat_shift"]
+    lon, Lat0, Lon0, dx = hour["lon"], hour["Lat0"], hour["Lon0"], hour["dx"]
+    rotation = hour["sinx"], hour["cosx"]
+    data = hour["data"]
+
+    # 500 mb height, wind, vorticity
+    try:
+        z500 = data.values("z500") * 0.1
+        z500 = smooth(dom, z500, 6.89)
+        vort500 = data.values("vort500") * 100000
+        vort500 = smooth(dom, vort500, 1.7225)
+        vort500[vort500 > 1000] = 0  # Mask out undefined values on domain edge
+        u500 = data.values("u500") * 1.94384
+        v500 = data.values("v500") * 1.94384
+        # Rotate winds from grid relative to Earth relative
+        u500, v500 = rotate_wind(
+            Lat0, Lon0, lon, u500, v500, "lcc", inverse=False, rotation=rotation
+        )
+    except KeyError:
+        return None
+
+    units = "x10${^5}$ s${^{-1}}$"
+    skip = round(177.28 * (dx / 1000.0) ** -0.97)
+    barblength = 4
+
+    vortlevs = [16, 20, 24, 28, 32, 36, 40]
+    colorlist = ["yellow", "gold", "goldenrod", "orange", "orangered", "red"]
+    cm = matplotlib.colors.ListedColormap(colorlist)
+    norm = matplotlib.colors.BoundaryNorm(vortlevs, cm.N)
+
+    cs1_a = plt.pcolormesh(
+        *lod_mesh(ax, lon_shift, lat_shift, vort500, "mean"),
+        transform=transform,
+        cmap=cm,
+        norm=norm,
+    )
+    cs1_a.cmap.set_under("white")
+    cs1_a.cmap.set_over("darkred")
+    cbar1 = plt.colorbar(
+        cs1_a,
+        orientation="horizontal",
+        pad=0.05,
+        shrink=0.6,
+        ticks=vortlevs,
+        extend="both",
+    )
+    cbar1.set_label(units, fontsize=8)
+    cbar1.ax.tick_params(labelsize=8)
+    plt.barbs(
+        lon_shift[::skip, ::skip],
+        lat_shift[::skip, ::skip],
+        u500[::skip, ::skip],
+        v500[::skip, ::skip],
+        length=barblength,
+        linewidth=0.5,
+        color="steelblue",
+        transform=transform,
+    )
+    cs1_b = plt.contour(
+        lon_shift,
+        lat_shift,
+        z500,
+        np.arange(486, 600, 6),
+        colors="black",
+        linewidths=1,
+        transform=transform,
+    )
+    plt.clabel(
+        cs1_b, np.arange(486, 600, 6), inline_spacing=1, fmt="%d", fontsize=8
+    )
+    ax.text(
+        0.5,
+        1.03,
+        "FV3-LAM 500 mb Heights (dam), Winds (kts), and $\zeta$ ("
+        + units
+        + ") \n initialized: "
+        + itime
+        + " valid: "
+        + vtime
+        + " (f"
+        + fhour
+        + ")",
+        horizontalalignment="center",
+        fontsize=8,
+        transform=ax.transAxes,
+        bbox=dict(facecolor="white", alpha=0.85, boxstyle="square,pad=0.2"),
+    )
+
+    compress_and_save(
+        COMOUT + "/500_" + dom + "_f" + fhour + ".png"
+    )
+
+    return cbar1
+
+
+def plot_wind250mb(dom, hour, ax, transform):
+    """Plot 250 mb winds"""
+    fhour, itime, vtime = hour["fhour"], hour["itime"], hour["vtime"]
+    lon_shift, lat_shift = hour["lon_shift"], hour["lat_shift"]
+    lon, Lat0, Lon0, dx = hour["lon"], hour["Lat0"], hour["Lon0"], hour["dx"]
+    rotation = hour["sinx"], hour["cosx"]
+    data = hour["data"]
+
+    # 250 mb winds
+    u250 = data.values("u250") * 1.94384
+    v250 = data.values("v250") * 1.94384
+    # Rotate winds from grid relative to Earth relative
+    u250, v250 = rotate_wind(
+        Lat0, Lon0, lon, u250, v250, "lcc", inverse=False, rotation=rotation
+    )
+    wspd250 = np.sqrt(u250**2 + v250**2)
+
+    units = "kts"
+    skip = round(177.28 * (dx / 1000.0) ** -0.97)
+
+    barblength = 4
+
+    clevs = [50, 60, 70, 80, 90, 100, 110, 120, 130, 140, 150]
+    colorlist = [
+        "turquoise",
+        "deepskyblue",
+        "dodgerblue",
+        "#1874CD",
+        "blue",
+        "beige",
+        "khaki",
+        "peru",
+        "brown",
+        "crimson",
+    ]
+    cm = matplotlib.colors.ListedColormap(colorlist)
+    norm = matplotlib.colors.BoundaryNorm(clevs, cm.N)
+
+    cs_1 = plt.pcolormesh(
+        *lod_mesh(ax, lon_shift, lat_shift, wspd250, "mean"),
+        transform=transform,
+        cmap=cm,
+        vmin=50,
+        norm=norm,
+    )
+    cs_1.cmap.set_under("white", alpha=0.0)
+    cs_1.cmap.set_over("red")
+    cbar1 = plt.colorbar(
+        cs_1,
+        orientation="horizontal",
+        pad=0.05,
+        shrink=0.6,
+        ticks=clevs,
+        extend="max",
+    )
+    cbar1.set_label(units, fontsize=8)
+    cbar1.ax.tick_params(labelsize=8)
+    plt.barbs(
+        lon_shift[::skip, ::skip],
+        lat_shift[::skip, ::skip],
+        u250[::skip, ::skip],
+        v250[::skip, ::skip],
+        length=barblength,
+        linewidth=0.5,
+        color="black",
+        transform=transform,
+    )
+    ax.text(
+        0.5,
+        1.03,
+        "FV3-LAM 250 mb Winds ("
+        + units
+        + ") \n initialized: "
+        + itime
+        + " valid: "
+        + vtime
+        + " (f"
+        + fhour
+        + ")",
+        horizontalalignment="center",
+        fontsize=8,
+        transform=ax.transAxes,
+        bbox=dict(facecolor="white", alpha=0.85, boxstyle="square,pad=0.2"),
+    )
+
+    compress_and_save(
+        COMOUT + "/250wind_" + dom + "_f" + fhour + ".png"
+    )
+
+    return cbar1
+
+
+def plot_qpf(dom, hour, ax, transform):
+    """Plot total accumulated precipitation"""
+    fhr, fhour, itime, vtime = hour["fhr"], hour["fhour"], hour["itime"], hour["vtime"]
+    lon_shift, lat_shift = hour["lon_shift"], hour["lat_shift"]
+    data = hour["data"]
+
+    if fhr == 0:  # Do not make total QPF plot for forecast hour 0
+        return None
+
+    # Total precipitation
+    qpf = data.values("qpf") * 0.0393701
+
+    units = "in"
+    clevs = [
+        0.01,
+        0.1,
+        0.25,
+        0.5,
+        0.75,
+        1,
+        1.25,
+        1.5,
+        1.75,
+        2,
+        2.5,
+        3,
+        4,
+        5,
+        7,
+        10,
+        15,
+        20,
+    ]
+    colorlist = [
+        "chartreuse",
+        "limegreen",
+        "green",
+        "blue",
+        "dodgerblue",
+        "deepskyblue",
+        "cyan",
+        "mediumpurple",
+        "mediumorchid",
+        "darkmagenta",
+        "darkred",
+        "crimson",
+        "orangered",
+        "darkorange",
+        "goldenrod",
+        "gold",
+        "yellow",
+    ]
+    cm = matplotlib.colors.ListedColormap(colorlist)
+    norm = matplotlib.colors.BoundaryNorm(clevs, cm.N)
+
+    cs_1 = plt.pcolormesh(
+        *lod_mesh(ax, lon_shift, lat_shift, qpf, "max"),
+        transform=transform,
+        cmap=cm,
+        vmin=0.01,
+        norm=norm,
+    )
+    cs_1.cmap.set_under("white", alpha=0.0)
+    cs_1.cmap.set_over("pink")
+    cbar1 = plt.colorbar(
+        cs_1,
+        orientation="horizontal",
+        pad=0.05,
+        shrink=0.6,
+        ticks=clevs,
+        extend="max",
+    )
+    cbar1.set_label(units, fontsize=8)
+    cbar1.ax.set_xticklabels(clevs)
+    cbar1.ax.tick_params(labelsize=8)
+    ax.text(
+        0.5,
+        1.03,
+        "FV3-LAM "
+        + fhour
+        + "-hr Accumulated Precipitation ("
+        + units
+        + ") \n initialized: "
+        + itime
+        + " valid: "
+        + vtime
+        + " (f"
+        + fhour
+        + ")",
+        horizontalalignment="center",
+        fontsize=8,
+        transform=ax.transAxes,
+        bbox=dict(facecolor="white", alpha=0.85, boxstyle="square,pad=0.2"),
+    )
+
+    compress_and_save(
+        COMOUT + "/qpf_" + dom + "_f" + fhour + ".png"
+    )
+
+    return cbar1
+
+
+def plot_refc(dom, hour, ax, transform):
+    """Plot composite reflectivity"""
+    fhour, itime, vtime = hour["fhour"], hour["itime"], hour["vtime"]
+    lon_shift, lat_shift = hour["lon_shift"], hour["lat_shift"]
+    data = hour["data"]
+
+    # Composite reflectivity
+    refc = data.values("refc")
+
+    units = "dBZ"
+    clevs = np.linspace(5, 70, 14)
+    colorlist = [
+        "turquoise",
+        "dodgerblue",
+        "mediumblue",
+        "lime",
+        "limegreen",
+        "green",
+        "#EEEE00",
+        "#EEC900",
+        "darkorange",
+        "red",
+        "firebrick",
+        "darkred",
+        "fuchsia",
+    ]
+    cm = matplotlib.colors.ListedColormap(colorlist)
+    norm = matplotlib.colors.BoundaryNorm(clevs, cm.N)
+
+    cs_1 = plt.pcolormesh(
+        *lod_mesh(ax, lon_shift, lat_shift, refc, "max"),
+        transform=transform,
+        cmap=cm,
+        vmin=5,
+        norm=norm,
+    )
+    cs_1.cmap.set_under("white", alpha=0.0)
+    cs_1.cmap.set_over("black")
+    cbar1 = plt.colorbar(
+        cs_1,
+        orientation="horizontal",
+        pad=0.05,
+        shrink=0.6,
+        ticks=clevs,
+        extend="max",
+    )
+    cbar1.set_label(units, fontsize=8)
+    cbar1.ax.tick_params(labelsize=8)
+    ax.text(
+        0.5,
+        1.03,
+        "FV3-LAM Composite Reflectivity ("
+        + units
+        + ") \n initialized: "
+        + itime
+        + " valid: "
+        + vtime
+        + " (f"
+        + fhour
+        + ")",
+        horizontalalignment="center",
+        fontsize=8,
+        transform=ax.transAxes,
+        bbox=dict(facecolor="white", alpha=0.85, boxstyle="square,pad=0.2"),
+    )
+
+    compress_and_save(
+        COMOUT + "/refc_" + dom + "_f" + fhour + ".png"
+    )
+
+    return cbar1
+
+
+def plot_uh25(dom, hour, ax, transform):
+    """Plot max/min hourly 2-5 km updraft helicity"""
+    fhr, fhour, itime, vtime = hour["fhr"], hour["fhour"], hour["itime"], hour["vtime"]
+    lon_shift, lat_shift = hour["lon_shift"], hour["lat_shift"]
+    data = hour["data"]
+
+    if fhr == 0:  # Do not make max/min hourly 2-5 km UH plot for forecast hour 0
+        return None
+
+    # Max/Min Hourly 2-5 km Updraft Helicity
+    maxuh25 = data.values("maxuh25")
+    minuh25 = data.values("minuh25")
+    maxuh25 = np.where(maxuh25 < 10, 0, maxuh25)
+    minuh25 = np.where(minuh25 > -10, 0, minuh25)
+    uh25 = maxuh25 + minuh25
+
+    units = "m${^2}$ s$^{-2}$"
+    clevs = [
+        -150,
+        -100,
+        -75,
+        -50,
+        -25,
+        -10,
+        0,
+        10,
+        25,
+        50,
+        75,
+        100,
+        150,
+        200,
+        250,
+        300,
+    ]
+    #   alternative colormap for just max UH if you don't want to plot the min UH too
+    #     colorlist = ['white','skyblue','mediumblue','green','orchid','firebrick','#EEC900','DarkViolet']
+    colorlist = [
+        "blue",
+        "#1874CD",
+        "dodgerblue",
+        "deepskyblue",
+        "turquoise",
+        "#E5E5E5",
+        "#E5E5E5",
+        "#EEEE00",
+        "#EEC900",
+        "darkorange",
+        "orangered",
+        "red",
+        "firebrick",
+        "mediumvioletred",
+        "darkviolet",
+    ]
+    cm = matplotlib.colors.ListedColormap(colorlist)
+    norm = matplotlib.colors.BoundaryNorm(clevs, cm.N)
+
+    cs_1 = plt.pcolormesh(
+        *lod_mesh(ax, lon_shift, lat_shift, uh25, "absmax"),
+        transform=transform,
+        cmap=cm,
+        norm=norm,
+    )
+    cs_1.cmap.set_under("darkblue")
+    cs_1.cmap.set_over("black")
+    cbar1 = plt.colorbar(
+        cs_1, orientation="horizontal", pad=0.05, shrink=0.6, extend="both"
+    )
+    cbar1.set_label(units, fontsize=8)
+    cbar1.ax.tick_params(labelsize=8)
+    ax.text(
+        0.5,
+        1.03,
+        "FV3-LAM 1-h Max/Min 2-5 km Updraft Helicity ("
+        + units
+        + ") \n initialized: "
+        + itime
+        + " valid: "
+        + vtime
+        + " (f"
+        + fhour
+        + ")",
+        horizontalalignment="center",
+        fontsize=8,
+        transform=ax.transAxes,
+        bbox=dict(facecolor="white", alpha=0.85, boxstyle="square,pad=0.2"),
+    )
+
+    compress_and_save(
+        COMOUT + "/uh25_" + dom + "_f" + fhour + ".png"
+    )
+
+    return cbar1
+
+
+# Products in plotting order. Each entry is (name, function), where the
+# function plots the product on the map, saves it and returns the colorbar,
+# or returns None if the product is not available for the forecast hour.
+# The fields each product is plotted from are listed in
+# plot_utils.PRODUCT_FIELDS.
+PRODUCTS = [
+    ("slp", plot_slp),
+    ("2mt", plot_t2m),
+    ("2mdew", plot_dew2m),
+    ("10mwind", plot_wind10m),
+    ("sfcape", plot_sfcape),
+    ("500", plot_500mb),
+    ("250wind", plot_wind250mb),
+    ("qpf", plot_qpf),
+    ("refc", plot_refc),
+    ("uh25", plot_uh25),
+]
+
+
+def plot_product(unit):
+    """Plot one product. This is the unit of work of the plotting processes.
+
+    Args:
+        unit: (forecast hour, domain, product name) tuple
+    """
+    fhr, dom, product = unit
+    hour = open_hour(fhr)
+    m = setup_map(dom, hour)
+
+    t1 = time.perf_counter()
+    logging.info(("Working on " + product + " for " + dom + " f" + hour["fhour"]))
+
+    # Clear off old plottables but keep all the map info
+    if m["cbar"] is not None:
+        m["cbar"].remove()
+        m["cbar"] = None
+    clear_plotables(m["ax"], m["keep_ax_lst"], m["fig"])
+    plt.sca(m["ax"])
+
+    m["cbar"] = dict(PRODUCTS)[product](dom, hour, m["ax"], m["transform"])
+
+    # Wait for the last PNG file, so that an error writing it fails this unit
+    # of work
+    _writer.wait()
+
+    t2 = time.perf_counter()
+    t3 = round(t2 - t1, 3)
+    logging.info(("%.3f seconds to plot " + product + " for: " + dom) % t3)
+
+
+def parse_args(argv):
+    """Parse command line arguments"""
     parser = argparse.ArgumentParser()
     parser.add_argument(
         "--cycle",
@@ -315,28 +1482,76 @@ if __name__ == "__main__":
         help="Name of domain to plot (either 'conus' or 'regional' or both).",
         required=False,
     )
+    parser.add_argument(
+        "--products",
+        nargs="+",
+        choices=list(PRODUCT_FIELDS),
+        default=list(PRODUCT_FIELDS),
+        help="Names of the products to plot (all of them by default). Only the fields of these products are read.",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        help="Path to directory of cached map backgrounds and grid geometry (no cache if not given).",
+        required=False,
+    )
+    parser.add_argument(
+        "--quality",
+        choices=["full", "display"],
+        default="full",
+        help="Plot fields at full grid resolution, or decimated to the resolution of the plots.",
+    )
+    parser.add_argument(
+        "--png-mode",
+        choices=list(PNG_MODES),
+        default="rgb",
+        help="Save plots as RGB PNG files, or as smaller PNG files with a palette of 256 colors.",
+    )
+    parser.add_argument(
+        "--follow",
+        action="store_true",
+        help="Plot each forecast hour as soon as its post output file is complete, while post is running.",
+    )
+    parser.add_argument(
+        "--follow-timeout",
+        type=float,
+        default=3600.0,
+        help="Seconds to wait for the next post output file in follow mode.",
+    )
+    parser.add_argument(
+        "--nprocs",
+        "-n",
+        type=int,
+        default=1,
+        help="Number of plotting processes.",
+    )
     parser.add_argument(
         "--debug",
         action="store_true",
         help="Print debug messages",
     )
-    args = parser.parse_args()
-    
-    setup_logging(args.debug)
-    
-    # Throw away python warnings (mostly depreciation.)
-    warnings.simplefilter("ignore")
+    return parser.parse_args(argv)
+
+
+def main(argv):
+    """Plot the products asked for for all forecast hours and domains, in
+    parallel if more than one process is asked for."""
+    args = parse_args(argv)
 
     # Read date/time, forecast hour, and directory paths from command line
-    ymdh = str(args.cycle)
-    ymd = ymdh[0:8]
-    year = int(ymdh[0:4])
-    month = int(ymdh[4:6])
-    day = int(ymdh[6:8])
-    hour = int(ymdh[8:10])
-    cyc = str(hour).zfill(2)
-    logging.info(f"{year}, {month}, {day}, {hour}")
-    
+    settings = {
+        "cycle": str(args.cycle),
+        "comout": str(args.comout),
+        "cartopy_dir": str(args.cartopy_dir),
+        "domain": str(args.domain).lower(),
+        "cache_dir": args.cache_dir,
+        "quality": args.quality,
+        "png_mode": args.png_mode,
+        "products": args.products,
+    }
+    init_worker(settings, args.debug)
+    ymdh = settings["cycle"]
+    logging.info(f"{ymdh[0:4]}, {ymdh[4:6]}, {ymdh[6:8]}, {ymdh[8:10]}")
+
     # Define the range of forecast hours to create plots for
     start_fhr = int(args.start)
     end_fhr = int(args.end)
@@ -347,1073 +1562,74 @@ if __name__ == "__main__":
         num = int(((end_fhr - start_fhr) / increment_fhr) + 1)
         fhours = np.linspace(start_fhr, end_fhr, num, dtype="int")
     logging.info(fhours)
-    
-    COMOUT = str(args.comout)
-    CARTOPY_DIR = str(args.cartopy_dir)
-    POST_OUTPUT_DOMAIN_NAME = str(args.domain).lower()
-    
-    # Loop over forecast hours
-    for fhr in fhours:
-        fhour = str(fhr).zfill(3)
-        logging.info("Working on forecast hour " + fhour)
-        itime = ymdh
-        vtime = ndate(itime, int(fhr))
-    
-        # Define the location of the input file
-        data1 = pygrib.open(
-            COMOUT
-            + "/rrfs.t"
-            + cyc
-            + "z.prslev.f"
-            + fhour
-            + "."
-            + POST_OUTPUT_DOMAIN_NAME
-            + ".grib2"
-        )
-    
-        # Get the lats and lons
-        grids = [data1]
-        lats = []
-        lons = []
-        lats_shift = []
-        lons_shift = []
-    
-        for data in grids:
-            # Unshifted grid for contours and wind barbs
-            lat, lon = data[1].latlons()
-            lats.append(lat)
-            lons.append(lon)
-    
-            # Shift grid for pcolormesh
-            lat1 = data[1]["latitudeOfFirstGridPointInDegrees"]
-            lon1 = data[1]["longitudeOfFirstGridPointInDegrees"]
-            try:
-                nx = data[1]["Nx"]
-                ny = data[1]["Ny"]
-            except:
-                nx = data[1]["Ni"]
-                ny = data[1]["Nj"]
-            dx = data[1]["DxInMetres"]
-            dy = data[1]["DyInMetres"]
-            pj = pyproj.Proj(data[1].projparams)
-            llcrnrx, llcrnry = pj(lon1, lat1)
-            llcrnrx = llcrnrx - (dx / 2.0)
-            llcrnry = llcrnry - (dy / 2.0)
-            x = llcrnrx + dx * np.arange(nx)
-            y = llcrnry + dy * np.arange(ny)
-            x, y = np.meshgrid(x, y)
-            lon, lat = pj(x, y, inverse=True)
-            lats_shift.append(lat)
-            lons_shift.append(lon)
-    
-        # Unshifted lat/lon arrays grabbed directly using latlons() method
-        lat = lats[0]
-        lon = lons[0]
-    
-        # Shifted lat/lon arrays for pcolormesh
-        lat_shift = lats_shift[0]
-        lon_shift = lons_shift[0]
-    
-        Lat0 = data1[1]["LaDInDegrees"]
-        Lon0 = data1[1]["LoVInDegrees"]
-        logging.info(Lat0)
-        logging.info(Lon0)
-    
-        # Specify plotting domains
-        # User can add domains here, just need to specify lat/lon information below
-        # (if dom == 'conus' block)
-        domains = args.plot_domains  # Other option is 'regional'
-    
-        ###################################################
-        # Read in all variables and calculate differences #
-        ###################################################
-        t1a = time.perf_counter()
-    
-        # Sea level pressure
-        slp = data1.select(name="Pressure reduced to MSL")[0].values * 0.01
-        slpsmooth = ndimage.gaussian_filter(slp, 13.78)
-    
-        # 2-m temperature
-        tmp2m = data1.select(name="2 metre temperature")[0].values
-        tmp2m = (tmp2m - 273.15) * 1.8 + 32.0
-    
-        # 2-m dew point temperature
-        dew2m = data1.select(name="2 metre dewpoint temperature")[0].values
-        dew2m = (dew2m - 273.15) * 1.8 + 32.0
-    
-        # 10-m wind speed
-        uwind = data1.select(name="10 metre U wind component")[0].values * 1.94384
-        vwind = data1.select(name="10 metre V wind component")[0].values * 1.94384
-        # Rotate winds from grid relative to Earth relative
-        uwind, vwind = rotate_wind(Lat0, Lon0, lon, uwind, vwind, "lcc", inverse=False)
-        wspd10m = np.sqrt(uwind**2 + vwind**2)
-    
-        # Surface-based CAPE
-        cape = data1.select(
-            name="Convective available potential energy", typeOfLevel="surface"
-        )[0].values
-    
-        # Surface-based CIN
-        cin = data1.select(name="Convective inhibition", typeOfLevel="surface")[0].values
-    
-        # 500 mb height, wind, vorticity
-        try:
-            z500 = data1.select(name="Geopotential Height", level=500)[0].values * 0.1
-            z500 = ndimage.gaussian_filter(z500, 6.89)
-            vort500 = data1.select(name="Absolute vorticity", level=500)[0].values * 100000
-            vort500 = ndimage.gaussian_filter(vort500, 1.7225)
-            vort500[vort500 > 1000] = 0  # Mask out undefined values on domain edge
-            u500 = data1.select(name="U component of wind", level=500)[0].values * 1.94384
-            v500 = data1.select(name="V component of wind", level=500)[0].values * 1.94384
-            # Rotate winds from grid relative to Earth relative
-            u500, v500 = rotate_wind(Lat0, Lon0, lon, u500, v500, "lcc", inverse=False)
-        except:
-            u500 = None
-            v500 = None
-    
-        # 250 mb winds
-        u250 = data1.select(name="U component of wind", level=250)[0].values * 1.94384
-        v250 = data1.select(name="V component of wind", level=250)[0].values * 1.94384
-        # Rotate winds from grid relative to Earth relative
-        u250, v250 = rotate_wind(Lat0, Lon0, lon, u250, v250, "lcc", inverse=False)
-        wspd250 = np.sqrt(u250**2 + v250**2)
-    
-        # Total precipitation
-        qpf = (
-            data1.select(name="Total Precipitation", lengthOfTimeRange=fhr)[0].values
-            * 0.0393701
+
+    # Specify plotting domains
+    # User can add domains here, just need to specify lat/lon information in
+    # setup_map() (if dom == 'conus' block)
+    domains = args.plot_domains  # Other option is 'regional'
+
+    products = [product for product, _ in PRODUCTS if product in args.products]
+    nunits = len(fhours) * len(domains) * len(products)
+
+    # Errors of the plotting processes
+    errors = []
+
+    def check():
+        """Stop at the first failed unit of work rather than at the end of
+        the forecast"""
+        if errors:
+            raise errors[0]
+
+    if args.follow:
+        # Plot each forecast hour as soon as post has written it. The hours
+        # are only known to the processes when they are ready.
+        files = {post_file(int(fhr)): int(fhr) for fhr in fhours}
+        fhours = (
+            files[path]
+            for path in follow_files(files, timeout=args.follow_timeout, check=check)
         )
-    
-        # Composite reflectivity
-        refc = data1.select(name="Maximum/Composite radar reflectivity")[0].values
-    
-        if fhr > 0:
-            # Max/Min Hourly 2-5 km Updraft Helicity
-            maxuh25 = data1.select(
-                stepType="max", parameterName="199", topLevel=5000, bottomLevel=2000
-            )[0].values
-            minuh25 = data1.select(
-                stepType="min", parameterName="200", topLevel=5000, bottomLevel=2000
-            )[0].values
-            maxuh25[maxuh25 < 10] = 0
-            minuh25[minuh25 > -10] = 0
-            uh25 = maxuh25 + minuh25
-    
-        t2a = time.perf_counter()
-        t3a = round(t2a - t1a, 3)
-        logging.info(("%.3f seconds to read all messages") % t3a)
-    
-        ########################################
-        #    START PLOTTING FOR EACH DOMAIN    #
-        ########################################
-    
-        def main():
-    
-            # Number of processes must coincide with the number of domains to plot
-            # pool = multiprocessing.Pool(len(domains))
-            # pool.map(plot_all,domains)
-    
-            # To avoid import multiprocessing recursively on MacOS etc.
-            # Anyway since we only have one domain for SRW application
-            for dom in domains:
-                plot_all(dom)
-    
-        def plot_all(dom):
-    
-            t1dom = time.perf_counter()
-    
-            # Map corners for each domain
-            if dom == "conus":
-                llcrnrlon = -120.5
-                llcrnrlat = 21.0
-                urcrnrlon = -64.5
-                urcrnrlat = 49.0
-                lat_0 = 35.4
-                lon_0 = -97.6
-                extent = [llcrnrlon - 3, urcrnrlon - 6, llcrnrlat - 1, urcrnrlat + 2]
-            elif dom == "regional":
-                llcrnrlon = np.min(lon)
-                llcrnrlat = np.min(lat)
-                urcrnrlon = np.max(lon)
-                urcrnrlat = np.max(lat)
-                lat_0 = Lat0
-                lon_0 = Lon0
-                extent = [llcrnrlon, urcrnrlon, llcrnrlat - 1, urcrnrlat]
-    
-            # create figure and axes instances
-            fig = plt.figure(figsize=(10, 10))
-            ax1 = fig.add_axes([0.1, 0.1, 0.8, 0.8])
-    
-            # Define where Cartopy Maps are located
-            cartopy.config["data_dir"] = CARTOPY_DIR
-    
-            back_res = "50m"
-            back_img = "on"
-    
-            # set up the map background with cartopy
-            myproj = ccrs.LambertConformal(
-                central_longitude=lon_0,
-                central_latitude=lat_0,
-                false_easting=0.0,
-                false_northing=0.0,
-                secant_latitudes=None,
-                standard_parallels=None,
-                globe=None,
-            )
-            ax = plt.axes(projection=myproj)
-            ax.set_extent(extent)
-    
-            fline_wd = 0.5  # line width
-            falpha = 0.3  # transparency
-    
-            # natural_earth
-            #  land=cfeature.NaturalEarthFeature('physical','land',back_res,
-            #                    edgecolor='face',facecolor=cfeature.COLORS['land'],
-            #                    alpha=falpha)
-            lakes = cfeature.NaturalEarthFeature(
-                "physical",
-                "lakes",
-                back_res,
-                edgecolor="blue",
-                facecolor="none",
-                linewidth=fline_wd,
-                alpha=falpha,
-            )
-            coastline = cfeature.NaturalEarthFeature(
-                "physical",
-                "coastline",
-                back_res,
-                edgecolor="blue",
-                facecolor="none",
-                linewidth=fline_wd,
-                alpha=falpha,
-            )
-            states = cfeature.NaturalEarthFeature(
-                "cultural",
-                "admin_1_states_provinces",
-                back_res,
-                edgecolor="black",
-                facecolor="none",
-                linewidth=fline_wd,
-                linestyle=":",
-                alpha=falpha,
-            )
-            borders = cfeature.NaturalEarthFeature(
-                "cultural",
-                "admin_0_countries",
-                back_res,
-                edgecolor="red",
-                facecolor="none",
-                linewidth=fline_wd,
-                alpha=falpha,
-            )
-    
-            # All lat lons are earth relative, so setup the associated projection correct for that data
-            transform = ccrs.PlateCarree()
-    
-            # high-resolution background images
-            if back_img == "on":
-                img = plt.imread(CARTOPY_DIR + "/raster_files/NE1_50M_SR_W.tif")
-                ax.imshow(img, origin="upper", transform=transform)
-    
-            #  ax.add_feature(land)
-            ax.add_feature(lakes)
-            ax.add_feature(states)
-            ax.add_feature(borders)
-            ax.add_feature(coastline)
-    
-            # Map/figure has been set up here, save axes instances for use again later
-            keep_ax_lst = ax.get_children()[:]
-    
-            ################################
-            # Plot SLP
-            ################################
-            t1 = time.perf_counter()
-            logging.info(("Working on slp for " + dom))
-    
-            units = "mb"
-            clevs = [
-                976,
-                980,
-                984,
-                988,
-                992,
-                996,
-                1000,
-                1004,
-                1008,
-                1012,
-                1016,
-                1020,
-                1024,
-                1028,
-                1032,
-                1036,
-                1040,
-                1044,
-                1048,
-                1052,
-            ]
-            clevsdif = [-12, -10, -8, -6, -4, -2, 0, 2, 4, 6, 8, 10, 12]
-            cm = plt.cm.Spectral_r
-            norm = matplotlib.colors.BoundaryNorm(clevs, cm.N)
-    
-            cs1_a = plt.pcolormesh(
-                lon_shift, lat_shift, slp, transform=transform, cmap=cm, norm=norm
-            )
-            cbar1 = plt.colorbar(
-                cs1_a, orientation="horizontal", pad=0.05, shrink=0.6, extend="both"
-            )
-            cbar1.set_label(units, fontsize=8)
-            cbar1.ax.tick_params(labelsize=8)
-            cs1_b = plt.contour(
-                lon_shift,
-                lat_shift,
-                slpsmooth,
-                np.arange(940, 1060, 4),
-                colors="black",
-                linewidths=1.25,
-                transform=transform,
-            )
-            plt.clabel(cs1_b, np.arange(940, 1060, 4), inline=1, fmt="%d", fontsize=8)
-            ax.text(
-                0.5,
-                1.03,
-                "FV3-LAM SLP ("
-                + units
-                + ") \n initialized: "
-                + itime
-                + " valid: "
-                + vtime
-                + " (f"
-                + fhour
-                + ")",
-                horizontalalignment="center",
-                fontsize=8,
-                transform=ax.transAxes,
-                bbox=dict(facecolor="white", alpha=0.85, boxstyle="square,pad=0.2"),
-            )
-    
-            compress_and_save(
-                COMOUT + "/slp_" + dom + "_f" + fhour + ".png"
-            )
-            t2 = time.perf_counter()
-            t3 = round(t2 - t1, 3)
-            logging.info(("%.3f seconds to plot slp for: " + dom) % t3)
-    
-            #################################
-            # Plot 2-m T
-            #################################
-            t1 = time.perf_counter()
-            logging.info(("Working on t2m for " + dom))
-    
-            # Clear off old plottables but keep all the map info
-            cbar1.remove()
-            clear_plotables(ax, keep_ax_lst, fig)
-    
-            units = "\xb0" "F"
-            clevs = np.linspace(-16, 134, 51)
-            cm = plt.cm.Spectral_r  # cmap_t2m()
-            norm = matplotlib.colors.BoundaryNorm(clevs, cm.N)
-    
-            cs_1 = plt.pcolormesh(
-                lon_shift, lat_shift, tmp2m, transform=transform, cmap=cm, norm=norm
-            )
-            cs_1.cmap.set_under("white")
-            cs_1.cmap.set_over("white")
-            cbar1 = plt.colorbar(
-                cs_1,
-                orientation="horizontal",
-                pad=0.05,
-                shrink=0.6,
-                ticks=[-16, -4, 8, 20, 32, 44, 56, 68, 80, 92, 104, 116, 128],
-                extend="both",
-            )
-            cbar1.set_label(units, fontsize=8)
-            cbar1.ax.tick_params(labelsize=8)
-            ax.text(
-                0.5,
-                1.03,
-                "FV3-LAM 2-m Temperature ("
-                + units
-                + ") \n initialized: "
-                + itime
-                + " valid: "
-                + vtime
-                + " (f"
-                + fhour
-                + ")",
-                horizontalalignment="center",
-                fontsize=8,
-                transform=ax.transAxes,
-                bbox=dict(facecolor="white", alpha=0.85, boxstyle="square,pad=0.2"),
-            )
-    
-            compress_and_save(
-                COMOUT + "/2mt_" + dom + "_f" + fhour + ".png"
-            )
-            t2 = time.perf_counter()
-            t3 = round(t2 - t1, 3)
-            logging.info(("%.3f seconds to plot 2mt for: " + dom) % t3)
-    
-            #################################
-            # Plot 2-m Dew Point
-            #################################
-            t1 = time.perf_counter()
-            logging.info(("Working on 2mdew for " + dom))
-    
-            # Clear off old plottables but keep all the map info
-            cbar1.remove()
-            clear_plotables(ax, keep_ax_lst, fig)
-    
-            units = "\xb0" "F"
-            clevs = np.linspace(-5, 80, 35)
-            cm = cmap_q2m()
-            norm = matplotlib.colors.BoundaryNorm(clevs, cm.N)
-    
-            cs_1 = plt.pcolormesh(
-                lon_shift, lat_shift, dew2m, transform=transform, cmap=cm, norm=norm
-            )
-            cbar1 = plt.colorbar(
-                cs_1, orientation="horizontal", pad=0.05, shrink=0.6, extend="both"
-            )
-            cbar1.set_label(units, fontsize=8)
-            cbar1.ax.tick_params(labelsize=8)
-            ax.text(
-                0.5,
-                1.03,
-                "FV3-LAM 2-m Dew Point Temperature ("
-                + units
-                + ") \n initialized: "
-                + itime
-                + " valid: "
-                + vtime
-                + " (f"
-                + fhour
-                + ")",
-                horizontalalignment="center",
-                fontsize=8,
-                transform=ax.transAxes,
-                bbox=dict(facecolor="white", alpha=0.85, boxstyle="square,pad=0.2"),
-            )
-    
-            compress_and_save(
-                COMOUT + "/2mdew_" + dom + "_f" + fhour + ".png"
-            )
-            t2 = time.perf_counter()
-            t3 = round(t2 - t1, 3)
-            logging.info(("%.3f seconds to plot 2mdew for: " + dom) % t3)
-    
-            #################################
-            # Plot 10-m WSPD
-            #################################
-            t1 = time.perf_counter()
-            logging.info(("Working on 10mwspd for " + dom))
-    
-            # Clear off old plottables but keep all the map info
-            cbar1.remove()
-            clear_plotables(ax, keep_ax_lst, fig)
-    
-            units = "kts"
-            # Places a wind barb every ~180 km, optimized for CONUS domain
-            skip = round(177.28 * (dx / 1000.0) ** -0.97)
-            logging.info("skipping every " + str(skip) + " grid points to plot")
-            barblength = 4
-    
-            clevs = [5, 10, 15, 20, 25, 30, 35, 40, 45, 50, 55, 60]
-            colorlist = [
-                "turquoise",
-                "dodgerblue",
-                "blue",
-                "#FFF68F",
-                "#E3CF57",
-                "peru",
-                "brown",
-                "crimson",
-                "red",
-                "fuchsia",
-                "DarkViolet",
-            ]
-            cm = matplotlib.colors.ListedColormap(colorlist)
-            norm = matplotlib.colors.BoundaryNorm(clevs, cm.N)
-    
-            cs_1 = plt.pcolormesh(
-                lon_shift,
-                lat_shift,
-                wspd10m,
-                transform=transform,
-                cmap=cm,
-                vmin=5,
-                norm=norm,
-            )
-            cs_1.cmap.set_under("white", alpha=0.0)
-            cs_1.cmap.set_over("black")
-            cbar1 = plt.colorbar(
-                cs_1,
-                orientation="horizontal",
-                pad=0.05,
-                shrink=0.6,
-                ticks=clevs,
-                extend="max",
-            )
-            cbar1.set_label(units, fontsize=8)
-            cbar1.ax.tick_params(labelsize=8)
-            plt.barbs(
-                lon_shift[::skip, ::skip],
-                lat_shift[::skip, ::skip],
-                uwind[::skip, ::skip],
-                vwind[::skip, ::skip],
-                length=barblength,
-                linewidth=0.5,
-                color="black",
-                transform=transform,
-            )
-            ax.text(
-                0.5,
-                1.03,
-                "FV3-LAM 10-m Winds ("
-                + units
-                + ") \n initialized: "
-                + itime
-                + " valid: "
-                + vtime
-                + " (f"
-                + fhour
-                + ")",
-                horizontalalignment="center",
-                fontsize=8,
-                transform=ax.transAxes,
-                bbox=dict(facecolor="white", alpha=0.85, boxstyle="square,pad=0.2"),
-            )
-    
-            compress_and_save(
-                COMOUT + "/10mwind_" + dom + "_f" + fhour + ".png"
-            )
-            t2 = time.perf_counter()
-            t3 = round(t2 - t1, 3)
-            logging.info(("%.3f seconds to plot 10mwspd for: " + dom) % t3)
-    
-            #################################
-            # Plot Surface-Based CAPE/CIN
-            #################################
-            t1 = time.perf_counter()
-            logging.info(("Working on surface-based CAPE/CIN for " + dom))
-    
-            # Clear off old plottables but keep all the map info
-            cbar1.remove()
-            clear_plotables(ax, keep_ax_lst, fig)
-    
-            units = "J/kg"
-            clevs = [100, 250, 500, 1000, 1500, 2000, 2500, 3000, 3500, 4000, 4500, 5000]
-            clevs2 = [-2000, -500, -250, -100, -25]
-            colorlist = [
-                "blue",
-                "dodgerblue",
-                "cyan",
-                "mediumspringgreen",
-                "#FAFAD2",
-                "#EEEE00",
-                "#EEC900",
-                "darkorange",
-                "crimson",
-                "darkred",
-                "darkviolet",
-            ]
-            cm = matplotlib.colors.ListedColormap(colorlist)
-            norm = matplotlib.colors.BoundaryNorm(clevs, cm.N)
-    
-            cs_1 = plt.pcolormesh(
-                lon_shift,
-                lat_shift,
-                cape,
-                transform=transform,
-                cmap=cm,
-                vmin=100,
-                norm=norm,
-            )
-            cs_1.cmap.set_under("white", alpha=0.0)
-            cs_1.cmap.set_over("black")
-            cbar1 = plt.colorbar(
-                cs_1,
-                orientation="horizontal",
-                pad=0.05,
-                shrink=0.6,
-                ticks=clevs,
-                extend="max",
-            )
-            cbar1.set_label(units, fontsize=8)
-            cbar1.ax.tick_params(labelsize=8)
-            cs_1b = plt.contourf(
-                lon_shift,
-                lat_shift,
-                cin,
-                clevs2,
-                colors="none",
-                hatches=["**", "++", "////", ".."],
-                transform=transform,
-            )
-            ax.text(
-                0.5,
-                1.05,
-                "FV3-LAM Surface-Based CAPE (shaded) and CIN (hatched) ("
-                + units
-                + ") \n <-500 (*), -500<-250 (+), -250<-100 (/), -100<-25 (.) \n initialized: "
-                + itime
-                + " valid: "
-                + vtime
-                + " (f"
-                + fhour
-                + ")",
-                horizontalalignment="center",
-                fontsize=8,
-                transform=ax.transAxes,
-                bbox=dict(facecolor="white", alpha=0.85, boxstyle="square,pad=0.2"),
-            )
-    
-            compress_and_save(
-                COMOUT + "/sfcape_" + dom + "_f" + fhour + ".png"
-            )
-            t2 = time.perf_counter()
-            t3 = round(t2 - t1, 3)
-            logging.info(("%.3f seconds to plot surface-based CAPE/CIN for: " + dom) % t3)
-    
-            #################################
-            # Plot 500 mb HGT/WIND/VORT
-            #################################
-            if u500 is not None:
-                t1 = time.perf_counter()
-                logging.info(("Working on 500 mb Hgt/Wind/Vort for " + dom))
-    
-                # Clear off old plottables but keep all the map info
-                cbar1.remove()
-                clear_plotables(ax, keep_ax_lst, fig)
-    
-                units = "x10${^5}$ s${^{-1}}$"
-                skip = round(177.28 * (dx / 1000.0) ** -0.97)
-                barblength = 4
-    
-                vortlevs = [16, 20, 24, 28, 32, 36, 40]
-                colorlist = ["yellow", "gold", "goldenrod", "orange", "orangered", "red"]
-                cm = matplotlib.colors.ListedColormap(colorlist)
-                norm = matplotlib.colors.BoundaryNorm(vortlevs, cm.N)
-    
-                cs1_a = plt.pcolormesh(
-                    lon_shift, lat_shift, vort500, transform=transform, cmap=cm, norm=norm
-                )
-                cs1_a.cmap.set_under("white")
-                cs1_a.cmap.set_over("darkred")
-                cbar1 = plt.colorbar(
-                    cs1_a,
-                    orientation="horizontal",
-                    pad=0.05,
-                    shrink=0.6,
-                    ticks=vortlevs,
-                    extend="both",
-                )
-                cbar1.set_label(units, fontsize=8)
-                cbar1.ax.tick_params(labelsize=8)
-                plt.barbs(
-                    lon_shift[::skip, ::skip],
-                    lat_shift[::skip, ::skip],
-                    u500[::skip, ::skip],
-                    v500[::skip, ::skip],
-                    length=barblength,
-                    linewidth=0.5,
-                    color="steelblue",
-                    transform=transform,
-                )
-                cs1_b = plt.contour(
-                    lon_shift,
-                    lat_shift,
-                    z500,
-                    np.arange(486, 600, 6),
-                    colors="black",
-                    linewidths=1,
-                    transform=transform,
-                )
-                plt.clabel(
-                    cs1_b, np.arange(486, 600, 6), inline_spacing=1, fmt="%d", fontsize=8
-                )
-                ax.text(
-                    0.5,
-                    1.03,
-                    "FV3-LAM 500 mb Heights (dam), Winds (kts), and $\zeta$ ("
-                    + units
-                    + ") \n initialized: "
-                    + itime
-                    + " valid: "
-                    + vtime
-                    + " (f"
-                    + fhour
-                    + ")",
-                    horizontalalignment="center",
-                    fontsize=8,
-                    transform=ax.transAxes,
-                    bbox=dict(facecolor="white", alpha=0.85, boxstyle="square,pad=0.2"),
-                )
-    
-                compress_and_save(
-                    COMOUT + "/500_" + dom + "_f" + fhour + ".png"
-                )
-                t2 = time.perf_counter()
-                t3 = round(t2 - t1, 3)
-                logging.info(("%.3f seconds to plot 500 mb Hgt/Wind/Vort for: " + dom) % t3)
-    
-            #################################
-            # Plot 250 mb WIND
-            #################################
-            t1 = time.perf_counter()
-            logging.info(("Working on 250 mb WIND for " + dom))
-    
-            # Clear off old plottables but keep all the map info
-            cbar1.remove()
-            clear_plotables(ax, keep_ax_lst, fig)
-    
-            units = "kts"
-            skip = round(177.28 * (dx / 1000.0) ** -0.97)
-    
-            barblength = 4
-    
-            clevs = [50, 60, 70, 80, 90, 100, 110, 120, 130, 140, 150]
-            colorlist = [
-                "turquoise",
-                "deepskyblue",
-                "dodgerblue",
-                "#1874CD",
-                "blue",
-                "beige",
-                "khaki",
-                "peru",
-                "brown",
-                "crimson",
-            ]
-            cm = matplotlib.colors.ListedColormap(colorlist)
-            norm = matplotlib.colors.BoundaryNorm(clevs, cm.N)
-    
-            cs_1 = plt.pcolormesh(
-                lon_shift,
-                lat_shift,
-                wspd250,
-                transform=transform,
-                cmap=cm,
-                vmin=50,
-                norm=norm,
-            )
-            cs_1.cmap.set_under("white", alpha=0.0)
-            cs_1.cmap.set_over("red")
-            cbar1 = plt.colorbar(
-                cs_1,
-                orientation="horizontal",
-                pad=0.05,
-                shrink=0.6,
-                ticks=clevs,
-                extend="max",
-            )
-            cbar1.set_label(units, fontsize=8)
-            cbar1.ax.tick_params(labelsize=8)
-            plt.barbs(
-                lon_shift[::skip, ::skip],
-                lat_shift[::skip, ::skip],
-                u250[::skip, ::skip],
-                v250[::skip, ::skip],
-                length=barblength,
-                linewidth=0.5,
-                color="black",
-                transform=transform,
-            )
-            ax.text(
-                0.5,
-                1.03,
-                "FV3-LAM 250 mb Winds ("
-                + units
-                + ") \n initialized: "
-                + itime
-                + " valid: "
-                + vtime
-                + " (f"
-                + fhour
-                + ")",
-                horizontalalignment="center",
-                fontsize=8,
-                transform=ax.transAxes,
-                bbox=dict(facecolor="white", alpha=0.85, boxstyle="square,pad=0.2"),
-            )
-    
-            compress_and_save(
-                COMOUT + "/250wind_" + dom + "_f" + fhour + ".png"
-            )
-            t2 = time.perf_counter()
-            t3 = round(t2 - t1, 3)
-            logging.info(("%.3f seconds to plot 250 mb WIND for: " + dom) % t3)
-    
-            #################################
-            # Plot Total QPF
-            #################################
-            if fhr > 0:  # Do not make total QPF plot for forecast hour 0
-                t1 = time.perf_counter()
-                logging.info(("Working on total qpf for " + dom))
-    
-                # Clear off old plottables but keep all the map info
-                cbar1.remove()
-                clear_plotables(ax, keep_ax_lst, fig)
-    
-                units = "in"
-                clevs = [
-                    0.01,
-                    0.1,
-                    0.25,
-                    0.5,
-                    0.75,
-                    1,
-                    1.25,
-                    1.5,
-                    1.75,
-                    2,
-                    2.5,
-                    3,
-                    4,
-                    5,
-                    7,
-                    10,
-                    15,
-                    20,
-                ]
-                clevsdif = [-3, -2.5, -2, -1.5, -1, -0.5, 0, 0.5, 1, 1.5, 2, 2.5, 3]
-                colorlist = [
-                    "chartreuse",
-                    "limegreen",
-                    "green",
-                    "blue",
-                    "dodgerblue",
-                    "deepskyblue",
-                    "cyan",
-                    "mediumpurple",
-                    "mediumorchid",
-                    "darkmagenta",
-                    "darkred",
-                    "crimson",
-                    "orangered",
-                    "darkorange",
-                    "goldenrod",
-                    "gold",
-                    "yellow",
-                ]
-                cm = matplotlib.colors.ListedColormap(colorlist)
-                norm = matplotlib.colors.BoundaryNorm(clevs, cm.N)
-    
-                cs_1 = plt.pcolormesh(
-                    lon_shift,
-                    lat_shift,
-                    qpf,
-                    transform=transform,
-                    cmap=cm,
-                    vmin=0.01,
-                    norm=norm,
-                )
-                cs_1.cmap.set_under("white", alpha=0.0)
-                cs_1.cmap.set_over("pink")
-                cbar1 = plt.colorbar(
-                    cs_1,
-                    orientation="horizontal",
-                    pad=0.05,
-                    shrink=0.6,
-                    ticks=clevs,
-                    extend="max",
-                )
-                cbar1.set_label(units, fontsize=8)
-                cbar1.ax.set_xticklabels(clevs)
-                cbar1.ax.tick_params(labelsize=8)
-                ax.text(
-                    0.5,
-                    1.03,
-                    "FV3-LAM "
-                    + fhour
-                    + "-hr Accumulated Precipitation ("
-                    + units
-                    + ") \n initialized: "
-                    + itime
-                    + " valid: "
-                    + vtime
-                    + " (f"
-                    + fhour
-                    + ")",
-                    horizontalalignment="center",
-                    fontsize=8,
-                    transform=ax.transAxes,
-                    bbox=dict(facecolor="white", alpha=0.85, boxstyle="square,pad=0.2"),
-                )
-    
-                compress_and_save(
-                    COMOUT + "/qpf_" + dom + "_f" + fhour + ".png"
-                )
-                t2 = time.perf_counter()
-                t3 = round(t2 - t1, 3)
-                logging.info(("%.3f seconds to plot total qpf for: " + dom) % t3)
-    
-            #################################
-            # Plot composite reflectivity
-            #################################
-            t1 = time.perf_counter()
-            logging.info(("Working on composite reflectivity for " + dom))
-    
-            # Clear off old plottables but keep all the map info
-            cbar1.remove()
-            clear_plotables(ax, keep_ax_lst, fig)
-    
-            units = "dBZ"
-            clevs = np.linspace(5, 70, 14)
-            clevsdif = [20, 1000]
-            colorlist = [
-                "turquoise",
-                "dodgerblue",
-                "mediumblue",
-                "lime",
-                "limegreen",
-                "green",
-                "#EEEE00",
-                "#EEC900",
-                "darkorange",
-                "red",
-                "firebrick",
-                "darkred",
-                "fuchsia",
-            ]
-            cm = matplotlib.colors.ListedColormap(colorlist)
-            norm = matplotlib.colors.BoundaryNorm(clevs, cm.N)
-    
-            cs_1 = plt.pcolormesh(
-                lon_shift, lat_shift, refc, transform=transform, cmap=cm, vmin=5, norm=norm
-            )
-            cs_1.cmap.set_under("white", alpha=0.0)
-            cs_1.cmap.set_over("black")
-            cbar1 = plt.colorbar(
-                cs_1,
-                orientation="horizontal",
-                pad=0.05,
-                shrink=0.6,
-                ticks=clevs,
-                extend="max",
-            )
-            cbar1.set_label(units, fontsize=8)
-            cbar1.ax.tick_params(labelsize=8)
-            ax.text(
-                0.5,
-                1.03,
-                "FV3-LAM Composite Reflectivity ("
-                + units
-                + ") \n initialized: "
-                + itime
-                + " valid: "
-                + vtime
-                + " (f"
-                + fhour
-                + ")",
-                horizontalalignment="center",
-                fontsize=8,
-                transform=ax.transAxes,
-                bbox=dict(facecolor="white", alpha=0.85, boxstyle="square,pad=0.2"),
-            )
-    
-            compress_and_save(
-                COMOUT + "/refc_" + dom + "_f" + fhour + ".png"
-            )
-            t2 = time.perf_counter()
-            t3 = round(t2 - t1, 3)
-            logging.info(("%.3f seconds to plot composite reflectivity for: " + dom) % t3)
-    
-            #################################
-            # Plot Max/Min Hourly 2-5 km UH
-            #################################
-            if fhr > 0:  # Do not make max/min hourly 2-5 km UH plot for forecast hour 0
-                t1 = time.perf_counter()
-                logging.info(("Working on Max/Min Hourly 2-5 km UH for " + dom))
-    
-                # Clear off old plottables but keep all the map info
-                cbar1.remove()
-                clear_plotables(ax, keep_ax_lst, fig)
-    
-                units = "m${^2}$ s$^{-2}$"
-                clevs = [
-                    -150,
-                    -100,
-                    -75,
-                    -50,
-                    -25,
-                    -10,
-                    0,
-                    10,
-                    25,
-                    50,
-                    75,
-                    100,
-                    150,
-                    200,
-                    250,
-                    300,
-                ]
-                #   alternative colormap for just max UH if you don't want to plot the min UH too
-                #     colorlist = ['white','skyblue','mediumblue','green','orchid','firebrick','#EEC900','DarkViolet']
-                colorlist = [
-                    "blue",
-                    "#1874CD",
-                    "dodgerblue",
-                    "deepskyblue",
-                    "turquoise",
-                    "#E5E5E5",
-                    "#E5E5E5",
-                    "#EEEE00",
-                    "#EEC900",
-                    "darkorange",
-                    "orangered",
-                    "red",
-                    "firebrick",
-                    "mediumvioletred",
-                    "darkviolet",
-                ]
-                cm = matplotlib.colors.ListedColormap(colorlist)
-                norm = matplotlib.colors.BoundaryNorm(clevs, cm.N)
-    
-                cs_1 = plt.pcolormesh(
-                    lon_shift, lat_shift, uh25, transform=transform, cmap=cm, norm=norm
-                )
-                cs_1.cmap.set_under("darkblue")
-                cs_1.cmap.set_over("black")
-                cbar1 = plt.colorbar(
-                    cs_1, orientation="horizontal", pad=0.05, shrink=0.6, extend="both"
-                )
-                cbar1.set_label(units, fontsize=8)
-                cbar1.ax.tick_params(labelsize=8)
-                ax.text(
-                    0.5,
-                    1.03,
-                    "FV3-LAM 1-h Max/Min 2-5 km Updraft Helicity ("
-                    + units
-                    + ") \n initialized: "
-                    + itime
-                    + " valid: "
-                    + vtime
-                    + " (f"
-                    + fhour
-                    + ")",
-                    horizontalalignment="center",
-                    fontsize=8,
-                    transform=ax.transAxes,
-                    bbox=dict(facecolor="white", alpha=0.85, boxstyle="square,pad=0.2"),
-                )
-    
-                compress_and_save(
-                    COMOUT + "/uh25_" + dom + "_f" + fhour + ".png"
+
+    # Products of the same hour are listed together so that the processes
+    # work on few forecast hours at a time
+    units = (
+        (int(fhr), dom, product)
+        for fhr in fhours
+        for dom in domains
+        for product in products
+    )
+
+    t1 = time.perf_counter()
+    nprocs = max(1, min(args.nprocs, nunits))
+    if nprocs > 1:
+        # Fresh processes are spawned so that nothing is inherited from this
+        # one (and it works the same on all platforms)
+        with multiprocessing.get_context("spawn").Pool(
+            nprocs, initializer=init_worker, initargs=(settings, args.debug)
+        ) as pool:
+            # The units are queued from this process, as their forecast
+            # hours are ready in follow mode
+            results = []
+            for unit in units:
+                check()
+                results.append(
+                    pool.apply_async(plot_product, (unit,), error_callback=errors.append)
                 )
-                t2 = time.perf_counter()
-                t3 = round(t2 - t1, 3)
-                logging.info(("%.3f seconds to plot Max/Min Hourly 2-5 km UH for: " + dom) % t3)
-    
-            ######################################################
-    
-            t3dom = round(t2 - t1dom, 3)
-            logging.info(("%.3f seconds to plot all variables for forecast hour " + fhour) % t3dom)
-            plt.clf()
-    
-        ######################################################
-    
-        main()
+            for result in results:
+                result.get()
+            # Let the processes exit
+            pool.close()
+            pool.join()
+    else:
+        for unit in units:
+            plot_product(unit)
+        _writer.close()
+    t2 = time.perf_counter()
+    logging.info(
+        "%.3f seconds to make %d plots with %d processes"
+        % (round(t2 - t1, 3), nunits, nprocs)
+    )
+
+
+# -------------Start of script -------------------------#
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -17,7 +17,11 @@
 #                       3. Ending forecast hour
 #                       4. Forecast hour increment
 #                       5. COMOUT_1: COMOUT directory containing postprocessed data.
+#                          Several directories can be given to compare several
+#                          forecasts to the same baseline in one pass; the
+#                          plots of each forecast are saved in its directory.
 #                       6. COMOUT_2: COMOUT directory for second experiment
+#                          (the baseline)
 #                       7. CARTOPY_DIR:  Base directory of cartopy shapefiles
 #                          -Shapefiles cannot be directly downloaded to NOAA
 #                            machines from the internet, so shapefiles need to
@@ -46,28 +50,50 @@
 ################################################################################
 
 # -------------Import modules --------------------------#
-import pygrib
 import cartopy.crs as ccrs
 from cartopy.mpl.gridliner import LONGITUDE_FORMATTER, LATITUDE_FORMATTER
 import cartopy.feature as cfeature
 import matplotlib
 
 matplotlib.use("Agg")
-import io
 import matplotlib.pyplot as plt
 import dateutil.relativedelta, dateutil.parser
-from PIL import Image
 from matplotlib.gridspec import GridSpec
 import numpy as np
 import time, os, sys, multiprocessing
 import multiprocessing.pool
-from scipy import ndimage
-import pyproj
+from concurrent.futures import ThreadPoolExecutor
 import argparse
 import cartopy
 import logging
 import warnings
 
+# Shared plotting utilities are in ush/plot_utils
+sys.path.append(
+    os.environ.get(
+        "USHdir", os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "ush")
+    )
+)
+from plot_utils import (
+    GribReader,
+    PNG_MODES,
+    PRODUCT_FIELDS,
+    PngWriter,
+    background_key,
+    decimate_mesh,
+    gaussian_smooth,
+    grid_geometry,
+    grid_key,
+    load_background,
+    lod_factor,
+    plot_fields,
+    render_background,
+    render_figure,
+    save_background,
+    set_background,
+    wind_rotation,
+)
+
 # --------------Define some functions ------------------#
 
 
@@ -117,12 +143,11 @@ def clear_plotables(ax, keep_ax_lst, fig):
 
 def compress_and_save(filename):
     #### - compress and save the image - ####
-    ram = io.BytesIO()
-    plt.savefig(ram, format="png", bbox_inches="tight", dpi=150)
-    ram.seek(0)
-    im = Image.open(ram)
-    im2 = im.convert("RGB")  # .convert('P', palette=Image.ADAPTIVE)
-    im2.save(filename, format="PNG")
+    # The plots of a product and domain have the same bounding box at all
+    # forecast hours, so it is only found for the first one
+    name = os.path.basename(filename).rsplit("_f", 1)[0]
+    image, _boxes[name] = render_figure(plt.gcf(), 150, _boxes.get(name))
+    _writer.save(filename, image)
 
 
 def cmap_t2m():
@@ -189,7 +214,9 @@ def cmap_q2m():
     return cmap_q2m_coltbl
 
 
-def rotate_wind(true_lat, lov_lon, earth_lons, uin, vin, proj, inverse=False):
+def rotate_wind(
+    true_lat, lov_lon, earth_lons, uin, vin, proj, inverse=False, rotation=None
+):
     #  Rotate winds from LCC relative to earth relative (or vice-versa if inverse==true)
     #   This routine is vectorized and *should* work on any size 2D vg and ug arrays.
     #   Program will quit if dimensions are too large.
@@ -204,21 +231,20 @@ def rotate_wind(true_lat, lov_lon, earth_lons, uin, vin, proj, inverse=False):
     #
     #  earth_lons = Earth relative longitudes (can be an array, in degrees)
     #  uin, vin     = Input winds to rotate
+    #  rotation = (sin, cos) of the rotation angles, if already computed for
+    #             these earth_lons (see plot_utils.wind_rotation)
     #
     # Returns:
     #  uout, vout = Output, rotated winds
     # -----------------------------------------------------------------------------------------------------
 
-    # Get size and length of input u winds, if not 2d, raise an error
+    # Get size and length of input u winds, if not 2d (or a stack of 2d
+    # winds of several runs), raise an error
     q = np.shape(uin)
     ndims = len(q)
-    if ndims > 2:
+    if ndims > 3:
         # Raise error and quit!
-        raise SystemExit("Input winds for rotation have greater than 2 dimensions!")
-    if lov_lon > 0.0:
-        lov_lon = lov_lon - 360.0
-    dtr = np.pi / 180.0  # Degrees to radians
-
+        raise SystemExit("Input winds for rotation have greater than 3 dimensions!")
     if not isinstance(inverse, bool):
         raise TypeError("**kwarg inverse must be of type bool.")
 
@@ -227,18 +253,12 @@ def rotate_wind(true_lat, lov_lon, earth_lons, uin, vin, proj, inverse=False):
     # of a polar stereographic projection, this is one.
     # See the following pdf for excellent documentation
     # http://www.dtcenter.org/met/users/docs/write_ups/velocity.pdf
-    if proj.lower() == "lcc":
-        rotcon_p = np.sin(true_lat * dtr)
-    elif proj.lower() in ["stere", "spstere", "npstere"]:
-        rotcon_p = 1.0
-    else:
-        raise SystemExit(
-            "Unsupported map projection: " + proj.lower() + " for wind rotation."
-        )
-
-    angles = rotcon_p * (earth_lons - lov_lon) * dtr
-    sinx2 = np.sin(angles)
-    cosx2 = np.cos(angles)
+    if rotation is None:
+        try:
+            rotation = wind_rotation(true_lat, lov_lon, earth_lons, proj)
+        except ValueError as e:
+            raise SystemExit(str(e))
+    sinx2, cosx2 = rotation
 
     # Steps below are elementwise products, not matrix mutliplies
     if inverse == False:
@@ -266,10 +286,2188 @@ def setup_logging(debug=False):
     if debug:
         logging.info("Logging level set to DEBUG")
 
-# -------------Start of script -------------------------#
-if __name__ == "__main__":
+# --------------Plotting processes ---------------------#
+
+# Settings of the runs being compared. They are set by init_worker() in each
+# plotting process.
+CYCLE = None
+COMOUT_1 = []
+COMOUT_2 = None
+CARTOPY_DIR = None
+POST_OUTPUT_DOMAIN_NAME = None
+CACHE_DIR = None
+QUALITY = "full"
+PLOT_PRODUCTS = None
+
+# The data of the forecast hour being plotted and the maps of each domain are
+# kept by each process and reused for the following products
+_hour = {}
+_maps = {}
+
+# The bounding boxes of the plots and the writer of the PNG files of each
+# process
+_boxes = {}
+_writer = None
+
+# colors for difference plots
+diffcolors = [
+    "blue",
+    "#1874CD",
+    "dodgerblue",
+    "deepskyblue",
+    "turquoise",
+    "white",
+    "white",
+    "#EEEE00",
+    "#EEC900",
+    "darkorange",
+    "orangered",
+    "red",
+]
+
+
+def init_worker(settings, debug=False):
+    """Set up a plotting process.
+
+    Args:
+        settings: dictionary with the cycle (YYYYMMDDHH), COMOUT_1 (a list of
+                  the directories of the runs compared to the baseline), COMOUT_2,
+                  CARTOPY_DIR and POST_OUTPUT_DOMAIN_NAME of the runs and the
+                  directory of cached map backgrounds and grid geometry
+                  (cache_dir, None for no cache) and the quality of the plots
+                  (quality, "full" or "display", see lod_mesh()) and of the
+                  PNG files (png_mode, see plot_utils.PNG_MODES) and the
+                  names of the products to plot (products)
+        debug: print debug messages
+    """
+    global CYCLE, COMOUT_1, COMOUT_2, CARTOPY_DIR, POST_OUTPUT_DOMAIN_NAME, CACHE_DIR, QUALITY
+    global PLOT_PRODUCTS, _writer
+    CYCLE = settings["cycle"]
+    COMOUT_1 = list(settings["comout_1"])
+    COMOUT_2 = settings["comout_2"]
+    CARTOPY_DIR = settings["cartopy_dir"]
+    POST_OUTPUT_DOMAIN_NAME = settings["domain"]
+    CACHE_DIR = settings["cache_dir"]
+    QUALITY = settings["quality"]
+    PLOT_PRODUCTS = settings["products"]
+
+    # The PNG files of each product are written by the end of plot_product();
+    # the thread of the writer is stopped when the process exits
+    _writer = PngWriter(settings["png_mode"])
+    multiprocessing.util.Finalize(_writer, _writer.close, exitpriority=10)
+
+    setup_logging(debug)
+    # Throw away python warnings (mostly depreciation.)
+    warnings.simplefilter("ignore")
+
+
+def post_file(comout, fhr):
+    """Get the path of the post output file of a run for a forecast hour."""
+    return (
+        comout
+        + "/rrfs.t"
+        + CYCLE[8:10]
+        + "z.prslev.f"
+        + str(fhr).zfill(3)
+        + "."
+        + POST_OUTPUT_DOMAIN_NAME
+        + ".grib2"
+    )
+
+
+def open_hour(fhr):
+    """Get the data of a forecast hour of all the runs. The GRIB files are
+    indexed concurrently, once per process and forecast hour; fields are
+    decoded when a plot needs them (see stacked()). The runs must be on the
+    same grid, so its geometry is computed once.
+
+    Returns:
+        dictionary with fhr, fhour, itime, vtime, the GribReaders of the post
+        output files (data, the runs of COMOUT_1 then the baseline), the
+        stacked fields (stacks) and product fields (fields) computed so far
+        and the grid geometry (see plot_utils.grid_geometry())
+    """
+    if _hour.get("fhr") == fhr:
+        return _hour
+
+    t1a = time.perf_counter()
+    fhour = str(fhr).zfill(3)
+    _hour.clear()
+
+    # Define the location of the input files and read all the messages
+    # needed for the products being plotted in one pass per file, reading the
+    # files of all runs at the same time
+    fields = plot_fields(fhr, PLOT_PRODUCTS)
+    paths = [post_file(comout, fhr) for comout in COMOUT_1 + [COMOUT_2]]
+    with ThreadPoolExecutor(len(paths)) as pool:
+        data = list(pool.map(lambda path: GribReader(path, fields), paths))
+    if len({grid_key(d.grid_message) for d in data}) > 1:
+        raise ValueError(
+            f"The post output files of forecast hour {fhour} are not all on the same grid"
+        )
+    _hour.update(
+        fhr=fhr,
+        fhour=fhour,
+        itime=CYCLE,
+        vtime=ndate(CYCLE, int(fhr)),
+        data=data,
+        stacks={},
+        fields={},
+        **grid_geometry(data[0].grid_message, CACHE_DIR),
+    )
+    logging.info(_hour["Lat0"])
+    logging.info(_hour["Lon0"])
+
+    t2a = time.perf_counter()
+    t3a = round(t2a - t1a, 3)
+    logging.info(("%.3f seconds to index forecast hour " + fhour) % t3a)
+    return _hour
+
+
+def stacked(hour, name):
+    """Get the values of a field in all the runs, stacked along the first
+    axis (the runs of COMOUT_1, then the baseline). The field is decoded in
+    all the runs at the same time, once per forecast hour; the returned
+    array must not be modified.
+
+    Raises:
+        KeyError if the field is not in all the files
+    """
+    stacks = hour["stacks"]
+    if name not in stacks:
+        data = hour["data"]
+        with ThreadPoolExecutor(len(data)) as pool:
+            values = list(pool.map(lambda d: d.values(name), data))
+        stack = np.ma.stack if any(np.ma.isMaskedArray(v) for v in values) else np.stack
+        stacks[name] = stack(values)
+    return stacks[name]
+
+
+def smooth(fields, sigma):
+    """Smooth the stacked fields of all the runs in one call (see stacked())
+    with a Gaussian filter of standard deviation sigma (grid points), see
+    plot_utils.gaussian_smooth()."""
+    return gaussian_smooth(fields, sigma)
+
+
+def differences(fields):
+    """Get the differences between the baseline and each run of stacked
+    fields (see stacked()), in one operation."""
+    return fields[-1] - fields[:-1]
+
+
+def earth_winds(hour, u, v):
+    """Rotate stacked winds of all the runs (see stacked()) from grid
+    relative to Earth relative."""
+    return rotate_wind(
+        hour["Lat0"],
+        hour["Lon0"],
+        hour["lon"],
+        u,
+        v,
+        "lcc",
+        inverse=False,
+        rotation=(hour["sinx"], hour["cosx"]),
+    )
+
+
+def setup_map(dom, hour):
+    """Set up the maps of a domain. The maps are drawn once per process and
+    domain, and their backgrounds are taken from the cache of map
+    backgrounds if they are there.
+
+    Returns:
+        dictionary with the figure (fig), the map axes of the two runs and
+        of the difference (axes), the artists of each map (keep_ax_lsts),
+        the transform of the data and the colorbars of the last plot (cbars)
+    """
+    if dom in _maps:
+        return _maps[dom]
+
+    lat, lon = hour["lat"], hour["lon"]
+    Lat0, Lon0 = hour["Lat0"], hour["Lon0"]
+
+    # Map corners for each domain
+    if dom == "conus":
+        llcrnrlon = -120.5
+        llcrnrlat = 21.0
+        urcrnrlon = -64.5
+        urcrnrlat = 49.0
+        lat_0 = 35.4
+        lon_0 = -97.6
+        extent = [llcrnrlon - 3, urcrnrlon - 6, llcrnrlat - 1, urcrnrlat + 2]
+    elif dom == "regional":
+        llcrnrlon = np.min(lon)
+        llcrnrlat = np.min(lat)
+        urcrnrlon = np.max(lon)
+        urcrnrlat = np.max(lat)
+        lat_0 = Lat0
+        lon_0 = Lon0
+        extent = [llcrnrlon, urcrnrlon, llcrnrlat - 1, urcrnrlat]
+
+    # create figure and axes instances
+    fig = plt.figure(figsize=(10, 10))
+    gs = GridSpec(9, 9, wspace=0.0, hspace=0.0)
+
+    # Define where Cartopy Maps are located
+    cartopy.config["data_dir"] = CARTOPY_DIR
+
+    back_res = "50m"
+    back_img = "on"
+
+    # set up the map background with cartopy
+    myproj = ccrs.LambertConformal(
+        central_longitude=lon_0,
+        central_latitude=lat_0,
+        false_easting=0.0,
+        false_northing=0.0,
+        secant_latitudes=None,
+        standard_parallels=None,
+        globe=None,
+    )
+    ax1 = fig.add_subplot(gs[0:4, 0:4], projection=myproj)
+    ax2 = fig.add_subplot(gs[0:4, 5:], projection=myproj)
+    ax3 = fig.add_subplot(gs[5:, 1:8], projection=myproj)
+    ax1.set_extent(extent)
+    ax2.set_extent(extent)
+    ax3.set_extent(extent)
+
+    fline_wd = 0.5  # line width
+    falpha = 0.3  # transparency
+
+    # natural_earth
+    #    land=cfeature.NaturalEarthFeature('physical','land',back_res,
+    #                      edgecolor='face',facecolor=cfeature.COLORS['land'],
+    #                      alpha=falpha)
+    lakes = cfeature.NaturalEarthFeature(
+        "physical",
+        "lakes",
+        back_res,
+        edgecolor="blue",
+        facecolor="none",
+        linewidth=fline_wd,
+        alpha=falpha,
+    )
+    coastline = cfeature.NaturalEarthFeature(
+        "physical",
+        "coastline",
+        back_res,
+        edgecolor="blue",
+        facecolor="none",
+        linewidth=fline_wd,
+        alpha=falpha,
+    )
+    states = cfeature.NaturalEarthFeature(
+        "cultural",
+        "admin_1_states_provinces",
+        back_res,
+        edgecolor="black",
+        facecolor="none",
+        linewidth=fline_wd,
+        linestyle=":",
+        alpha=falpha,
+    )
+    borders = cfeature.NaturalEarthFeature(
+        "cultural",
+        "admin_0_countries",
+        back_res,
+        edgecolor="red",
+        facecolor="none",
+        linewidth=fline_wd,
+        alpha=falpha,
+    )
+
+    # All lat lons are earth relative, so setup the associated projection correct for that data
+    transform = ccrs.PlateCarree()
+
+    # The map backgrounds are drawn once per domain and cached as images,
+    # which are drawn with the data of every plot
+    axes = (ax1, ax2, ax3)
+    keys = [
+        background_key(fig, ax, extent, 150, [CARTOPY_DIR, back_res, back_img])
+        for ax in axes
+    ]
+    backgrounds = [load_background(CACHE_DIR, key) for key in keys]
+    if any(background is None for background in backgrounds):
+        keep_ax_lsts = [ax.get_children()[:] for ax in axes]
+
+        # high-resolution background images
+        if back_img == "on":
+            img = plt.imread(CARTOPY_DIR + "/raster_files/NE1_50M_SR_W.tif")
+            ax1.imshow(img, origin="upper", transform=transform)
+            ax2.imshow(img, origin="upper", transform=transform)
+            ax3.imshow(img, origin="upper", transform=transform)
+        backgrounds = [{"image": render_background(fig, ax, 150)} for ax in axes]
+        for ax, keep_ax_lst in zip(axes, keep_ax_lsts):
+            clear_plotables(ax, keep_ax_lst, fig)
+
+        #  ax.add_feature(land)
+        ax1.add_feature(lakes)
+        ax1.add_feature(states)
+        ax1.add_feature(borders)
+        ax1.add_feature(coastline)
+        ax2.add_feature(lakes)
+        ax2.add_feature(states)
+        ax2.add_feature(borders)
+        ax2.add_feature(coastline)
+        ax3.add_feature(lakes)
+        ax3.add_feature(states)
+        ax3.add_feature(borders)
+        ax3.add_feature(coastline)
+        for ax, keep_ax_lst, key, background in zip(
+            axes, keep_ax_lsts, keys, backgrounds
+        ):
+            background["features"] = render_background(
+                fig, ax, 150, transparent=True
+            )
+            clear_plotables(ax, keep_ax_lst, fig)
+            save_background(CACHE_DIR, key, background)
+    for ax, background in zip(axes, backgrounds):
+        set_background(ax, background)
+
+    # Map/figure has been set up here, save axes instances for use again later
+    keep_ax_lst_1 = ax1.get_children()[:]
+    keep_ax_lst_2 = ax2.get_children()[:]
+    keep_ax_lst_3 = ax3.get_children()[:]
+
+    _maps[dom] = {
+        "fig": fig,
+        "axes": (ax1, ax2, ax3),
+        "keep_ax_lsts": (keep_ax_lst_1, keep_ax_lst_2, keep_ax_lst_3),
+        "transform": transform,
+        "cbars": [],
+    }
+    return _maps[dom]
+
+
+def lod_mesh(ax, x, y, field, how="mean"):
+    """Decimate a field and its grid to about the resolution of the saved
+    plot (see plot_utils.decimate_mesh()) when plots are made at display
+    quality.
+
+    Args:
+        ax: the map axes the field is plotted on
+        x, y: lon/lat of the grid
+        field: the field
+        how: reduction of the blocks of the grid ("mean" for smooth fields,
+             "max" or "absmax" to keep extremes)
+    Returns:
+        (x, y, field) tuple, as given if plots are made at full quality
+    """
+    if QUALITY == "full":
+        return x, y, field
+    return decimate_mesh(x, y, field, lod_factor(ax, _hour["dx"], 150), how)
+
+
+def fields_slp(hour):
+    """Sea level pressure of all the runs"""
+    slp = stacked(hour, "slp") * 0.01
+    return {
+        "slp": slp,
+        "slpsmooth": smooth(slp, 13.78),
+        "slp_diff": differences(slp),
+    }
+
+
+def plot_slp(dom, hour, fields, run, axes, transform):
+    """Plot sea level pressure"""
+    fhour, itime, vtime = hour["fhour"], hour["itime"], hour["vtime"]
+    lon_shift, lat_shift = hour["lon_shift"], hour["lat_shift"]
+    ax1, ax2, ax3 = axes
+    cmdiff = matplotlib.colors.ListedColormap(diffcolors)
+
+    # Sea level pressure
+    slp_1, slp_2 = fields["slp"][[run, -1]]
+    slpsmooth_1, slpsmooth_2 = fields["slpsmooth"][[run, -1]]
+    slp_diff = fields["slp_diff"][run]
+
+    units = "mb"
+    clevs = [
+        976,
+        980,
+        984,
+        988,
+        992,
+        996,
+        1000,
+        1004,
+        1008,
+        1012,
+        1016,
+        1020,
+        1024,
+        1028,
+        1032,
+        1036,
+        1040,
+        1044,
+        1048,
+        1052,
+    ]
+    clevsdiff = [-12, -10, -8, -6, -4, -2, 0, 2, 4, 6, 8, 10, 12]
+    cm = plt.cm.Spectral_r
+    norm = matplotlib.colors.BoundaryNorm(clevs, cm.N)
+    normdiff = matplotlib.colors.BoundaryNorm(clevsdiff, cmdiff.N)
+
+    cs1_a = ax1.pcolormesh(
+        *lod_mesh(ax1, lon_shift, lat_shift, slp_1, "mean"),
+        transform=transform,
+        cmap=cm,
+        norm=norm,
+    )
+    cbar1 = plt.colorbar(
+        cs1_a, ax=ax1, orientation="horizontal", pad=0.05, shrink=0.6, extend="both"
+    )
+    cbar1.set_label(units, fontsize=6)
+    cbar1.ax.tick_params(labelsize=5)
+    cs1_b = ax1.contour(
+        lon_shift,
+        lat_shift,
+        slpsmooth_1,
+        np.arange(940, 1060, 4),
+        colors="black",
+        linewidths=1.25,
+        transform=transform,
+    )
+    plt.clabel(cs1_b, np.arange(940, 1060, 4), inline=1, fmt="%d", fontsize=6)
+    ax1.text(
+        0.5,
+        1.03,
+        "FV3-LAM SLP ("
+        + units
+        + ") \n initialized: "
+        + itime
+        + " valid: "
+        + vtime
+        + " (f"
+        + fhour
+        + ")",
+        horizontalalignment="center",
+        fontsize=8,
+        transform=ax1.transAxes,
+        bbox=dict(facecolor="white", alpha=0.85, boxstyle="square,pad=0.2"),
+    )
+
+    cs2_a = ax2.pcolormesh(
+        *lod_mesh(ax2, lon_shift, lat_shift, slp_2, "mean"),
+        transform=transform,
+        cmap=cm,
+        norm=norm,
+    )
+    cbar2 = plt.colorbar(
+        cs2_a, ax=ax2, orientation="horizontal", pad=0.05, shrink=0.6, extend="both"
+    )
+    cbar2.set_label(units, fontsize=6)
+    cbar2.ax.tick_params(labelsize=5)
+    cs2_b = ax2.contour(
+        lon_shift,
+        lat_shift,
+        slpsmooth_2,
+        np.arange(940, 1060, 4),
+        colors="black",
+        linewidths=1.25,
+        transform=transform,
+    )
+    plt.clabel(cs2_b, np.arange(940, 1060, 4), inline=1, fmt="%d", fontsize=6)
+    ax2.text(
+        0.5,
+        1.03,
+        "FV3-LAM-2 SLP ("
+        + units
+        + ") \n initialized: "
+        + itime
+        + " valid: "
+        + vtime
+        + " (f"
+        + fhour
+        + ")",
+        horizontalalignment="center",
+        fontsize=8,
+        transform=ax2.transAxes,
+        bbox=dict(facecolor="white", alpha=0.85, boxstyle="square,pad=0.2"),
+    )
+
+    cs = ax3.pcolormesh(
+        *lod_mesh(ax3, lon_shift, lat_shift, slp_diff, "mean"),
+        transform=transform,
+        cmap=cmdiff,
+        norm=normdiff,
+    )
+    cs.cmap.set_under("darkblue")
+    cs.cmap.set_over("darkred")
+    cbar3 = plt.colorbar(
+        cs, ax=ax3, orientation="horizontal", pad=0.05, shrink=0.6, extend="both"
+    )
+    cbar3.set_label(units, fontsize=6)
+    cbar3.ax.tick_params(labelsize=5)
+    ax3.text(
+        0.5,
+        1.03,
+        "FV3-LAM-2 - FV3-LAM SLP ("
+        + units
+        + ") \n initialized: "
+        + itime
+        + " valid: "
+        + vtime
+        + " (f"
+        + fhour
+        + ")",
+        horizontalalignment="center",
+        fontsize=6,
+        transform=ax3.transAxes,
+        bbox=dict(facecolor="white", alpha=0.85, boxstyle="square,pad=0.2"),
+    )
+
+    compress_and_save(
+        COMOUT_1[run] + "/slp_diff_" + dom + "_f" + fhour + ".png"
+    )
+
+    return [cbar1, cbar2, cbar3]
+
+
+def fields_t2m(hour):
+    """2-m temperature of all the runs"""
+    tmp2m = (stacked(hour, "tmp2m") - 273.15) * 1.8 + 32.0
+    return {"tmp2m": tmp2m, "tmp2m_diff": differences(tmp2m)}
+
+
+def plot_t2m(dom, hour, fields, run, axes, transform):
+    """Plot 2-m temperature"""
+    fhour, itime, vtime = hour["fhour"], hour["itime"], hour["vtime"]
+    lon_shift, lat_shift = hour["lon_shift"], hour["lat_shift"]
+    ax1, ax2, ax3 = axes
+    cmdiff = matplotlib.colors.ListedColormap(diffcolors)
+
+    # 2-m temperature
+    tmp2m_1, tmp2m_2 = fields["tmp2m"][[run, -1]]
+    tmp2m_diff = fields["tmp2m_diff"][run]
+
+    units = "\xb0" "F"
+    clevs = np.linspace(-16, 134, 51)
+    clevsdiff = [-6, -5, -4, -3, -2, -1, 0, 1, 2, 3, 4, 5, 6]
+    #  cm = plt.cm.Spectral_r
+    cm = cmap_t2m()
+    norm = matplotlib.colors.BoundaryNorm(clevs, cm.N)
+    normdiff = matplotlib.colors.BoundaryNorm(clevsdiff, cmdiff.N)
+
+    cs_1 = ax1.pcolormesh(
+        *lod_mesh(ax1, lon_shift, lat_shift, tmp2m_1, "mean"),
+        transform=transform,
+        cmap=cm,
+        norm=norm,
+    )
+    cs_1.cmap.set_under("white")
+    cs_1.cmap.set_over("white")
+    cbar1 = plt.colorbar(
+        cs_1,
+        ax=ax1,
+        orientation="horizontal",
+        pad=0.05,
+        shrink=0.6,
+        ticks=[-16, -4, 8, 20, 32, 44, 56, 68, 80, 92, 104, 116, 128],
+        extend="both",
+    )
+    cbar1.set_label(units, fontsize=6)
+    cbar1.ax.tick_params(labelsize=5)
+    ax1.text(
+        0.5,
+        1.03,
+        "FV3-LAM 2-m Temperature ("
+        + units
+        + ") \n initialized: "
+        + itime
+        + " valid: "
+        + vtime
+        + " (f"
+        + fhour
+        + ")",
+        horizontalalignment="center",
+        fontsize=6,
+        transform=ax1.transAxes,
+        bbox=dict(facecolor="white", alpha=0.85, boxstyle="square,pad=0.2"),
+    )
+
+    cs_2 = ax2.pcolormesh(
+        *lod_mesh(ax2, lon_shift, lat_shift, tmp2m_2, "mean"),
+        transform=transform,
+        cmap=cm,
+        norm=norm,
+    )
+    cs_2.cmap.set_under("white")
+    cs_2.cmap.set_over("white")
+    cbar2 = plt.colorbar(
+        cs_2,
+        ax=ax2,
+        orientation="horizontal",
+        pad=0.05,
+        shrink=0.6,
+        ticks=[-16, -4, 8, 20, 32, 44, 56, 68, 80, 92, 104, 116, 128],
+        extend="both",
+    )
+    cbar2.set_label(units, fontsize=6)
+    cbar2.ax.tick_params(labelsize=5)
+    ax2.text(
+        0.5,
+        1.03,
+        "FV3-LAM-2 2-m Temperature ("
+        + units
+        + ") \n initialized: "
+        + itime
+        + " valid: "
+        + vtime
+        + " (f"
+        + fhour
+        + ")",
+        horizontalalignment="center",
+        fontsize=6,
+        transform=ax2.transAxes,
+        bbox=dict(facecolor="white", alpha=0.85, boxstyle="square,pad=0.2"),
+    )
+
+    cs = ax3.pcolormesh(
+        *lod_mesh(ax3, lon_shift, lat_shift, tmp2m_diff, "mean"),
+        transform=transform,
+        cmap=cmdiff,
+        norm=normdiff,
+    )
+    cs.cmap.set_under("darkblue")
+    cs.cmap.set_over("darkred")
+    cbar3 = plt.colorbar(
+        cs, ax=ax3, orientation="horizontal", pad=0.05, shrink=0.6, extend="both"
+    )
+    cbar3.set_label(units, fontsize=6)
+    cbar3.ax.tick_params(labelsize=6)
+    ax3.text(
+        0.5,
+        1.03,
+        "FV3-LAM-2 - FV3-LAM 2-m Temperature ("
+        + units
+        + ") \n initialized: "
+        + itime
+        + " valid: "
+        + vtime
+        + " (f"
+        + fhour
+        + ")",
+        horizontalalignment="center",
+        fontsize=6,
+        transform=ax3.transAxes,
+        bbox=dict(facecolor="white", alpha=0.85, boxstyle="square,pad=0.2"),
+    )
+
+    compress_and_save(
+        COMOUT_1[run] + "/2mt_diff_" + dom + "_f" + fhour + ".png"
+    )
+
+    return [cbar1, cbar2, cbar3]
+
+
+def fields_dew2m(hour):
+    """2-m dew point temperature of all the runs"""
+    dew2m = (stacked(hour, "dew2m") - 273.15) * 1.8 + 32.0
+    return {"dew2m": dew2m, "dew2m_diff": differences(dew2m)}
+
+
+def plot_dew2m(dom, hour, fields, run, axes, transform):
+    """Plot 2-m dew point temperature"""
+    fhour, itime, vtime = hour["fhour"], hour["itime"], hour["vtime"]
+    lon_shift, lat_shift = hour["lon_shift"], hour["lat_shift"]
+    ax1, ax2, ax3 = axes
+    cmdiff = matplotlib.colors.ListedColormap(diffcolors)
+
+    # 2-m dew point temperature
+    dew2m_1, dew2m_2 = fields["dew2m"][[run, -1]]
+    dew2m_diff = fields["dew2m_diff"][run]
+
+    units = "\xb0" "F"
+    clevs = np.linspace(-5, 80, 35)
+    clevsdiff = [-12, -10, -8, -6, -4, -2, 0, 2, 4, 6, 8, 10, 12]
+    cm = cmap_q2m()
+    norm = matplotlib.colors.BoundaryNorm(clevs, cm.N)
+    normdiff = matplotlib.colors.BoundaryNorm(clevsdiff, cmdiff.N)
+
+    cs_1 = ax1.pcolormesh(
+        *lod_mesh(ax1, lon_shift, lat_shift, dew2m_1, "mean"),
+        transform=transform,
+        cmap=cm,
+        norm=norm,
+    )
+    cbar1 = plt.colorbar(
+        cs_1, ax=ax1, orientation="horizontal", pad=0.05, shrink=0.6, extend="both"
+    )
+    cbar1.set_label(units, fontsize=6)
+    cbar1.ax.tick_params(labelsize=6)
+    ax1.text(
+        0.5,
+        1.03,
+        "FV3-LAM 2-m Dew Point Temperature ("
+        + units
+        + ") \n initialized: "
+        + itime
+        + " valid: "
+        + vtime
+        + " (f"
+        + fhour
+        + ")",
+        horizontalalignment="center",
+        fontsize=6,
+        transform=ax1.transAxes,
+        bbox=dict(facecolor="white", alpha=0.85, boxstyle="square,pad=0.2"),
+    )
+
+    cs_2 = ax2.pcolormesh(
+        *lod_mesh(ax2, lon_shift, lat_shift, dew2m_2, "mean"),
+        transform=transform,
+        cmap=cm,
+        norm=norm,
+    )
+    cbar2 = plt.colorbar(
+        cs_2, ax=ax2, orientation="horizontal", pad=0.05, shrink=0.6, extend="both"
+    )
+    cbar2.set_label(units, fontsize=6)
+    cbar2.ax.tick_params(labelsize=6)
+    ax2.text(
+        0.5,
+        1.03,
+        "FV3-LAM-2 2-m Dew Point Temperature ("
+        + units
+        + ") \n initialized: "
+        + itime
+        + " valid: "
+        + vtime
+        + " (f"
+        + fhour
+        + ")",
+        horizontalalignment="center",
+        fontsize=6,
+        transform=ax2.transAxes,
+        bbox=dict(facecolor="white", alpha=0.85, boxstyle="square,pad=0.2"),
+    )
+
+    cs = ax3.pcolormesh(
+        *lod_mesh(ax3, lon_shift, lat_shift, dew2m_diff, "mean"),
+        transform=transform,
+        cmap=cmdiff,
+        norm=normdiff,
+    )
+    cs.cmap.set_under("darkblue")
+    cs.cmap.set_over("darkred")
+    cbar3 = plt.colorbar(
+        cs, ax=ax3, orientation="horizontal", pad=0.05, shrink=0.6, extend="both"
+    )
+    cbar3.set_label(units, fontsize=6)
+    cbar3.ax.tick_params(labelsize=6)
+    ax3.text(
+        0.5,
+        1.03,
+        "FV3-LAM-2 - FV3-LAM 2-m Dew Point Temperature ("
+        + units
+        + ") \n initialized: "
+        + itime
+        + " valid: "
+        + vtime
+        + " (f"
+        + fhour
+        + ")",
+        horizontalalignment="center",
+        fontsize=6,
+        transform=ax3.transAxes,
+        bbox=dict(facecolor="white", alpha=0.85, boxstyle="square,pad=0.2"),
+    )
+
+    compress_and_save(
+        COMOUT_1[run]
+        + "/2mdew_diff_"
+        + dom
+        + "_f"
+        + fhour
+        + ".png"
+    )
+
+    return [cbar1, cbar2, cbar3]
+
+
+def fields_wind10m(hour):
+    """10-m wind of all the runs"""
+    uwind = stacked(hour, "u10m") * 1.94384
+    vwind = stacked(hour, "v10m") * 1.94384
+    uwind, vwind = earth_winds(hour, uwind, vwind)
+    wspd10m = np.sqrt(uwind**2 + vwind**2)
+    return {
+        "uwind": uwind,
+        "vwind": vwind,
+        "wspd10m": wspd10m,
+        "wspd10m_diff": differences(wspd10m),
+    }
+
+
+def plot_wind10m(dom, hour, fields, run, axes, transform):
+    """Plot 10-m wind speed and barbs"""
+    fhour, itime, vtime = hour["fhour"], hour["itime"], hour["vtime"]
+    lon_shift, lat_shift = hour["lon_shift"], hour["lat_shift"]
+    dx = hour["dx"]
+    ax1, ax2, ax3 = axes
+    cmdiff = matplotlib.colors.ListedColormap(diffcolors)
+
+    # 10-m wind speed
+    uwind_1, uwind_2 = fields["uwind"][[run, -1]]
+    vwind_1, vwind_2 = fields["vwind"][[run, -1]]
+    wspd10m_1, wspd10m_2 = fields["wspd10m"][[run, -1]]
+    wspd10m_diff = fields["wspd10m_diff"][run]
+
+    units = "kts"
+    # Places a wind barb every ~180 km, optimized for CONUS domain
+    skip = round(177.28 * (dx / 1000.0) ** -0.97)
+    logging.info("skipping every " + str(skip) + " grid points to plot")
+    barblength = 4
+
+    clevs = [5, 10, 15, 20, 25, 30, 35, 40, 45, 50, 55, 60]
+    clevsdiff = [-12, -10, -8, -6, -4, -2, 0, 2, 4, 6, 8, 10, 12]
+    colorlist = [
+        "turquoise",
+        "dodgerblue",
+        "blue",
+        "#FFF68F",
+        "#E3CF57",
+        "peru",
+        "brown",
+        "crimson",
+        "red",
+        "fuchsia",
+        "DarkViolet",
+    ]
+    cm = matplotlib.colors.ListedColormap(colorlist)
+    norm = matplotlib.colors.BoundaryNorm(clevs, cm.N)
+    normdiff = matplotlib.colors.BoundaryNorm(clevsdiff, cmdiff.N)
+
+    cs_1 = ax1.pcolormesh(
+        *lod_mesh(ax1, lon_shift, lat_shift, wspd10m_1, "mean"),
+        transform=transform,
+        cmap=cm,
+        vmin=5,
+        norm=norm,
+    )
+    cs_1.cmap.set_under("white", alpha=0.0)
+    cs_1.cmap.set_over("black")
+    cbar1 = plt.colorbar(
+        cs_1,
+        ax=ax1,
+        orientation="horizontal",
+        pad=0.05,
+        shrink=0.6,
+        ticks=clevs,
+        extend="max",
+    )
+    cbar1.set_label(units, fontsize=6)
+    cbar1.ax.tick_params(labelsize=6)
+    ax1.barbs(
+        lon_shift[::skip, ::skip],
+        lat_shift[::skip, ::skip],
+        uwind_1[::skip, ::skip],
+        vwind_1[::skip, ::skip],
+        length=barblength,
+        linewidth=0.5,
+        color="black",
+        transform=transform,
+    )
+    ax1.text(
+        0.5,
+        1.03,
+        "FV3-LAM 10-m Winds ("
+        + units
+        + ") \n initialized: "
+        + itime
+        + " valid: "
+        + vtime
+        + " (f"
+        + fhour
+        + ")",
+        horizontalalignment="center",
+        fontsize=6,
+        transform=ax1.transAxes,
+        bbox=dict(facecolor="white", alpha=0.85, boxstyle="square,pad=0.2"),
+    )
+
+    cs_2 = ax2.pcolormesh(
+        *lod_mesh(ax2, lon_shift, lat_shift, wspd10m_2, "mean"),
+        transform=transform,
+        cmap=cm,
+        vmin=5,
+        norm=norm,
+    )
+    cs_2.cmap.set_under("white", alpha=0.0)
+    cs_2.cmap.set_over("black")
+    cbar2 = plt.colorbar(
+        cs_2,
+        ax=ax2,
+        orientation="horizontal",
+        pad=0.05,
+        shrink=0.6,
+        ticks=clevs,
+        extend="max",
+    )
+    cbar2.set_label(units, fontsize=6)
+    cbar2.ax.tick_params(labelsize=6)
+    ax2.barbs(
+        lon_shift[::skip, ::skip],
+        lat_shift[::skip, ::skip],
+        uwind_2[::skip, ::skip],
+        vwind_2[::skip, ::skip],
+        length=barblength,
+        linewidth=0.5,
+        color="black",
+        transform=transform,
+    )
+    ax2.text(
+        0.5,
+        1.03,
+        "FV3-LAM-2 10-m Winds ("
+        + units
+        + ") \n initialized: "
+        + itime
+        + " valid: "
+        + vtime
+        + " (f"
+        + fhour
+        + ")",
+        horizontalalignment="center",
+        fontsize=6,
+        transform=ax2.transAxes,
+        bbox=dict(facecolor="white", alpha=0.85, boxstyle="square,pad=0.2"),
+    )
+
+    cs = ax3.pcolormesh(
+        *lod_mesh(ax3, lon_shift, lat_shift, wspd10m_diff, "mean"),
+        transform=transform,
+        cmap=cmdiff,
+        norm=normdiff,
+    )
+    cs.cmap.set_under("darkblue")
+    cs.cmap.set_over("darkred")
+    cbar3 = plt.colorbar(
+        cs, ax=ax3, orientation="horizontal", pad=0.05, shrink=0.6, extend="both"
+    )
+    cbar3.set_label(units, fontsize=6)
+    cbar3.ax.tick_params(labelsize=6)
+    ax3.text(
+        0.5,
+        1.03,
+        "FV3-LAM-2 - FV3-LAM 10-m Winds ("
+        + units
+        + ") \n initialized: "
+        + itime
+        + " valid: "
+        + vtime
+        + " (f"
+        + fhour
+        + ")",
+        horizontalalignment="center",
+        fontsize=6,
+        transform=ax3.transAxes,
+        bbox=dict(facecolor="white", alpha=0.85, boxstyle="square,pad=0.2"),
+    )
+
+    compress_and_save(
+        COMOUT_1[run]
+        + "/10mwind_diff_"
+        + dom
+        + "_f"
+        + fhour
+        + ".png"
+    )
+
+    return [cbar1, cbar2, cbar3]
+
+
+def fields_sfcape(hour):
+    """Surface-based CAPE and CIN of all the runs"""
+    cape = stacked(hour, "cape")
+    cin = stacked(hour, "cin")
+    return {
+        "cape": cape,
+        "cape_diff": differences(cape),
+        "cin": cin,
+    }
+
+
+def plot_sfcape(dom, hour, fields, run, axes, transform):
+    """Plot surface-based CAPE and CIN"""
+    fhour, itime, vtime = hour["fhour"], hour["itime"], hour["vtime"]
+    lon_shift, lat_shift = hour["lon_shift"], hour["lat_shift"]
+    ax1, ax2, ax3 = axes
+    cmdiff = matplotlib.colors.ListedColormap(diffcolors)
+
+    # Surface-based CAPE
+    cape_1, cape_2 = fields["cape"][[run, -1]]
+    cape_diff = fields["cape_diff"][run]
+
+    # Surface-based CIN
+    cin_1, cin_2 = fields["cin"][[run, -1]]
+
+    units = "J/kg"
+    clevs = [100, 250, 500, 1000, 1500, 2000, 2500, 3000, 3500, 4000, 4500, 5000]
+    clevs2 = [-2000, -500, -250, -100, -25]
+    clevsdiff = [
+        -2000,
+        -1500,
+        -1000,
+        -500,
+        -250,
+        -100,
+        0,
+        100,
+        250,
+        500,
+        1000,
+        1500,
+        2000,
+    ]
+    colorlist = [
+        "blue",
+        "dodgerblue",
+        "cyan",
+        "mediumspringgreen",
+        "#FAFAD2",
+        "#EEEE00",
+        "#EEC900",
+        "darkorange",
+        "crimson",
+        "darkred",
+        "darkviolet",
+    ]
+    cm = matplotlib.colors.ListedColormap(colorlist)
+    norm = matplotlib.colors.BoundaryNorm(clevs, cm.N)
+    normdiff = matplotlib.colors.BoundaryNorm(clevsdiff, cmdiff.N)
+
+    cs_1 = ax1.pcolormesh(
+        *lod_mesh(ax1, lon_shift, lat_shift, cape_1, "mean"),
+        transform=transform,
+        cmap=cm,
+        vmin=100,
+        norm=norm,
+    )
+    cs_1.cmap.set_under("white", alpha=0.0)
+    cs_1.cmap.set_over("black")
+    cbar1 = plt.colorbar(
+        cs_1,
+        ax=ax1,
+        orientation="horizontal",
+        pad=0.05,
+        shrink=0.6,
+        ticks=clevs,
+        extend="max",
+    )
+    cbar1.set_label(units, fontsize=6)
+    cbar1.ax.tick_params(labelsize=4)
+    ax1.contourf(
+        lon_shift,
+        lat_shift,
+        cin_1,
+        clevs2,
+        colors="none",
+        hatches=["**", "++", "////", ".."],
+        transform=transform,
+    )
+    ax1.text(
+        0.5,
+        1.05,
+        "FV3-LAM Surface-Based CAPE (shaded) and CIN (hatched) ("
+        + units
+        + ") \n <-500 (*), -500<-250 (+), -250<-100 (/), -100<-25 (.) \n initialized: "
+        + itime
+        + " valid: "
+        + vtime
+        + " (f"
+        + fhour
+        + ")",
+        horizontalalignment="center",
+        fontsize=6,
+        transform=ax1.transAxes,
+        bbox=dict(facecolor="white", alpha=0.85, boxstyle="square,pad=0.2"),
+    )
+
+    cs_2 = ax2.pcolormesh(
+        *lod_mesh(ax2, lon_shift, lat_shift, cape_2, "mean"),
+        transform=transform,
+        cmap=cm,
+        vmin=100,
+        norm=norm,
+    )
+    cs_2.cmap.set_under("white", alpha=0.0)
+    cs_2.cmap.set_over("black")
+    cbar2 = plt.colorbar(
+        cs_2,
+        ax=ax2,
+        orientation="horizontal",
+        pad=0.05,
+        shrink=0.6,
+        ticks=clevs,
+        extend="max",
+    )
+    cbar2.set_label(units, fontsize=6)
+    cbar2.ax.tick_params(labelsize=4)
+    ax2.contourf(
+        lon_shift,
+        lat_shift,
+        cin_2,
+        clevs2,
+        colors="none",
+        hatches=["**", "++", "////", ".."],
+        transform=transform,
+    )
+    ax2.text(
+        0.5,
+        1.05,
+        "FV3-LAM-2 Surface-Based CAPE (shaded) and CIN (hatched) ("
+        + units
+        + ") \n <-500 (*), -500<-250 (+), -250<-100 (/), -100<-25 (.) \n initialized: "
+        + itime
+        + " valid: "
+        + vtime
+        + " (f"
+        + fhour
+        + ")",
+        horizontalalignment="center",
+        fontsize=6,
+        transform=ax2.transAxes,
+        bbox=dict(facecolor="white", alpha=0.85, boxstyle="square,pad=0.2"),
+    )
+
+    cs = ax3.pcolormesh(
+        *lod_mesh(ax3, lon_shift, lat_shift, cape_diff, "mean"),
+        transform=transform,
+        cmap=cmdiff,
+        norm=normdiff,
+    )
+    cs.cmap.set_under("darkblue")
+    cs.cmap.set_over("darkred")
+    cbar3 = plt.colorbar(
+        cs, ax=ax3, orientation="horizontal", pad=0.05, shrink=0.6, extend="both"
+    )
+    cbar3.set_label(units, fontsize=6)
+    cbar3.ax.tick_params(labelsize=6)
+    ax3.text(
+        0.5,
+        1.03,
+        "FV3-LAM-2 - FV3-LAM Surface-Based CAPE ("
+        + units
+        + ") \n initialized: "
+        + itime
+        + " valid: "
+        + vtime
+        + " (f"
+        + fhour
+        + ")",
+        horizontalalignment="center",
+        fontsize=6,
+        transform=ax3.transAxes,
+        bbox=dict(facecolor="white", alpha=0.85, boxstyle="square,pad=0.2"),
+    )
+
+    compress_and_save(
+        COMOUT_1[run]
+        + "/sfcape_diff_"
+        + dom
+        + "_f"
+        + fhour
+        + ".png"
+    )
+
+    return [cbar1, cbar2, cbar3]
+
+
+def fields_500mb(hour):
+    """500 mb height, wind and vorticity of all the runs, None if they are
+    not in the post output files"""
+    try:
+        z500 = smooth(stacked(hour, "z500") * 0.1, 6.89)
+        vort500 = smooth(stacked(hour, "vort500") * 100000, 1.7225)
+        u500 = stacked(hour, "u500") * 1.94384
+        v500 = stacked(hour, "v500") * 1.94384
+    except KeyError:
+        return None
+    vort500[vort500 > 1000] = 0  # Mask out undefined values on domain edge
+    u500, v500 = earth_winds(hour, u500, v500)
+    return {
+        "z500": z500,
+        "z500_diff": differences(z500),
+        "vort500": vort500,
+        "u500": u500,
+        "v500": v500,
+    }
+
+
+def plot_500mb(dom, hour, fields, run, axes, transform):
+    """Plot 500 mb heights, winds and vorticity"""
+    fhour, itime, vtime = hour["fhour"], hour["itime"], hour["vtime"]
+    lon_shift, lat_shift = hour["lon_shift"], hour["lat_shift"]
+    dx = hour["dx"]
+    ax1, ax2, ax3 = axes
+    cmdiff = matplotlib.colors.ListedColormap(diffcolors)
+
+    # 500 mb height, wind, vorticity
+    z500_1, z500_2 = fields["z500"][[run, -1]]
+    z500_diff = fields["z500_diff"][run]
+    vort500_1, vort500_2 = fields["vort500"][[run, -1]]
+    u500_1, u500_2 = fields["u500"][[run, -1]]
+    v500_1, v500_2 = fields["v500"][[run, -1]]
+
+    units = "x10${^5}$ s${^{-1}}$"
+    skip = round(177.28 * (dx / 1000.0) ** -0.97)
+    logging.info("skipping every " + str(skip) + " grid points to plot")
+    barblength = 4
+
+    vortlevs = [16, 20, 24, 28, 32, 36, 40]
+    clevsdiff = [-6, -5, -4, -3, -2, -1, 0, 1, 2, 3, 4, 5, 6]
+    colorlist = ["yellow", "gold", "goldenrod", "orange", "orangered", "red"]
+    cm = matplotlib.colors.ListedColormap(colorlist)
+    norm = matplotlib.colors.BoundaryNorm(vortlevs, cm.N)
+    normdiff = matplotlib.colors.BoundaryNorm(clevsdiff, cmdiff.N)
+
+    cs1_a = ax1.pcolormesh(
+        *lod_mesh(ax1, lon_shift, lat_shift, vort500_1, "mean"),
+        transform=transform,
+        cmap=cm,
+        norm=norm,
+    )
+    cs1_a.cmap.set_under("white")
+    cs1_a.cmap.set_over("darkred")
+    cbar1 = plt.colorbar(
+        cs1_a,
+        ax=ax1,
+        orientation="horizontal",
+        pad=0.05,
+        shrink=0.6,
+        ticks=vortlevs,
+        extend="both",
+    )
+    cbar1.set_label(units, fontsize=6)
+    cbar1.ax.tick_params(labelsize=6)
+    ax1.barbs(
+        lon_shift[::skip, ::skip],
+        lat_shift[::skip, ::skip],
+        u500_1[::skip, ::skip],
+        v500_1[::skip, ::skip],
+        length=barblength,
+        linewidth=0.5,
+        color="steelblue",
+        transform=transform,
+    )
+    cs1_b = ax1.contour(
+        lon_shift,
+        lat_shift,
+        z500_1,
+        np.arange(486, 600, 6),
+        colors="black",
+        linewidths=1,
+        transform=transform,
+    )
+    plt.clabel(
+        cs1_b, np.arange(486, 600, 6), inline_spacing=1, fmt="%d", fontsize=8
+    )
+    ax1.text(
+        0.5,
+        1.03,
+        "FV3-LAM 500 mb Heights (dam), Winds (kts), and $\zeta$ ("
+        + units
+        + ") \n initialized: "
+        + itime
+        + " valid: "
+        + vtime
+        + " (f"
+        + fhour
+        + ")",
+        horizontalalignment="center",
+        fontsize=8,
+        transform=ax1.transAxes,
+        bbox=dict(facecolor="white", alpha=0.85, boxstyle="square,pad=0.2"),
+    )
+
+    cs2_a = ax2.pcolormesh(
+        *lod_mesh(ax2, lon_shift, lat_shift, vort500_2, "mean"),
+        transform=transform,
+        cmap=cm,
+        norm=norm,
+    )
+    cs2_a.cmap.set_under("white")
+    cs2_a.cmap.set_over("darkred")
+    cbar2 = plt.colorbar(
+        cs2_a,
+        ax=ax2,
+        orientation="horizontal",
+        pad=0.05,
+        shrink=0.6,
+        ticks=vortlevs,
+        extend="both",
+    )
+    cbar2.set_label(units, fontsize=6)
+    cbar2.ax.tick_params(labelsize=6)
+    ax2.barbs(
+        lon_shift[::skip, ::skip],
+        lat_shift[::skip, ::skip],
+        u500_2[::skip, ::skip],
+        v500_2[::skip, ::skip],
+        length=barblength,
+        linewidth=0.5,
+        color="steelblue",
+        transform=transform,
+    )
+    cs2_b = ax2.contour(
+        lon_shift,
+        lat_shift,
+        z500_2,
+        np.arange(486, 600, 6),
+        colors="black",
+        linewidths=1,
+        transform=transform,
+    )
+    plt.clabel(
+        cs2_b, np.arange(486, 600, 6), inline_spacing=1, fmt="%d", fontsize=8
+    )
+    ax2.text(
+        0.5,
+        1.03,
+        "FV3-LAM-2 500 mb Heights (dam), Winds (kts), and $\zeta$ ("
+        + units
+        + ") \n initialized: "
+        + itime
+        + " valid: "
+        + vtime
+        + " (f"
+        + fhour
+        + ")",
+        horizontalalignment="center",
+        fontsize=8,
+        transform=ax2.transAxes,
+        bbox=dict(facecolor="white", alpha=0.85, boxstyle="square,pad=0.2"),
+    )
+
+    cs = ax3.pcolormesh(
+        *lod_mesh(ax3, lon_shift, lat_shift, z500_diff, "mean"),
+        transform=transform,
+        cmap=cmdiff,
+        norm=normdiff,
+    )
+    cs.cmap.set_under("darkblue")
+    cs.cmap.set_over("darkred")
+    cbar3 = plt.colorbar(
+        cs, ax=ax3, orientation="horizontal", pad=0.05, shrink=0.6, extend="both"
+    )
+    cbar3.set_label(units, fontsize=6)
+    cbar3.ax.tick_params(labelsize=6)
+    ax3.text(
+        0.5,
+        1.03,
+        "FV3-LAM-2 - FV3-LAM 500-mb Heights (dam) \n initialized: "
+        + itime
+        + " valid: "
+        + vtime
+        + " (f"
+        + fhour
+        + ")",
+        horizontalalignment="center",
+        fontsize=6,
+        transform=ax3.transAxes,
+        bbox=dict(facecolor="white", alpha=0.85, boxstyle="square,pad=0.2"),
+    )
+
+    compress_and_save(
+        COMOUT_1[run] + "/500_diff_" + dom + "_f" + fhour + ".png"
+    )
+
+    return [cbar1, cbar2, cbar3]
+
+
+def fields_wind250mb(hour):
+    """250 mb wind of all the runs"""
+    u250 = stacked(hour, "u250") * 1.94384
+    v250 = stacked(hour, "v250") * 1.94384
+    u250, v250 = earth_winds(hour, u250, v250)
+    wspd250 = np.sqrt(u250**2 + v250**2)
+    return {
+        "u250": u250,
+        "v250": v250,
+        "wspd250": wspd250,
+        "wspd250_diff": differences(wspd250),
+    }
+
+
+def plot_wind250mb(dom, hour, fields, run, axes, transform):
+    """Plot 250 mb winds"""
+    fhour, itime, vtime = hour["fhour"], hour["itime"], hour["vtime"]
+    lon_shift, lat_shift = hour["lon_shift"], hour["lat_shift"]
+    dx = hour["dx"]
+    ax1, ax2, ax3 = axes
+    cmdiff = matplotlib.colors.ListedColormap(diffcolors)
 
-    # Define required positional arguments
+    # 250 mb winds
+    u250_1, u250_2 = fields["u250"][[run, -1]]
+    v250_1, v250_2 = fields["v250"][[run, -1]]
+    wspd250_1, wspd250_2 = fields["wspd250"][[run, -1]]
+    wspd250_diff = fields["wspd250_diff"][run]
+
+    units = "kts"
+    skip = round(177.28 * (dx / 1000.0) ** -0.97)
+    logging.info("skipping every " + str(skip) + " grid points to plot")
+    barblength = 4
+
+    clevs = [50, 60, 70, 80, 90, 100, 110, 120, 130, 140, 150]
+    clevsdiff = [-30, -25, -20, -15, -10, -5, 0, 5, 10, 15, 20, 25, 30]
+    colorlist = [
+        "turquoise",
+        "deepskyblue",
+        "dodgerblue",
+        "#1874CD",
+        "blue",
+        "beige",
+        "khaki",
+        "peru",
+        "brown",
+        "crimson",
+    ]
+    cm = matplotlib.colors.ListedColormap(colorlist)
+    norm = matplotlib.colors.BoundaryNorm(clevs, cm.N)
+    normdiff = matplotlib.colors.BoundaryNorm(clevsdiff, cmdiff.N)
+
+    cs_1 = ax1.pcolormesh(
+        *lod_mesh(ax1, lon_shift, lat_shift, wspd250_1, "mean"),
+        transform=transform,
+        cmap=cm,
+        vmin=50,
+        norm=norm,
+    )
+    cs_1.cmap.set_under("white", alpha=0.0)
+    cs_1.cmap.set_over("red")
+    cbar1 = plt.colorbar(
+        cs_1,
+        ax=ax1,
+        orientation="horizontal",
+        pad=0.05,
+        shrink=0.6,
+        ticks=clevs,
+        extend="max",
+    )
+    cbar1.set_label(units, fontsize=6)
+    cbar1.ax.tick_params(labelsize=6)
+    ax1.barbs(
+        lon_shift[::skip, ::skip],
+        lat_shift[::skip, ::skip],
+        u250_1[::skip, ::skip],
+        v250_1[::skip, ::skip],
+        length=barblength,
+        linewidth=0.5,
+        color="black",
+        transform=transform,
+    )
+    ax1.text(
+        0.5,
+        1.03,
+        "FV3-LAM 250 mb Winds ("
+        + units
+        + ") \n initialized: "
+        + itime
+        + " valid: "
+        + vtime
+        + " (f"
+        + fhour
+        + ")",
+        horizontalalignment="center",
+        fontsize=6,
+        transform=ax1.transAxes,
+        bbox=dict(facecolor="white", alpha=0.85, boxstyle="square,pad=0.2"),
+    )
+
+    cs_2 = ax2.pcolormesh(
+        *lod_mesh(ax2, lon_shift, lat_shift, wspd250_2, "mean"),
+        transform=transform,
+        cmap=cm,
+        vmin=50,
+        norm=norm,
+    )
+    cs_2.cmap.set_under("white", alpha=0.0)
+    cs_2.cmap.set_over("red")
+    cbar2 = plt.colorbar(
+        cs_2,
+        ax=ax2,
+        orientation="horizontal",
+        pad=0.05,
+        shrink=0.6,
+        ticks=clevs,
+        extend="max",
+    )
+    cbar2.set_label(units, fontsize=6)
+    cbar2.ax.tick_params(labelsize=6)
+    ax2.barbs(
+        lon_shift[::skip, ::skip],
+        lat_shift[::skip, ::skip],
+        u250_2[::skip, ::skip],
+        v250_2[::skip, ::skip],
+        length=barblength,
+        linewidth=0.5,
+        color="black",
+        transform=transform,
+    )
+    ax2.text(
+        0.5,
+        1.03,
+        "FV3-LAM-2 250 mb Winds ("
+        + units
+        + ") \n initialized: "
+        + itime
+        + " valid: "
+        + vtime
+        + " (f"
+        + fhour
+        + ")",
+        horizontalalignment="center",
+        fontsize=6,
+        transform=ax2.transAxes,
+        bbox=dict(facecolor="white", alpha=0.85, boxstyle="square,pad=0.2"),
+    )
+
+    cs = ax3.pcolormesh(
+        *lod_mesh(ax3, lon_shift, lat_shift, wspd250_diff, "mean"),
+        transform=transform,
+        cmap=cmdiff,
+        norm=normdiff,
+    )
+    cs.cmap.set_under("darkblue")
+    cs.cmap.set_over("darkred")
+    cbar3 = plt.colorbar(
+        cs, ax=ax3, orientation="horizontal", pad=0.05, shrink=0.6, extend="both"
+    )
+    cbar3.set_label(units, fontsize=6)
+    cbar3.ax.tick_params(labelsize=6)
+    ax3.text(
+        0.5,
+        1.03,
+        "FV3-LAM-2 - FV3-LAM 250-mb Winds ("
+        + units
+        + ") \n initialized: "
+        + itime
+        + " valid: "
+        + vtime
+        + " (f"
+        + fhour
+        + ")",
+        horizontalalignment="center",
+        fontsize=6,
+        transform=ax3.transAxes,
+        bbox=dict(facecolor="white", alpha=0.85, boxstyle="square,pad=0.2"),
+    )
+
+    compress_and_save(
+        COMOUT_1[run]
+        + "/250wind_diff_"
+        + dom
+        + "_f"
+        + fhour
+        + ".png"
+    )
+
+    return [cbar1, cbar2, cbar3]
+
+
+def fields_qpf(hour):
+    """Total precipitation of all the runs, None at forecast hour 0"""
+    if hour["fhr"] == 0:  # Do not make total QPF plot for forecast hour 0
+        return None
+    qpf = stacked(hour, "qpf") * 0.0393701
+    return {"qpf": qpf, "qpf_diff": differences(qpf)}
+
+
+def plot_qpf(dom, hour, fields, run, axes, transform):
+    """Plot total accumulated precipitation"""
+    fhour, itime, vtime = hour["fhour"], hour["itime"], hour["vtime"]
+    lon_shift, lat_shift = hour["lon_shift"], hour["lat_shift"]
+    ax1, ax2, ax3 = axes
+    cmdiff = matplotlib.colors.ListedColormap(diffcolors)
+
+    # Total precipitation
+    qpf_1, qpf_2 = fields["qpf"][[run, -1]]
+    qpf_diff = fields["qpf_diff"][run]
+
+    units = "in"
+    clevs = [
+        0.01,
+        0.1,
+        0.25,
+        0.5,
+        0.75,
+        1,
+        1.25,
+        1.5,
+        1.75,
+        2,
+        2.5,
+        3,
+        4,
+        5,
+        7,
+        10,
+        15,
+        20,
+    ]
+    clevsdiff = [-3, -2.5, -2, -1.5, -1, -0.5, 0, 0.5, 1, 1.5, 2, 2.5, 3]
+    colorlist = [
+        "chartreuse",
+        "limegreen",
+        "green",
+        "blue",
+        "dodgerblue",
+        "deepskyblue",
+        "cyan",
+        "mediumpurple",
+        "mediumorchid",
+        "darkmagenta",
+        "darkred",
+        "crimson",
+        "orangered",
+        "darkorange",
+        "goldenrod",
+        "gold",
+        "yellow",
+    ]
+    cm = matplotlib.colors.ListedColormap(colorlist)
+    norm = matplotlib.colors.BoundaryNorm(clevs, cm.N)
+    normdiff = matplotlib.colors.BoundaryNorm(clevsdiff, cmdiff.N)
+
+    cs_1 = ax1.pcolormesh(
+        *lod_mesh(ax1, lon_shift, lat_shift, qpf_1, "max"),
+        transform=transform,
+        cmap=cm,
+        vmin=0.01,
+        norm=norm,
+    )
+    cs_1.cmap.set_under("white", alpha=0.0)
+    cs_1.cmap.set_over("pink")
+    cbar1 = plt.colorbar(
+        cs_1,
+        ax=ax1,
+        orientation="horizontal",
+        pad=0.05,
+        shrink=0.6,
+        extend="max",
+    )
+    cbar1.set_label(units, fontsize=6)
+    #cbar1.ax.set_xticklabels([0.1, 0.5, 1, 1.5, 2, 3, 5, 10, 20])
+    cbar1.ax.set_xticklabels([0.1, 0.3, 0.5, 0.75, 1, 1.25, 1.5, 1.75, 2, 2.5, 3, 4, 5, 7.5, 10, 15, 17.5, 20])
+    cbar1.ax.tick_params(labelsize=6)
+    ax1.text(
+        0.5,
+        1.03,
+        "FV3-LAM "
+        + fhour
+        + "-hr Accumulated Precipitation ("
+        + units
+        + ") \n initialized: "
+        + itime
+        + " valid: "
+        + vtime
+        + " (f"
+        + fhour
+        + ")",
+        horizontalalignment="center",
+        fontsize=6,
+        transform=ax1.transAxes,
+        bbox=dict(facecolor="white", alpha=0.85, boxstyle="square,pad=0.2"),
+    )
+
+    cs_2 = ax2.pcolormesh(
+        *lod_mesh(ax2, lon_shift, lat_shift, qpf_2, "max"),
+        transform=transform,
+        cmap=cm,
+        vmin=0.01,
+        norm=norm,
+    )
+    cs_2.cmap.set_under("white", alpha=0.0)
+    cs_2.cmap.set_over("pink")
+    cbar2 = plt.colorbar(
+        cs_2,
+        ax=ax2,
+        orientation="horizontal",
+        pad=0.05,
+        shrink=0.6,
+        extend="max",
+    )
+    cbar2.set_label(units, fontsize=6)
+    #cbar2.ax.set_xticklabels([0.1, 0.5, 1, 1.5, 2, 3, 5, 10, 20])
+    cbar2.ax.set_xticklabels([0.1, 0.3, 0.5, 0.75, 1, 1.25, 1.5, 1.75, 2, 2.5, 3, 4, 5, 7.5, 10, 15, 17.5, 20])
+    cbar2.ax.tick_params(labelsize=6)
+    ax2.text(
+        0.5,
+        1.03,
+        "FV3-LAM-2 "
+        + fhour
+        + "-hr Accumulated Precipitation ("
+        + units
+        + ") \n initialized: "
+        + itime
+        + " valid: "
+        + vtime
+        + " (f"
+        + fhour
+        + ")",
+        horizontalalignment="center",
+        fontsize=6,
+        transform=ax2.transAxes,
+        bbox=dict(facecolor="white", alpha=0.85, boxstyle="square,pad=0.2"),
+    )
+
+    cs = ax3.pcolormesh(
+        *lod_mesh(ax3, lon_shift, lat_shift, qpf_diff, "absmax"),
+        transform=transform,
+        cmap=cmdiff,
+        norm=normdiff,
+    )
+    cs.cmap.set_under("darkblue")
+    cs.cmap.set_over("darkred")
+    cbar3 = plt.colorbar(
+        cs,
+        ax=ax3,
+        orientation="horizontal",
+        pad=0.05,
+        shrink=0.6,
+        extend="both",
+    )
+    cbar3.set_label(units, fontsize=6)
+    cbar3.ax.tick_params(labelsize=6)
+    ax3.text(
+        0.5,
+        1.03,
+        "FV3-LAM-2 - FV3-LAM "
+        + fhour
+        + "-hr Accumulated Precipitation ("
+        + units
+        + ") \n initialized: "
+        + itime
+        + " valid: "
+        + vtime
+        + " (f"
+        + fhour
+        + ")",
+        horizontalalignment="center",
+        fontsize=6,
+        transform=ax3.transAxes,
+        bbox=dict(facecolor="white", alpha=0.85, boxstyle="square,pad=0.2"),
+    )
+
+    compress_and_save(
+        COMOUT_1[run]
+        + "/qpf_diff_"
+        + dom
+        + "_f"
+        + fhour
+        + ".png"
+    )
+
+    return [cbar1, cbar2, cbar3]
+
+
+def fields_uh25(hour):
+    """Max/min hourly 2-5 km updraft helicity of all the runs, None at
+    forecast hour 0"""
+    if hour["fhr"] == 0:  # Do not make max/min hourly 2-5 km UH plot for forecast hour 0
+        return None
+    maxuh25 = stacked(hour, "maxuh25")
+    minuh25 = stacked(hour, "minuh25")
+    maxuh25 = np.where(maxuh25 < 10, 0, maxuh25)
+    minuh25 = np.where(minuh25 > -10, 0, minuh25)
+    uh25 = maxuh25 + minuh25
+    return {"uh25": uh25, "uh25_diff": differences(uh25)}
+
+
+def plot_uh25(dom, hour, fields, run, axes, transform):
+    """Plot max/min hourly 2-5 km updraft helicity"""
+    fhour, itime, vtime = hour["fhour"], hour["itime"], hour["vtime"]
+    lon_shift, lat_shift = hour["lon_shift"], hour["lat_shift"]
+    ax1, ax2, ax3 = axes
+
+    # Max/Min Hourly 2-5 km Updraft Helicity
+    uh25_1, uh25_2 = fields["uh25"][[run, -1]]
+    uh25_diff = fields["uh25_diff"][run]
+
+    units = "m${^2}$ s$^{-2}$"
+    clevs = [
+        -150,
+        -100,
+        -75,
+        -50,
+        -25,
+        -10,
+        0,
+        10,
+        25,
+        50,
+        75,
+        100,
+        150,
+        200,
+        250,
+        300,
+    ]
+    #   alternative colormap for just max UH if you don't want to plot the min UH too
+    #   colorlist = ['white','skyblue','mediumblue','green','orchid','firebrick','#EEC900','DarkViolet']
+    colorlist = [
+        "blue",
+        "#1874CD",
+        "dodgerblue",
+        "deepskyblue",
+        "turquoise",
+        "#E5E5E5",
+        "#E5E5E5",
+        "#EEEE00",
+        "#EEC900",
+        "darkorange",
+        "orangered",
+        "red",
+        "firebrick",
+        "mediumvioletred",
+        "darkviolet",
+    ]
+    cm = matplotlib.colors.ListedColormap(colorlist)
+    clevsdiff = [-3, -2.5, -2, -1.5, -1, -0.5, 0, 0.5, 1, 1.5, 2, 2.5, 3]
+    cmdiff = matplotlib.colors.ListedColormap(diffcolors)
+    norm = matplotlib.colors.BoundaryNorm(clevs, cm.N)
+    normdiff = matplotlib.colors.BoundaryNorm(clevsdiff, cmdiff.N)
+
+    cs_1 = ax1.pcolormesh(
+        *lod_mesh(ax1, lon_shift, lat_shift, uh25_1, "absmax"),
+        transform=transform,
+        cmap=cm,
+        norm=norm,
+    )
+    cs_1.cmap.set_under("darkblue")
+    cs_1.cmap.set_over("black")
+    cbar1 = plt.colorbar(
+        cs_1,
+        ax=ax1,
+        orientation="horizontal",
+        pad=0.05,
+        shrink=0.6,
+        extend="both",
+    )
+    cbar1.set_label(units, fontsize=6)
+    cbar1.ax.tick_params(labelsize=6)
+    ax1.text(
+        0.5,
+        1.03,
+        "FV3-LAM 1-h Max/Min 2-5 km Updraft Helicity ("
+        + units
+        + ") \n initialized: "
+        + itime
+        + " valid: "
+        + vtime
+        + " (f"
+        + fhour
+        + ")",
+        horizontalalignment="center",
+        fontsize=6,
+        transform=ax1.transAxes,
+        bbox=dict(facecolor="white", alpha=0.85, boxstyle="square,pad=0.2"),
+    )
+
+    cs_2 = ax2.pcolormesh(
+        *lod_mesh(ax2, lon_shift, lat_shift, uh25_2, "absmax"),
+        transform=transform,
+        cmap=cm,
+        norm=norm,
+    )
+    cs_2.cmap.set_under("darkblue")
+    cs_2.cmap.set_over("black")
+    cbar2 = plt.colorbar(
+        cs_2,
+        ax=ax2,
+        orientation="horizontal",
+        pad=0.05,
+        shrink=0.6,
+        extend="both",
+    )
+    cbar2.set_label(units, fontsize=6)
+    cbar2.ax.tick_params(labelsize=6)
+    ax2.text(
+        0.5,
+        1.03,
+        "FV3-LAM-2 1-h Max/Min 2-5 km Updraft Helicity ("
+        + units
+        + ") \n initialized: "
+        + itime
+        + " valid: "
+        + vtime
+        + " (f"
+        + fhour
+        + ")",
+        horizontalalignment="center",
+        fontsize=6,
+        transform=ax2.transAxes,
+        bbox=dict(facecolor="white", alpha=0.85, boxstyle="square,pad=0.2"),
+    )
+
+    cs = ax3.pcolormesh(
+        *lod_mesh(ax3, lon_shift, lat_shift, uh25_diff, "absmax"),
+        transform=transform,
+        cmap=cmdiff,
+        norm=normdiff,
+    )
+    cs.cmap.set_under("darkblue")
+    cs.cmap.set_over("darkred")
+    cbar3 = plt.colorbar(
+        cs,
+        ax=ax3,
+        orientation="horizontal",
+        pad=0.05,
+        shrink=0.6,
+        extend="both",
+    )
+    cbar3.set_label(units, fontsize=6)
+    cbar3.ax.tick_params(labelsize=6)
+    ax3.text(
+        0.5,
+        1.03,
+        "FV3-LAM-2 - FV3-LAM 1-h Max/Min 2-5 km Updraft Helicity ("
+        + units
+        + ") \n initialized: "
+        + itime
+        + " valid: "
+        + vtime
+        + " (f"
+        + fhour
+        + ")",
+        horizontalalignment="center",
+        fontsize=6,
+        transform=ax3.transAxes,
+        bbox=dict(facecolor="white", alpha=0.85, boxstyle="square,pad=0.2"),
+    )
+
+    compress_and_save(
+        COMOUT_1[run]
+        + "/uh25_diff_"
+        + dom
+        + "_f"
+        + fhour
+        + ".png"
+    )
+
+    return [cbar1, cbar2, cbar3]
+
+
+def fields_refc(hour):
+    """Composite reflectivity of all the runs"""
+    return {"refc": stacked(hour, "refc")}
+
+
+def plot_refc(dom, hour, fields, run, axes, transform):
+    """Plot composite reflectivity"""
+    fhour, itime, vtime = hour["fhour"], hour["itime"], hour["vtime"]
+    lon_shift, lat_shift = hour["lon_shift"], hour["lat_shift"]
+    ax1, ax2, ax3 = axes
+
+    # Composite reflectivity
+    refc_1, refc_2 = fields["refc"][[run, -1]]
+
+    units = "dBZ"
+    clevs = np.linspace(5, 70, 14)
+    clevsdiff = [20, 1000]
+    colorlist = [
+        "turquoise",
+        "dodgerblue",
+        "mediumblue",
+        "lime",
+        "limegreen",
+        "green",
+        "#EEEE00",
+        "#EEC900",
+        "darkorange",
+        "red",
+        "firebrick",
+        "darkred",
+        "fuchsia",
+    ]
+    cm = matplotlib.colors.ListedColormap(colorlist)
+    norm = matplotlib.colors.BoundaryNorm(clevs, cm.N)
+
+    cs_1 = ax1.pcolormesh(
+        *lod_mesh(ax1, lon_shift, lat_shift, refc_1, "max"),
+        transform=transform,
+        cmap=cm,
+        vmin=5,
+        norm=norm,
+    )
+    cs_1.cmap.set_under("white", alpha=0.0)
+    cs_1.cmap.set_over("black")
+    cbar1 = plt.colorbar(
+        cs_1,
+        ax=ax1,
+        orientation="horizontal",
+        pad=0.05,
+        shrink=0.6,
+        ticks=clevs,
+        extend="max",
+    )
+    cbar1.set_label(units, fontsize=6)
+    cbar1.ax.tick_params(labelsize=6)
+    ax1.text(
+        0.5,
+        1.03,
+        "FV3-LAM Composite Reflectivity ("
+        + units
+        + ") \n initialized: "
+        + itime
+        + " valid: "
+        + vtime
+        + " (f"
+        + fhour
+        + ")",
+        horizontalalignment="center",
+        fontsize=6,
+        transform=ax1.transAxes,
+        bbox=dict(facecolor="white", alpha=0.85, boxstyle="square,pad=0.2"),
+    )
+
+    cs_2 = ax2.pcolormesh(
+        *lod_mesh(ax2, lon_shift, lat_shift, refc_2, "max"),
+        transform=transform,
+        cmap=cm,
+        vmin=5,
+        norm=norm,
+    )
+    cs_2.cmap.set_under("white", alpha=0.0)
+    cs_2.cmap.set_over("black")
+    cbar2 = plt.colorbar(
+        cs_2,
+        ax=ax2,
+        orientation="horizontal",
+        pad=0.05,
+        shrink=0.6,
+        ticks=clevs,
+        extend="max",
+    )
+    cbar2.set_label(units, fontsize=6)
+    cbar2.ax.tick_params(labelsize=6)
+    ax2.text(
+        0.5,
+        1.03,
+        "FV3-LAM-2 Composite Reflectivity ("
+        + units
+        + ") \n initialized: "
+        + itime
+        + " valid: "
+        + vtime
+        + " (f"
+        + fhour
+        + ")",
+        horizontalalignment="center",
+        fontsize=6,
+        transform=ax2.transAxes,
+        bbox=dict(facecolor="white", alpha=0.85, boxstyle="square,pad=0.2"),
+    )
+
+    ax3.contourf(
+        lon_shift, lat_shift, refc_1, clevsdiff, colors="red", transform=transform
+    )
+    ax3.contourf(
+        lon_shift,
+        lat_shift,
+        refc_2,
+        clevsdiff,
+        colors="dodgerblue",
+        transform=transform,
+    )
+    ax3.text(
+        0.5,
+        1.03,
+        "FV3-LAM (red) and FV3-LAM-2 (blue) Composite Reflectivity > 20 ("
+        + units
+        + ") \n initialized: "
+        + itime
+        + " valid: "
+        + vtime
+        + " (f"
+        + fhour
+        + ")",
+        horizontalalignment="center",
+        fontsize=6,
+        transform=ax3.transAxes,
+        bbox=dict(facecolor="white", alpha=0.85, boxstyle="square,pad=0.2"),
+    )
+
+    compress_and_save(
+        COMOUT_1[run]
+        + "/refc_diff_"
+        + dom
+        + "_f"
+        + fhour
+        + ".png"
+    )
+
+    return [cbar1, cbar2]
+
+
+# Products in plotting order. Each entry is (name, fields, plot), where the
+# fields function computes the fields of the product for all the runs at once
+# (or returns None if the product is not available for the forecast hour)
+# and the plot function plots them for one run on the maps, saves the plot and
+# returns its colorbars. The fields each product is computed from are listed
+# in plot_utils.PRODUCT_FIELDS.
+PRODUCTS = [
+    ("slp", fields_slp, plot_slp),
+    ("2mt", fields_t2m, plot_t2m),
+    ("2mdew", fields_dew2m, plot_dew2m),
+    ("10mwind", fields_wind10m, plot_wind10m),
+    ("sfcape", fields_sfcape, plot_sfcape),
+    ("500", fields_500mb, plot_500mb),
+    ("250wind", fields_wind250mb, plot_wind250mb),
+    ("qpf", fields_qpf, plot_qpf),
+    ("refc", fields_refc, plot_refc),
+    ("uh25", fields_uh25, plot_uh25),
+]
+
+
+def plot_product(unit):
+    """Plot one product for all the runs. This is the unit of work of the
+    plotting processes.
+
+    Args:
+        unit: (forecast hour, domain, product name) tuple
+    """
+    fhr, dom, product = unit
+    hour = open_hour(fhr)
+    m = setup_map(dom, hour)
+
+    t1 = time.perf_counter()
+    logging.info(("Working on " + product + " for " + dom + " f" + hour["fhour"]))
+
+    # The fields of a product are computed once per forecast hour, for all
+    # runs and domains
+    compute, plot = {name: funcs for name, *funcs in PRODUCTS}[product]
+    if product not in hour["fields"]:
+        hour["fields"][product] = compute(hour)
+    fields = hour["fields"][product]
+    if fields is None:
+        return
+
+    for run in range(len(COMOUT_1)):
+        # Clear off old plottables but keep all the map info
+        for cbar in m["cbars"]:
+            cbar.remove()
+        m["cbars"] = []
+        for ax, keep_ax_lst in zip(m["axes"], m["keep_ax_lsts"]):
+            clear_plotables(ax, keep_ax_lst, m["fig"])
+        plt.sca(m["axes"][2])
+
+        m["cbars"] = plot(dom, hour, fields, run, m["axes"], m["transform"])
+
+    # Wait for the last PNG file, so that an error writing it fails this unit
+    # of work
+    _writer.wait()
+
+    t2 = time.perf_counter()
+    t3 = round(t2 - t1, 3)
+    logging.info(("%.3f seconds to plot " + product + " for: " + dom) % t3)
+
+
+def parse_args(argv):
+    """Parse command line arguments"""
     parser = argparse.ArgumentParser()
     parser.add_argument(
         "--cycle",
@@ -297,12 +2495,13 @@ if __name__ == "__main__":
     )
     parser.add_argument(
         "--comout-1",
-        help="Path to directory 1 containing post-processed files.",
+        nargs="+",
+        help="Path to directory 1 containing post-processed files. Several directories can be given to compare each of them to directory 2.",
         required=True,
     )
     parser.add_argument(
         "--comout-2",
-        help="Path to directory 2 containing post-processed files.",
+        help="Path to directory 2 (the baseline) containing post-processed files.",
         required=True,
     )
     parser.add_argument(
@@ -324,28 +2523,66 @@ if __name__ == "__main__":
         help="Name of domains to plot (either 'conus' or 'regional' or both).",
         required=False,
     )
+    parser.add_argument(
+        "--products",
+        nargs="+",
+        choices=list(PRODUCT_FIELDS),
+        default=list(PRODUCT_FIELDS),
+        help="Names of the products to plot (all of them by default). Only the fields of these products are read.",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        help="Path to directory of cached map backgrounds and grid geometry (no cache if not given).",
+        required=False,
+    )
+    parser.add_argument(
+        "--quality",
+        choices=["full", "display"],
+        default="full",
+        help="Plot fields at full grid resolution, or decimated to the resolution of the plots.",
+    )
+    parser.add_argument(
+        "--png-mode",
+        choices=list(PNG_MODES),
+        default="rgb",
+        help="Save plots as RGB PNG files, or as smaller PNG files with a palette of 256 colors.",
+    )
+    parser.add_argument(
+        "--nprocs",
+        "-n",
+        type=int,
+        default=1,
+        help="Number of plotting processes.",
+    )
     parser.add_argument(
         "--debug",
         action="store_true",
         help="Print debug messages",
     )
-    args = parser.parse_args()
-    
-    setup_logging(args.debug)
+    return parser.parse_args(argv)
 
-    # Throw away python warnings (mostly depreciation.)
-    warnings.simplefilter("ignore")
+
+def main(argv):
+    """Plot the differences of the products asked for for all forecast
+    hours and domains, in parallel if more than one process is asked for."""
+    args = parse_args(argv)
 
     # Read date/time, forecast hour, and directory paths from command line
-    ymdh = str(args.cycle)
-    ymd = ymdh[0:8]
-    year = int(ymdh[0:4])
-    month = int(ymdh[4:6])
-    day = int(ymdh[6:8])
-    hour = int(ymdh[8:10])
-    cyc = str(hour).zfill(2)
-    logging.info(f"{year}, {month}, {day}, {hour}")
-    
+    settings = {
+        "cycle": str(args.cycle),
+        "comout_1": [str(comout) for comout in args.comout_1],
+        "comout_2": str(args.comout_2),
+        "cartopy_dir": str(args.cartopy_dir),
+        "domain": str(args.domain).lower(),
+        "cache_dir": args.cache_dir,
+        "quality": args.quality,
+        "png_mode": args.png_mode,
+        "products": args.products,
+    }
+    init_worker(settings, args.debug)
+    ymdh = settings["cycle"]
+    logging.info(f"{ymdh[0:4]}, {ymdh[4:6]}, {ymdh[6:8]}, {ymdh[8:10]}")
+
     # Define the range of forecast hours to create plots for
     start_fhr = int(args.start)
     end_fhr = int(args.end)
@@ -356,2049 +2593,46 @@ if __name__ == "__main__":
         num = int(((end_fhr - start_fhr) / increment_fhr) + 1)
         fhours = np.linspace(start_fhr, end_fhr, num, dtype="int")
     logging.info(fhours)
-    
-    COMOUT_1 = str(args.comout_1)
-    COMOUT_2 = str(args.comout_2)
-    CARTOPY_DIR = str(args.cartopy_dir)
-    POST_OUTPUT_DOMAIN_NAME = str(args.domain).lower()
-    
-    # Loop over forecast hours
-    for fhr in fhours:
-        fhour = str(fhr).zfill(3)
-        logging.info("Working on forecast hour " + fhour)
-        itime = ymdh
-        vtime = ndate(itime, int(fhr))
-    
-        # Define the location of the input files
-        data1 = pygrib.open(
-            COMOUT_1
-            + "/rrfs.t"
-            + cyc
-            + "z.prslev.f"
-            + fhour
-            + "."
-            + POST_OUTPUT_DOMAIN_NAME
-            + ".grib2"
-        )
-        data2 = pygrib.open(
-            COMOUT_2
-            + "/rrfs.t"
-            + cyc
-            + "z.prslev.f"
-            + fhour
-            + "."
-            + POST_OUTPUT_DOMAIN_NAME
-            + ".grib2"
-        )
-    
-        # Get the lats and lons
-        grids = [data1, data2]
-        lats = []
-        lons = []
-        lats_shift = []
-        lons_shift = []
-    
-        for data in grids:
-            # Unshifted grid for contours and wind barbs
-            lat, lon = data[1].latlons()
-            lats.append(lat)
-            lons.append(lon)
-    
-            # Shift grid for pcolormesh
-            lat1 = data[1]["latitudeOfFirstGridPointInDegrees"]
-            lon1 = data[1]["longitudeOfFirstGridPointInDegrees"]
-            try:
-                nx = data[1]["Nx"]
-                ny = data[1]["Ny"]
-            except:
-                nx = data[1]["Ni"]
-                ny = data[1]["Nj"]
-            dx = data[1]["DxInMetres"]
-            dy = data[1]["DyInMetres"]
-            pj = pyproj.Proj(data[1].projparams)
-            llcrnrx, llcrnry = pj(lon1, lat1)
-            llcrnrx = llcrnrx - (dx / 2.0)
-            llcrnry = llcrnry - (dy / 2.0)
-            x = llcrnrx + dx * np.arange(nx)
-            y = llcrnry + dy * np.arange(ny)
-            x, y = np.meshgrid(x, y)
-            lon, lat = pj(x, y, inverse=True)
-            lats_shift.append(lat)
-            lons_shift.append(lon)
-    
-        # Unshifted lat/lon arrays grabbed directly using latlons() method
-        lat = lats[0]
-        lon = lons[0]
-        lat2 = lats[1]
-        lon2 = lons[1]
-    
-        # Shifted lat/lon arrays for pcolormesh
-        lat_shift = lats_shift[0]
-        lon_shift = lons_shift[0]
-        lat2_shift = lats_shift[1]
-        lon2_shift = lons_shift[1]
-    
-        Lat0 = data1[1]["LaDInDegrees"]
-        Lon0 = data1[1]["LoVInDegrees"]
-        logging.info(Lat0)
-        logging.info(Lon0)
-    
-        # Specify plotting domains
-        # User can add domains here, just need to specify lat/lon information below
-        # (if dom == 'conus' block)
-        domains = args.plot_domains  # Other option is 'regional'
-    
-        ###################################################
-        # Read in all variables and calculate differences #
-        ###################################################
-        t1a = time.perf_counter()
-    
-        # Sea level pressure
-        slp_1 = data1.select(name="Pressure reduced to MSL")[0].values * 0.01
-        slpsmooth_1 = ndimage.gaussian_filter(slp_1, 13.78)
-        slp_2 = data2.select(name="Pressure reduced to MSL")[0].values * 0.01
-        slpsmooth_2 = ndimage.gaussian_filter(slp_2, 13.78)
-        slp_diff = slp_2 - slp_1
-    
-        # 2-m temperature
-        tmp2m_1 = data1.select(name="2 metre temperature")[0].values
-        tmp2m_1 = (tmp2m_1 - 273.15) * 1.8 + 32.0
-        tmp2m_2 = data2.select(name="2 metre temperature")[0].values
-        tmp2m_2 = (tmp2m_2 - 273.15) * 1.8 + 32.0
-        tmp2m_diff = tmp2m_2 - tmp2m_1
-    
-        # 2-m dew point temperature
-        dew2m_1 = data1.select(name="2 metre dewpoint temperature")[0].values
-        dew2m_1 = (dew2m_1 - 273.15) * 1.8 + 32.0
-        dew2m_2 = data2.select(name="2 metre dewpoint temperature")[0].values
-        dew2m_2 = (dew2m_2 - 273.15) * 1.8 + 32.0
-        dew2m_diff = dew2m_2 - dew2m_1
-    
-        # 10-m wind speed
-        uwind_1 = data1.select(name="10 metre U wind component")[0].values * 1.94384
-        vwind_1 = data1.select(name="10 metre V wind component")[0].values * 1.94384
-        uwind_2 = data2.select(name="10 metre U wind component")[0].values * 1.94384
-        vwind_2 = data2.select(name="10 metre V wind component")[0].values * 1.94384
-        # Rotate winds from grid relative to Earth relative
-        uwind_1, vwind_1 = rotate_wind(
-            Lat0, Lon0, lon, uwind_1, vwind_1, "lcc", inverse=False
-        )
-        uwind_2, vwind_2 = rotate_wind(
-            Lat0, Lon0, lon2, uwind_2, vwind_2, "lcc", inverse=False
-        )
-        wspd10m_1 = np.sqrt(uwind_1**2 + vwind_1**2)
-        wspd10m_2 = np.sqrt(uwind_2**2 + vwind_2**2)
-        wspd10m_diff = wspd10m_2 - wspd10m_1
-    
-        # Surface-based CAPE
-        cape_1 = data1.select(
-            name="Convective available potential energy", typeOfLevel="surface"
-        )[0].values
-        cape_2 = data2.select(
-            name="Convective available potential energy", typeOfLevel="surface"
-        )[0].values
-        cape_diff = cape_2 - cape_1
-    
-        # Surface-based CIN
-        cin_1 = data1.select(name="Convective inhibition", typeOfLevel="surface")[0].values
-        cin_2 = data2.select(name="Convective inhibition", typeOfLevel="surface")[0].values
-        cin_diff = cin_2 - cin_1
-    
-        # 500 mb height, wind, vorticity
-        try:
-            z500_1 = data1.select(name="Geopotential Height", level=500)[0].values * 0.1
-            z500_1 = ndimage.gaussian_filter(z500_1, 6.89)
-            z500_2 = data2.select(name="Geopotential Height", level=500)[0].values * 0.1
-            z500_2 = ndimage.filters.gaussian_filter(z500_2, 6.89)
-            z500_diff = z500_2 - z500_1
-            vort500_1 = data1.select(name="Absolute vorticity", level=500)[0].values * 100000
-            vort500_1 = ndimage.filters.gaussian_filter(vort500_1, 1.7225)
-            vort500_1[vort500_1 > 1000] = 0  # Mask out undefined values on domain edge
-            vort500_2 = data2.select(name="Absolute vorticity", level=500)[0].values * 100000
-            vort500_2 = ndimage.filters.gaussian_filter(vort500_2, 1.7225)
-            vort500_2[vort500_2 > 1000] = 0  # Mask out undefined values on domain edge
-            u500_1 = data1.select(name="U component of wind", level=500)[0].values * 1.94384
-            u500_2 = data2.select(name="U component of wind", level=500)[0].values * 1.94384
-            v500_1 = data1.select(name="V component of wind", level=500)[0].values * 1.94384
-            v500_2 = data2.select(name="V component of wind", level=500)[0].values * 1.94384
-            # Rotate winds from grid relative to Earth relative
-            u500_1, v500_1 = rotate_wind(Lat0, Lon0, lon, u500_1, v500_1, "lcc", inverse=False)
-            u500_2, v500_2 = rotate_wind(Lat0, Lon0, lon2, u500_2, v500_2, "lcc", inverse=False)
-        except:
-            u500_1 = None
-            u500_2 = None
-    
-        # 250 mb winds
-        u250_1 = data1.select(name="U component of wind", level=250)[0].values * 1.94384
-        u250_2 = data2.select(name="U component of wind", level=250)[0].values * 1.94384
-        v250_1 = data1.select(name="V component of wind", level=250)[0].values * 1.94384
-        v250_2 = data2.select(name="V component of wind", level=250)[0].values * 1.94384
-        # Rotate winds from grid relative to Earth relative
-        u250_1, v250_1 = rotate_wind(Lat0, Lon0, lon, u250_1, v250_1, "lcc", inverse=False)
-        u250_2, v250_2 = rotate_wind(Lat0, Lon0, lon2, u250_2, v250_2, "lcc", inverse=False)
-        wspd250_1 = np.sqrt(u250_1**2 + v250_1**2)
-        wspd250_2 = np.sqrt(u250_2**2 + v250_2**2)
-        wspd250_diff = wspd250_2 - wspd250_1
-    
-        # Total precipitation
-        qpf_1 = (
-            data1.select(name="Total Precipitation", lengthOfTimeRange=fhr)[0].values
-            * 0.0393701
-        )
-        qpf_2 = (
-            data2.select(name="Total Precipitation", lengthOfTimeRange=fhr)[0].values
-            * 0.0393701
-        )
-        qpf_diff = qpf_2 - qpf_1
-    
-        # Composite reflectivity
-        refc_1 = data1.select(name="Maximum/Composite radar reflectivity")[0].values
-        refc_2 = data2.select(name="Maximum/Composite radar reflectivity")[0].values
-    
-        if fhr > 0:
-            # Max/Min Hourly 2-5 km Updraft Helicity
-            maxuh25_1 = data1.select(
-                stepType="max", parameterName="199", topLevel=5000, bottomLevel=2000
-            )[0].values
-            maxuh25_2 = data2.select(
-                stepType="max", parameterName="199", topLevel=5000, bottomLevel=2000
-            )[0].values
-            minuh25_1 = data1.select(
-                stepType="min", parameterName="200", topLevel=5000, bottomLevel=2000
-            )[0].values
-            minuh25_2 = data2.select(
-                stepType="min", parameterName="200", topLevel=5000, bottomLevel=2000
-            )[0].values
-            maxuh25_1[maxuh25_1 < 10] = 0
-            maxuh25_2[maxuh25_2 < 10] = 0
-            minuh25_1[minuh25_1 > -10] = 0
-            minuh25_2[minuh25_2 > -10] = 0
-            uh25_1 = maxuh25_1 + minuh25_1
-            uh25_2 = maxuh25_2 + minuh25_2
-            uh25_diff = uh25_2 - uh25_1
-    
-        t2a = time.perf_counter()
-        t3a = round(t2a - t1a, 3)
-        logging.info(("%.3f seconds to read all messages") % t3a)
-    
-        ########################################
-        #    START PLOTTING FOR EACH DOMAIN    #
-        ########################################
-    
-        def main():
-    
-            # Number of processes must coincide with the number of domains to plot
-            # pool = multiprocessing.Pool(len(domains))
-            # pool.map(plot_all,domains)
-    
-            # To avoid import multiprocessing recursively on MacOS/Windows etc.
-            # Anyway since we only have one domain for SRW application
-            for dom in domains:
-                plot_all(dom)
-    
-        def plot_all(dom):
-    
-            t1dom = time.perf_counter()
-    
-            # Map corners for each domain
-            if dom == "conus":
-                llcrnrlon = -120.5
-                llcrnrlat = 21.0
-                urcrnrlon = -64.5
-                urcrnrlat = 49.0
-                lat_0 = 35.4
-                lon_0 = -97.6
-                extent = [llcrnrlon - 3, urcrnrlon - 6, llcrnrlat - 1, urcrnrlat + 2]
-            elif dom == "regional":
-                llcrnrlon = np.min(lon)
-                llcrnrlat = np.min(lat)
-                urcrnrlon = np.max(lon)
-                urcrnrlat = np.max(lat)
-                lat_0 = Lat0
-                lon_0 = Lon0
-                extent = [llcrnrlon, urcrnrlon, llcrnrlat - 1, urcrnrlat]
-    
-            # create figure and axes instances
-            fig = plt.figure(figsize=(10, 10))
-            gs = GridSpec(9, 9, wspace=0.0, hspace=0.0)
-    
-            # Define where Cartopy Maps are located
-            cartopy.config["data_dir"] = CARTOPY_DIR
-    
-            back_res = "50m"
-            back_img = "on"
-    
-            # set up the map background with cartopy
-            myproj = ccrs.LambertConformal(
-                central_longitude=lon_0,
-                central_latitude=lat_0,
-                false_easting=0.0,
-                false_northing=0.0,
-                secant_latitudes=None,
-                standard_parallels=None,
-                globe=None,
-            )
-            ax1 = fig.add_subplot(gs[0:4, 0:4], projection=myproj)
-            ax2 = fig.add_subplot(gs[0:4, 5:], projection=myproj)
-            ax3 = fig.add_subplot(gs[5:, 1:8], projection=myproj)
-            ax1.set_extent(extent)
-            ax2.set_extent(extent)
-            ax3.set_extent(extent)
-    
-            fline_wd = 0.5  # line width
-            falpha = 0.3  # transparency
-    
-            # natural_earth
-            #    land=cfeature.NaturalEarthFeature('physical','land',back_res,
-            #                      edgecolor='face',facecolor=cfeature.COLORS['land'],
-            #                      alpha=falpha)
-            lakes = cfeature.NaturalEarthFeature(
-                "physical",
-                "lakes",
-                back_res,
-                edgecolor="blue",
-                facecolor="none",
-                linewidth=fline_wd,
-                alpha=falpha,
-            )
-            coastline = cfeature.NaturalEarthFeature(
-                "physical",
-                "coastline",
-                back_res,
-                edgecolor="blue",
-                facecolor="none",
-                linewidth=fline_wd,
-                alpha=falpha,
-            )
-            states = cfeature.NaturalEarthFeature(
-                "cultural",
-                "admin_1_states_provinces",
-                back_res,
-                edgecolor="black",
-                facecolor="none",
-                linewidth=fline_wd,
-                linestyle=":",
-                alpha=falpha,
-            )
-            borders = cfeature.NaturalEarthFeature(
-                "cultural",
-                "admin_0_countries",
-                back_res,
-                edgecolor="red",
-                facecolor="none",
-                linewidth=fline_wd,
-                alpha=falpha,
-            )
-    
-            # All lat lons are earth relative, so setup the associated projection correct for that data
-            transform = ccrs.PlateCarree()
-    
-            # high-resolution background images
-            if back_img == "on":
-                img = plt.imread(CARTOPY_DIR + "/raster_files/NE1_50M_SR_W.tif")
-                ax1.imshow(img, origin="upper", transform=transform)
-                ax2.imshow(img, origin="upper", transform=transform)
-                ax3.imshow(img, origin="upper", transform=transform)
-    
-            #  ax.add_feature(land)
-            ax1.add_feature(lakes)
-            ax1.add_feature(states)
-            ax1.add_feature(borders)
-            ax1.add_feature(coastline)
-            ax2.add_feature(lakes)
-            ax2.add_feature(states)
-            ax2.add_feature(borders)
-            ax2.add_feature(coastline)
-            ax3.add_feature(lakes)
-            ax3.add_feature(states)
-            ax3.add_feature(borders)
-            ax3.add_feature(coastline)
-    
-            # Map/figure has been set up here, save axes instances for use again later
-            keep_ax_lst_1 = ax1.get_children()[:]
-            keep_ax_lst_2 = ax2.get_children()[:]
-            keep_ax_lst_3 = ax3.get_children()[:]
-    
-            # colors for difference plots, only need to define once
-            diffcolors = [
-                "blue",
-                "#1874CD",
-                "dodgerblue",
-                "deepskyblue",
-                "turquoise",
-                "white",
-                "white",
-                "#EEEE00",
-                "#EEC900",
-                "darkorange",
-                "orangered",
-                "red",
-            ]
-    
-            ################################
-            # Plot SLP
-            ################################
-            t1 = time.perf_counter()
-            logging.info(("Working on slp for " + dom))
-    
-            units = "mb"
-            clevs = [
-                976,
-                980,
-                984,
-                988,
-                992,
-                996,
-                1000,
-                1004,
-                1008,
-                1012,
-                1016,
-                1020,
-                1024,
-                1028,
-                1032,
-                1036,
-                1040,
-                1044,
-                1048,
-                1052,
-            ]
-            clevsdiff = [-12, -10, -8, -6, -4, -2, 0, 2, 4, 6, 8, 10, 12]
-            cm = plt.cm.Spectral_r
-            cmdiff = matplotlib.colors.ListedColormap(diffcolors)
-            norm = matplotlib.colors.BoundaryNorm(clevs, cm.N)
-            normdiff = matplotlib.colors.BoundaryNorm(clevsdiff, cmdiff.N)
-    
-            cs1_a = ax1.pcolormesh(
-                lon_shift, lat_shift, slp_1, transform=transform, cmap=cm, norm=norm
-            )
-            cbar1 = plt.colorbar(
-                cs1_a, ax=ax1, orientation="horizontal", pad=0.05, shrink=0.6, extend="both"
-            )
-            cbar1.set_label(units, fontsize=6)
-            cbar1.ax.tick_params(labelsize=5)
-            cs1_b = ax1.contour(
-                lon_shift,
-                lat_shift,
-                slpsmooth_1,
-                np.arange(940, 1060, 4),
-                colors="black",
-                linewidths=1.25,
-                transform=transform,
-            )
-            plt.clabel(cs1_b, np.arange(940, 1060, 4), inline=1, fmt="%d", fontsize=6)
-            ax1.text(
-                0.5,
-                1.03,
-                "FV3-LAM SLP ("
-                + units
-                + ") \n initialized: "
-                + itime
-                + " valid: "
-                + vtime
-                + " (f"
-                + fhour
-                + ")",
-                horizontalalignment="center",
-                fontsize=8,
-                transform=ax1.transAxes,
-                bbox=dict(facecolor="white", alpha=0.85, boxstyle="square,pad=0.2"),
-            )
-    
-            cs2_a = ax2.pcolormesh(
-                lon2_shift, lat2_shift, slp_2, transform=transform, cmap=cm, norm=norm
-            )
-            cbar2 = plt.colorbar(
-                cs2_a, ax=ax2, orientation="horizontal", pad=0.05, shrink=0.6, extend="both"
-            )
-            cbar2.set_label(units, fontsize=6)
-            cbar2.ax.tick_params(labelsize=5)
-            cs2_b = ax2.contour(
-                lon2_shift,
-                lat2_shift,
-                slpsmooth_2,
-                np.arange(940, 1060, 4),
-                colors="black",
-                linewidths=1.25,
-                transform=transform,
-            )
-            plt.clabel(cs2_b, np.arange(940, 1060, 4), inline=1, fmt="%d", fontsize=6)
-            ax2.text(
-                0.5,
-                1.03,
-                "FV3-LAM-2 SLP ("
-                + units
-                + ") \n initialized: "
-                + itime
-                + " valid: "
-                + vtime
-                + " (f"
-                + fhour
-                + ")",
-                horizontalalignment="center",
-                fontsize=8,
-                transform=ax2.transAxes,
-                bbox=dict(facecolor="white", alpha=0.85, boxstyle="square,pad=0.2"),
-            )
-    
-            cs = ax3.pcolormesh(
-                lon2_shift,
-                lat2_shift,
-                slp_diff,
-                transform=transform,
-                cmap=cmdiff,
-                norm=normdiff,
-            )
-            cs.cmap.set_under("darkblue")
-            cs.cmap.set_over("darkred")
-            cbar3 = plt.colorbar(
-                cs, ax=ax3, orientation="horizontal", pad=0.05, shrink=0.6, extend="both"
-            )
-            cbar3.set_label(units, fontsize=6)
-            cbar3.ax.tick_params(labelsize=5)
-            ax3.text(
-                0.5,
-                1.03,
-                "FV3-LAM-2 - FV3-LAM SLP ("
-                + units
-                + ") \n initialized: "
-                + itime
-                + " valid: "
-                + vtime
-                + " (f"
-                + fhour
-                + ")",
-                horizontalalignment="center",
-                fontsize=6,
-                transform=ax3.transAxes,
-                bbox=dict(facecolor="white", alpha=0.85, boxstyle="square,pad=0.2"),
-            )
-    
-            compress_and_save(
-                COMOUT_1 + "/slp_diff_" + dom + "_f" + fhour + ".png"
-            )
-            t2 = time.perf_counter()
-            t3 = round(t2 - t1, 3)
-            logging.info(("%.3f seconds to plot slp for: " + dom) % t3)
-    
-            #################################
-            # Plot 2-m T
-            #################################
-            t1 = time.perf_counter()
-            logging.info(("Working on t2m for " + dom))
-    
-            # Clear off old plottables but keep all the map info
-            cbar1.remove()
-            cbar2.remove()
-            cbar3.remove()
-            clear_plotables(ax1, keep_ax_lst_1, fig)
-            clear_plotables(ax2, keep_ax_lst_2, fig)
-            clear_plotables(ax3, keep_ax_lst_3, fig)
-    
-            units = "\xb0" "F"
-            clevs = np.linspace(-16, 134, 51)
-            clevsdiff = [-6, -5, -4, -3, -2, -1, 0, 1, 2, 3, 4, 5, 6]
-            #  cm = plt.cm.Spectral_r
-            cm = cmap_t2m()
-            norm = matplotlib.colors.BoundaryNorm(clevs, cm.N)
-            normdiff = matplotlib.colors.BoundaryNorm(clevsdiff, cmdiff.N)
-    
-            cs_1 = ax1.pcolormesh(
-                lon_shift, lat_shift, tmp2m_1, transform=transform, cmap=cm, norm=norm
-            )
-            cs_1.cmap.set_under("white")
-            cs_1.cmap.set_over("white")
-            cbar1 = plt.colorbar(
-                cs_1,
-                ax=ax1,
-                orientation="horizontal",
-                pad=0.05,
-                shrink=0.6,
-                ticks=[-16, -4, 8, 20, 32, 44, 56, 68, 80, 92, 104, 116, 128],
-                extend="both",
-            )
-            cbar1.set_label(units, fontsize=6)
-            cbar1.ax.tick_params(labelsize=5)
-            ax1.text(
-                0.5,
-                1.03,
-                "FV3-LAM 2-m Temperature ("
-                + units
-                + ") \n initialized: "
-                + itime
-                + " valid: "
-                + vtime
-                + " (f"
-                + fhour
-                + ")",
-                horizontalalignment="center",
-                fontsize=6,
-                transform=ax1.transAxes,
-                bbox=dict(facecolor="white", alpha=0.85, boxstyle="square,pad=0.2"),
-            )
-    
-            cs_2 = ax2.pcolormesh(
-                lon2_shift, lat2_shift, tmp2m_2, transform=transform, cmap=cm, norm=norm
-            )
-            cs_2.cmap.set_under("white")
-            cs_2.cmap.set_over("white")
-            cbar2 = plt.colorbar(
-                cs_2,
-                ax=ax2,
-                orientation="horizontal",
-                pad=0.05,
-                shrink=0.6,
-                ticks=[-16, -4, 8, 20, 32, 44, 56, 68, 80, 92, 104, 116, 128],
-                extend="both",
-            )
-            cbar2.set_label(units, fontsize=6)
-            cbar2.ax.tick_params(labelsize=5)
-            ax2.text(
-                0.5,
-                1.03,
-                "FV3-LAM-2 2-m Temperature ("
-                + units
-                + ") \n initialized: "
-                + itime
-                + " valid: "
-                + vtime
-                + " (f"
-                + fhour
-                + ")",
-                horizontalalignment="center",
-                fontsize=6,
-                transform=ax2.transAxes,
-                bbox=dict(facecolor="white", alpha=0.85, boxstyle="square,pad=0.2"),
-            )
-    
-            cs = ax3.pcolormesh(
-                lon2_shift,
-                lat2_shift,
-                tmp2m_diff,
-                transform=transform,
-                cmap=cmdiff,
-                norm=normdiff,
-            )
-            cs.cmap.set_under("darkblue")
-            cs.cmap.set_over("darkred")
-            cbar3 = plt.colorbar(
-                cs, ax=ax3, orientation="horizontal", pad=0.05, shrink=0.6, extend="both"
-            )
-            cbar3.set_label(units, fontsize=6)
-            cbar3.ax.tick_params(labelsize=6)
-            ax3.text(
-                0.5,
-                1.03,
-                "FV3-LAM-2 - FV3-LAM 2-m Temperature ("
-                + units
-                + ") \n initialized: "
-                + itime
-                + " valid: "
-                + vtime
-                + " (f"
-                + fhour
-                + ")",
-                horizontalalignment="center",
-                fontsize=6,
-                transform=ax3.transAxes,
-                bbox=dict(facecolor="white", alpha=0.85, boxstyle="square,pad=0.2"),
-            )
-    
-            compress_and_save(
-                COMOUT_1 + "/2mt_diff_" + dom + "_f" + fhour + ".png"
-            )
-            t2 = time.perf_counter()
-            t3 = round(t2 - t1, 3)
-            logging.info(("%.3f seconds to plot 2mt for: " + dom) % t3)
-    
-            #################################
-            # Plot 2-m Dew Point
-            #################################
-            t1 = time.perf_counter()
-            logging.info(("Working on 2mdew for " + dom))
-    
-            # Clear off old plottables but keep all the map info
-            cbar1.remove()
-            cbar2.remove()
-            cbar3.remove()
-            clear_plotables(ax1, keep_ax_lst_1, fig)
-            clear_plotables(ax2, keep_ax_lst_2, fig)
-            clear_plotables(ax3, keep_ax_lst_3, fig)
-    
-            units = "\xb0" "F"
-            clevs = np.linspace(-5, 80, 35)
-            clevsdiff = [-12, -10, -8, -6, -4, -2, 0, 2, 4, 6, 8, 10, 12]
-            cm = cmap_q2m()
-            norm = matplotlib.colors.BoundaryNorm(clevs, cm.N)
-            normdiff = matplotlib.colors.BoundaryNorm(clevsdiff, cmdiff.N)
-    
-            cs_1 = ax1.pcolormesh(
-                lon_shift, lat_shift, dew2m_1, transform=transform, cmap=cm, norm=norm
-            )
-            cbar1 = plt.colorbar(
-                cs_1, ax=ax1, orientation="horizontal", pad=0.05, shrink=0.6, extend="both"
-            )
-            cbar1.set_label(units, fontsize=6)
-            cbar1.ax.tick_params(labelsize=6)
-            ax1.text(
-                0.5,
-                1.03,
-                "FV3-LAM 2-m Dew Point Temperature ("
-                + units
-                + ") \n initialized: "
-                + itime
-                + " valid: "
-                + vtime
-                + " (f"
-                + fhour
-                + ")",
-                horizontalalignment="center",
-                fontsize=6,
-                transform=ax1.transAxes,
-                bbox=dict(facecolor="white", alpha=0.85, boxstyle="square,pad=0.2"),
-            )
-    
-            cs_2 = ax2.pcolormesh(
-                lon2_shift, lat2_shift, dew2m_2, transform=transform, cmap=cm, norm=norm
-            )
-            cbar2 = plt.colorbar(
-                cs_2, ax=ax2, orientation="horizontal", pad=0.05, shrink=0.6, extend="both"
-            )
-            cbar2.set_label(units, fontsize=6)
-            cbar2.ax.tick_params(labelsize=6)
-            ax2.text(
-                0.5,
-                1.03,
-                "FV3-LAM-2 2-m Dew Point Temperature ("
-                + units
-                + ") \n initialized: "
-                + itime
-                + " valid: "
-                + vtime
-                + " (f"
-                + fhour
-                + ")",
-                horizontalalignment="center",
-                fontsize=6,
-                transform=ax2.transAxes,
-                bbox=dict(facecolor="white", alpha=0.85, boxstyle="square,pad=0.2"),
-            )
-    
-            cs = ax3.pcolormesh(
-                lon2_shift,
-                lat2_shift,
-                dew2m_diff,
-                transform=transform,
-                cmap=cmdiff,
-                norm=normdiff,
-            )
-            cs.cmap.set_under("darkblue")
-            cs.cmap.set_over("darkred")
-            cbar3 = plt.colorbar(
-                cs, ax=ax3, orientation="horizontal", pad=0.05, shrink=0.6, extend="both"
-            )
-            cbar3.set_label(units, fontsize=6)
-            cbar3.ax.tick_params(labelsize=6)
-            ax3.text(
-                0.5,
-                1.03,
-                "FV3-LAM-2 - FV3-LAM 2-m Dew Point Temperature ("
-                + units
-                + ") \n initialized: "
-                + itime
-                + " valid: "
-                + vtime
-                + " (f"
-                + fhour
-                + ")",
-                horizontalalignment="center",
-                fontsize=6,
-                transform=ax3.transAxes,
-                bbox=dict(facecolor="white", alpha=0.85, boxstyle="square,pad=0.2"),
-            )
-    
-            compress_and_save(
-                COMOUT_1
-                + "/2mdew_diff_"
-                + dom
-                + "_f"
-                + fhour
-                + ".png"
-            )
-            t2 = time.perf_counter()
-            t3 = round(t2 - t1, 3)
-            logging.info(("%.3f seconds to plot 2mdew for: " + dom) % t3)
-    
-            #################################
-            # Plot 10-m WSPD
-            #################################
-            t1 = time.perf_counter()
-            logging.info(("Working on 10mwspd for " + dom))
-    
-            # Clear off old plottables but keep all the map info
-            cbar1.remove()
-            cbar2.remove()
-            cbar3.remove()
-            clear_plotables(ax1, keep_ax_lst_1, fig)
-            clear_plotables(ax2, keep_ax_lst_2, fig)
-            clear_plotables(ax3, keep_ax_lst_3, fig)
-    
-            units = "kts"
-            # Places a wind barb every ~180 km, optimized for CONUS domain
-            skip = round(177.28 * (dx / 1000.0) ** -0.97)
-            logging.info("skipping every " + str(skip) + " grid points to plot")
-            barblength = 4
-    
-            clevs = [5, 10, 15, 20, 25, 30, 35, 40, 45, 50, 55, 60]
-            clevsdiff = [-12, -10, -8, -6, -4, -2, 0, 2, 4, 6, 8, 10, 12]
-            colorlist = [
-                "turquoise",
-                "dodgerblue",
-                "blue",
-                "#FFF68F",
-                "#E3CF57",
-                "peru",
-                "brown",
-                "crimson",
-                "red",
-                "fuchsia",
-                "DarkViolet",
-            ]
-            cm = matplotlib.colors.ListedColormap(colorlist)
-            norm = matplotlib.colors.BoundaryNorm(clevs, cm.N)
-            normdiff = matplotlib.colors.BoundaryNorm(clevsdiff, cmdiff.N)
-    
-            cs_1 = ax1.pcolormesh(
-                lon_shift,
-                lat_shift,
-                wspd10m_1,
-                transform=transform,
-                cmap=cm,
-                vmin=5,
-                norm=norm,
-            )
-            cs_1.cmap.set_under("white", alpha=0.0)
-            cs_1.cmap.set_over("black")
-            cbar1 = plt.colorbar(
-                cs_1,
-                ax=ax1,
-                orientation="horizontal",
-                pad=0.05,
-                shrink=0.6,
-                ticks=clevs,
-                extend="max",
-            )
-            cbar1.set_label(units, fontsize=6)
-            cbar1.ax.tick_params(labelsize=6)
-            ax1.barbs(
-                lon_shift[::skip, ::skip],
-                lat_shift[::skip, ::skip],
-                uwind_1[::skip, ::skip],
-                vwind_1[::skip, ::skip],
-                length=barblength,
-                linewidth=0.5,
-                color="black",
-                transform=transform,
-            )
-            ax1.text(
-                0.5,
-                1.03,
-                "FV3-LAM 10-m Winds ("
-                + units
-                + ") \n initialized: "
-                + itime
-                + " valid: "
-                + vtime
-                + " (f"
-                + fhour
-                + ")",
-                horizontalalignment="center",
-                fontsize=6,
-                transform=ax1.transAxes,
-                bbox=dict(facecolor="white", alpha=0.85, boxstyle="square,pad=0.2"),
-            )
-    
-            cs_2 = ax2.pcolormesh(
-                lon2_shift,
-                lat2_shift,
-                wspd10m_2,
-                transform=transform,
-                cmap=cm,
-                vmin=5,
-                norm=norm,
-            )
-            cs_2.cmap.set_under("white", alpha=0.0)
-            cs_2.cmap.set_over("black")
-            cbar2 = plt.colorbar(
-                cs_2,
-                ax=ax2,
-                orientation="horizontal",
-                pad=0.05,
-                shrink=0.6,
-                ticks=clevs,
-                extend="max",
-            )
-            cbar2.set_label(units, fontsize=6)
-            cbar2.ax.tick_params(labelsize=6)
-            ax2.barbs(
-                lon2_shift[::skip, ::skip],
-                lat2_shift[::skip, ::skip],
-                uwind_2[::skip, ::skip],
-                vwind_2[::skip, ::skip],
-                length=barblength,
-                linewidth=0.5,
-                color="black",
-                transform=transform,
-            )
-            ax2.text(
-                0.5,
-                1.03,
-                "FV3-LAM-2 10-m Winds ("
-                + units
-                + ") \n initialized: "
-                + itime
-                + " valid: "
-                + vtime
-                + " (f"
-                + fhour
-                + ")",
-                horizontalalignment="center",
-                fontsize=6,
-                transform=ax2.transAxes,
-                bbox=dict(facecolor="white", alpha=0.85, boxstyle="square,pad=0.2"),
-            )
-    
-            cs = ax3.pcolormesh(
-                lon2_shift,
-                lat2_shift,
-                wspd10m_diff,
-                transform=transform,
-                cmap=cmdiff,
-                norm=normdiff,
-            )
-            cs.cmap.set_under("darkblue")
-            cs.cmap.set_over("darkred")
-            cbar3 = plt.colorbar(
-                cs, ax=ax3, orientation="horizontal", pad=0.05, shrink=0.6, extend="both"
-            )
-            cbar3.set_label(units, fontsize=6)
-            cbar3.ax.tick_params(labelsize=6)
-            ax3.text(
-                0.5,
-                1.03,
-                "FV3-LAM-2 - FV3-LAM 10-m Winds ("
-                + units
-                + ") \n initialized: "
-                + itime
-                + " valid: "
-                + vtime
-                + " (f"
-                + fhour
-                + ")",
-                horizontalalignment="center",
-                fontsize=6,
-                transform=ax3.transAxes,
-                bbox=dict(facecolor="white", alpha=0.85, boxstyle="square,pad=0.2"),
-            )
-    
-            compress_and_save(
-                COMOUT_1
-                + "/10mwind_diff_"
-                + dom
-                + "_f"
-                + fhour
-                + ".png"
-            )
-            t2 = time.perf_counter()
-            t3 = round(t2 - t1, 3)
-            logging.info(("%.3f seconds to plot 10mwspd for: " + dom) % t3)
-    
-            #################################
-            # Plot Surface-Based CAPE/CIN
-            #################################
-            t1 = time.perf_counter()
-            logging.info(("Working on surface-based CAPE/CIN for " + dom))
-    
-            # Clear off old plottables but keep all the map info
-            cbar1.remove()
-            cbar2.remove()
-            cbar3.remove()
-            clear_plotables(ax1, keep_ax_lst_1, fig)
-            clear_plotables(ax2, keep_ax_lst_2, fig)
-            clear_plotables(ax3, keep_ax_lst_3, fig)
-    
-            units = "J/kg"
-            clevs = [100, 250, 500, 1000, 1500, 2000, 2500, 3000, 3500, 4000, 4500, 5000]
-            clevs2 = [-2000, -500, -250, -100, -25]
-            clevsdiff = [
-                -2000,
-                -1500,
-                -1000,
-                -500,
-                -250,
-                -100,
-                0,
-                100,
-                250,
-                500,
-                1000,
-                1500,
-                2000,
-            ]
-            colorlist = [
-                "blue",
-                "dodgerblue",
-                "cyan",
-                "mediumspringgreen",
-                "#FAFAD2",
-                "#EEEE00",
-                "#EEC900",
-                "darkorange",
-                "crimson",
-                "darkred",
-                "darkviolet",
-            ]
-            cm = matplotlib.colors.ListedColormap(colorlist)
-            norm = matplotlib.colors.BoundaryNorm(clevs, cm.N)
-            normdiff = matplotlib.colors.BoundaryNorm(clevsdiff, cmdiff.N)
-    
-            cs_1 = ax1.pcolormesh(
-                lon_shift,
-                lat_shift,
-                cape_1,
-                transform=transform,
-                cmap=cm,
-                vmin=100,
-                norm=norm,
-            )
-            cs_1.cmap.set_under("white", alpha=0.0)
-            cs_1.cmap.set_over("black")
-            cbar1 = plt.colorbar(
-                cs_1,
-                ax=ax1,
-                orientation="horizontal",
-                pad=0.05,
-                shrink=0.6,
-                ticks=clevs,
-                extend="max",
-            )
-            cbar1.set_label(units, fontsize=6)
-            cbar1.ax.tick_params(labelsize=4)
-            cs_1b = ax1.contourf(
-                lon_shift,
-                lat_shift,
-                cin_1,
-                clevs2,
-                colors="none",
-                hatches=["**", "++", "////", ".."],
-                transform=transform,
-            )
-            ax1.text(
-                0.5,
-                1.05,
-                "FV3-LAM Surface-Based CAPE (shaded) and CIN (hatched) ("
-                + units
-                + ") \n <-500 (*), -500<-250 (+), -250<-100 (/), -100<-25 (.) \n initialized: "
-                + itime
-                + " valid: "
-                + vtime
-                + " (f"
-                + fhour
-                + ")",
-                horizontalalignment="center",
-                fontsize=6,
-                transform=ax1.transAxes,
-                bbox=dict(facecolor="white", alpha=0.85, boxstyle="square,pad=0.2"),
-            )
-    
-            cs_2 = ax2.pcolormesh(
-                lon2_shift,
-                lat2_shift,
-                cape_2,
-                transform=transform,
-                cmap=cm,
-                vmin=100,
-                norm=norm,
-            )
-            cs_2.cmap.set_under("white", alpha=0.0)
-            cs_2.cmap.set_over("black")
-            cbar2 = plt.colorbar(
-                cs_2,
-                ax=ax2,
-                orientation="horizontal",
-                pad=0.05,
-                shrink=0.6,
-                ticks=clevs,
-                extend="max",
-            )
-            cbar2.set_label(units, fontsize=6)
-            cbar2.ax.tick_params(labelsize=4)
-            cs_2b = ax2.contourf(
-                lon2_shift,
-                lat2_shift,
-                cin_2,
-                clevs2,
-                colors="none",
-                hatches=["**", "++", "////", ".."],
-                transform=transform,
-            )
-            ax2.text(
-                0.5,
-                1.05,
-                "FV3-LAM-2 Surface-Based CAPE (shaded) and CIN (hatched) ("
-                + units
-                + ") \n <-500 (*), -500<-250 (+), -250<-100 (/), -100<-25 (.) \n initialized: "
-                + itime
-                + " valid: "
-                + vtime
-                + " (f"
-                + fhour
-                + ")",
-                horizontalalignment="center",
-                fontsize=6,
-                transform=ax2.transAxes,
-                bbox=dict(facecolor="white", alpha=0.85, boxstyle="square,pad=0.2"),
-            )
-    
-            cs = ax3.pcolormesh(
-                lon2_shift,
-                lat2_shift,
-                cape_diff,
-                transform=transform,
-                cmap=cmdiff,
-                norm=normdiff,
-            )
-            cs.cmap.set_under("darkblue")
-            cs.cmap.set_over("darkred")
-            cbar3 = plt.colorbar(
-                cs, ax=ax3, orientation="horizontal", pad=0.05, shrink=0.6, extend="both"
-            )
-            cbar3.set_label(units, fontsize=6)
-            cbar3.ax.tick_params(labelsize=6)
-            ax3.text(
-                0.5,
-                1.03,
-                "FV3-LAM-2 - FV3-LAM Surface-Based CAPE ("
-                + units
-                + ") \n initialized: "
-                + itime
-                + " valid: "
-                + vtime
-                + " (f"
-                + fhour
-                + ")",
-                horizontalalignment="center",
-                fontsize=6,
-                transform=ax3.transAxes,
-                bbox=dict(facecolor="white", alpha=0.85, boxstyle="square,pad=0.2"),
-            )
-    
-            compress_and_save(
-                COMOUT_1
-                + "/sfcape_diff_"
-                + dom
-                + "_f"
-                + fhour
-                + ".png"
-            )
-            t2 = time.perf_counter()
-            t3 = round(t2 - t1, 3)
-            logging.info(("%.3f seconds to plot surface-based CAPE/CIN for: " + dom) % t3)
-    
-            #################################
-            # Plot 500 mb HGT/WIND/VORT
-            #################################
-            if (u500_1 is not None) and (u500_2 is not None):
-                t1 = time.perf_counter()
-                logging.info(("Working on 500 mb Hgt/Wind/Vort for " + dom))
-    
-                # Clear off old plottables but keep all the map info
-                cbar1.remove()
-                cbar2.remove()
-                cbar3.remove()
-                clear_plotables(ax1, keep_ax_lst_1, fig)
-                clear_plotables(ax2, keep_ax_lst_2, fig)
-                clear_plotables(ax3, keep_ax_lst_3, fig)
-    
-                units = "x10${^5}$ s${^{-1}}$"
-                skip = round(177.28 * (dx / 1000.0) ** -0.97)
-                logging.info("skipping every " + str(skip) + " grid points to plot")
-                barblength = 4
-    
-                vortlevs = [16, 20, 24, 28, 32, 36, 40]
-                clevsdiff = [-6, -5, -4, -3, -2, -1, 0, 1, 2, 3, 4, 5, 6]
-                colorlist = ["yellow", "gold", "goldenrod", "orange", "orangered", "red"]
-                cm = matplotlib.colors.ListedColormap(colorlist)
-                norm = matplotlib.colors.BoundaryNorm(vortlevs, cm.N)
-                normdiff = matplotlib.colors.BoundaryNorm(clevsdiff, cmdiff.N)
-    
-                cs1_a = ax1.pcolormesh(
-                    lon_shift, lat_shift, vort500_1, transform=transform, cmap=cm, norm=norm
-                )
-                cs1_a.cmap.set_under("white")
-                cs1_a.cmap.set_over("darkred")
-                cbar1 = plt.colorbar(
-                    cs1_a,
-                    ax=ax1,
-                    orientation="horizontal",
-                    pad=0.05,
-                    shrink=0.6,
-                    ticks=vortlevs,
-                    extend="both",
-                )
-                cbar1.set_label(units, fontsize=6)
-                cbar1.ax.tick_params(labelsize=6)
-                ax1.barbs(
-                    lon_shift[::skip, ::skip],
-                    lat_shift[::skip, ::skip],
-                    u500_1[::skip, ::skip],
-                    v500_1[::skip, ::skip],
-                    length=barblength,
-                    linewidth=0.5,
-                    color="steelblue",
-                    transform=transform,
-                )
-                cs1_b = ax1.contour(
-                    lon_shift,
-                    lat_shift,
-                    z500_1,
-                    np.arange(486, 600, 6),
-                    colors="black",
-                    linewidths=1,
-                    transform=transform,
-                )
-                plt.clabel(
-                    cs1_b, np.arange(486, 600, 6), inline_spacing=1, fmt="%d", fontsize=8
-                )
-                ax1.text(
-                    0.5,
-                    1.03,
-                    "FV3-LAM 500 mb Heights (dam), Winds (kts), and $\zeta$ ("
-                    + units
-                    + ") \n initialized: "
-                    + itime
-                    + " valid: "
-                    + vtime
-                    + " (f"
-                    + fhour
-                    + ")",
-                    horizontalalignment="center",
-                    fontsize=8,
-                    transform=ax1.transAxes,
-                    bbox=dict(facecolor="white", alpha=0.85, boxstyle="square,pad=0.2"),
-                )
-    
-                cs2_a = ax2.pcolormesh(
-                    lon2_shift, lat2_shift, vort500_2, transform=transform, cmap=cm, norm=norm
-                )
-                cs2_a.cmap.set_under("white")
-                cs2_a.cmap.set_over("darkred")
-                cbar2 = plt.colorbar(
-                    cs2_a,
-                    ax=ax2,
-                    orientation="horizontal",
-                    pad=0.05,
-                    shrink=0.6,
-                    ticks=vortlevs,
-                    extend="both",
-                )
-                cbar2.set_label(units, fontsize=6)
-                cbar2.ax.tick_params(labelsize=6)
-                ax2.barbs(
-                    lon2_shift[::skip, ::skip],
-                    lat2_shift[::skip, ::skip],
-                    u500_2[::skip, ::skip],
-                    v500_2[::skip, ::skip],
-                    length=barblength,
-                    linewidth=0.5,
-                    color="steelblue",
-                    transform=transform,
-                )
-                cs2_b = ax2.contour(
-                    lon2_shift,
-                    lat2_shift,
-                    z500_2,
-                    np.arange(486, 600, 6),
-                    colors="black",
-                    linewidths=1,
-                    transform=transform,
-                )
-                plt.clabel(
-                    cs2_b, np.arange(486, 600, 6), inline_spacing=1, fmt="%d", fontsize=8
-                )
-                ax2.text(
-                    0.5,
-                    1.03,
-                    "FV3-LAM-2 500 mb Heights (dam), Winds (kts), and $\zeta$ ("
-                    + units
-                    + ") \n initialized: "
-                    + itime
-                    + " valid: "
-                    + vtime
-                    + " (f"
-                    + fhour
-                    + ")",
-                    horizontalalignment="center",
-                    fontsize=8,
-                    transform=ax2.transAxes,
-                    bbox=dict(facecolor="white", alpha=0.85, boxstyle="square,pad=0.2"),
-                )
-    
-                cs = ax3.pcolormesh(
-                    lon2_shift,
-                    lat2_shift,
-                    z500_diff,
-                    transform=transform,
-                    cmap=cmdiff,
-                    norm=normdiff,
-                )
-                cs.cmap.set_under("darkblue")
-                cs.cmap.set_over("darkred")
-                cbar3 = plt.colorbar(
-                    cs, ax=ax3, orientation="horizontal", pad=0.05, shrink=0.6, extend="both"
-                )
-                cbar3.set_label(units, fontsize=6)
-                cbar3.ax.tick_params(labelsize=6)
-                ax3.text(
-                    0.5,
-                    1.03,
-                    "FV3-LAM-2 - FV3-LAM 500-mb Heights (dam) \n initialized: "
-                    + itime
-                    + " valid: "
-                    + vtime
-                    + " (f"
-                    + fhour
-                    + ")",
-                    horizontalalignment="center",
-                    fontsize=6,
-                    transform=ax3.transAxes,
-                    bbox=dict(facecolor="white", alpha=0.85, boxstyle="square,pad=0.2"),
-                )
-    
-                compress_and_save(
-                    COMOUT_1 + "/500_diff_" + dom + "_f" + fhour + ".png"
-                )
-                t2 = time.perf_counter()
-                t3 = round(t2 - t1, 3)
-                logging.info(("%.3f seconds to plot 500 mb Hgt/Wind/Vort for: " + dom) % t3)
-    
-            #################################
-            # Plot 250 mb WIND
-            #################################
-            t1 = time.perf_counter()
-            logging.info(("Working on 250 mb WIND for " + dom))
-    
-            # Clear off old plottables but keep all the map info
-            cbar1.remove()
-            cbar2.remove()
-            cbar3.remove()
-            clear_plotables(ax1, keep_ax_lst_1, fig)
-            clear_plotables(ax2, keep_ax_lst_2, fig)
-            clear_plotables(ax3, keep_ax_lst_3, fig)
-    
-            units = "kts"
-            skip = round(177.28 * (dx / 1000.0) ** -0.97)
-            logging.info("skipping every " + str(skip) + " grid points to plot")
-            barblength = 4
-    
-            clevs = [50, 60, 70, 80, 90, 100, 110, 120, 130, 140, 150]
-            clevsdiff = [-30, -25, -20, -15, -10, -5, 0, 5, 10, 15, 20, 25, 30]
-            colorlist = [
-                "turquoise",
-                "deepskyblue",
-                "dodgerblue",
-                "#1874CD",
-                "blue",
-                "beige",
-                "khaki",
-                "peru",
-                "brown",
-                "crimson",
-            ]
-            cm = matplotlib.colors.ListedColormap(colorlist)
-            norm = matplotlib.colors.BoundaryNorm(clevs, cm.N)
-            normdiff = matplotlib.colors.BoundaryNorm(clevsdiff, cmdiff.N)
-    
-            cs_1 = ax1.pcolormesh(
-                lon_shift,
-                lat_shift,
-                wspd250_1,
-                transform=transform,
-                cmap=cm,
-                vmin=50,
-                norm=norm,
-            )
-            cs_1.cmap.set_under("white", alpha=0.0)
-            cs_1.cmap.set_over("red")
-            cbar1 = plt.colorbar(
-                cs_1,
-                ax=ax1,
-                orientation="horizontal",
-                pad=0.05,
-                shrink=0.6,
-                ticks=clevs,
-                extend="max",
-            )
-            cbar1.set_label(units, fontsize=6)
-            cbar1.ax.tick_params(labelsize=6)
-            ax1.barbs(
-                lon_shift[::skip, ::skip],
-                lat_shift[::skip, ::skip],
-                u250_1[::skip, ::skip],
-                v250_1[::skip, ::skip],
-                length=barblength,
-                linewidth=0.5,
-                color="black",
-                transform=transform,
-            )
-            ax1.text(
-                0.5,
-                1.03,
-                "FV3-LAM 250 mb Winds ("
-                + units
-                + ") \n initialized: "
-                + itime
-                + " valid: "
-                + vtime
-                + " (f"
-                + fhour
-                + ")",
-                horizontalalignment="center",
-                fontsize=6,
-                transform=ax1.transAxes,
-                bbox=dict(facecolor="white", alpha=0.85, boxstyle="square,pad=0.2"),
-            )
-    
-            cs_2 = ax2.pcolormesh(
-                lon2_shift,
-                lat2_shift,
-                wspd250_2,
-                transform=transform,
-                cmap=cm,
-                vmin=50,
-                norm=norm,
-            )
-            cs_2.cmap.set_under("white", alpha=0.0)
-            cs_2.cmap.set_over("red")
-            cbar2 = plt.colorbar(
-                cs_2,
-                ax=ax2,
-                orientation="horizontal",
-                pad=0.05,
-                shrink=0.6,
-                ticks=clevs,
-                extend="max",
-            )
-            cbar2.set_label(units, fontsize=6)
-            cbar2.ax.tick_params(labelsize=6)
-            ax2.barbs(
-                lon2_shift[::skip, ::skip],
-                lat2_shift[::skip, ::skip],
-                u250_2[::skip, ::skip],
-                v250_2[::skip, ::skip],
-                length=barblength,
-                linewidth=0.5,
-                color="black",
-                transform=transform,
-            )
-            ax2.text(
-                0.5,
-                1.03,
-                "FV3-LAM-2 250 mb Winds ("
-                + units
-                + ") \n initialized: "
-                + itime
-                + " valid: "
-                + vtime
-                + " (f"
-                + fhour
-                + ")",
-                horizontalalignment="center",
-                fontsize=6,
-                transform=ax2.transAxes,
-                bbox=dict(facecolor="white", alpha=0.85, boxstyle="square,pad=0.2"),
-            )
-    
-            cs = ax3.pcolormesh(
-                lon2_shift,
-                lat2_shift,
-                wspd250_diff,
-                transform=transform,
-                cmap=cmdiff,
-                norm=normdiff,
-            )
-            cs.cmap.set_under("darkblue")
-            cs.cmap.set_over("darkred")
-            cbar3 = plt.colorbar(
-                cs, ax=ax3, orientation="horizontal", pad=0.05, shrink=0.6, extend="both"
-            )
-            cbar3.set_label(units, fontsize=6)
-            cbar3.ax.tick_params(labelsize=6)
-            ax3.text(
-                0.5,
-                1.03,
-                "FV3-LAM-2 - FV3-LAM 250-mb Winds ("
-                + units
-                + ") \n initialized: "
-                + itime
-                + " valid: "
-                + vtime
-                + " (f"
-                + fhour
-                + ")",
-                horizontalalignment="center",
-                fontsize=6,
-                transform=ax3.transAxes,
-                bbox=dict(facecolor="white", alpha=0.85, boxstyle="square,pad=0.2"),
-            )
-    
-            compress_and_save(
-                COMOUT_1
-                + "/250wind_diff_"
-                + dom
-                + "_f"
-                + fhour
-                + ".png"
-            )
-            t2 = time.perf_counter()
-            t3 = round(t2 - t1, 3)
-            logging.info(("%.3f seconds to plot 250 mb WIND for: " + dom) % t3)
-    
-            #################################
-            # Plot Total QPF
-            #################################
-            if fhr > 0:  # Do not make total QPF plot for forecast hour 0
-                t1 = time.perf_counter()
-                logging.info(("Working on total qpf for " + dom))
-    
-                # Clear off old plottables but keep all the map info
-                cbar1.remove()
-                cbar2.remove()
-                cbar3.remove()
-                clear_plotables(ax1, keep_ax_lst_1, fig)
-                clear_plotables(ax2, keep_ax_lst_2, fig)
-                clear_plotables(ax3, keep_ax_lst_3, fig)
-    
-                units = "in"
-                clevs = [
-                    0.01,
-                    0.1,
-                    0.25,
-                    0.5,
-                    0.75,
-                    1,
-                    1.25,
-                    1.5,
-                    1.75,
-                    2,
-                    2.5,
-                    3,
-                    4,
-                    5,
-                    7,
-                    10,
-                    15,
-                    20,
-                ]
-                clevsdiff = [-3, -2.5, -2, -1.5, -1, -0.5, 0, 0.5, 1, 1.5, 2, 2.5, 3]
-                colorlist = [
-                    "chartreuse",
-                    "limegreen",
-                    "green",
-                    "blue",
-                    "dodgerblue",
-                    "deepskyblue",
-                    "cyan",
-                    "mediumpurple",
-                    "mediumorchid",
-                    "darkmagenta",
-                    "darkred",
-                    "crimson",
-                    "orangered",
-                    "darkorange",
-                    "goldenrod",
-                    "gold",
-                    "yellow",
-                ]
-                cm = matplotlib.colors.ListedColormap(colorlist)
-                norm = matplotlib.colors.BoundaryNorm(clevs, cm.N)
-                normdiff = matplotlib.colors.BoundaryNorm(clevsdiff, cmdiff.N)
-    
-                cs_1 = ax1.pcolormesh(
-                    lon_shift,
-                    lat_shift,
-                    qpf_1,
-                    transform=transform,
-                    cmap=cm,
-                    vmin=0.01,
-                    norm=norm,
-                )
-                cs_1.cmap.set_under("white", alpha=0.0)
-                cs_1.cmap.set_over("pink")
-                cbar1 = plt.colorbar(
-                    cs_1,
-                    ax=ax1,
-                    orientation="horizontal",
-                    pad=0.05,
-                    shrink=0.6,
-                    extend="max",
-                )
-                cbar1.set_label(units, fontsize=6)
-                #cbar1.ax.set_xticklabels([0.1, 0.5, 1, 1.5, 2, 3, 5, 10, 20])
-                cbar1.ax.set_xticklabels([0.1, 0.3, 0.5, 0.75, 1, 1.25, 1.5, 1.75, 2, 2.5, 3, 4, 5, 7.5, 10, 15, 17.5, 20])
-                cbar1.ax.tick_params(labelsize=6)
-                ax1.text(
-                    0.5,
-                    1.03,
-                    "FV3-LAM "
-                    + fhour
-                    + "-hr Accumulated Precipitation ("
-                    + units
-                    + ") \n initialized: "
-                    + itime
-                    + " valid: "
-                    + vtime
-                    + " (f"
-                    + fhour
-                    + ")",
-                    horizontalalignment="center",
-                    fontsize=6,
-                    transform=ax1.transAxes,
-                    bbox=dict(facecolor="white", alpha=0.85, boxstyle="square,pad=0.2"),
-                )
-    
-                cs_2 = ax2.pcolormesh(
-                    lon2_shift,
-                    lat2_shift,
-                    qpf_2,
-                    transform=transform,
-                    cmap=cm,
-                    vmin=0.01,
-                    norm=norm,
-                )
-                cs_2.cmap.set_under("white", alpha=0.0)
-                cs_2.cmap.set_over("pink")
-                cbar2 = plt.colorbar(
-                    cs_2,
-                    ax=ax2,
-                    orientation="horizontal",
-                    pad=0.05,
-                    shrink=0.6,
-                    extend="max",
-                )
-                cbar2.set_label(units, fontsize=6)
-                #cbar2.ax.set_xticklabels([0.1, 0.5, 1, 1.5, 2, 3, 5, 10, 20])
-                cbar2.ax.set_xticklabels([0.1, 0.3, 0.5, 0.75, 1, 1.25, 1.5, 1.75, 2, 2.5, 3, 4, 5, 7.5, 10, 15, 17.5, 20])
-                cbar2.ax.tick_params(labelsize=6)
-                ax2.text(
-                    0.5,
-                    1.03,
-                    "FV3-LAM-2 "
-                    + fhour
-                    + "-hr Accumulated Precipitation ("
-                    + units
-                    + ") \n initialized: "
-                    + itime
-                    + " valid: "
-                    + vtime
-                    + " (f"
-                    + fhour
-                    + ")",
-                    horizontalalignment="center",
-                    fontsize=6,
-                    transform=ax2.transAxes,
-                    bbox=dict(facecolor="white", alpha=0.85, boxstyle="square,pad=0.2"),
-                )
-    
-                cs = ax3.pcolormesh(
-                    lon2_shift,
-                    lat2_shift,
-                    qpf_diff,
-                    transform=transform,
-                    cmap=cmdiff,
-                    norm=normdiff,
-                )
-                cs.cmap.set_under("darkblue")
-                cs.cmap.set_over("darkred")
-                cbar3 = plt.colorbar(
-                    cs,
-                    ax=ax3,
-                    orientation="horizontal",
-                    pad=0.05,
-                    shrink=0.6,
-                    extend="both",
-                )
-                cbar3.set_label(units, fontsize=6)
-                cbar3.ax.tick_params(labelsize=6)
-                ax3.text(
-                    0.5,
-                    1.03,
-                    "FV3-LAM-2 - FV3-LAM "
-                    + fhour
-                    + "-hr Accumulated Precipitation ("
-                    + units
-                    + ") \n initialized: "
-                    + itime
-                    + " valid: "
-                    + vtime
-                    + " (f"
-                    + fhour
-                    + ")",
-                    horizontalalignment="center",
-                    fontsize=6,
-                    transform=ax3.transAxes,
-                    bbox=dict(facecolor="white", alpha=0.85, boxstyle="square,pad=0.2"),
-                )
-    
-                compress_and_save(
-                    COMOUT_1
-                    + "/qpf_diff_"
-                    + dom
-                    + "_f"
-                    + fhour
-                    + ".png"
-                )
-                t2 = time.perf_counter()
-                t3 = round(t2 - t1, 3)
-                logging.info(("%.3f seconds to plot total qpf for: " + dom) % t3)
-    
-                #################################
-                # Plot Max/Min Hourly 2-5 km UH
-                #################################
-                # Do not make max/min hourly 2-5 km UH plot for forecast hour 0
-                t1 = time.perf_counter()
-                logging.info(("Working on Max/Min Hourly 2-5 km UH for " + dom))
-    
-                # Clear off old plottables but keep all the map info
-                cbar1.remove()
-                cbar2.remove()
-                cbar3.remove()
-                clear_plotables(ax1, keep_ax_lst_1, fig)
-                clear_plotables(ax2, keep_ax_lst_2, fig)
-                clear_plotables(ax3, keep_ax_lst_3, fig)
-    
-                units = "m${^2}$ s$^{-2}$"
-                clevs = [
-                    -150,
-                    -100,
-                    -75,
-                    -50,
-                    -25,
-                    -10,
-                    0,
-                    10,
-                    25,
-                    50,
-                    75,
-                    100,
-                    150,
-                    200,
-                    250,
-                    300,
-                ]
-                #   alternative colormap for just max UH if you don't want to plot the min UH too
-                #   colorlist = ['white','skyblue','mediumblue','green','orchid','firebrick','#EEC900','DarkViolet']
-                colorlist = [
-                    "blue",
-                    "#1874CD",
-                    "dodgerblue",
-                    "deepskyblue",
-                    "turquoise",
-                    "#E5E5E5",
-                    "#E5E5E5",
-                    "#EEEE00",
-                    "#EEC900",
-                    "darkorange",
-                    "orangered",
-                    "red",
-                    "firebrick",
-                    "mediumvioletred",
-                    "darkviolet",
-                ]
-                cm = matplotlib.colors.ListedColormap(colorlist)
-                cmdiff = matplotlib.colors.ListedColormap(diffcolors)
-                norm = matplotlib.colors.BoundaryNorm(clevs, cm.N)
-                normdiff = matplotlib.colors.BoundaryNorm(clevsdiff, cmdiff.N)
-    
-                cs_1 = ax1.pcolormesh(
-                    lon_shift, lat_shift, uh25_1, transform=transform, cmap=cm, norm=norm
-                )
-                cs_1.cmap.set_under("darkblue")
-                cs_1.cmap.set_over("black")
-                cbar1 = plt.colorbar(
-                    cs_1,
-                    ax=ax1,
-                    orientation="horizontal",
-                    pad=0.05,
-                    shrink=0.6,
-                    extend="both",
-                )
-                cbar1.set_label(units, fontsize=6)
-                cbar1.ax.tick_params(labelsize=6)
-                ax1.text(
-                    0.5,
-                    1.03,
-                    "FV3-LAM 1-h Max/Min 2-5 km Updraft Helicity ("
-                    + units
-                    + ") \n initialized: "
-                    + itime
-                    + " valid: "
-                    + vtime
-                    + " (f"
-                    + fhour
-                    + ")",
-                    horizontalalignment="center",
-                    fontsize=6,
-                    transform=ax1.transAxes,
-                    bbox=dict(facecolor="white", alpha=0.85, boxstyle="square,pad=0.2"),
-                )
-    
-                cs_2 = ax2.pcolormesh(
-                    lon2_shift, lat2_shift, uh25_2, transform=transform, cmap=cm, norm=norm
-                )
-                cs_2.cmap.set_under("darkblue")
-                cs_2.cmap.set_over("black")
-                cbar2 = plt.colorbar(
-                    cs_2,
-                    ax=ax2,
-                    orientation="horizontal",
-                    pad=0.05,
-                    shrink=0.6,
-                    extend="both",
-                )
-                cbar2.set_label(units, fontsize=6)
-                cbar2.ax.tick_params(labelsize=6)
-                ax2.text(
-                    0.5,
-                    1.03,
-                    "FV3-LAM-2 1-h Max/Min 2-5 km Updraft Helicity ("
-                    + units
-                    + ") \n initialized: "
-                    + itime
-                    + " valid: "
-                    + vtime
-                    + " (f"
-                    + fhour
-                    + ")",
-                    horizontalalignment="center",
-                    fontsize=6,
-                    transform=ax2.transAxes,
-                    bbox=dict(facecolor="white", alpha=0.85, boxstyle="square,pad=0.2"),
-                )
-    
-                cs = ax3.pcolormesh(
-                    lon2_shift,
-                    lat2_shift,
-                    uh25_diff,
-                    transform=transform,
-                    cmap=cmdiff,
-                    norm=normdiff,
-                )
-                cs.cmap.set_under("darkblue")
-                cs.cmap.set_over("darkred")
-                cbar3 = plt.colorbar(
-                    cs,
-                    ax=ax3,
-                    orientation="horizontal",
-                    pad=0.05,
-                    shrink=0.6,
-                    extend="both",
-                )
-                cbar3.set_label(units, fontsize=6)
-                cbar3.ax.tick_params(labelsize=6)
-                ax3.text(
-                    0.5,
-                    1.03,
-                    "FV3-LAM-2 - FV3-LAM 1-h Max/Min 2-5 km Updraft Helicity ("
-                    + units
-                    + ") \n initialized: "
-                    + itime
-                    + " valid: "
-                    + vtime
-                    + " (f"
-                    + fhour
-                    + ")",
-                    horizontalalignment="center",
-                    fontsize=6,
-                    transform=ax3.transAxes,
-                    bbox=dict(facecolor="white", alpha=0.85, boxstyle="square,pad=0.2"),
-                )
-    
-                compress_and_save(
-                    COMOUT_1
-                    + "/uh25_diff_"
-                    + dom
-                    + "_f"
-                    + fhour
-                    + ".png"
-                )
-                t2 = time.perf_counter()
-                t3 = round(t2 - t1, 3)
-                logging.info(("%.3f seconds to plot Max/Min Hourly 2-5 km UH for: " + dom) % t3)
-    
-            #################################
-            # Plot composite reflectivity
-            #################################
-            t1 = time.perf_counter()
-            logging.info(("Working on composite reflectivity for " + dom))
-    
-            # Clear off old plottables but keep all the map info
-            cbar1.remove()
-            cbar2.remove()
-            cbar3.remove()
-            clear_plotables(ax1, keep_ax_lst_1, fig)
-            clear_plotables(ax2, keep_ax_lst_2, fig)
-            clear_plotables(ax3, keep_ax_lst_3, fig)
-    
-            units = "dBZ"
-            clevs = np.linspace(5, 70, 14)
-            clevsdiff = [20, 1000]
-            colorlist = [
-                "turquoise",
-                "dodgerblue",
-                "mediumblue",
-                "lime",
-                "limegreen",
-                "green",
-                "#EEEE00",
-                "#EEC900",
-                "darkorange",
-                "red",
-                "firebrick",
-                "darkred",
-                "fuchsia",
-            ]
-            cm = matplotlib.colors.ListedColormap(colorlist)
-            norm = matplotlib.colors.BoundaryNorm(clevs, cm.N)
-    
-            cs_1 = ax1.pcolormesh(
-                lon_shift,
-                lat_shift,
-                refc_1,
-                transform=transform,
-                cmap=cm,
-                vmin=5,
-                norm=norm,
-            )
-            cs_1.cmap.set_under("white", alpha=0.0)
-            cs_1.cmap.set_over("black")
-            cbar1 = plt.colorbar(
-                cs_1,
-                ax=ax1,
-                orientation="horizontal",
-                pad=0.05,
-                shrink=0.6,
-                ticks=clevs,
-                extend="max",
-            )
-            cbar1.set_label(units, fontsize=6)
-            cbar1.ax.tick_params(labelsize=6)
-            ax1.text(
-                0.5,
-                1.03,
-                "FV3-LAM Composite Reflectivity ("
-                + units
-                + ") \n initialized: "
-                + itime
-                + " valid: "
-                + vtime
-                + " (f"
-                + fhour
-                + ")",
-                horizontalalignment="center",
-                fontsize=6,
-                transform=ax1.transAxes,
-                bbox=dict(facecolor="white", alpha=0.85, boxstyle="square,pad=0.2"),
-            )
-    
-            cs_2 = ax2.pcolormesh(
-                lon2_shift,
-                lat2_shift,
-                refc_2,
-                transform=transform,
-                cmap=cm,
-                vmin=5,
-                norm=norm,
-            )
-            cs_2.cmap.set_under("white", alpha=0.0)
-            cs_2.cmap.set_over("black")
-            cbar2 = plt.colorbar(
-                cs_2,
-                ax=ax2,
-                orientation="horizontal",
-                pad=0.05,
-                shrink=0.6,
-                ticks=clevs,
-                extend="max",
-            )
-            cbar2.set_label(units, fontsize=6)
-            cbar2.ax.tick_params(labelsize=6)
-            ax2.text(
-                0.5,
-                1.03,
-                "FV3-LAM-2 Composite Reflectivity ("
-                + units
-                + ") \n initialized: "
-                + itime
-                + " valid: "
-                + vtime
-                + " (f"
-                + fhour
-                + ")",
-                horizontalalignment="center",
-                fontsize=6,
-                transform=ax2.transAxes,
-                bbox=dict(facecolor="white", alpha=0.85, boxstyle="square,pad=0.2"),
-            )
-    
-            csdiff = ax3.contourf(
-                lon_shift, lat_shift, refc_1, clevsdiff, colors="red", transform=transform
-            )
-            csdiff2 = ax3.contourf(
-                lon2_shift,
-                lat2_shift,
-                refc_2,
-                clevsdiff,
-                colors="dodgerblue",
-                transform=transform,
-            )
-            ax3.text(
-                0.5,
-                1.03,
-                "FV3-LAM (red) and FV3-LAM-2 (blue) Composite Reflectivity > 20 ("
-                + units
-                + ") \n initialized: "
-                + itime
-                + " valid: "
-                + vtime
-                + " (f"
-                + fhour
-                + ")",
-                horizontalalignment="center",
-                fontsize=6,
-                transform=ax3.transAxes,
-                bbox=dict(facecolor="white", alpha=0.85, boxstyle="square,pad=0.2"),
-            )
-    
-            compress_and_save(
-                COMOUT_1
-                + "/refc_diff_"
-                + dom
-                + "_f"
-                + fhour
-                + ".png"
-            )
-            t2 = time.perf_counter()
-            t3 = round(t2 - t1, 3)
-            logging.info(("%.3f seconds to plot composite reflectivity for: " + dom) % t3)
-    
-            ######################################################
-    
-            t3dom = round(t2 - t1dom, 3)
-            logging.info(("%.3f seconds to plot all variables for: " + dom) % t3dom)
-            plt.clf()
-    
-        ######################################################
-    
-        main()
+
+    # Specify plotting domains
+    # User can add domains here, just need to specify lat/lon information in
+    # setup_map() (if dom == 'conus' block)
+    domains = args.plot_domains  # Other option is 'regional'
+
+    # Products of the same hour are listed together so that the processes
+    # work on few forecast hours at a time
+    units = [
+        (int(fhr), dom, product)
+        for fhr in fhours
+        for dom in domains
+        for product, _, _ in PRODUCTS
+        if product in args.products
+    ]
+
+    t1 = time.perf_counter()
+    nprocs = max(1, min(args.nprocs, len(units)))
+    if nprocs > 1:
+        # Fresh processes are spawned so that nothing is inherited from this
+        # one (and it works the same on all platforms)
+        with multiprocessing.get_context("spawn").Pool(
+            nprocs, initializer=init_worker, initargs=(settings, args.debug)
+        ) as pool:
+            for _ in pool.imap(plot_product, units):
+                pass
+            # Let the processes exit
+            pool.close()
+            pool.join()
+    else:
+        for unit in units:
+            plot_product(unit)
+        _writer.close()
+    t2 = time.perf_counter()
+    logging.info(
+        "%.3f seconds to make %d plots with %d processes"
+        % (round(t2 - t1, 3), len(units), nprocs)
+    )
+
+
+# -------------Start of script -------------------------#
+if __name__ == "__main__":
+    main(sys.argv[1:])
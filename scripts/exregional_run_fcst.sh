@@ -88,264 +88,41 @@ fi
 #
 #-----------------------------------------------------------------------
 #
-# Create links in the INPUT subdirectory of the current run directory to
-# the grid and (filtered) orography files.
+# Create the links in the run directory (DATA) and in its INPUT
+# subdirectory to the grid, orography, initial and boundary condition
+# files, and to the fixed files in the FIXam and FIXclim directories.
+# They are listed in a template (FCST_INPUT_LINKS_FP) written when the
+# experiment is generated, and stage_fcst_input.py creates all of them in
+# one call.  For experiments generated before the template existed, it is
+# built from the variable definitions file (GLOBAL_VAR_DEFNS_FP) instead.
 #
 #-----------------------------------------------------------------------
 #
 print_info_msg "$VERBOSE" "
-Creating links in the INPUT subdirectory of the current run directory to
-the grid and (filtered) orography files ..."
-
-# Create links to fix files in the FIXlam directory.
-cd_vrfy ${DATA}/INPUT
-
-#
-# For experiments in which the TN_MAKE_GRID task is run, we make the 
-# symlinks to the grid files relative because those files wlll be located 
-# within the experiment directory.  This keeps the experiment directory 
-# more portable and the symlinks more readable.  However, for experiments 
-# in which the TN_MAKE_GRID task is not run, pregenerated grid files will
-# be used, and those will be located in an arbitrary directory (specified 
-# by the user) that is somwehere outside the experiment directory.  Thus, 
-# in this case, there isn't really an advantage to using relative symlinks, 
-# so we use symlinks with absolute paths.
-#
-if [[ -d "${EXPTDIR}/grid" ]]; then
-  relative_link_flag="TRUE"
-else
-  relative_link_flag="FALSE"
-fi
-
-# Symlink to mosaic file with a completely different name.
-#target="${FIXlam}/${CRES}${DOT_OR_USCORE}mosaic.halo${NH4}.nc"   # Should this point to this halo4 file or a halo3 file???
-target="${FIXlam}/${CRES}${DOT_OR_USCORE}mosaic.halo${NH3}.nc"   # Should this point to this halo4 file or a halo3 file???
-symlink="grid_spec.nc"
-create_symlink_to_file target="$target" symlink="$symlink" \
-                       relative="${relative_link_flag}"
-
-# Symlink to halo-3 grid file with "halo3" stripped from name.
-mosaic_fn="grid_spec.nc"
-grid_fn=$( get_charvar_from_netcdf "${mosaic_fn}" "gridfiles" )
-
-target="${FIXlam}/${grid_fn}"
-symlink="${grid_fn}"
-create_symlink_to_file target="$target" symlink="$symlink" \
-                       relative="${relative_link_flag}"
-
-# Symlink to halo-4 grid file with "${CRES}_" stripped from name.
-#
-# If this link is not created, then the code hangs with an error message
-# like this:
-#
-#   check netcdf status=           2
-#  NetCDF error No such file or directory
-# Stopped
-#
-# Note that even though the message says "Stopped", the task still con-
-# sumes core-hours.
-#
-target="${FIXlam}/${CRES}${DOT_OR_USCORE}grid.tile${TILE_RGNL}.halo${NH4}.nc"
-symlink="grid.tile${TILE_RGNL}.halo${NH4}.nc"
-create_symlink_to_file target="$target" symlink="$symlink" \
-                       relative="${relative_link_flag}"
-
-
-#
-# As with the symlinks grid files above, when creating the symlinks to
-# the orography files, use relative paths if running the TN_MAKE_OROG
-# task and absolute paths otherwise.
-#
-if [ -d "${EXPTDIR}/orog" ]; then
-  relative_link_flag="TRUE"
-else
-  relative_link_flag="FALSE"
-fi
-
-# Symlink to halo-0 orography file with "${CRES}_" and "halo0" stripped from name.
-target="${FIXlam}/${CRES}${DOT_OR_USCORE}oro_data.tile${TILE_RGNL}.halo${NH0}.nc"
-symlink="oro_data.nc"
-create_symlink_to_file target="$target" symlink="$symlink" \
-                       relative="${relative_link_flag}"
-#
-# Symlink to halo-4 orography file with "${CRES}_" stripped from name.
-#
-# If this link is not created, then the code hangs with an error message
-# like this:
-#
-#   check netcdf status=           2
-#  NetCDF error No such file or directory
-# Stopped
-#
-# Note that even though the message says "Stopped", the task still con-
-# sumes core-hours.
-#
-target="${FIXlam}/${CRES}${DOT_OR_USCORE}oro_data.tile${TILE_RGNL}.halo${NH4}.nc"
-symlink="oro_data.tile${TILE_RGNL}.halo${NH4}.nc"
-create_symlink_to_file target="$target" symlink="$symlink" \
-                       relative="${relative_link_flag}"
-#
-# If using the FV3_HRRR physics suite, there are two files (that contain 
-# statistics of the orography) that are needed by the gravity wave drag 
-# parameterization in that suite.  Below, create symlinks to these files
-# in the run directory.  Note that the symlinks must have specific names 
-# that the FV3 model is hardcoded to recognize, and those are the names 
-# we use below.
-#
-suites=( "FV3_RAP" "FV3_HRRR" "FV3_GFS_v15_thompson_mynn_lam3km" "FV3_GFS_v17_p8" )
-if [[ ${suites[@]} =~ "${CCPP_PHYS_SUITE}" ]] ; then
-  file_ids=( "ss" "ls" )
-  for file_id in "${file_ids[@]}"; do
-    target="${FIXlam}/${CRES}${DOT_OR_USCORE}oro_data_${file_id}.tile${TILE_RGNL}.halo${NH0}.nc"
-    symlink="oro_data_${file_id}.nc"
-    create_symlink_to_file target="$target" symlink="$symlink" \
-                           relative="${relative_link_flag}"
-  done
-fi
-#
-#-----------------------------------------------------------------------
-#
-# The FV3 model looks for the following files in the INPUT subdirectory
-# of the run directory:
-#
-#   gfs_data.nc
-#   sfc_data.nc
-#   gfs_bndy*.nc
-#   gfs_ctrl.nc
-#
-# Some of these files (gfs_ctrl.nc, gfs_bndy*.nc) already exist, but
-# others do not.  Thus, create links with these names to the appropriate
-# files (in this case the initial condition and surface files only).
-#
-#-----------------------------------------------------------------------
-#
-print_info_msg "$VERBOSE" "
-Creating links with names that FV3 looks for in the INPUT subdirectory
-of the current run directory (DATA), where
-  DATA = \"${DATA}\"
-..."
-
-cd_vrfy ${DATA}/INPUT
-
-#
-# The symlinks to be created point to files in the same directory (INPUT),
-# so it's most straightforward to use relative paths.
-#
-relative_link_flag="FALSE"
-
-target="${INPUT_DATA}/${NET}.${cycle}${dot_ensmem}.gfs_data.tile${TILE_RGNL}.halo${NH0}.nc"
-symlink="gfs_data.nc"
-create_symlink_to_file target="$target" symlink="$symlink" \
-                       relative="${relative_link_flag}"
-
-target="${INPUT_DATA}/${NET}.${cycle}${dot_ensmem}.sfc_data.tile${TILE_RGNL}.halo${NH0}.nc"
-symlink="sfc_data.nc"
-create_symlink_to_file target="$target" symlink="$symlink" \
-                       relative="${relative_link_flag}"
-
-target="${INPUT_DATA}/${NET}.${cycle}${dot_ensmem}.gfs_ctrl.nc"
-symlink="gfs_ctrl.nc"
-create_symlink_to_file target="$target" symlink="$symlink" \
-                       relative="${relative_link_flag}"
-
-
-for fhr in $(seq -f "%03g" 0 ${LBC_SPEC_INTVL_HRS} ${FCST_LEN_HRS}); do
-  target="${INPUT_DATA}/${NET}.${cycle}${dot_ensmem}.gfs_bndy.tile${TILE_RGNL}.f${fhr}.nc"
-  symlink="gfs_bndy.tile${TILE_RGNL}.${fhr}.nc"
-  create_symlink_to_file target="$target" symlink="$symlink" \
-                         relative="${relative_link_flag}"
-done
-
-if [ "${CPL_AQM}" = "TRUE" ]; then
-  target="${INPUT_DATA}/${NET}.${cycle}${dot_ensmem}.NEXUS_Expt.nc"
-  symlink="NEXUS_Expt.nc"
-  create_symlink_to_file target="$target" symlink="$symlink" \
-                       relative="${relative_link_flag}"
-
-  # create symlink to PT for point source in Online-CMAQ
-  target="${INPUT_DATA}/${NET}.${cycle}${dot_ensmem}.PT.nc"
-  if [ -f ${target} ]; then
-    symlink="PT.nc"
-    create_symlink_to_file target="$target" symlink="$symlink" \
-	                       relative="${relative_link_flag}"
-  fi
-fi
-#
-#-----------------------------------------------------------------------
-#
-# Create links in the current run directory to fixed (i.e. static) files
-# in the FIXam directory.  These links have names that are set to the
-# names of files that the forecast model expects to exist in the current
-# working directory when the forecast model executable is called (and
-# that is just the run directory).
-#
-#-----------------------------------------------------------------------
-#
-cd_vrfy ${DATA}
-
-print_info_msg "$VERBOSE" "
-Creating links in the current run directory (DATA) to fixed (i.e.
-static) files in the FIXam directory:
-  FIXam = \"${FIXam}\"
+Staging links in the current run directory (DATA) from the template:
+  FCST_INPUT_LINKS_FP = \"${FCST_INPUT_LINKS_FP:-}\"
   DATA = \"${DATA}\""
-#
-# For experiments that are run in "community" mode, the FIXam directory
-# is an actual directory (i.e. not a symlink) located under the experiment 
-# directory containing actual files (i.e. not symlinks).  In this case,
-# we use relative paths for the symlinks in order to keep the experiment
-# directory more portable and the symlinks more readable.  However, for
-# experiments that are run in "nco" mode, the FIXam directory is a symlink
-# under the experiment directory that points to an arbitrary (user specified)
-# location outside the experiment directory.  Thus, in this case, there 
-# isn't really an advantage to using relative symlinks, so we use symlinks 
-# with absolute paths.
-#
-if [ "${SYMLINK_FIX_FILES}" == "FALSE" ]; then
-  relative_link_flag="TRUE"
-else
-  relative_link_flag="FALSE"
-fi
-
-regex_search="^[ ]*([^| ]+)[ ]*[|][ ]*([^| ]+)[ ]*$"
-num_symlinks=${#CYCLEDIR_LINKS_TO_FIXam_FILES_MAPPING[@]}
-for (( i=0; i<${num_symlinks}; i++ )); do
 
-  mapping="${CYCLEDIR_LINKS_TO_FIXam_FILES_MAPPING[$i]}"
-  symlink=$( printf "%s\n" "$mapping" | \
-             $SED -n -r -e "s/${regex_search}/\1/p" )
-  target=$( printf "%s\n" "$mapping" | \
-            $SED -n -r -e "s/${regex_search}/\2/p" )
-
-  symlink="${DATA}/$symlink"
-  target="$FIXam/$target"
-  create_symlink_to_file target="$target" symlink="$symlink" \
-                         relative="${relative_link_flag}"
-
-done
-#
-#-----------------------------------------------------------------------
-#
-# Create links in the current run directory to the MERRA2 aerosol 
-# climatology data files and lookup table for optics properties.
-#
-#-----------------------------------------------------------------------
-#
-if [ "${USE_MERRA_CLIMO}" = "TRUE" ]; then
-  for f_nm_path in ${FIXclim}/*; do
-    f_nm=$( basename "${f_nm_path}" )
-    pre_f="${f_nm%%.*}"
-
-    if [ "${pre_f}" = "merra2" ]; then
-      mnth=$( printf "%s\n" "${f_nm}" | grep -o -P '(?<=2014.m).*(?=.nc)' )
-      symlink="${DATA}/aeroclim.m${mnth}.nc"
-    else
-      symlink="${DATA}/${pre_f}.dat"
-    fi
-    target="${f_nm_path}"
-    create_symlink_to_file target="$target" symlink="$symlink" \
-                         relative="${relative_link_flag}"
-  done
-fi
+grid_fn=$( get_charvar_from_netcdf \
+           "${FIXlam}/${CRES}${DOT_OR_USCORE}mosaic.halo${NH3}.nc" "gridfiles" )
+
+python3 $USHdir/stage_fcst_input.py \
+  --template "${FCST_INPUT_LINKS_FP:-${EXPTDIR}/fcst_input_links.yaml}" \
+  --path-to-defns "${GLOBAL_VAR_DEFNS_FP}" \
+  --data "${DATA}" \
+  --fcst-len-hrs "${FCST_LEN_HRS}" \
+  --nthreads "${STAGE_FCST_INPUT_NTHREADS:-1}" \
+  --relative-link-flag="${RELATIVE_LINK_FLAG}" \
+  --cres "${CRES}" \
+  --grid-fn "${grid_fn}" \
+  --input-data "${INPUT_DATA}" \
+  --net "${NET}" \
+  --cycle "${cycle}" \
+  --dot-ensmem="${dot_ensmem}" || \
+print_err_msg_exit "\
+Call to stage_fcst_input.py failed to create the links in the forecast
+run directory:
+  DATA = \"${DATA}\""
 #
 #-----------------------------------------------------------------------
 #
@@ -1,16 +1,16 @@
 #!/usr/bin/env python3
 
+import os
 import sys
 import argparse
 import logging
 
 sys.path.append("../../ush")
 
-from python_utils import load_config_file
-
 from check_python_version import check_python_version
 
-from utils import calculate_core_hours, create_expts_dict, print_WE2E_summary, write_monitor_file
+from utils import calculate_core_hours, create_expts_dict, print_WE2E_summary, write_monitor_file,\
+                  load_monitor_file, TaskTable
 
 def setup_logging(debug: bool = False) -> None:
     """
@@ -40,32 +40,54 @@ if __name__ == "__main__":
                      "provided directory of experiments\n")
 
     req = parser.add_mutually_exclusive_group(required=True)
-    req.add_argument('-y', '--yaml_file', type=str,
+    req.add_argument('-y', '--yaml_file', type=str, nargs='+',
                      help='YAML-format file specifying the information of jobs to be summarized; '\
-                          'for an example file, see WE2E_tests.yaml')
+                          'for an example file, see WE2E_tests.yaml. Several files (e.g. of '\
+                          'successive test runs) are summarized together')
     req.add_argument('-e', '--expt_dir', type=str,
                      help='The full path of an experiment directory, containing one or more '\
                           'subdirectories with UFS SRW App experiments in them')
     parser.add_argument('-d', '--debug', action='store_true',
                         help='Script will be run in debug mode with more verbose output')
+    parser.add_argument('--csv', type=str,
+                        help='Also write the tasks of all experiments to this CSV file')
+    parser.add_argument('--json', type=str,
+                        help='Also write the summary of each experiment and task type to this '\
+                             'JSON file')
 
     args = parser.parse_args()
 
     setup_logging(args.debug)
 
-    yaml_file = args.yaml_file
-
     # Set up dictionary of experiments
     if args.expt_dir:
         yaml_file, expts_dict = create_expts_dict(args.expt_dir)
+        sources = {yaml_file: expts_dict}
     elif args.yaml_file:
-        expts_dict = load_config_file(args.yaml_file)
+        sources = {yaml_file: load_monitor_file(yaml_file) for yaml_file in args.yaml_file}
     else:
         raise ValueError(f'Bad arguments; run {__file__} -h for more information')
 
     # Calculate core hours and update yaml
-    expts_dict = calculate_core_hours(expts_dict)
-    write_monitor_file(yaml_file,expts_dict)
+    for yaml_file in sources:
+        sources[yaml_file] = calculate_core_hours(sources[yaml_file])
+        write_monitor_file(yaml_file,sources[yaml_file])
+
+    # Experiments of several files are told apart by the name of their file
+    if len(sources) == 1:
+        expts_dict = sources[yaml_file]
+    else:
+        expts_dict = {f'{os.path.splitext(os.path.basename(yaml_file))[0]}/{expt}': expt_dict
+                      for yaml_file in sources for expt, expt_dict in sources[yaml_file].items()}
 
     #Call function to print summary
     print_WE2E_summary(expts_dict, args.debug)
+
+    if args.csv or args.json:
+        table = TaskTable(expts_dict)
+        if args.csv:
+            table.write_csv(args.csv)
+            logging.info(f"Tasks written to {args.csv}")
+        if args.json:
+            table.write_json(args.json)
+            logging.info(f"Summary written to {args.json}")
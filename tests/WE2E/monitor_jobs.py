@@ -1,73 +1,194 @@
 #!/usr/bin/env python3
 
+import os
 import sys
 import argparse
+import heapq
 import logging
 import time
+from concurrent.futures import FIRST_COMPLETED, as_completed, wait
 from textwrap import dedent
-from datetime import datetime
+from datetime import datetime, timedelta
 
 sys.path.append("../../ush")
 
-from python_utils import load_config_file
-
 from check_python_version import check_python_version
 
 from utils import calculate_core_hours, write_monitor_file, update_expt_status,\
-                  update_expt_status_parallel, print_WE2E_summary
-
-def monitor_jobs(expts_dict: dict, monitor_file: str = '', procs: int = 1, debug: bool = False) -> str:
-    """Function to monitor and run jobs for the specified experiment using Rocoto
-
-    Args:
-        expts_dict  (dict): A dictionary containing the information needed to run
-                            one or more experiments. See example file monitor_jobs.yaml
-        monitor_file (str): [optional]
-        debug       (bool): [optional] Enable extra output for debugging
-
-    Returns:
-        str: The name of the file used for job monitoring (when script is finished, this 
-             contains results/summary)
-    """
-
-    monitor_start = datetime.now()
-    # Write monitor_file, which will contain information on each monitored experiment
-    monitor_start_string = monitor_start.strftime("%Y%m%d%H%M%S")
-    if not monitor_file:
-        monitor_file = f'WE2E_tests_{monitor_start_string}.yaml'
-    logging.info(f"Writing information for all experiments to {monitor_file}")
+                  print_WE2E_summary, load_monitor_file, MonitorJournal, RocotoRunner,\
+                  RuntimeHistory, expt_machine_grid
 
-    write_monitor_file(monitor_file,expts_dict)
+def rocoto_db_mtime(expt: dict):
+    """Returns the modification time of the rocoto database of an experiment, or None if it
+    does not exist yet"""
+    try:
+        return os.path.getmtime(os.path.join(expt["expt_dir"], "FV3LAM_wflow.db"))
+    except OSError:
+        return None
+
+
+def expt_statuses(expt: dict) -> tuple:
+    """Returns the status of an experiment dictionary and a dictionary of the status of each of
+    its tasks"""
+    return expt["status"], {task: expt[task]["status"] for task in expt
+                            if task not in ["expt_dir","status","start_time","walltime"]}
+
+
+def predict_expts(expts_dict: dict, history: RuntimeHistory) -> dict:
+    """Predicts the cost of each experiment from the runtime history (see
+    RuntimeHistory.predict()), and logs the predicted cost of all of them. Returns a dictionary
+    of the predictions, without the experiments that were never run before."""
+    predictions = {}
+    for expt in expts_dict:
+        machine_grid = expt_machine_grid(expts_dict[expt]["expt_dir"])
+        prediction = history.predict(expt, *machine_grid) if machine_grid else None
+        if prediction:
+            predictions[expt] = prediction
+            logging.debug(f'Predicted cost of experiment {expt}: {prediction}')
+    if predictions:
+        core_hours = sum(prediction["core_hours"] for prediction in predictions.values())
+        longest = max(prediction["walltime"] for prediction in predictions.values())
+        logging.info(f'Predicted cost of the {len(predictions)} experiments run before: '\
+                     f'{core_hours:.2f} core hours; the longest takes up to '\
+                     f'{timedelta(seconds=round(longest))}')
+    if len(predictions) < len(expts_dict):
+        logging.info(f'{len(expts_dict) - len(predictions)} experiments have no runtime history')
+    return predictions
+
+
+def monitor_expts(expts_dict: dict, runner: RocotoRunner, journal: MonitorJournal,
+                  monitor_start: datetime, debug: bool, poll_interval: float,
+                  max_poll_interval: float, predictions: dict, max_cores: int) -> None:
+    """Starts the experiments, then checks each running experiment when it is due until all of
+    them are finished, see monitor_jobs(). Arguments are as for monitor_jobs(); runner is the
+    RocotoRunner advancing the experiments, journal the MonitorJournal recording their changes
+    and predictions the predicted costs of the experiments (see predict_expts())."""
+
+    # Experiments that were not started yet are started in order of their predicted walltime,
+    # longest first (those never run before first of all), and held back while the cores
+    # predicted for the running experiments would exceed max_cores
+    waiting = [expt for expt in expts_dict if expts_dict[expt]["status"] == "CREATED"]
+    waiting.sort(key=lambda expt: (expt in predictions,
+                                   -predictions.get(expt, {}).get("walltime", 0)))
+
+    def cores(expt):
+        return predictions.get(expt, {}).get("cores", 0)
+
+    def start_waiting(running):
+        """Returns the waiting experiments that can be started, given the running ones"""
+        used = sum(cores(expt) for expt in running)
+        started = []
+        while waiting:
+            if max_cores and (running or started) and used + cores(waiting[0]) > max_cores:
+                break
+            used += cores(waiting[0])
+            started.append(waiting.pop(0))
+        return started
 
     # Perform initial setup for each experiment
     logging.info("Checking tests available for monitoring...")
 
-    if procs > 1:
-        print(f'Starting experiments in parallel with {procs} processes')
-        expts_dict = update_expt_status_parallel(expts_dict, procs, True, debug)
-    else:
-        for expt in expts_dict:
-            logging.info(f"Starting experiment {expt} running")
-            expts_dict[expt] = update_expt_status(expts_dict[expt], expt, True, debug)
+    initial = [expt for expt in expts_dict if expt not in waiting]
+    initial += start_waiting(initial)
+    if waiting:
+        logging.info(f'Holding back {len(waiting)} experiments to stay within {max_cores} cores')
 
-    write_monitor_file(monitor_file,expts_dict)
+    futures = {}
+    for expt in initial:
+        logging.info(f"Starting experiment {expt} running")
+        futures[runner.submit(expts_dict[expt], expt)] = expt
+    for future in as_completed(futures):
+        expt = futures[future]
+        future.result()
+        expts_dict[expt] = update_expt_status(expts_dict[expt], expt, True, debug, submit=False)
+
+    journal.record(expts_dict, list(expts_dict))
 
     logging.info(f'Setup complete; monitoring {len(expts_dict)} experiments')
     logging.info('Use ctrl-c to pause job submission/monitoring')
 
     #Make a copy of experiment dictionary; will use this copy to monitor active experiments
-    running_expts = expts_dict.copy()
+    running_expts = {expt: expts_dict[expt] for expt in initial}
+
+    # Queue of (next check time, experiment) of the running experiments. Entries made obsolete
+    # by an earlier check are skipped when they come up.
+    now = time.monotonic()
+    next_check = {expt: now for expt in running_expts}
+    interval = {expt: poll_interval for expt in running_expts}
+    statuses = {expt: expt_statuses(expts_dict[expt]) for expt in running_expts}
+    db_mtimes = {expt: rocoto_db_mtime(expts_dict[expt]) for expt in running_expts}
+    queue = [(now, expt) for expt in running_expts]
+    heapq.heapify(queue)
+
+    # Experiments being advanced by rocotorun, by future, and those being started
+    checking = {}
+    starting = set()
 
     i = 0
-    while running_expts:
+    while running_expts or waiting:
+        # Start the waiting experiments that fit now
+        now = time.monotonic()
+        for expt in start_waiting(running_expts):
+            logging.info(f"Starting experiment {expt} running")
+            running_expts[expt] = expts_dict[expt]
+            starting.add(expt)
+            next_check[expt] = now
+            interval[expt] = poll_interval
+            statuses[expt] = expt_statuses(expts_dict[expt])
+            db_mtimes[expt] = rocoto_db_mtime(expts_dict[expt])
+            heapq.heappush(queue, (now, expt))
+
+        # Start checking the experiments that are due, and those whose database was modified
+        # since their last check
+        now = time.monotonic()
+        due = set()
+        while queue and queue[0][0] <= now:
+            check_time, expt = heapq.heappop(queue)
+            if expt in running_expts and next_check[expt] == check_time:
+                due.add(expt)
+        for expt in running_expts:
+            if expt in checking.values() or expt in due:
+                continue
+            if rocoto_db_mtime(expts_dict[expt]) != db_mtimes[expt]:
+                logging.debug(f'Database of experiment {expt} was modified; checking it now')
+                due.add(expt)
+        for expt in running_expts:
+            if expt in due and expt not in checking.values():
+                checking[runner.submit(expts_dict[expt], expt)] = expt
+
+        # Wait for checks to be done, until the next experiment is due, looking for modified
+        # databases meanwhile
+        timeout = max(0, min(queue[0][0] - now, poll_interval)) if queue else poll_interval
+        if not checking:
+            time.sleep(timeout)
+            continue
+        done, _ = wait(checking, timeout=timeout, return_when=FIRST_COMPLETED)
+        if not done:
+            continue
+
         i += 1
-        if procs > 1:
-            expts_dict = update_expt_status_parallel(expts_dict, procs)
-        else:
-            for expt in running_expts.copy():
-                expts_dict[expt] = update_expt_status(expts_dict[expt], expt)
+        done = [future for future in checking if future in done]
+        checked = []
+        for future in done:
+            expt = checking.pop(future)
+            checked.append(expt)
+            future.result()
+            expts_dict[expt] = update_expt_status(expts_dict[expt], expt, expt in starting,
+                                                  debug, submit=False)
+            starting.discard(expt)
+
+            # Back off from experiments that did not change
+            new_statuses = expt_statuses(expts_dict[expt])
+            if new_statuses != statuses[expt]:
+                interval[expt] = poll_interval
+            else:
+                interval[expt] = min(2 * interval[expt], max_poll_interval)
+            statuses[expt] = new_statuses
+            db_mtimes[expt] = rocoto_db_mtime(expts_dict[expt])
+            next_check[expt] = time.monotonic() + interval[expt]
+            heapq.heappush(queue, (next_check[expt], expt))
+            logging.debug(f'Next check of experiment {expt} in {interval[expt]} seconds')
 
-        for expt in running_expts.copy():
             running_expts[expt] = expts_dict[expt]
             if running_expts[expt]["status"] in ['DEAD','ERROR','COMPLETE']:
                 # If start_time is in dictionary, compute total walltime
@@ -84,27 +205,90 @@ def monitor_jobs(expts_dict: dict, monitor_file: str = '', procs: int = 1, debug
                 # If failures, check how many experiments were successful
                 if debug:
                     if running_expts[expt]["status"] != "COMPLETE":
-                        i=j=0
+                        n=j=0
                         for task in running_expts[expt]:
                             # Skip non-task entries
                             if task in ["expt_dir","status","start_time","walltime"]:
                                 continue
                             j+=1
                             if running_expts[expt][task]["status"] == "SUCCEEDED":
-                                i+=1
-                        logging.debug(f'{i} of {j} tasks were successful')
+                                n+=1
+                        logging.debug(f'{n} of {j} tasks were successful')
                 logging.info(f'{walltimestr}will no longer monitor.')
                 running_expts.pop(expt)
                 continue
             logging.debug(f'Experiment {expt} status is {expts_dict[expt]["status"]}')
 
-        write_monitor_file(monitor_file,expts_dict)
+        # Only the changes are recorded; the monitor file is written from time to time
+        journal.record(expts_dict, checked)
         endtime = datetime.now()
         total_walltime = endtime - monitor_start
 
-        logging.debug(f"Finished loop {i}\nWalltime so far is {str(total_walltime)}")
-        #Slow things down just a tad between loops so experiments behave better
-        time.sleep(5)
+        logging.debug(f"Finished loop {i} ({len(done)} experiments checked)\n"
+                      f"Walltime so far is {str(total_walltime)}")
+
+
+def monitor_jobs(expts_dict: dict, monitor_file: str = '', procs: int = 1, debug: bool = False,
+                 poll_interval: float = 5, max_poll_interval: float = 60,
+                 rocotorun_timeout: float = 600, history_file: str = 'WE2E_runtimes.db',
+                 max_cores: int = 0) -> str:
+    """Function to monitor and run jobs for the specified experiment using Rocoto
+
+    Experiments are checked (with rocotorun) when they are due rather than all at once. An
+    experiment whose status or tasks changed at its last check is due again after poll_interval
+    seconds; each check without changes doubles that time, up to max_poll_interval seconds. An
+    experiment whose rocoto database is modified by something else than this function (e.g. a
+    manual rocotorun or rocotorewind) is checked right away. rocotorun is run in the background
+    for up to procs experiments at a time, and each experiment is updated as soon as its own
+    rocotorun commands are done, so slow experiments do not hold up the others.
+
+    The task runtimes of finished experiments are recorded in history_file, and used to predict
+    the cost of later runs of the same tests on the same machine and grid. Experiments are
+    started longest (predicted) first, so that the longest ones do not start last and hold up
+    the end of the suite; with max_cores, experiments are held back while the cores predicted
+    for the running experiments would exceed it.
+
+    Args:
+        expts_dict  (dict): A dictionary containing the information needed to run
+                            one or more experiments. See example file monitor_jobs.yaml
+        monitor_file (str): [optional]
+        procs        (int): [optional] Number of experiments advanced by rocotorun at a time
+        debug       (bool): [optional] Enable extra output for debugging
+        poll_interval (float): [optional] Shortest time between checks of an experiment (seconds)
+        max_poll_interval (float): [optional] Longest time between checks of an experiment
+                            (seconds)
+        rocotorun_timeout (float): [optional] Time after which a rocotorun command is killed
+                            (seconds); the experiment is checked again later
+        history_file (str): [optional] sqlite database of task runtimes of earlier runs
+        max_cores    (int): [optional] Limit on the cores predicted for the running experiments;
+                            0 means no limit
+
+    Returns:
+        str: The name of the file used for job monitoring (when script is finished, this 
+             contains results/summary)
+    """
+
+    monitor_start = datetime.now()
+    # Write monitor_file, which will contain information on each monitored experiment
+    monitor_start_string = monitor_start.strftime("%Y%m%d%H%M%S")
+    if not monitor_file:
+        monitor_file = f'WE2E_tests_{monitor_start_string}.yaml'
+    logging.info(f"Writing information for all experiments to {monitor_file}")
+
+    journal = MonitorJournal(monitor_file, expts_dict)
+
+    history = RuntimeHistory(history_file)
+    predictions = predict_expts(expts_dict, history)
+
+    # rocotorun is run for all experiments by a single runner, created once
+    runner = RocotoRunner(procs, rocotorun_timeout, debug)
+    try:
+        monitor_expts(expts_dict, runner, journal, monitor_start, debug, poll_interval,
+                      max_poll_interval, predictions, max_cores)
+    finally:
+        runner.close()
+        # Write the monitor file, also if monitoring is interrupted, so that it can be resumed
+        journal.close(expts_dict)
 
     logging.info(f'All {len(expts_dict)} experiments finished')
     logging.info('Calculating core-hour usage and printing final summary')
@@ -113,6 +297,10 @@ def monitor_jobs(expts_dict: dict, monitor_file: str = '', procs: int = 1, debug
     expts_dict = calculate_core_hours(expts_dict)
     write_monitor_file(monitor_file,expts_dict)
 
+    # Record the task runtimes, to predict the cost of later runs
+    history.record(expts_dict)
+    history.close()
+
     #Call function to print summary
     print_WE2E_summary(expts_dict, debug)
 
@@ -162,12 +350,21 @@ if __name__ == "__main__":
                              'with provided number of parallel tasks', default=1)
     parser.add_argument('-d', '--debug', action='store_true',
                         help='Script will be run in debug mode with more verbose output')
+    parser.add_argument('--max_poll_interval', type=float, default=60,
+                        help='Longest time in seconds between checks of an experiment whose '\
+                             'tasks have not changed status')
+    parser.add_argument('--max_cores', type=int, default=0,
+                        help='Hold back experiments while the cores predicted (from earlier '\
+                             'runs) for the running experiments would exceed this number')
+    parser.add_argument('--runtime_history', type=str, default='WE2E_runtimes.db',
+                        help='Database of task runtimes of earlier runs, used to predict the '\
+                             'cost of experiments')
 
     args = parser.parse_args()
 
     setup_logging(logfile,args.debug)
 
-    expts_dict = load_config_file(args.yaml_file)
+    expts_dict = load_monitor_file(args.yaml_file)
 
     if args.procs < 1:
         raise ValueError('You can not have less than one parallel process; select a valid value for --procs')
@@ -175,7 +372,9 @@ if __name__ == "__main__":
     #Call main function
 
     try:
-        monitor_jobs(expts_dict,args.yaml_file,args.procs,args.debug)
+        monitor_jobs(expts_dict,args.yaml_file,args.procs,args.debug,
+                     max_poll_interval=args.max_poll_interval,
+                     history_file=args.runtime_history, max_cores=args.max_cores)
     except KeyboardInterrupt:
         logging.info("\n\nUser interrupted monitor script; to resume monitoring jobs run:\n")
         logging.info(f"{__file__} -y={args.yaml_file} -p={args.procs}\n")
@@ -238,7 +238,8 @@ def run_we2e_tests(homedir, args) -> None:
         write_monitor_file(monitor_file,monitor_yaml)
         try:
             monitor_file = monitor_jobs(monitor_yaml, monitor_file=monitor_file, procs=args.procs,
-                                        debug=args.debug)
+                                        debug=args.debug, history_file=args.runtime_history,
+                                        max_cores=args.max_cores)
         except KeyboardInterrupt:
             logging.info("\n\nUser interrupted monitor script; to resume monitoring jobs run:\n")
             logging.info(f"./monitor_jobs.py -y={monitor_file} -p={args.procs}\n")
@@ -473,6 +474,12 @@ if __name__ == "__main__":
     parser.add_argument('-p', '--procs', type=int,
                         help='Run resource-heavy tasks (such as calls to rocotorun) in parallel, '\
                              'with provided number of parallel tasks', default=1)
+    parser.add_argument('--max_cores', type=int, default=0,
+                        help='Hold back experiments while the cores predicted (from earlier '\
+                             'runs) for the running experiments would exceed this number')
+    parser.add_argument('--runtime_history', type=str, default='WE2E_runtimes.db',
+                        help='Database of task runtimes of earlier runs, used to predict the '\
+                             'cost of experiments')
 
     parser.add_argument('--modulefile', type=str, help='Modulefile used for building the app')
     parser.add_argument('--run_envir', type=str,
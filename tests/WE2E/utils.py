@@ -5,14 +5,20 @@ A collection of utilities used by the various WE2E scripts
 import os
 import re
 import sys
+import copy
+import csv
+import json
+import time
 import logging
 import subprocess
 import sqlite3
 import glob
+import xml.etree.ElementTree as ET
 from textwrap import dedent
-from datetime import datetime
-from contextlib import closing
-from multiprocessing import Pool
+from datetime import datetime, timedelta
+from collections import Counter
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
 
 sys.path.append("../../ush")
 
@@ -39,41 +45,18 @@ def print_WE2E_summary(expts_dict: dict, debug: bool = False):
         None
     """
 
+    table = TaskTable(expts_dict)
+
     # Create summary table as list of strings
     summary = []
     summary.append('-'*REPORT_WIDTH)
     summary.append(f'Experiment name {" "*(EXPT_COLUMN_WIDTH-17)} | Status    | Core hours used ')
     summary.append('-'*REPORT_WIDTH)
-    total_core_hours = 0
-    statuses = []
-    expt_details = []
-    for expt in expts_dict:
-        statuses.append(expts_dict[expt]["status"])
-        ch = 0
-        expt_details.append('')
-        expt_details.append('-'*REPORT_WIDTH)
-        expt_details.append(f'Detailed summary of experiment {expt}')
-        expt_details.append(f"in directory {expts_dict[expt]['expt_dir']}")
-        expt_details.append(f'{" "*TASK_COLUMN_WIDTH}| Status    | Walltime   | Core hours used')
-        expt_details.append('-'*REPORT_WIDTH)
-
-        for task in expts_dict[expt]:
-            # Skip non-task entries
-            if task in ["expt_dir","status","start_time","walltime"]:
-                continue
-            status = expts_dict[expt][task]["status"]
-            walltime = expts_dict[expt][task]["walltime"]
-            expt_details.append(f'{task[:TASK_COLUMN_WIDTH]:<{TASK_COLUMN_WIDTH}s}  {status:<12s} {walltime:>10.1f}')
-            if "core_hours" in expts_dict[expt][task]:
-                task_ch = expts_dict[expt][task]["core_hours"]
-                ch += task_ch
-                expt_details[-1] = f'{expt_details[-1]}  {task_ch:>13.2f}'
-            else:
-                expt_details[-1] = f'{expt_details[-1]}            -'
-        expt_details.append('-'*REPORT_WIDTH)
-        expt_details.append(f'Total {" "*(TASK_COLUMN_WIDTH - 6)}  {statuses[-1]:<12s} {" "*11} {ch:>13.2f}')
-        summary.append(f'{expt[:EXPT_COLUMN_WIDTH]:<{EXPT_COLUMN_WIDTH}s}  {statuses[-1]:<12s}  {ch:>13.2f}')
-        total_core_hours += ch
+    expts = table.expt_summary()
+    for expt, _, status, ch in expts:
+        summary.append(f'{expt[:EXPT_COLUMN_WIDTH]:<{EXPT_COLUMN_WIDTH}s}  {status:<12s}  {ch:>13.2f}')
+    total_core_hours = sum(ch for _, _, _, ch in expts)
+    statuses = [status for _, _, status, _ in expts]
     if "ERROR" in statuses:
         total_status = "ERROR"
     elif "RUNNING" in statuses:
@@ -89,6 +72,33 @@ def print_WE2E_summary(expts_dict: dict, debug: bool = False):
     summary.append('-'*REPORT_WIDTH)
     summary.append(f'Total {" "*(EXPT_COLUMN_WIDTH - 6)}  {total_status:<12s}  {total_core_hours:>13.2f}')
 
+    expt_details = []
+    tasks = table.expt_tasks()
+    for expt, expt_dir, status, ch in expts:
+        expt_details.append('')
+        expt_details.append('-'*REPORT_WIDTH)
+        expt_details.append(f'Detailed summary of experiment {expt}')
+        expt_details.append(f"in directory {expt_dir}")
+        expt_details.append(f'{" "*TASK_COLUMN_WIDTH}| Status    | Walltime   | Core hours used')
+        expt_details.append('-'*REPORT_WIDTH)
+        for task, task_status, walltime, task_ch in tasks.get(expt, []):
+            expt_details.append(f'{task[:TASK_COLUMN_WIDTH]:<{TASK_COLUMN_WIDTH}s}  {task_status:<12s} {walltime:>10.1f}')
+            if task_ch is not None:
+                expt_details[-1] = f'{expt_details[-1]}  {task_ch:>13.2f}'
+            else:
+                expt_details[-1] = f'{expt_details[-1]}            -'
+        expt_details.append('-'*REPORT_WIDTH)
+        expt_details.append(f'Total {" "*(TASK_COLUMN_WIDTH - 6)}  {status:<12s} {" "*11} {ch:>13.2f}')
+
+    # Aggregates by type of task (task name without cycle, member and forecast hour)
+    type_details = []
+    type_details.append('-'*REPORT_WIDTH)
+    type_details.append(f'{"Task type":<{TASK_COLUMN_WIDTH}s}| Tasks | Mean walltime | Max walltime | Core hours used')
+    type_details.append('-'*REPORT_WIDTH)
+    for task_type, ntasks, mean_walltime, max_walltime, type_ch in table.type_summary():
+        type_details.append(f'{task_type[:TASK_COLUMN_WIDTH]:<{TASK_COLUMN_WIDTH}s}  {ntasks:>5d}  '\
+                            f'{mean_walltime:>13.1f}  {max_walltime:>12.1f}  {type_ch:>15.2f}')
+
     # Print summary to screen
     for line in summary:
         print(line)
@@ -101,6 +111,9 @@ def print_WE2E_summary(expts_dict: dict, debug: bool = False):
     with open(summary_file, 'w', encoding="utf-8") as f:
         for line in summary:
             f.write(f"{line}\n")
+        f.write("\nSummary by task type:\n")
+        for line in type_details:
+            f.write(f"{line}\n")
         f.write("\nDetailed summary of each experiment:\n")
         for line in expt_details:
             f.write(f"{line}\n")
@@ -154,25 +167,19 @@ def calculate_core_hours(expts_dict: dict) -> dict:
 
     for expt in expts_dict:
         # Read variable definitions file
-        vardefs_file = os.path.join(expts_dict[expt]["expt_dir"],"var_defns.sh")
-        if not os.path.isfile(vardefs_file):
+        vdf = expt_vardefs(expts_dict[expt]["expt_dir"])
+        if vdf is None:
             logging.warning(f"\nWARNING: For experiment {expt}, variable definitions file")
-            logging.warning(f"{vardefs_file}\ndoes not exist!\n\nDropping experiment from summary")
+            logging.warning(f"{os.path.join(expts_dict[expt]['expt_dir'],'var_defns.sh')}\n"\
+                            "does not exist!\n\nDropping experiment from summary")
             continue
-        logging.debug(f'Reading variable definitions file {vardefs_file}')
-        vardefs = load_shell_config(vardefs_file)
-        vdf = flatten_dict(vardefs)
         cores_per_node = vdf["NCORES_PER_NODE"]
         for task in expts_dict[expt]:
             # Skip non-task entries
             if task in ["expt_dir","status","start_time","walltime"]:
                 continue
             # Cycle is last 12 characters, task name is rest (minus separating underscore)
-            taskname = task[:-13]
-            # Handle task names that have ensemble and/or fhr info appended with regex
-            taskname = re.sub('_mem\d{3}', '', taskname)
-            taskname = re.sub('_f\d{3}', '', taskname)
-            nnodes_var = f'NNODES_{taskname.upper()}'
+            nnodes_var = f'NNODES_{task_type(task[:-13]).upper()}'
             if nnodes_var in vdf:
                 nnodes = vdf[nnodes_var]
                 # Users are charged for full use of nodes, so core hours = CPN * nodes * time in hrs
@@ -187,6 +194,199 @@ def calculate_core_hours(expts_dict: dict) -> dict:
     return expts_dict
 
 
+# Flattened variable definitions of experiments, with the modification time they were read at
+_vardefs = {}
+
+
+def expt_vardefs(expt_dir: str):
+    """Returns the flattened variable definitions of an experiment, read from its var_defns.sh
+    file (once for each version of the file), or None if that file does not exist"""
+    vardefs_file = os.path.join(expt_dir,"var_defns.sh")
+    try:
+        mtime = os.stat(vardefs_file).st_mtime
+    except OSError:
+        return None
+    if _vardefs.get(vardefs_file, (None,))[0] != mtime:
+        logging.debug(f'Reading variable definitions file {vardefs_file}')
+        _vardefs[vardefs_file] = (mtime, flatten_dict(load_shell_config(vardefs_file)))
+    return _vardefs[vardefs_file][1]
+
+
+@lru_cache(maxsize=None)
+def task_type(taskname: str) -> str:
+    """Returns the type of a task, i.e. its name (without cycle) without the ensemble member
+    and forecast hour; names are only parsed once"""
+    return re.sub('_f\\d{3}', '', re.sub('_mem\\d{3}', '', taskname))
+
+
+class TaskTable:
+    """
+    Columnar table of the tasks of experiments, kept in an in-memory sqlite database, from which
+    the summaries and exports of experiments are computed with one query each.
+
+    Args:
+        expts_dict (dict): A dictionary of experiments (with core hours, see
+                           calculate_core_hours()). See example file WE2E_tests.yaml
+    """
+
+    # Columns of the tasks, as exported
+    COLUMNS = ["experiment", "task", "task_type", "cycle", "status", "cores", "walltime",
+               "core_hours", "exact_count"]
+
+    def __init__(self, expts_dict: dict):
+        self.db = sqlite3.connect(":memory:")
+        self.db.execute("CREATE TABLE expts (experiment TEXT, expt_dir TEXT, status TEXT)")
+        self.db.execute(f"CREATE TABLE tasks ({', '.join(self.COLUMNS)})")
+        self.db.executemany("INSERT INTO expts VALUES (?, ?, ?)",
+                            [(expt, expts_dict[expt]["expt_dir"], expts_dict[expt]["status"])
+                             for expt in expts_dict])
+        self.db.executemany(f"INSERT INTO tasks VALUES ({', '.join('?'*len(self.COLUMNS))})",
+                            self._task_rows(expts_dict))
+
+    @staticmethod
+    def _task_rows(expts_dict):
+        for expt in expts_dict:
+            for task, info in expts_dict[expt].items():
+                # Skip non-task entries
+                if task in ["expt_dir","status","start_time","walltime"]:
+                    continue
+                # Cycle is last 12 characters, task name is rest (minus separating underscore)
+                yield (expt, task, task_type(task[:-13]), task[-12:], info.get("status"),
+                       info.get("cores"), info.get("walltime", 0), info.get("core_hours"),
+                       info.get("exact_count"))
+
+    def expt_summary(self) -> list:
+        """Returns the (experiment, expt_dir, status, core hours) of each experiment"""
+        return self.db.execute("""
+            SELECT expts.experiment, expt_dir, expts.status, total(core_hours) FROM expts
+            LEFT JOIN tasks ON tasks.experiment = expts.experiment
+            GROUP BY expts.rowid ORDER BY expts.rowid""").fetchall()
+
+    def expt_tasks(self) -> dict:
+        """Returns the (task, status, walltime, core hours) of the tasks, by experiment"""
+        tasks = {}
+        for row in self.db.execute("SELECT experiment, task, status, walltime, core_hours "
+                                   "FROM tasks ORDER BY rowid"):
+            tasks.setdefault(row[0], []).append(row[1:])
+        return tasks
+
+    def type_summary(self) -> list:
+        """Returns the (task type, number of tasks, mean walltime, max walltime, core hours) of
+        each type of task, in order of core hours used"""
+        return self.db.execute("""
+            SELECT task_type, count(*), avg(walltime), max(walltime), round(total(core_hours), 2)
+            FROM tasks GROUP BY task_type ORDER BY total(core_hours) DESC, task_type""").fetchall()
+
+    def write_csv(self, csv_file: str):
+        """Writes the tasks of all experiments to a CSV file, one row per task"""
+        with open(csv_file, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(self.COLUMNS)
+            writer.writerows(self.db.execute(f"SELECT {', '.join(self.COLUMNS)} FROM tasks "
+                                             "ORDER BY rowid"))
+
+    def write_json(self, json_file: str):
+        """Writes the summary of each experiment and of each type of task to a JSON file"""
+        report = {
+            "experiments": [dict(zip(["experiment", "expt_dir", "status", "core_hours"], row))
+                            for row in self.expt_summary()],
+            "task_types": [dict(zip(["task_type", "tasks", "mean_walltime", "max_walltime",
+                                     "core_hours"], row))
+                           for row in self.type_summary()],
+        }
+        with open(json_file, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+def expt_machine_grid(expt_dir: str) -> tuple:
+    """Returns the machine (in lower case) and predefined grid of an experiment, read from its
+    variable definitions file, or None if that file does not exist or does not set the machine"""
+    vdf = expt_vardefs(expt_dir)
+    if vdf is None or not vdf.get("MACHINE"):
+        return None
+    return str(vdf["MACHINE"]).lower(), str(vdf.get("PREDEF_GRID_NAME") or "")
+
+
+class RuntimeHistory:
+    """
+    Persistent history of the runtimes of the tasks of WE2E tests, kept in a sqlite database. The
+    tasks of each complete experiment are recorded by test name, machine and predefined grid,
+    and the cost of running a test again on the same machine and grid is predicted from its last
+    few runs.
+
+    Args:
+        path (str): Path of the database; it is created if it does not exist
+    """
+
+    # Number of recent runs a prediction is based on
+    RECENT_RUNS = 5
+
+    def __init__(self, path: str):
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        with self.connection:
+            self.connection.executescript("""
+                CREATE TABLE IF NOT EXISTS runs (id INTEGER PRIMARY KEY, test TEXT, machine TEXT,
+                                                 grid TEXT, recorded TEXT);
+                CREATE INDEX IF NOT EXISTS runs_key ON runs (test, machine, grid);
+                CREATE TABLE IF NOT EXISTS tasks (run INTEGER, task TEXT, cycle TEXT,
+                                                  cores INTEGER, walltime REAL, core_hours REAL);
+                CREATE INDEX IF NOT EXISTS tasks_run ON tasks (run);
+                """)
+
+    def record(self, expts_dict: dict):
+        """Records the tasks of the complete experiments of a dictionary (with core hours, see
+        calculate_core_hours())"""
+        recorded = datetime.now().strftime("%Y%m%d%H%M%S")
+        with self.connection:
+            for expt in expts_dict:
+                if expts_dict[expt]["status"] != "COMPLETE":
+                    continue
+                machine_grid = expt_machine_grid(expts_dict[expt]["expt_dir"])
+                if machine_grid is None:
+                    continue
+                run = self.connection.execute(
+                    "INSERT INTO runs (test, machine, grid, recorded) VALUES (?, ?, ?, ?)",
+                    (expt, *machine_grid, recorded)).lastrowid
+                tasks = []
+                for task in expts_dict[expt]:
+                    # Skip non-task entries
+                    if task in ["expt_dir","status","start_time","walltime"]:
+                        continue
+                    info = expts_dict[expt][task]
+                    # Cycle is last 12 characters, task name is rest (minus separating underscore)
+                    tasks.append((run, task[:-13], task[-12:], info.get("cores"),
+                                  info.get("walltime"), info.get("core_hours")))
+                self.connection.executemany("INSERT INTO tasks VALUES (?, ?, ?, ?, ?, ?)", tasks)
+        logging.debug(f"Recorded task runtimes in {self.path}")
+
+    def predict(self, test: str, machine: str, grid: str):
+        """
+        Predicts the cost of running a test from the runs recorded on the same machine and grid.
+
+        Returns:
+            dict: The mean, over recent runs, of the total walltime of the tasks in seconds (the
+                  time the experiment takes if its tasks run one after another), of the largest
+                  number of cores used by a task (cores) and of the core hours of the tasks, or
+                  None if the test was never recorded
+        """
+        row = self.connection.execute("""
+            SELECT count(*), avg(walltime), avg(cores), avg(core_hours) FROM
+                (SELECT sum(tasks.walltime) AS walltime, max(tasks.cores) AS cores,
+                        sum(tasks.core_hours) AS core_hours
+                 FROM tasks WHERE tasks.run IN
+                     (SELECT id FROM runs WHERE test = ? AND machine = ? AND grid = ?
+                      ORDER BY id DESC LIMIT ?)
+                 GROUP BY tasks.run)
+            """, (test, machine, grid, self.RECENT_RUNS)).fetchone()
+        if not row[0]:
+            return None
+        return {"walltime": row[1] or 0, "cores": int(row[2] or 0), "core_hours": row[3] or 0}
+
+    def close(self):
+        self.connection.close()
+
+
 def write_monitor_file(monitor_file: str, expts_dict: dict):
     try:
         with open(monitor_file,"w", encoding="utf-8") as f:
@@ -206,6 +406,275 @@ def write_monitor_file(monitor_file: str, expts_dict: dict):
         raise
 
 
+class RocotoDB:
+    """
+    Incremental reader of the "jobs" table of a rocoto database. Each call to changed_jobs() only
+    returns the jobs that are new or changed since the previous call, and the reader keeps counts
+    of the statuses of the tasks of the experiment it reads, so that each check of an experiment
+    costs as much as the jobs that changed rather than all the jobs of the experiment.
+
+    Readers are kept open for the life of the process; use RocotoDB.get() to get the reader of a
+    database.
+
+    Args:
+        rocoto_db (str): Path of the rocoto database
+    """
+
+    # Jobs in these states are not updated by rocotorun anymore; rocotorewind deletes them
+    FINAL_STATES = ["SUCCEEDED", "DEAD"]
+
+    _readers = {}
+
+    @classmethod
+    def get(cls, rocoto_db: str):
+        """Returns the reader of a database, opening it if needed"""
+        if rocoto_db not in cls._readers:
+            cls._readers[rocoto_db] = cls(rocoto_db)
+        return cls._readers[rocoto_db]
+
+    @classmethod
+    def discard(cls, rocoto_db: str):
+        """Closes the reader of a database (e.g. after an error reading it)"""
+        reader = cls._readers.pop(rocoto_db, None)
+        if reader is not None:
+            reader.connection.close()
+
+    def __init__(self, rocoto_db: str):
+        # Read-only, so that a database that does not exist yet is not created, and shared by
+        # the threads checking experiments in parallel (one at a time)
+        self.connection = sqlite3.connect(f"file:{rocoto_db}?mode=ro", uri=True,
+                                          check_same_thread=False)
+        # Jobs read so far, by rowid, as (taskname, cycle, state, cores, duration) tuples, their
+        # job ids, and the rowids of those that are not finished
+        self.jobs = {}
+        self.jobids = {}
+        self.pending = set()
+        self.last_rowid = 0
+        self.data_version = None
+        # Counts of the statuses of the tasks of the experiment dictionary
+        self.counts = Counter()
+
+    def _reset(self):
+        """Forgets the jobs read so far"""
+        self.jobs = {}
+        self.jobids = {}
+        self.pending = set()
+        self.last_rowid = 0
+
+    def changed_jobs(self, expt: dict) -> list:
+        """
+        Returns the jobs that are new or changed since the last call, as a list of
+        (taskname, cycle, state, cores, duration) tuples. All the jobs are returned by the
+        first call, whenever jobs were deleted or replaced in the database, and whenever the
+        experiment dictionary is not the one read so far (its tasks are then counted again).
+
+        Args:
+            expt (dict): The experiment dictionary the jobs will be stored in
+        """
+        ntasks = len(expt) - sum(key in expt for key in ["expt_dir","status","start_time","walltime"])
+        if sum(self.counts.values()) != ntasks:
+            self.counts = Counter(expt[task]["status"] for task in expt
+                                  if task not in ["expt_dir","status","start_time","walltime"])
+            self._reset()
+            self.data_version = None
+
+        cur = self.connection.cursor()
+        try:
+            # The data version only changes when another connection modifies the database
+            data_version = cur.execute("PRAGMA data_version").fetchone()[0]
+            if data_version == self.data_version:
+                return []
+            self.data_version = data_version
+
+            select = 'SELECT rowid,jobid,taskname,cycle,state,cores,duration from jobs'
+            # A job deleted by rocotorewind can be replaced by a new job with the same rowid
+            # (SQLite reuses the highest rowid), so the job ids of all the rows are compared
+            jobids = dict(cur.execute("SELECT rowid,jobid from jobs").fetchall())
+            if any(rowid not in jobids or (rowid not in self.pending and jobids[rowid] != jobid)
+                   for rowid, jobid in self.jobids.items()):
+                # Jobs were deleted or replaced; read them all again
+                self._reset()
+                return self._update(cur.execute(select).fetchall())
+
+            # New jobs, and jobs that were not finished at the last read
+            query = f'{select} where rowid > ?'
+            if self.pending:
+                query += f' or rowid in ({",".join(str(rowid) for rowid in self.pending)})'
+            return self._update(cur.execute(query, (self.last_rowid,)).fetchall())
+        finally:
+            cur.close()
+
+    def _update(self, rows: list) -> list:
+        """Stores the jobs read from the database, and returns those that changed"""
+        changed = []
+        for rowid, jobid, *job in rows:
+            job = tuple(job)
+            self.last_rowid = max(self.last_rowid, rowid)
+            self.jobids[rowid] = jobid
+            if self.jobs.get(rowid) != job:
+                self.jobs[rowid] = job
+                changed.append(job)
+            if job[2] in self.FINAL_STATES:
+                self.pending.discard(rowid)
+            else:
+                self.pending.add(rowid)
+        return changed
+
+
+class RocotoRunner:
+    """
+    Runs rocotorun for experiments in the background, in a pool of threads: at most procs
+    experiments are advanced at a time, and the caller can process each one as soon as its
+    commands are done. The runner is meant to be created once and used for the whole monitoring
+    of a set of experiments.
+
+    Args:
+        procs      (int): Maximum number of experiments advanced at the same time
+        timeout  (float): Time in seconds after which a rocotorun command is killed
+        debug     (bool): Capture the output of rocotorun and log it as debug messages
+    """
+
+    def __init__(self, procs: int = 1, timeout: float = 600, debug: bool = False):
+        self.timeout = timeout
+        self.debug = debug
+        self._executor = ThreadPoolExecutor(max_workers=procs)
+        self._futures = set()
+
+    def submit(self, expt: dict, name: str):
+        """
+        Starts advancing an experiment with rocotorun.
+
+        Args:
+            expt (dict): The experiment dictionary (see update_expt_status())
+            name  (str): Name of the experiment; used for logging only
+
+        Returns:
+            concurrent.futures.Future: Future that is done when the rocotorun commands are done
+        """
+        future = self._executor.submit(self._rocotorun, expt["expt_dir"], name)
+        self._futures.add(future)
+        future.add_done_callback(self._futures.discard)
+        return future
+
+    def _rocotorun(self, expt_dir: str, name: str):
+        rocoto_db = f"{expt_dir}/FV3LAM_wflow.db"
+        rocoto_xml = f"{expt_dir}/FV3LAM_wflow.xml"
+        rocotorun_cmd = ["rocotorun", f"-w {rocoto_xml}", f"-d {rocoto_db}"]
+        output = None
+        if self.debug:
+            rocotorun_cmd.append("-v 10")
+            output = subprocess.PIPE
+        #Run rocotorun twice to get around rocotobqserver proliferation issue
+        for _ in range(2):
+            try:
+                p = subprocess.run(rocotorun_cmd, stdout=output,
+                                   stderr=subprocess.STDOUT if output else None,
+                                   timeout=self.timeout, check=False)
+            except subprocess.TimeoutExpired:
+                logging.warning(f"rocotorun did not finish in {self.timeout} seconds for "\
+                                f"experiment {name}; will try again at its next check")
+                return
+            if p.stdout:
+                logging.debug(p.stdout.decode(errors="replace"))
+
+    def close(self):
+        """Stops the runner: experiments not started yet are not advanced, and the rocotorun
+        commands still running are waited for."""
+        for future in list(self._futures):
+            future.cancel()
+        self._executor.shutdown()
+
+
+def journal_file(monitor_file: str) -> str:
+    """Returns the path of the journal of a monitor file (see MonitorJournal)"""
+    return f"{monitor_file}.journal"
+
+
+def load_monitor_file(monitor_file: str) -> dict:
+    """
+    Reads a monitor file written by monitor_jobs(), applying the changes recorded in its journal
+    (see MonitorJournal) if monitoring stopped before writing them to the monitor file.
+
+    Args:
+        monitor_file (str): Path of the monitor file
+
+    Returns:
+        dict: The experiments dictionary
+    """
+    expts_dict = load_config_file(monitor_file)
+    journal = journal_file(monitor_file)
+    if os.path.isfile(journal):
+        logging.info(f"Applying changes recorded in {journal}")
+        with open(journal, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # The last line may have been cut off by a crash
+                    logging.warning(f"Skipping incomplete record of journal {journal}")
+                    break
+                expts_dict.setdefault(record["expt"], {}).update(record["changes"])
+    return expts_dict
+
+
+class MonitorJournal:
+    """
+    Journal of the changes made by monitor_jobs() to the experiments dictionary. Rather than
+    writing the whole dictionary to the monitor file after each check, the entries of the
+    experiments that changed are appended to the journal (the monitor file with ".journal"
+    appended to its name) as lines of JSON. The journal is compacted (the monitor file is written
+    and the journal emptied) every compact_interval seconds, and when monitoring stops. Monitoring
+    can be resumed from the monitor file and the journal after a crash, see load_monitor_file().
+
+    Args:
+        monitor_file      (str): Path of the monitor file
+        expts_dict       (dict): The experiments dictionary
+        compact_interval (float): Time in seconds between compactions of the journal
+    """
+
+    def __init__(self, monitor_file: str, expts_dict: dict, compact_interval: float = 600):
+        self.monitor_file = monitor_file
+        self.path = journal_file(monitor_file)
+        self.compact_interval = compact_interval
+        self._file = None
+        self._compacted = None
+        # The entries of each experiment as last recorded
+        self._recorded = {}
+        self.compact(expts_dict)
+
+    def record(self, expts_dict: dict, expts: list):
+        """Records the changes to the entries of some experiments of the dictionary"""
+        lines = []
+        for expt in expts:
+            recorded = self._recorded.setdefault(expt, {})
+            changes = {key: value for key, value in expts_dict[expt].items()
+                       if recorded.get(key) != value}
+            if changes:
+                # Entries are updated in place by update_expt_status(), so copies are recorded
+                recorded.update(copy.deepcopy(changes))
+                lines.append(json.dumps({"expt": expt, "changes": changes}) + "\n")
+        if lines:
+            self._file.writelines(lines)
+            self._file.flush()
+        if time.monotonic() - self._compacted > self.compact_interval:
+            self.compact(expts_dict)
+
+    def compact(self, expts_dict: dict):
+        """Writes the whole dictionary to the monitor file and empties the journal"""
+        write_monitor_file(self.monitor_file, expts_dict)
+        self._recorded = copy.deepcopy(expts_dict)
+        if self._file is not None:
+            self._file.close()
+        self._file = open(self.path, "w", encoding="utf-8")  # pylint: disable=consider-using-with
+        self._compacted = time.monotonic()
+
+    def close(self, expts_dict: dict):
+        """Writes the whole dictionary to the monitor file and removes the journal"""
+        write_monitor_file(self.monitor_file, expts_dict)
+        self._file.close()
+        os.remove(self.path)
+
+
 def update_expt_status(expt: dict, name: str, refresh: bool = False, debug: bool = False,
                        submit: bool = True) -> dict:
     """
@@ -288,11 +757,12 @@ def update_expt_status(expt: dict, name: str, refresh: bool = False, debug: bool
     logging.debug(f"Reading database for experiment {name}, updating experiment dictionary")
     try:
         # This section of code queries the "job" table of the rocoto database, returning a list
-        # of tuples containing the taskname, cycle, and state of each job respectively
-        with closing(sqlite3.connect(rocoto_db)) as connection:
-            with closing(connection.cursor()) as cur:
-                db = cur.execute('SELECT taskname,cycle,state,cores,duration from jobs').fetchall()
+        # of tuples containing the taskname, cycle, state, cores and duration of each job that
+        # changed since the last time the database was read
+        reader = RocotoDB.get(rocoto_db)
+        db = reader.changed_jobs(expt)
     except:
+        RocotoDB.discard(rocoto_db)
         # Some platforms (including Hera) can have a problem with rocoto jobs not submitting
         # properly due to build-ups of background processes. This will resolve over time as
         # rocotorun continues to be called, so let's only treat this as an error if we are
@@ -303,6 +773,8 @@ def update_expt_status(expt: dict, name: str, refresh: bool = False, debug: bool
 
         return expt
 
+    # The statuses of the tasks are counted as they change
+    counts = reader.counts
     for task in db:
         # For each entry from rocoto database, store that task's info under a dictionary key named
         # TASKNAME_CYCLE; Cycle comes from the database in Unix Time (seconds), so convert to
@@ -310,16 +782,14 @@ def update_expt_status(expt: dict, name: str, refresh: bool = False, debug: bool
         cycle = datetime.utcfromtimestamp(task[1]).strftime('%Y%m%d%H%M')
         if f"{task[0]}_{cycle}" not in expt:
             expt[f"{task[0]}_{cycle}"] = dict()
+        else:
+            counts[expt[f"{task[0]}_{cycle}"]["status"]] -= 1
         expt[f"{task[0]}_{cycle}"]["status"] = task[2]
         expt[f"{task[0]}_{cycle}"]["cores"] = task[3]
         expt[f"{task[0]}_{cycle}"]["walltime"] = task[4]
+        counts[task[2]] += 1
 
-    statuses = list()
-    for task in expt:
-        # Skip non-task entries
-        if task in ["expt_dir","status","start_time","walltime"]:
-            continue
-        statuses.append(expt[task]["status"])
+    statuses = [status for status, count in counts.items() if count > 0]
 
     if "DEAD" in statuses:
         still_live = ["RUNNING", "SUBMITTING", "QUEUED", "FAILED"]
@@ -373,45 +843,6 @@ def update_expt_status(expt: dict, name: str, refresh: bool = False, debug: bool
 
     return expt
 
-def update_expt_status_parallel(expts_dict: dict, procs: int, refresh: bool = False,
-                                debug: bool = False) -> dict:
-    """
-    This function updates an entire set of experiments in parallel, drastically speeding up
-    the process if given enough parallel processes. Given a dictionary of experiments, it will
-    pass each individual experiment dictionary to update_expt_status() to be updated, making use
-    of the python multiprocessing starmap functionality to achieve this in parallel
-
-    Args:
-        expts_dict (dict): A dictionary containing information for all experiments
-        procs       (int): The number of parallel processes
-        refresh    (bool): "Refresh" flag to pass to update_expt_status()
-        debug      (bool): Will capture all output from rocotorun. This will allow information such
-                           as job cards and job submit messages to appear in the log files, but can
-                           slow down the process drastically.
-
-    Returns:
-        dict: The updated dictionary of experiment dictionaries
-    """
-
-    args = []
-    # Define a tuple of arguments to pass to starmap
-    for expt in expts_dict:
-        args.append( (expts_dict[expt],expt,refresh,debug) )
-
-    # call update_expt_status() in parallel
-    with Pool(processes=procs) as pool:
-        output = pool.starmap(update_expt_status, args)
-
-    # Update dictionary with output from all calls to update_expt_status()
-    i = 0
-    for expt in expts_dict:
-        expts_dict[expt] = output[i]
-        i += 1
-
-    return expts_dict
-
-
-
 def print_test_info(txtfile: str = "WE2E_test_info.txt") -> None:
     """Prints a pipe ( | ) delimited text file containing summaries of each test defined by a
     config file in test_configs/*
@@ -507,21 +938,100 @@ def print_test_info(txtfile: str = "WE2E_test_info.txt") -> None:
             f.write("\n")
 
 
-def compare_rocotostat(expt_dict,name):
-    """Reads the dictionary showing the location of a given experiment, runs a `rocotostat` command
-    to get the full set of tasks for the experiment, and compares the two to see if there are any
-    unsubmitted tasks remaining.
+def _cycles(cycledef: str) -> list:
+    """Returns the cycles of a rocoto cycledef of the form "start end interval", as
+    YYYYMMDDHHmm strings. Raises ValueError for other forms (e.g. crontab-like cycledefs)."""
+    start, end, interval = cycledef.split()
+    # Intervals are [[[dd:]hh:]mm:]ss
+    parts = [int(part) for part in interval.split(":")]
+    days, hours, minutes, seconds = [0] * (4 - len(parts)) + parts
+    step = timedelta(days=days, hours=hours, minutes=minutes, seconds=seconds)
+    cycle = datetime.strptime(start, "%Y%m%d%H%M")
+    end = datetime.strptime(end, "%Y%m%d%H%M")
+    if step <= timedelta(0):
+        raise ValueError(f"Invalid cycledef interval {interval}")
+    cycles = []
+    while cycle <= end:
+        cycles.append(cycle.strftime("%Y%m%d%H%M"))
+        cycle += step
+    return cycles
+
+
+def _expand_tasks(element, variables: dict, tasks: list) -> None:
+    """Appends the (name, cycledefs) of the tasks of a workflow or metatask element to tasks,
+    expanding metatasks with the values of their variables"""
+    def substitute(text):
+        for var, value in variables.items():
+            text = text.replace(f"#{var}#", value)
+        return text
+
+    for child in element:
+        if child.tag == "task":
+            cycledefs = child.get("cycledefs")
+            tasks.append((substitute(child.get("name")),
+                          substitute(cycledefs) if cycledefs is not None else None))
+        elif child.tag == "metatask":
+            values = {var.get("name"): substitute(var.text or "").split()
+                      for var in child.findall("var")}
+            for i in range(min(len(v) for v in values.values()) if values else 0):
+                _expand_tasks(child, {**variables, **{var: v[i] for var, v in values.items()}},
+                              tasks)
+
+
+_expected_tasks = {}
+
+def expected_tasks(rocoto_xml: str):
+    """
+    Returns all the tasks of a rocoto workflow, for all its cycles, as a set of TASKNAME_CYCLE
+    names (as used in the experiment dictionary, see update_expt_status()). The tasks are found
+    by expanding the metatasks and cycledefs of the workflow XML file, and are cached as long as
+    the file is not modified.
+
+    Args:
+        rocoto_xml (str): Path of the workflow XML file
+
+    Returns:
+        set: The names of the tasks, or None if the file could not be expanded (e.g. it has
+             crontab-like cycledefs)
     """
+    try:
+        mtime = os.path.getmtime(rocoto_xml)
+        if _expected_tasks.get(rocoto_xml, (None,))[0] == mtime:
+            return _expected_tasks[rocoto_xml][1]
+        # Entities declared in the XML file are expanded by the parser
+        workflow = ET.parse(rocoto_xml).getroot()
+        groups = {}
+        for cycledef in workflow.findall("cycledef"):
+            groups.setdefault(cycledef.get("group"), []).extend(_cycles(cycledef.text))
+        tasks = []
+        _expand_tasks(workflow, {}, tasks)
+    except (OSError, ET.ParseError, ValueError) as e:
+        logging.debug(f"Could not expand tasks of workflow {rocoto_xml}: {e}")
+        return None
+
+    all_cycles = sorted({cycle for cycles in groups.values() for cycle in cycles})
+    names = set()
+    for task, cycledefs in tasks:
+        if cycledefs is None:
+            cycles = all_cycles
+        else:
+            cycles = [cycle for group in cycledefs.split(",") for cycle in groups.get(group, [])]
+        names.update(f"{task}_{cycle}" for cycle in cycles)
+    _expected_tasks[rocoto_xml] = (mtime, names)
+    return names
+
+
+def rocotostat_tasks(rocoto_xml: str, rocoto_db: str) -> set:
+    """Returns all the tasks of a rocoto workflow, for all its cycles, as listed by rocotostat,
+    as a set of TASKNAME_CYCLE names"""
 
     # Call rocotostat and store output
-    rocoto_db = f"{expt_dict['expt_dir']}/FV3LAM_wflow.db"
-    rocoto_xml = f"{expt_dict['expt_dir']}/FV3LAM_wflow.xml"
     rocotorun_cmd = ["rocotostat", f"-w {rocoto_xml}", f"-d {rocoto_db}", "-v 10"]
     p = subprocess.run(rocotorun_cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
     rsout = p.stdout
 
     # Parse each line of rocotostat output, extracting relevant information
-    untracked_tasks = []
+    tasks = set()
     for line in rsout.split('\n'):
         # Skip blank lines and dividing lines of '=====...'
         if not line:
@@ -537,14 +1047,25 @@ def compare_rocotostat(expt_dict,name):
 
         # As defined in update_expt_status(), the "task names" in the dictionary are a combination
         # of the task name and cycle
-        taskname = f'{line_array[1]}_{line_array[0]}'
+        tasks.add(f'{line_array[1]}_{line_array[0]}')
+    return tasks
 
-        # If we're already tracking this task, continue
-        if expt_dict.get(taskname):
-            continue
 
-        # Otherwise, extract information into dictionary of untracked tasks
-        untracked_tasks.append(taskname)
+def compare_rocotostat(expt_dict,name):
+    """Reads the dictionary showing the location of a given experiment, gets the full set of tasks
+    for the experiment from its workflow XML file (see expected_tasks(), or from a `rocotostat`
+    command if the XML file can not be expanded), and compares the two to see if there are any
+    unsubmitted tasks remaining.
+    """
+
+    rocoto_db = f"{expt_dict['expt_dir']}/FV3LAM_wflow.db"
+    rocoto_xml = f"{expt_dict['expt_dir']}/FV3LAM_wflow.xml"
+    tasks = expected_tasks(rocoto_xml)
+    if tasks is None:
+        tasks = rocotostat_tasks(rocoto_xml, rocoto_db)
+
+    # Tasks we are not tracking yet
+    untracked_tasks = sorted(task for task in tasks if not expt_dict.get(task))
 
     if untracked_tasks:
         # We want to give this a couple loops before reporting that it is "stuck"
@@ -0,0 +1,142 @@
+""" Tests for the monitoring utilities of tests/WE2E/utils.py """
+
+#pylint: disable=invalid-name
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import unittest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "WE2E"))
+
+# pylint: disable=wrong-import-position
+from utils import (
+    MonitorJournal,
+    RocotoDB,
+    expected_tasks,
+    journal_file,
+    load_monitor_file,
+    update_expt_status,
+)
+
+WORKFLOW_XML = """<?xml version="1.0"?>
+<!DOCTYPE workflow [
+<!ENTITY TASK_PREFIX "run">
+]>
+<workflow realtime="F" scheduler="slurm">
+  <cycledef group="forecast">202206150000 202206150600 06:00:00</cycledef>
+  <cycledef group="initial">202206150000 202206150000 24:00:00</cycledef>
+  <task name="make_grid" cycledefs="initial"/>
+  <task name="&TASK_PREFIX;_fcst"/>
+  <metatask name="post">
+    <var name="mem">001 002</var>
+    <metatask name="post_mem#mem#">
+      <var name="fhr">000 001</var>
+      <task name="run_post_mem#mem#_f#fhr#" cycledefs="forecast"/>
+    </metatask>
+  </metatask>
+</workflow>
+"""
+
+
+class Testing(unittest.TestCase):
+    """ Define the tests. """
+
+    def test_expected_tasks(self):
+        """ Test the expansion of the tasks and cycles of a workflow """
+        tasks = expected_tasks(self.xml)
+        self.assertEqual(
+            tasks,
+            {"make_grid_202206150000", "run_fcst_202206150000", "run_fcst_202206150600"}
+            | {f"run_post_mem{mem}_f{fhr}_{cycle}" for mem in ["001", "002"]
+               for fhr in ["000", "001"] for cycle in ["202206150000", "202206150600"]},
+        )
+
+        # Crontab-like cycledefs can not be expanded
+        with open(self.xml, "w", encoding="utf-8") as f:
+            f.write(WORKFLOW_XML.replace("202206150000 202206150000 24:00:00",
+                                         "00 00 15 06 2022 *"))
+        os.utime(self.xml, (0, 0))
+        self.assertIsNone(expected_tasks(self.xml))
+
+    def test_rocoto_db(self):
+        """ Test that the jobs read from the rocoto database follow its changes, including
+        jobs replaced with the same rowid """
+        expt = {"expt_dir": self.tmp_dir.name, "status": "CREATED"}
+
+        def check():
+            return update_expt_status(expt, "expt", submit=False)["status"]
+
+        self.insert(1, "make_grid", "SUCCEEDED")
+        self.insert(2, "run_fcst", "RUNNING")
+        self.assertEqual(check(), "RUNNING")
+        self.assertEqual(check(), "RUNNING")
+        self.db.execute("UPDATE jobs SET state='SUCCEEDED', duration=60 WHERE id=2")
+        self.db.commit()
+        self.assertEqual(check(), "STALLED")
+        self.assertEqual(expt["run_fcst_202206150000"]["walltime"], 60)
+
+        # rocotorewind deletes the job, which is rerun with the same rowid
+        self.db.execute("DELETE FROM jobs WHERE id=2")
+        self.insert(2, "run_fcst", "DEAD", jobid=102)
+        self.assertEqual(check(), "DEAD")
+
+        # A deleted job is noticed too
+        reader = RocotoDB.get(self.rocoto_db)
+        self.db.execute("DELETE FROM jobs WHERE id=2")
+        self.db.commit()
+        self.assertEqual(reader.changed_jobs(expt),
+                         [("make_grid", 1655251200, "SUCCEEDED", 1, 10)])
+        self.assertEqual(reader.changed_jobs(expt), [])
+
+    def test_monitor_journal(self):
+        """ Test that changes recorded in the journal are applied when reading the monitor
+        file """
+        monitor_file = os.path.join(self.tmp_dir.name, "monitor.yaml")
+        expts_dict = {"expt": {"expt_dir": self.tmp_dir.name, "status": "CREATED"}}
+        journal = MonitorJournal(monitor_file, expts_dict)
+        expts_dict["expt"]["status"] = "RUNNING"
+        expts_dict["expt"]["make_grid_202206150000"] = {"status": "SUCCEEDED", "cores": 1,
+                                                       "walltime": 10}
+        journal.record(expts_dict, ["expt"])
+        expts_dict["expt"]["status"] = "DEAD"
+        journal.record(expts_dict, ["expt"])
+
+        # As if the monitoring stopped while writing a record
+        with open(journal_file(monitor_file), "a", encoding="utf-8") as f:
+            f.write(json.dumps({"expt": "expt", "changes": {"status": "COMPLETE"}})[:20])
+        self.assertEqual(load_monitor_file(monitor_file), expts_dict)
+
+        journal.close(expts_dict)
+        self.assertFalse(os.path.exists(journal_file(monitor_file)))
+        self.assertEqual(load_monitor_file(monitor_file), expts_dict)
+
+    def insert(self, rowid, taskname, state, jobid=None):
+        """ Adds a job to the rocoto database """
+        self.db.execute(
+            "INSERT INTO jobs (id, jobid, taskname, cycle, cores, state, tries, duration)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (rowid, jobid or rowid, taskname, 1655251200, 1, state, 1, 10),
+        )
+        self.db.commit()
+
+    def setUp(self):
+        # pylint: disable=consider-using-with
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.xml = os.path.join(self.tmp_dir.name, "FV3LAM_wflow.xml")
+        with open(self.xml, "w", encoding="utf-8") as f:
+            f.write(WORKFLOW_XML)
+        self.rocoto_db = os.path.join(self.tmp_dir.name, "FV3LAM_wflow.db")
+        self.db = sqlite3.connect(self.rocoto_db)
+        self.db.execute(
+            "CREATE TABLE jobs (id INTEGER PRIMARY KEY, jobid VARCHAR(64), taskname VARCHAR(64),"
+            " cycle DATETIME, cores INTEGER, state VARCHAR(64), native_state VARCHAR(64),"
+            " exit_status INTEGER, tries INTEGER, nunknowns INTEGER, duration REAL)"
+        )
+        self.db.commit()
+
+    def tearDown(self):
+        RocotoDB.discard(self.rocoto_db)
+        self.db.close()
+        self.tmp_dir.cleanup()
@@ -0,0 +1,92 @@
+""" Tests for plot_utils/basemap.py """
+
+#pylint: disable=invalid-name
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import matplotlib
+
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt  # pylint: disable=wrong-import-position
+
+from plot_utils import (  # pylint: disable=wrong-import-position
+    background_key,
+    load_background,
+    render_background,
+    save_background,
+    set_background,
+)
+
+
+class Testing(unittest.TestCase):
+    """ Define the tests. """
+
+    def make_map(self):
+        """ Make a figure with a "map" drawn on its axes """
+        fig = plt.figure(figsize=(4, 3))
+        ax = fig.add_axes([0.1, 0.1, 0.8, 0.8])
+        ax.set_xlim(0, 10)
+        ax.set_ylim(0, 5)
+        ax.set_axis_off()
+        self.addCleanup(plt.close, fig)
+        return fig, ax
+
+    def test_background(self):
+        """ Test that a cached background looks like the map it was drawn
+        from """
+        fig, ax = self.make_map()
+        fill = ax.fill_between([2, 6], 1, 4, color="red")
+        line = ax.plot([0, 10], [0, 5], color="blue", linewidth=3)[0]
+        expected = render_background(fig, ax, 50)
+        self.assertEqual(expected.shape, (120, 160, 4))
+        self.assertEqual(expected.dtype, np.uint8)
+
+        line.set_visible(False)
+        image = render_background(fig, ax, 50)
+        line.set_visible(True)
+        fill.set_visible(False)
+        features = render_background(fig, ax, 50, transparent=True)
+        # Only the line is opaque
+        self.assertEqual(features[0, 0, 3], 0)
+        self.assertGreater(features[60, 80, 3], 0)
+        self.assertTrue(fig.patch.get_visible())
+
+        key = background_key(fig, ax, [0, 10, 0, 5], 50)
+        self.assertIsNone(load_background(self.tmp_dir.name, key))
+        save_background(self.tmp_dir.name, key, {"image": image, "features": features})
+        self.assertEqual(os.listdir(self.tmp_dir.name), [f"background_{key}.npz"])
+        cached = load_background(self.tmp_dir.name, key)
+        np.testing.assert_array_equal(cached["image"], image)
+        np.testing.assert_array_equal(cached["features"], features)
+
+        # The key depends on the map and the resolution
+        self.assertEqual(key, background_key(fig, ax, [0, 10, 0, 5], 50))
+        self.assertNotEqual(key, background_key(fig, ax, [0, 10, 0, 5], 100))
+        self.assertNotEqual(key, background_key(fig, ax, [0, 10, 0, 6], 50))
+        self.assertNotEqual(key, background_key(fig, ax, [0, 10, 0, 5], 50, ["50m"]))
+
+        # No cache
+        self.assertIsNone(load_background(None, key))
+        save_background(None, key, cached)
+
+        # Drawing the cached images gives the same map
+        fig2, ax2 = self.make_map()
+        set_background(ax2, cached)
+        self.assertEqual(ax2.get_xlim(), (0, 10))
+        self.assertEqual(ax2.get_ylim(), (0, 5))
+        redrawn = render_background(fig2, ax2, 50)
+        self.assertEqual(redrawn.shape, expected.shape)
+        differ = np.abs(redrawn.astype(int) - expected.astype(int)).max(axis=-1) > 0
+        self.assertLess(differ.mean(), 0.01)
+
+    def setUp(self):
+        # pylint: disable=consider-using-with
+        self.tmp_dir = tempfile.TemporaryDirectory(
+            dir=os.path.dirname(os.path.abspath(__file__)),
+            prefix="basemap",
+            )
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
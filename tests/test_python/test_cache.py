@@ -0,0 +1,43 @@
+""" Tests for plot_utils/cache.py """
+
+#pylint: disable=invalid-name
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from plot_utils import save_arrays
+
+
+class Testing(unittest.TestCase):
+    """ Define the tests. """
+
+    def test_save_arrays(self):
+        """ Test that arrays are saved to a new directory, and that no temporary file is
+        left behind when saving fails """
+        path = os.path.join(self.tmp_dir.name, "cache", "arrays.npz")
+        save_arrays(path, {"a": np.arange(3), "b": np.float64(1.5)})
+        self.assertEqual(os.listdir(os.path.dirname(path)), ["arrays.npz"])
+        with np.load(path) as arrays:
+            np.testing.assert_array_equal(arrays["a"], np.arange(3))
+            self.assertEqual(arrays["b"].item(), 1.5)
+
+        class Unsaveable:
+            """ An object that can not be pickled """
+            def __reduce__(self):
+                raise OSError("No space left on device")
+
+        with self.assertRaises(OSError):
+            save_arrays(path, {"a": np.array([Unsaveable()], dtype=object)})
+        self.assertEqual(os.listdir(os.path.dirname(path)), ["arrays.npz"])
+
+    def setUp(self):
+        # pylint: disable=consider-using-with
+        self.tmp_dir = tempfile.TemporaryDirectory(
+            dir=os.path.dirname(os.path.abspath(__file__)),
+            prefix="cache",
+            )
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
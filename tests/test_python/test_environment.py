@@ -0,0 +1,110 @@
+""" Tests for the string conversion layer in python_utils/environment.py """
+
+#pylint: disable=invalid-name
+import configparser
+import copy
+import os
+import tempfile
+import time
+import unittest
+from datetime import datetime
+
+from python_utils import (
+    cfg_to_shell_str,
+    load_config_file,
+    load_shell_config,
+    str_to_list,
+    str_to_type,
+    strs_to_types,
+)
+from python_utils import environment
+
+
+class Testing(unittest.TestCase):
+    """ Define the tests. """
+
+    def test_str_to_type(self):
+        """ Test that strings are classified as the expected type """
+        self.assertIs(str_to_type("TRUE"), True)
+        self.assertIs(str_to_type("nope"), False)
+        self.assertIsNone(str_to_type("null"))
+        self.assertEqual(str_to_type("2023010112"), datetime(2023, 1, 1, 12))
+        self.assertEqual(str_to_type("2023010112", return_string=2), "2023010112")
+        # Not a valid date, so an integer
+        self.assertEqual(str_to_type("20231301"), 20231301)
+        self.assertEqual(str_to_type("-42"), -42)
+        self.assertEqual(str_to_type("042"), "042")
+        self.assertEqual(str_to_type("'1.5e3'"), 1500.0)
+        self.assertEqual(str_to_type("inf"), float("inf"))
+        self.assertEqual(str_to_type("1.0.0"), "1.0.0")
+        self.assertEqual(str_to_type("TRUE", return_string=1), "TRUE")
+
+    def test_str_to_list(self):
+        """ Test that arrays are converted in bulk and that cached results
+        are not shared between callers """
+        v = str_to_list('( \\\n"1" \\\n"a b" \\\n\'FALSE\' \\\n)')
+        self.assertEqual(v, [1, "a b", False])
+        v.append("spam")
+        self.assertEqual(str_to_list('( \\\n"1" \\\n"a b" \\\n\'FALSE\' \\\n)'),
+                         [1, "a b", False])
+        # Adjacent quoted pieces and escapes fall back to shlex
+        self.assertEqual(str_to_list('( a"b" c\\ d )'), ["ab", "c d"])
+        self.assertEqual(str_to_list('( "a\\\\b" )'), ["a\\b"])
+        self.assertEqual(str_to_list("( [0]=hello [1]=2 )"), ["hello", 2])
+        self.assertEqual(strs_to_types(["1", "", "[2]=x"]), [1, "x"])
+
+    def test_var_defns_cache(self):
+        """ Test that loading a full var_defns file gives the same result
+        with cold and warm conversion caches """
+
+        cfg = copy.deepcopy(self.cfg)
+        with tempfile.TemporaryDirectory(
+            dir=os.path.dirname(os.path.abspath(__file__)),
+            prefix="var_defns_cache",
+        ) as tmp_dir:
+            var_defns = os.path.join(tmp_dir, "var_defns.sh")
+            with open(var_defns, "w", encoding="utf-8") as f:
+                f.write(cfg_to_shell_str(cfg))
+
+            environment._str_to_type.cache_clear()
+            environment._str_to_list.cache_clear()
+            cold_cfg = load_shell_config(var_defns)
+            misses = environment._str_to_list.cache_info().misses
+            self.assertEqual(load_shell_config(var_defns), cold_cfg)
+            # The second load only hits the cache
+            self.assertEqual(environment._str_to_list.cache_info().misses, misses)
+
+    def test_var_defns_benchmark(self):
+        """ Time the conversion of all the values of a full var_defns file,
+        with cold and warm conversion caches """
+
+        # The values as load_shell_config() reads them, before conversion
+        config = configparser.RawConfigParser()
+        config.optionxform = str
+        config.read_string(
+            cfg_to_shell_str(self.cfg).replace("# [", "[").replace("\\\n", " ")
+        )
+        values = [v for section in config.sections() for _, v in config.items(section)]
+        self.assertGreater(len(values), 100)
+
+        def convert():
+            start = time.perf_counter()
+            converted = [str_to_list(v) for v in values]
+            return time.perf_counter() - start, converted
+
+        cold = warm = float("inf")
+        for _ in range(5):
+            environment._str_to_type.cache_clear()
+            environment._str_to_list.cache_clear()
+            cold_time, cold_values = convert()
+            warm_time, warm_values = convert()
+            self.assertEqual(warm_values, cold_values)
+            cold = min(cold, cold_time)
+            warm = min(warm, warm_time)
+        self.assertLess(warm, cold)
+
+    def setUp(self):
+        test_dir = os.path.dirname(os.path.abspath(__file__))
+        ushdir = os.path.join(test_dir, "..", "..", "ush")
+        self.cfg = load_config_file(os.path.join(ushdir, "config_defaults.yaml"))
+        del self.cfg["rocoto"]
@@ -0,0 +1,26 @@
+""" Tests for plot_utils/fields.py """
+
+#pylint: disable=invalid-name
+import unittest
+
+from plot_utils import PRODUCT_FIELDS, plot_fields
+
+
+class Testing(unittest.TestCase):
+    """ Define the tests. """
+
+    def test_plot_fields(self):
+        """ Test the selection of the fields of products """
+        fields = plot_fields(1)
+        self.assertEqual(
+            set(fields), {name for names in PRODUCT_FIELDS.values() for name in names}
+        )
+        self.assertNotIn("maxuh25", plot_fields(0))
+
+        fields = plot_fields(1, ["refc", "qpf"])
+        self.assertEqual(set(fields), {"refc", "qpf"})
+        self.assertEqual(fields["qpf"]["lengthOfTimeRange"], 1)
+        self.assertEqual(set(plot_fields(0, ["uh25", "10mwind"])), {"u10m", "v10m"})
+
+        with self.assertRaises(ValueError):
+            plot_fields(1, ["refc", "radar"])
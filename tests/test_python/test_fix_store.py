@@ -0,0 +1,81 @@
+""" Tests for fix_store.py """
+
+#pylint: disable=invalid-name
+import errno
+import io
+import json
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from unittest import mock
+
+from fix_store import MANIFEST_FN, populate_from_fix_store
+
+
+class Testing(unittest.TestCase):
+    """ Define the tests. """
+
+    def test_populate_from_fix_store(self):
+        """ Test that files with the same content are stored once and that
+        a second experiment only links them """
+
+        files = [
+            (os.path.join(self.fixgsm, "a.txt"), os.path.join(self.expt1, "a.txt")),
+            (os.path.join(self.fixgsm, "sub", "b.txt"),
+             os.path.join(self.expt1, "sub", "b.txt")),
+            (os.path.join(self.fixgsm, "*.dat"), self.expt1),
+        ]
+        counts = populate_from_fix_store(self.store, files)
+        self.assertEqual(sum(counts.values()), 3)
+        self.assertEqual(counts["hardlink"], 3)
+
+        # a.txt and c.dat have the same content
+        a = os.stat(os.path.join(self.expt1, "a.txt"))
+        c = os.stat(os.path.join(self.expt1, "c.dat"))
+        self.assertEqual(a.st_ino, c.st_ino)
+        self.assertEqual(a.st_nlink, 3)
+
+        with open(os.path.join(self.store, MANIFEST_FN), encoding="utf-8") as f:
+            manifest = json.load(f)
+        self.assertEqual(len(manifest), 3)
+        self.assertEqual(len(set(manifest.values())), 2)
+
+        # A second experiment reuses the stored objects
+        files = [(src, dst.replace(self.expt1, self.expt2)) for src, dst in files]
+        populate_from_fix_store(self.store, files)
+        with open(os.path.join(self.expt2, "sub", "b.txt"), encoding="utf-8") as f:
+            self.assertEqual(f.read(), "bbb")
+        self.assertEqual(os.stat(os.path.join(self.expt2, "a.txt")).st_nlink, 5)
+
+    def test_copy_warning(self):
+        """ Test that files that can not be hard linked are copied, with a
+        warning """
+        files = [(os.path.join(self.fixgsm, "a.txt"), os.path.join(self.expt1, "a.txt"))]
+        out = io.StringIO()
+        with mock.patch("os.link", side_effect=OSError(errno.EPERM, "denied")), \
+                mock.patch("fcntl.ioctl", side_effect=OSError(errno.EOPNOTSUPP, "no")), \
+                redirect_stdout(out):
+            counts = populate_from_fix_store(self.store, files)
+        self.assertEqual(counts["copy"], 1)
+        self.assertIn("1 fix files could not be hard linked", out.getvalue())
+        with open(os.path.join(self.expt1, "a.txt"), encoding="utf-8") as f:
+            self.assertEqual(f.read(), "aaa")
+
+    def setUp(self):
+        # pylint: disable=consider-using-with
+        self.tmp_dir = tempfile.TemporaryDirectory(
+            dir=os.path.dirname(os.path.abspath(__file__)),
+            prefix="fix_store",
+            )
+        self.fixgsm = os.path.join(self.tmp_dir.name, "fix_am")
+        self.store = os.path.join(self.tmp_dir.name, "store")
+        self.expt1 = os.path.join(self.tmp_dir.name, "expt1")
+        self.expt2 = os.path.join(self.tmp_dir.name, "expt2")
+        os.makedirs(os.path.join(self.fixgsm, "sub"))
+        for fn, content in [("a.txt", "aaa"), ("sub/b.txt", "bbb"), ("c.dat", "aaa")]:
+            with open(os.path.join(self.fixgsm, fn), "w", encoding="utf-8") as f:
+                f.write(content)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
@@ -0,0 +1,83 @@
+""" Tests for plot_utils/follow.py """
+
+#pylint: disable=invalid-name
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+from plot_utils import follow
+from plot_utils import file_complete, follow_files
+
+
+class Testing(unittest.TestCase):
+    """ Define the tests. """
+
+    def write(self, name, age=0.0):
+        """ Write a file last modified age seconds ago """
+        path = os.path.join(self.tmp_dir.name, name)
+        with open(path, "wb") as f:
+            f.write(b"GRIB")
+        if age:
+            mtime = time.time() - age
+            os.utime(path, (mtime, mtime))
+        return path
+
+    def test_file_complete(self):
+        """ Test the checks of complete files """
+        path = os.path.join(self.tmp_dir.name, "f001.grib2")
+        self.assertFalse(file_complete(path))
+
+        self.write("f001.grib2")
+        self.assertFalse(file_complete(path, stable=30.0))
+        self.assertTrue(file_complete(path, stable=30.0, written={path}))
+        self.write("f001.grib2.idx")
+        self.assertTrue(file_complete(path, stable=30.0))
+
+        self.write("f002.grib2", age=60.0)
+        self.assertTrue(file_complete(os.path.join(self.tmp_dir.name, "f002.grib2"), stable=30.0))
+
+        # Empty files are not complete
+        path = os.path.join(self.tmp_dir.name, "f003.grib2")
+        open(path, "wb").close()  # pylint: disable=consider-using-with
+        self.assertFalse(file_complete(path, stable=0.0))
+
+    def test_follow_files(self):
+        """ Test that files are yielded as they are written """
+        for inotify in (follow.inotify_simple, None):
+            with self.subTest(inotify=inotify is not None):
+                follow.inotify_simple = inotify
+                old = self.write("old.grib2", age=60.0)
+                new = os.path.join(self.tmp_dir.name, "new.grib2")
+                writer = threading.Timer(0.2, self.write, ("new.grib2",))
+                writer.start()
+                self.addCleanup(writer.cancel)
+                start = time.monotonic()
+                files = list(follow_files([new, old], interval=0.05, stable=0.3, timeout=5.0))
+                self.assertEqual(files, [old, new])
+                self.assertLess(time.monotonic() - start, 3.0)
+                os.remove(new)
+
+                with self.assertRaises(TimeoutError):
+                    list(follow_files([old, new], interval=0.05, timeout=0.2))
+
+                def check():
+                    raise RuntimeError("failed")
+
+                files = follow_files([old, new], interval=0.05, timeout=5.0, check=check)
+                self.assertEqual(next(files), old)
+                with self.assertRaises(RuntimeError):
+                    next(files)
+
+    def setUp(self):
+        # pylint: disable=consider-using-with
+        self.tmp_dir = tempfile.TemporaryDirectory(
+            dir=os.path.dirname(os.path.abspath(__file__)),
+            prefix="follow",
+            )
+        self.inotify_simple = follow.inotify_simple
+
+    def tearDown(self):
+        follow.inotify_simple = self.inotify_simple
+        self.tmp_dir.cleanup()
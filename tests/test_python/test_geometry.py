@@ -0,0 +1,81 @@
+""" Tests for plot_utils/geometry.py """
+
+#pylint: disable=invalid-name
+import importlib.util
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+try:
+    import pygrib
+except ImportError:
+    pygrib = None
+
+from plot_utils import geometry
+from plot_utils import grid_geometry, grid_key, wind_rotation
+from .test_grib_index import grib2_message
+
+
+class Testing(unittest.TestCase):
+    """ Define the tests. """
+
+    def test_wind_rotation(self):
+        """ Test the wind rotation angles """
+        lons = np.array([[-97.5, -90.0], [262.5, -105.0]])
+        sinx, cosx = wind_rotation(38.5, 262.5, lons, "lcc")
+        angles = np.sin(np.radians(38.5)) * np.radians([[0.0, 7.5], [360.0, -7.5]])
+        np.testing.assert_allclose(sinx, np.sin(angles))
+        np.testing.assert_allclose(cosx, np.cos(angles))
+        self.assertEqual(sinx[0, 0], 0.0)
+
+        sinx, _ = wind_rotation(60.0, -105.0, lons, "npstere")
+        np.testing.assert_allclose(sinx[1, 1], 0.0)
+        with self.assertRaises(ValueError):
+            wind_rotation(38.5, 262.5, lons, "merc")
+
+    @unittest.skipIf(pygrib is None or importlib.util.find_spec("pyproj") is None,
+                     "pygrib or pyproj is not available")
+    def test_grid_geometry(self):
+        """ Test that the geometry of a grid is computed once and cached """
+        with open(self.grib_fp, "wb") as f:
+            f.write(grib2_message(101325.0, 3, 1, 101, 0))
+            f.write(grib2_message(5500.0, 3, 5, 100, 50000))
+        grbs = pygrib.open(self.grib_fp)
+        msg1, msg2 = grbs.read(2)
+        grbs.close()
+
+        # Messages on the same grid have the same key
+        key = grid_key(msg1)
+        self.assertEqual(key, grid_key(msg2))
+
+        expected = geometry.compute_geometry(msg1)
+        self.assertEqual(expected["lat_shift"].shape, (3, 4))
+        self.assertEqual(expected["Lat0"], 38.5)
+
+        geo = grid_geometry(msg1, self.cache_dir)
+        self.assertEqual(os.listdir(self.cache_dir), [f"geometry_{key}.npz"])
+        self.assertIs(grid_geometry(msg2, self.cache_dir), geo)
+
+        # Loaded from the cache by a new process
+        geometry._geometries.clear()
+        cached = grid_geometry(msg2, self.cache_dir)
+        self.assertIsNot(cached, geo)
+        self.assertEqual(set(cached), set(expected))
+        for name, value in expected.items():
+            np.testing.assert_array_equal(cached[name], value)
+
+    def setUp(self):
+        # pylint: disable=consider-using-with
+        self.tmp_dir = tempfile.TemporaryDirectory(
+            dir=os.path.dirname(os.path.abspath(__file__)),
+            prefix="geometry",
+            )
+        self.grib_fp = os.path.join(self.tmp_dir.name, "test.grib2")
+        self.cache_dir = os.path.join(self.tmp_dir.name, "cache")
+        geometry._geometries.clear()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+        geometry._geometries.clear()
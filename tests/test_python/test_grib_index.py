@@ -0,0 +1,124 @@
+""" Tests for plot_utils/grib_index.py """
+
+#pylint: disable=invalid-name
+import os
+import struct
+import tempfile
+import unittest
+
+try:
+    import pygrib
+except ImportError:
+    pygrib = None
+
+from plot_utils import GribReader, read_inventory
+
+
+def grib2_message(value, cat, num, level_type, level, fhr=0, stat=None, length=0, level2=None):
+    """Encode a GRIB2 message of a constant field on a small Lambert
+    conformal grid. Statistically processed fields (stat is not None) use
+    product definition template 4.8."""
+    nx, ny = 4, 3
+    sec1 = struct.pack(">IBHHBBBHBBBBBBB", 21, 1, 7, 0, 2, 1, 1, 2023, 1, 1, 0, 0, 0, 0, 1)
+    tmpl = struct.pack(">BBIBIBI", 6, 0, 0, 0, 0, 0, 0)
+    tmpl += struct.pack(
+        ">IIIIBIIIIBBIIII",
+        nx, ny, 20000000, 260000000, 0x08, 38500000, 262500000,
+        3000000, 3000000, 0, 0x40, 38500000, 38500000, 0x80000000 | 90000000, 0,
+    )
+    sec3 = struct.pack(">IBBIBBH", 14 + len(tmpl), 3, 0, nx * ny, 0, 0, 30) + tmpl
+    surf2 = (255, 0, 0) if level2 is None else (level_type, 0, level2)
+    prod = struct.pack(
+        ">BBBBBHBBIBBIBBI", cat, num, 2, 0, 0, 0, 0, 1, fhr - length,
+        level_type, 0, level, *surf2,
+    )
+    template = 0
+    if stat is not None:
+        template = 8
+        prod += struct.pack(
+            ">HBBBBBBIBBBIBI", 2023, 1, 1, fhr, 0, 0, 1, 0, stat, 2, 1, length, 255, 0
+        )
+    sec4 = struct.pack(">IBHH", 9 + len(prod), 4, 0, template) + prod
+    sec5 = struct.pack(">IBIHfhhBB", 21, 5, nx * ny, 0, value, 0, 0, 0, 0)
+    body = sec1 + sec3 + sec4 + sec5 + struct.pack(">IBB", 6, 6, 255)
+    body += struct.pack(">IB", 5, 7) + b"7777"
+    return b"GRIB" + struct.pack(">HBBQ", 0, 0, 2, 16 + len(body)) + body
+
+
+@unittest.skipIf(pygrib is None, "pygrib is not available")
+class Testing(unittest.TestCase):
+    """ Define the tests. """
+
+    def check_reader(self, reader):
+        """ Check the fields read from the test file """
+        self.assertEqual(reader.values("slp")[0, 0], 101325.0)
+        self.assertEqual(reader.values("qpf6")[0, 0], 6.0)
+        self.assertEqual(reader.values("qpf1")[0, 0], 1.0)
+        self.assertEqual(reader.values("maxuh")[0, 0], 55.0)
+        self.assertEqual(reader.values("hgt500")[0, 0], 5500.0)
+        self.assertNotIn("missing", reader)
+        with self.assertRaises(KeyError):
+            reader.values("missing")
+        self.assertEqual(reader.grid_message["Nx"], 4)
+
+    def test_grib_reader(self):
+        """ Test that fields are found by scanning the file once and
+        through the wgrib2 inventory """
+        reader = GribReader(self.grib_fp, self.fields)
+        self.check_reader(reader)
+
+        offsets = [0]
+        for msg in self.messages[:-1]:
+            offsets.append(offsets[-1] + len(msg))
+        lines = [
+            "PRMSL:mean sea level:anl:",
+            "HGT:500 mb:anl:",
+            "APCP:surface:0-1 hour acc fcst:",
+            "APCP:surface:0-6 hour acc fcst:",
+            "MXUPHL:5000-2000 m above ground:5-6 hour max fcst:",
+        ]
+        with open(f"{self.grib_fp}.idx", "w", encoding="utf-8") as f:
+            for i, (offset, line) in enumerate(zip(offsets, lines)):
+                f.write(f"{i + 1}:{offset}:d=2023010100:{line}\n")
+        self.assertEqual(read_inventory(f"{self.grib_fp}.idx")[2][0], offsets[2])
+        reader = GribReader(self.grib_fp, self.fields)
+        self.check_reader(reader)
+
+        # Inventories with submessages are not used
+        with open(f"{self.grib_fp}.idx", "a", encoding="utf-8") as f:
+            f.write(f"5.2:{offsets[-1]}:d=2023010100:{lines[-1]}\n")
+        self.assertIsNone(read_inventory(f"{self.grib_fp}.idx"))
+        self.check_reader(GribReader(self.grib_fp, self.fields))
+
+    def setUp(self):
+        # pylint: disable=consider-using-with
+        self.tmp_dir = tempfile.TemporaryDirectory(
+            dir=os.path.dirname(os.path.abspath(__file__)),
+            prefix="grib_index",
+            )
+        self.grib_fp = os.path.join(self.tmp_dir.name, "test.grib2")
+        self.messages = [
+            grib2_message(101325.0, 3, 1, 101, 0),
+            grib2_message(5500.0, 3, 5, 100, 50000),
+            grib2_message(1.0, 1, 8, 1, 0, fhr=1, stat=1, length=1),
+            grib2_message(6.0, 1, 8, 1, 0, fhr=6, stat=1, length=6),
+            grib2_message(55.0, 7, 199, 103, 5000, fhr=6, stat=2, length=1, level2=2000),
+        ]
+        with open(self.grib_fp, "wb") as f:
+            f.write(b"".join(self.messages))
+        self.fields = {
+            "slp": {"name": "Pressure reduced to MSL", "inventory": ":PRMSL:"},
+            "hgt500": {"shortName": "gh", "level": 500, "inventory": ":HGT:500 mb:"},
+            "qpf1": {"shortName": "tp", "lengthOfTimeRange": 1, "inventory": ":APCP:surface:"},
+            "qpf6": {"shortName": "tp", "lengthOfTimeRange": 6, "inventory": ":APCP:surface:"},
+            "maxuh": {
+                "stepType": "max",
+                "parameterName": "199",
+                "topLevel": 5000,
+                "bottomLevel": 2000,
+            },
+            "missing": {"name": "2 metre temperature", "inventory": ":TMP:2 m above ground:"},
+        }
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
@@ -29,6 +29,56 @@ class Testing(unittest.TestCase):
         )
         self.assertTrue(res == "3357")
 
+    def test_link_fix_manifest(self):
+        """ Test that the manifest-driven mode creates the same links as
+        the default mode, and leaves them alone when run again """
+        sfc_climo_fields = ["facsf", "soil_type"]
+        for file_group in ["grid", "orog", "sfc_climo"]:
+            links = {}
+            for manifest, target_dir in [(False, self.FIXlam), (True, self.FIXlam2)]:
+                res = link_fix(
+                    verbose=False,
+                    file_group=file_group,
+                    source_dir=self.task_dir,
+                    target_dir=target_dir,
+                    ccpp_phys_suite="FV3_HRRR",
+                    constants=self.cfg["constants"],
+                    dot_or_uscore=self.cfg["DOT_OR_USCORE"],
+                    nhw=self.cfg["NHW"],
+                    run_task=False,
+                    sfc_climo_fields=sfc_climo_fields,
+                    manifest=manifest,
+                )
+                self.assertEqual(res, "3357")
+                links[manifest] = {
+                    fn: os.readlink(os.path.join(target_dir, fn))
+                    for fn in os.listdir(target_dir)
+                }
+            self.assertEqual(links[False], links[True])
+
+        self.assertIn("C3357_grid.tile7.nc", links[True])
+        self.assertIn("C3357.soil_type.tile1.nc", links[True])
+
+        # A second pass finds every link up to date
+        mtime = os.lstat(os.path.join(self.FIXlam2, "C3357_grid.tile7.nc")).st_mtime_ns
+        link_fix(
+            verbose=False,
+            file_group="grid",
+            source_dir=self.task_dir,
+            target_dir=self.FIXlam2,
+            ccpp_phys_suite="FV3_HRRR",
+            constants=self.cfg["constants"],
+            dot_or_uscore=self.cfg["DOT_OR_USCORE"],
+            nhw=self.cfg["NHW"],
+            run_task=False,
+            sfc_climo_fields=sfc_climo_fields,
+            manifest=True,
+        )
+        self.assertEqual(
+            mtime,
+            os.lstat(os.path.join(self.FIXlam2, "C3357_grid.tile7.nc")).st_mtime_ns,
+        )
+
     def setUp(self):
         define_macos_utilities()
         test_dir = os.path.dirname(os.path.abspath(__file__))
@@ -46,6 +96,11 @@ class Testing(unittest.TestCase):
             prefix="expt_fix_lam",
             )
         self.FIXlam = self.tmp_dir.name
+        self.tmp_dir2 = tempfile.TemporaryDirectory(
+            dir=os.path.abspath("."),
+            prefix="expt_fix_lam",
+            )
+        self.FIXlam2 = self.tmp_dir2.name
 
 
         self.cfg = {
@@ -61,3 +116,4 @@ class Testing(unittest.TestCase):
         }
     def tearDown(self):
         self.tmp_dir.cleanup()
+        self.tmp_dir2.cleanup()
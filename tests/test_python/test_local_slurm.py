@@ -0,0 +1,163 @@
+""" Tests for local_slurm.py """
+
+#pylint: disable=invalid-name
+import os
+import sqlite3
+import subprocess
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+import local_slurm
+from local_slurm import DB_FN, Scheduler, job_options, parse_memory, parse_time
+
+
+def script(directives, command="true"):
+    """ A job script with #SBATCH directives """
+    lines = ["#!/bin/bash"] + [f"#SBATCH {directive}" for directive in directives]
+    return "\n".join(lines + [command, ""])
+
+
+class Testing(unittest.TestCase):
+    """ Define the tests. """
+
+    def test_parse(self):
+        """ Test the conversion of times, memory sizes and job options """
+        self.assertEqual(parse_time("01:30:00"), 5400)
+        self.assertEqual(parse_time("10"), 600)
+        self.assertEqual(parse_time("10:30"), 630)
+        self.assertEqual(parse_time("1-02"), 93600)
+        self.assertEqual(parse_time("1-0:01:05"), 86465)
+        self.assertIsNone(parse_time("UNLIMITED"))
+        self.assertEqual(parse_memory("2G"), 2048)
+        self.assertEqual(parse_memory("500"), 500)
+
+        opts = job_options(
+            script(["--job-name=make_ics", "-o /log/make_ics.log", "-t 00:20:00",
+                    "--nodes=2-2 --ntasks-per-node=4", "--mem=1G", "-A account"]),
+            ["-t", "5"],
+        )
+        self.assertEqual(opts["name"], "make_ics")
+        self.assertEqual(opts["output"], "/log/make_ics.log")
+        self.assertEqual(opts["time_limit"], 300)
+        self.assertEqual(opts["cores"], 8)
+        self.assertEqual(opts["memory"], 2048)
+
+        # Directives after the first command are not read
+        opts = job_options(script(["-n 3 -c 2"]) + "#SBATCH -n 6\n", [])
+        self.assertEqual(opts["cores"], 6)
+        self.assertIsNone(opts["time_limit"])
+
+    def test_scheduler(self):
+        """ Test that jobs run within the cores of the machine, in order,
+        with backfilling, time limits and cancellation """
+        def submit(directives, command="sleep 1"):
+            return scheduler.submit(
+                {"script": script(directives, command), "args": [], "cwd": self.tmp.name,
+                 "env": dict(os.environ)}
+            )
+
+        def run(seconds):
+            end = time.time() + seconds
+            while time.time() < end:
+                scheduler.check()
+                scheduler.schedule()
+                time.sleep(0.05)
+
+        def states():
+            return {job["id"]: job["state"] for job in scheduler.query(list(range(1, 7)))}
+
+        with mock.patch.dict(os.environ, {"LOCAL_SLURM_CORES": "2"}):
+            scheduler = Scheduler(self.tmp.name)
+        first = submit(["-t 1", "-o first.out"], "echo $SLURM_JOB_ID; sleep 1")
+        long = submit(["-t 1"], "sleep 3")
+        wide = submit(["-n 2", "-t 1"])
+        short = submit(["-t 0:01"], "true")
+        unlimited = submit([])
+        failing = submit(["-t 0:01"], "exit 3")
+
+        # The short job ends before the wide one can start, the others wait
+        run(0.5)
+        self.assertEqual(
+            states(),
+            {first: "RUNNING", long: "RUNNING", wide: "PENDING", short: "PENDING",
+             unlimited: "PENDING", failing: "PENDING"},
+        )
+        run(1)
+        self.assertEqual(states()[short], "COMPLETED")
+        self.assertEqual(states()[unlimited], "PENDING")
+        scheduler.cancel([unlimited, long])
+        run(0.5)
+        self.assertEqual(states()[long], "CANCELLED")
+        self.assertEqual(states()[unlimited], "CANCELLED")
+        run(1.5)
+        self.assertEqual(states()[wide], "COMPLETED")
+        self.assertEqual(states()[failing], "FAILED")
+        self.assertEqual(scheduler.query([failing])[0]["exit_code"], 3)
+        self.assertTrue(scheduler.idle())
+        with open(os.path.join(self.tmp.name, "first.out"), encoding="utf-8") as f:
+            self.assertEqual(f.read(), f"{first}\n")
+
+    def test_recover(self):
+        """ Test that the jobs left running by a previous daemon fail, and
+        that only the processes that are still those jobs are killed """
+        Scheduler(self.tmp.name).db.close()
+        job = subprocess.Popen(["sleep", "60"], start_new_session=True,
+                               env=dict(os.environ, SLURM_JOB_ID="1"))
+        other = subprocess.Popen(["sleep", "60"], start_new_session=True)
+        try:
+            with sqlite3.connect(os.path.join(self.tmp.name, DB_FN)) as db:
+                db.executemany(
+                    "INSERT INTO jobs (id, state, pid) VALUES (?, 'RUNNING', ?)",
+                    [(1, job.pid), (2, other.pid)],
+                )
+            db.close()
+            scheduler = Scheduler(self.tmp.name)
+            self.assertEqual(job.wait(5), -9)
+            self.assertIsNone(other.poll())
+            self.assertEqual(
+                [row["state"] for row in scheduler.query([1, 2])], ["NODE_FAIL", "NODE_FAIL"]
+            )
+        finally:
+            other.kill()
+            other.wait()
+
+    def test_recover_without_proc(self):
+        """ Test that without /proc (e.g. macOS), only the processes that
+        started when the jobs did are killed, in a database of an older
+        daemon """
+        with sqlite3.connect(os.path.join(self.tmp.name, DB_FN)) as db:
+            db.execute("CREATE TABLE jobs (id INTEGER PRIMARY KEY, name TEXT, user TEXT,"
+                       " cwd TEXT, output TEXT, error TEXT, env TEXT, cores INTEGER,"
+                       " memory INTEGER, time_limit INTEGER, submit REAL, start REAL,"
+                       " end REAL, exit_code INTEGER, state TEXT, pid INTEGER)")
+        db.close()
+        with mock.patch.object(local_slurm, "PROC_DIR", os.path.join(self.tmp.name, "proc")):
+            Scheduler(self.tmp.name).db.close()
+            job = subprocess.Popen(["sleep", "60"], start_new_session=True)
+            other = subprocess.Popen(["sleep", "60"], start_new_session=True)
+            try:
+                with sqlite3.connect(os.path.join(self.tmp.name, DB_FN)) as db:
+                    db.executemany(
+                        "INSERT INTO jobs (id, state, pid, pid_start)"
+                        " VALUES (?, 'RUNNING', ?, ?)",
+                        [(1, job.pid, local_slurm._process_start(job.pid)),
+                         (2, other.pid, "Thu Jan  1 00:00:00 1970"),
+                         (3, other.pid, None)],
+                    )
+                db.close()
+                scheduler = Scheduler(self.tmp.name)
+                self.assertEqual(job.wait(5), -9)
+                self.assertIsNone(other.poll())
+                self.assertEqual([row["state"] for row in scheduler.query([1, 2, 3])],
+                                 ["NODE_FAIL"] * 3)
+            finally:
+                other.kill()
+                other.wait()
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
@@ -0,0 +1,79 @@
+""" Tests for plot_utils/lod.py """
+
+#pylint: disable=invalid-name
+import unittest
+
+import numpy as np
+import matplotlib
+
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt  # pylint: disable=wrong-import-position
+
+from plot_utils import decimate, decimate_mesh, lod_factor  # pylint: disable=wrong-import-position
+
+
+class Testing(unittest.TestCase):
+    """ Define the tests. """
+
+    def test_decimate(self):
+        """ Test the reductions of blocks of grid cells """
+        field = np.arange(35.0).reshape(5, 7) - 10.0
+        self.assertIs(decimate(field, 1), field)
+
+        # The last row and column do not fill a block and are dropped
+        np.testing.assert_array_equal(decimate(field, 2), [[-6.0, -4.0, -2.0], [8.0, 10.0, 12.0]])
+        np.testing.assert_array_equal(decimate(field, 2, "max"), [[-2.0, 0.0, 2.0], [12.0, 14.0, 16.0]])
+        np.testing.assert_array_equal(decimate(field, 2, "min"), [[-10.0, -8.0, -6.0], [4.0, 6.0, 8.0]])
+        np.testing.assert_array_equal(decimate(field, 2, "absmax"), [[-10.0, -8.0, -6.0], [12.0, 14.0, 16.0]])
+        with self.assertRaises(ValueError):
+            decimate(field, 2, "median")
+
+        # Masked cells are left out, fully masked blocks stay masked
+        masked = np.ma.masked_greater(field, 5.0)
+        result = decimate(masked, 2, "absmax")
+        self.assertTrue(np.ma.isMaskedArray(result))
+        np.testing.assert_array_equal(result.mask, [[False, False, False], [False, True, True]])
+        self.assertEqual(result[1, 0], 5.0)
+        self.assertEqual(decimate(masked, 2, "min")[1, 0], 4.0)
+
+    def test_decimate_mesh(self):
+        """ Test that the decimated grid is made of the first corners of the
+        blocks """
+        y, x = np.mgrid[0:7, 0:10]
+        field = (x * y).astype(float)
+        dx, dy, dfield = decimate_mesh(x, y, field, 3)
+        self.assertEqual(dfield.shape, (2, 3))
+        np.testing.assert_array_equal(dx[0], [0, 3, 6])
+        np.testing.assert_array_equal(dy[:, 0], [0, 3])
+        self.assertEqual(dx.shape, dfield.shape)
+
+    def test_lod_factor(self):
+        """ Test the number of grid cells per pixel """
+        fig = plt.figure(figsize=(4, 3), dpi=100)
+        self.addCleanup(plt.close, fig)
+        ax = fig.add_axes([0.0, 0.0, 1.0, 1.0])
+        ax.set_xlim(0.0, 4000.0)
+        # 400 pixels for 4000 m
+        self.assertEqual(lod_factor(ax, 3.0, 100), 3)
+        self.assertEqual(lod_factor(ax, 3.0, 50), 6)
+        self.assertEqual(lod_factor(ax, 25.0, 100), 1)
+        self.assertEqual(lod_factor(ax, 0.0, 100), 1)
+
+    def test_display_quality(self):
+        """ Test that a decimated field looks like the full field """
+        y, x = np.mgrid[0:400, 0:600] * 1.0
+        field = np.sin(x / 40.0) * np.cos(y / 30.0) * 10.0
+        images = []
+        for factor in (1, 4):
+            fig = plt.figure(figsize=(3, 2), dpi=50)
+            self.addCleanup(plt.close, fig)
+            ax = fig.add_axes([0.0, 0.0, 1.0, 1.0])
+            ax.set_axis_off()
+            ax.set_xlim(0.0, 600.0)
+            ax.set_ylim(0.0, 400.0)
+            self.assertEqual(lod_factor(ax, 1.0, 50), 4)
+            ax.pcolormesh(*decimate_mesh(x, y, field, factor), vmin=-10.0, vmax=10.0)
+            fig.canvas.draw()
+            images.append(np.asarray(fig.canvas.buffer_rgba()).astype(int))
+        differ = np.abs(images[0] - images[1]).max(axis=-1) > 32
+        self.assertLess(differ.mean(), 0.05)
@@ -0,0 +1,90 @@
+""" Tests for plot_utils/png.py """
+
+#pylint: disable=invalid-name
+import io
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import matplotlib
+
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt  # pylint: disable=wrong-import-position
+from PIL import Image  # pylint: disable=wrong-import-position
+
+from plot_utils import PngWriter, encode_png, render_figure  # pylint: disable=wrong-import-position
+
+
+class Testing(unittest.TestCase):
+    """ Define the tests. """
+
+    def make_plot(self):
+        """ Make a figure with a plot that does not fill it """
+        fig = plt.figure(figsize=(4, 3))
+        self.addCleanup(plt.close, fig)
+        ax = fig.add_axes([0.2, 0.3, 0.5, 0.4])
+        y, x = np.mgrid[0:20, 0:30]
+        mesh = ax.pcolormesh(x, y, np.sin(x / 5.0) * np.cos(y / 4.0))
+        fig.colorbar(mesh, ax=ax, orientation="horizontal")
+        ax.set_title("title")
+        return fig
+
+    def test_render_figure(self):
+        """ Test that a rendered figure looks like the figure saved with a
+        tight bounding box """
+        fig = self.make_plot()
+        ram = io.BytesIO()
+        fig.savefig(ram, format="png", bbox_inches="tight", dpi=80)
+        ram.seek(0)
+        expected = np.asarray(Image.open(ram).convert("RGBA")).astype(int)
+
+        image, box = render_figure(fig, 80)
+        self.assertEqual(image.shape, expected.shape)
+        self.assertEqual(image.dtype, np.uint8)
+        self.assertEqual(fig.dpi, 100)
+        differ = np.abs(image.astype(int) - expected).max(axis=-1) > 64
+        self.assertLess(differ.mean(), 0.05)
+
+        # The box is reused for the same plot
+        image2, box2 = render_figure(fig, 80, box)
+        self.assertEqual(box2, box)
+        np.testing.assert_array_equal(image2, image)
+
+    def test_writer(self):
+        """ Test that PNG files are written in the background """
+        image, _ = render_figure(self.make_plot(), 80)
+        rgb_fp = os.path.join(self.tmp_dir.name, "rgb.png")
+        palette_fp = os.path.join(self.tmp_dir.name, "palette.png")
+
+        writer = PngWriter()
+        writer.save(rgb_fp, image)
+        writer.close()
+        im = Image.open(rgb_fp)
+        self.assertEqual(im.mode, "RGB")
+        np.testing.assert_array_equal(np.asarray(im), image[..., :3])
+
+        encode_png(palette_fp, image, "palette")
+        im = Image.open(palette_fp)
+        self.assertEqual(im.mode, "P")
+        self.assertEqual(im.size, (image.shape[1], image.shape[0]))
+        self.assertLess(os.path.getsize(palette_fp), os.path.getsize(rgb_fp))
+
+        # Errors are raised by the next call, with the file that failed
+        writer = PngWriter("palette")
+        writer.save(os.path.join(self.tmp_dir.name, "missing", "plot.png"), image)
+        with self.assertRaisesRegex(OSError, "missing/plot.png"):
+            writer.save(palette_fp, image)
+        writer.close()
+        with self.assertRaises(ValueError):
+            PngWriter("jpeg")
+
+    def setUp(self):
+        # pylint: disable=consider-using-with
+        self.tmp_dir = tempfile.TemporaryDirectory(
+            dir=os.path.dirname(os.path.abspath(__file__)),
+            prefix="png",
+            )
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
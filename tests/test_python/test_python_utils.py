@@ -112,6 +112,48 @@ class Testing(unittest.TestCase):
             util.cp_vrfy(f"{self.ushdir}/python_utils/misc.py", f"{testable_path}/miscs.py")
             self.assertTrue(os.path.exists(f"{testable_path}/miscs.py"))
 
+            # Copy a batch of files given as a list, in parallel
+            util.cp_vrfy(
+                [f"{self.ushdir}/python_utils/misc.py", f"{self.ushdir}/python_utils/print_msg.py"],
+                testable_path,
+                nthreads=2,
+            )
+            self.assertTrue(os.path.exists(f"{testable_path}/print_msg.py"))
+
+            # Globbing patterns are expanded and "-fsn" replaces an existing
+            # link to a directory instead of linking into it
+            util.mkdir_vrfy(f' -p "{testable_path}/a/b" "{testable_path}/c"')
+            util.ln_vrfy(f"-fsn {testable_path}/a {testable_path}/link")
+            util.ln_vrfy("-fsn", f"{testable_path}/c", f"{testable_path}/link")
+            self.assertEqual(os.readlink(f"{testable_path}/link"), f"{testable_path}/c")
+            util.ln_vrfy("-sf --relative", f"{testable_path}/*.py", f"{testable_path}/c")
+            self.assertEqual(os.readlink(f"{testable_path}/c/misc.py"), "../misc.py")
+
+            # Quoted words and paths given in lists are not expanded
+            util.mkdir_vrfy(f"{testable_path}/d")
+            with open(f"{testable_path}/*.py", "w", encoding="utf-8"):
+                pass
+            util.cp_vrfy(f'"{testable_path}/*.py" {testable_path}/d')
+            util.cp_vrfy([f"{testable_path}/*.py"], f"{testable_path}/d/star.py")
+            self.assertEqual(sorted(os.listdir(f"{testable_path}/d")), ["*.py", "star.py"])
+
+            # "cp -r" copies a symbolic link to a directory as a link
+            util.mkdir_vrfy(f"{testable_path}/e")
+            util.cp_vrfy(f"-r {testable_path}/link {testable_path}/e")
+            self.assertEqual(os.readlink(f"{testable_path}/e/link"), f"{testable_path}/c")
+            util.cp_vrfy(f"-rL {testable_path}/link {testable_path}/e/copy")
+            self.assertFalse(os.path.islink(f"{testable_path}/e/copy"))
+            self.assertTrue(os.path.exists(f"{testable_path}/e/copy/misc.py"))
+
+            # "mv" replaces an empty directory instead of moving into it
+            util.mkdir_vrfy(f"-p {testable_path}/e/d")
+            util.mv_vrfy(f"{testable_path}/d {testable_path}/e")
+            self.assertEqual(sorted(os.listdir(f"{testable_path}/e/d")), ["*.py", "star.py"])
+
+            util.mv_vrfy(f"{testable_path}/miscs.py {testable_path}/a")
+            self.assertTrue(os.path.exists(f"{testable_path}/a/miscs.py"))
+            util.rm_vrfy("-f", f"{testable_path}/no_such_file")
+
             # Run a platform native command
             util.cmd_vrfy(f"rm -rf {testable_path}")
 
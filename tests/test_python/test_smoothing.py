@@ -0,0 +1,73 @@
+""" Tests for plot_utils/smoothing.py """
+
+#pylint: disable=invalid-name
+import unittest
+
+import numpy as np
+
+try:
+    from scipy import ndimage
+except ImportError:
+    ndimage = None
+
+from plot_utils import gaussian_smooth
+
+
+def field(shape=(60, 80)):
+    """ A smooth field with small-scale noise """
+    rng = np.random.default_rng(0)
+    y, x = np.mgrid[0:shape[0], 0:shape[1]]
+    return 1000.0 + 10.0 * np.sin(x / 9.0) * np.cos(y / 7.0) + rng.normal(size=shape)
+
+
+class Testing(unittest.TestCase):
+    """ Define the tests. """
+
+    def test_fft(self):
+        """ Test the filter applied with FFTs """
+        constant = np.full((30, 40), 5.0)
+        np.testing.assert_allclose(gaussian_smooth(constant, 3.0, method="fft"), constant)
+
+        # The response to an impulse away from the edges is the filter
+        impulse = np.zeros((41, 41))
+        impulse[20, 20] = 1.0
+        x = np.arange(-8, 9)
+        weights = np.exp(-0.5 * (x / 2.0) ** 2)
+        weights /= weights.sum()
+        expected = np.zeros((41, 41))
+        expected[12:29, 12:29] = np.outer(weights, weights)
+        np.testing.assert_allclose(
+            gaussian_smooth(impulse, 2.0, method="fft"), expected, atol=1e-15
+        )
+
+        # Stacked fields are smoothed separately
+        fields = np.stack([field(), 2.0 * field()])
+        smoothed = gaussian_smooth(fields, 7.0, method="fft")
+        self.assertEqual(smoothed.shape, fields.shape)
+        np.testing.assert_allclose(smoothed[1], 2.0 * smoothed[0])
+
+        with self.assertRaises(ValueError):
+            gaussian_smooth(constant, 3.0, method="spline")
+
+    def test_region(self):
+        """ Test that smoothing a region gives the same values there """
+        f = field()
+        region = (slice(20, 45), slice(5, 30))
+        full = gaussian_smooth(f, 7.0, method="fft")
+        smoothed = gaussian_smooth(f, 7.0, region=region, method="fft")
+        self.assertEqual(smoothed.shape, f.shape)
+        np.testing.assert_allclose(smoothed[region], full[region], rtol=1e-12)
+        self.assertEqual(smoothed.count(), 25 * 25)
+
+    @unittest.skipIf(ndimage is None, "scipy is not installed")
+    def test_scipy(self):
+        """ Test that the filters are the ones of scipy """
+        f = field()
+        for sigma in (1.7225, 6.89, 13.78):
+            expected = ndimage.gaussian_filter(f, sigma)
+            for method in ("auto", "fft"):
+                np.testing.assert_allclose(
+                    gaussian_smooth(f, sigma, method=method), expected, rtol=1e-10
+                )
+            expected = ndimage.gaussian_filter(np.stack([f, -f]), (0, sigma, sigma))
+            np.testing.assert_allclose(gaussian_smooth(np.stack([f, -f]), sigma), expected, rtol=1e-10)
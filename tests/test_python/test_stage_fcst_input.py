@@ -0,0 +1,183 @@
+""" Tests for stage_fcst_input.py """
+
+#pylint: disable=invalid-name
+import os
+import tempfile
+import unittest
+
+from python_utils import cfg_to_shell_str
+from stage_fcst_input import stage_fcst_input, write_fcst_input_template
+
+
+class Testing(unittest.TestCase):
+    """ Define the tests. """
+
+    def test_stage_fcst_input(self):
+        """ Test that the links built from the template point to the
+        expected files, and that staging again changes nothing """
+
+        template_fp = os.path.join(self.exptdir, "fcst_input_links.yaml")
+        write_fcst_input_template(self.cfg, template_fp)
+
+        kwargs = {
+            "template_fp": template_fp,
+            "data": self.data,
+            "fcst_len_hrs": 12,
+            "nthreads": 4,
+            "CRES": "C3357",
+            "grid_fn": "C3357_grid.tile7.halo3.nc",
+            "INPUT_DATA": self.input_data,
+            "NET": "rrfs",
+            "cycle": "t00z",
+            "dot_ensmem": ".mem001",
+        }
+        created = stage_fcst_input(**kwargs)
+
+        def target(symlink):
+            return os.readlink(os.path.join(self.data, symlink))
+
+        self.assertEqual(
+            target("INPUT/grid_spec.nc"),
+            os.path.join(self.fixlam, "C3357_mosaic.halo3.nc"),
+        )
+        # The orography is generated in the experiment directory
+        self.assertEqual(
+            target("INPUT/oro_data_ss.nc"),
+            os.path.join("..", "..", "fix_lam", "C3357_oro_data_ss.tile7.halo0.nc"),
+        )
+        self.assertEqual(
+            target("INPUT/gfs_bndy.tile7.012.nc"),
+            os.path.join(self.input_data, "rrfs.t00z.mem001.gfs_bndy.tile7.f012.nc"),
+        )
+        self.assertFalse(os.path.lexists(os.path.join(self.data, "INPUT/PT.nc")))
+        self.assertEqual(target("co2historicaldata_2010.txt"),
+                         os.path.join(self.fixam, "fix_co2_proj/global_co2historicaldata_2010.txt"))
+        self.assertEqual(target("aeroclim.m01.nc"),
+                         os.path.join(self.fixclim, "merra2.aerclim.2003-2014.m01.nc"))
+        self.assertEqual(target("optics_BC.dat"),
+                         os.path.join(self.fixclim, "optics_BC.v1_3.dat"))
+
+        self.assertEqual(stage_fcst_input(**kwargs), 0)
+        self.assertGreater(created, 0)
+
+    def test_stage_without_template(self):
+        """ Test that experiments generated without a template get the same
+        links, from a template built from their var_defns file """
+
+        template_fp = os.path.join(self.exptdir, "fcst_input_links.yaml")
+        write_fcst_input_template(self.cfg, template_fp)
+        kwargs = {
+            "data": self.data,
+            "fcst_len_hrs": 12,
+            "CRES": "C3357",
+            "grid_fn": "C3357_grid.tile7.halo3.nc",
+            "INPUT_DATA": self.input_data,
+            "NET": "rrfs",
+            "cycle": "t00z",
+            "dot_ensmem": ".mem001",
+        }
+        stage_fcst_input(template_fp=template_fp, **kwargs)
+
+        def links():
+            return {
+                os.path.relpath(os.path.join(root, fn), self.data):
+                    os.readlink(os.path.join(root, fn))
+                for root, _, fns in os.walk(self.data) for fn in fns
+            }
+
+        expected = links()
+        for symlink in expected:
+            os.remove(os.path.join(self.data, symlink))
+
+        # load_shell_config() works in the current directory, as the
+        # forecast task does in its run directory
+        self.addCleanup(os.chdir, os.path.dirname(os.path.abspath(__file__)))
+        os.chdir(self.data)
+        defns_fp = os.path.join(self.exptdir, "var_defns.sh")
+        with open(defns_fp, "w", encoding="utf-8") as f:
+            f.write(cfg_to_shell_str(self.cfg))
+        os.remove(template_fp)
+        created = stage_fcst_input(
+            template_fp=template_fp, path_to_defns=defns_fp, **kwargs
+        )
+        self.assertEqual(created, len(expected))
+        self.assertEqual(links(), expected)
+
+    def setUp(self):
+        # pylint: disable=consider-using-with
+        self.tmp_dir = tempfile.TemporaryDirectory(
+            dir=os.path.dirname(os.path.abspath(__file__)),
+            prefix="stage_fcst_input",
+            )
+        self.exptdir = os.path.join(self.tmp_dir.name, "expt")
+        self.fixlam = os.path.join(self.exptdir, "fix_lam")
+        self.fixam = os.path.join(self.tmp_dir.name, "fix_am")
+        self.fixclim = os.path.join(self.exptdir, "fix_clim")
+        self.input_data = os.path.join(self.tmp_dir.name, "com", "INPUT")
+        self.data = os.path.join(self.exptdir, "2023010100")
+
+        for path in [self.fixlam, self.fixclim, self.input_data,
+                     os.path.join(self.fixam, "fix_co2_proj"),
+                     os.path.join(self.exptdir, "orog"),
+                     os.path.join(self.data, "INPUT")]:
+            os.makedirs(path)
+
+        files = [
+            os.path.join(self.fixlam, fn) for fn in [
+                "C3357_mosaic.halo3.nc",
+                "C3357_grid.tile7.halo3.nc",
+                "C3357_grid.tile7.halo4.nc",
+                "C3357_oro_data.tile7.halo0.nc",
+                "C3357_oro_data.tile7.halo4.nc",
+                "C3357_oro_data_ss.tile7.halo0.nc",
+                "C3357_oro_data_ls.tile7.halo0.nc",
+            ]
+        ]
+        files += [
+            os.path.join(self.input_data, f"rrfs.t00z.mem001.{fn}") for fn in [
+                "gfs_data.tile7.halo0.nc",
+                "sfc_data.tile7.halo0.nc",
+                "gfs_ctrl.nc",
+                "gfs_bndy.tile7.f000.nc",
+                "gfs_bndy.tile7.f006.nc",
+                "gfs_bndy.tile7.f012.nc",
+                "NEXUS_Expt.nc",
+            ]
+        ]
+        files += [
+            os.path.join(self.fixam, "fix_co2_proj/global_co2historicaldata_2010.txt"),
+            os.path.join(self.fixclim, "merra2.aerclim.2003-2014.m01.nc"),
+            os.path.join(self.fixclim, "optics_BC.v1_3.dat"),
+        ]
+        for fp in files:
+            with open(fp, "w", encoding="utf-8"):
+                pass
+
+        self.cfg = {
+            "workflow": {
+                "EXPTDIR": self.exptdir,
+                "FIXlam": self.fixlam,
+                "FIXam": self.fixam,
+                "FIXclim": self.fixclim,
+                "DOT_OR_USCORE": "_",
+                "CCPP_PHYS_SUITE": "FV3_HRRR",
+                "SYMLINK_FIX_FILES": True,
+            },
+            "constants": {
+                "NH0": 0,
+                "NH3": 3,
+                "NH4": 4,
+                "TILE_RGNL": 7,
+            },
+            "fixed_files": {
+                "CYCLEDIR_LINKS_TO_FIXam_FILES_MAPPING": [
+                    "co2historicaldata_2010.txt | fix_co2_proj/global_co2historicaldata_2010.txt",
+                ],
+            },
+            "cpl_aqm_parm": {"CPL_AQM": True},
+            "task_run_fcst": {"USE_MERRA_CLIMO": True},
+            "task_get_extrn_lbcs": {"LBC_SPEC_INTVL_HRS": 6},
+        }
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
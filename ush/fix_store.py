@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+
+"""
+A content-addressed store of fix files that can be shared by many
+experiments.
+
+Each file is kept once in the store under the SHA-256 hash of its content.
+Experiments get hard links to the stored files (or reflinks or, as a last
+resort, copies when the store is on another file system), so hundreds of
+experiments that use the same fix files take the space of one copy.  A
+manifest in the store maps source files (path, size and modification time)
+to hashes, so files that were stored before are neither read nor copied
+again.
+
+Stored files are read-only and owned by the user who stored them.  With
+fs.protected_hardlinks=1, the default on most Linux systems, only their
+owner can hard link to them, so other users of a store get copies.  A store
+shared by several users should be populated and used by one account (e.g.
+a role account running the experiments), or be on a system where
+fs.protected_hardlinks is 0.
+"""
+
+import os
+import sys
+import argparse
+import errno
+import fcntl
+import glob
+import hashlib
+import json
+import shutil
+import stat
+from contextlib import contextmanager
+
+from python_utils import print_err_msg_exit, print_info_msg
+
+MANIFEST_FN = "manifest.json"
+OBJECTS_DIR = "objects"
+
+# ioctl request that clones (reflinks) a file on file systems that support it
+FICLONE = 0x40049409
+
+HASH_CHUNK_SIZE = 16 * 1024 * 1024
+
+
+def file_hash(path):
+    """Get the SHA-256 hash of the content of a file."""
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+@contextmanager
+def locked_manifest(store_dir):
+    """Open the manifest of a store for update. The store is locked while
+    the manifest is in use so that concurrent experiment generations see
+    each other's updates."""
+    os.makedirs(os.path.join(store_dir, OBJECTS_DIR), exist_ok=True)
+    with open(os.path.join(store_dir, ".lock"), "a", encoding="utf-8") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        manifest_fp = os.path.join(store_dir, MANIFEST_FN)
+        manifest = {}
+        if os.path.exists(manifest_fp):
+            with open(manifest_fp, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+        n_entries = len(manifest)
+        yield manifest
+        if len(manifest) != n_entries:
+            tmp_fp = f"{manifest_fp}.tmp{os.getpid()}"
+            with open(tmp_fp, "w", encoding="utf-8") as f:
+                json.dump(manifest, f, indent=1, sort_keys=True)
+            os.replace(tmp_fp, manifest_fp)
+
+
+def _source_key(path):
+    """Identify a source file by its real path, size and modification time."""
+    real = os.path.realpath(path)
+    st = os.stat(real)
+    return f"{real}:{st.st_size}:{st.st_mtime_ns}"
+
+
+def _object_path(store_dir, digest):
+    return os.path.join(store_dir, OBJECTS_DIR, digest[:2], digest[2:])
+
+
+def store_file(store_dir, src, manifest):
+    """Add a file to the store unless its content is already there.
+
+    Args:
+        store_dir: the store directory
+        src: path to the file
+        manifest: the manifest of the store (see locked_manifest)
+    Returns:
+        path to the stored object
+    """
+    key = _source_key(src)
+    digest = manifest.get(key)
+    if digest is None:
+        digest = file_hash(src)
+        manifest[key] = digest
+
+    obj = _object_path(store_dir, digest)
+    if not os.path.exists(obj):
+        os.makedirs(os.path.dirname(obj), exist_ok=True)
+        tmp = f"{obj}.tmp{os.getpid()}"
+        shutil.copyfile(src, tmp)
+        # Objects are shared by all experiments, so must not be modified
+        os.chmod(tmp, stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+        os.replace(tmp, obj)
+    return obj
+
+
+def link_object(obj, dst):
+    """Make dst a hard link to a stored object, or a reflink or a copy of it
+    when the store is on another file system.
+
+    Returns:
+        one of "hardlink", "reflink" or "copy"
+    """
+    if os.path.lexists(dst):
+        if os.path.samefile(obj, dst):
+            return "hardlink"
+        os.remove(dst)
+    try:
+        os.link(obj, dst)
+        return "hardlink"
+    except OSError as e:
+        if e.errno not in (errno.EXDEV, errno.EPERM, errno.EMLINK):
+            raise
+    with open(obj, "rb") as fsrc, open(dst, "wb") as fdst:
+        try:
+            fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+            return "reflink"
+        except OSError:
+            shutil.copyfileobj(fsrc, fdst)
+            return "copy"
+
+
+def populate_from_fix_store(store_dir, files, verbose=False):
+    """Put files into an experiment through the store.
+
+    Args:
+        store_dir: the store directory
+        files: list of (src, dst) tuples. src may be a globbing pattern, in
+               which case dst is a directory.
+        verbose: print a summary when done
+    Returns:
+        a dict counting how many files were hard linked, reflinked or copied
+    """
+    counts = {"hardlink": 0, "reflink": 0, "copy": 0}
+    with locked_manifest(store_dir) as manifest:
+        for src, dst in files:
+            if glob.has_magic(src):
+                srcs = sorted(glob.glob(src))
+                if not srcs:
+                    print_err_msg_exit(
+                        f"""
+                        No fix files were found matching the pattern:
+                          {src}"""
+                    )
+                pairs = [(s, os.path.join(dst, os.path.basename(s))) for s in srcs]
+            else:
+                pairs = [(src, dst)]
+            for s, d in pairs:
+                if not os.path.isfile(s):
+                    print_err_msg_exit(
+                        f"""
+                        Fix file does not exist:
+                          {s}"""
+                    )
+                os.makedirs(os.path.dirname(d) or ".", exist_ok=True)
+                counts[link_object(store_file(store_dir, s, manifest), d)] += 1
+
+    print_info_msg(
+        f"Placed fix files from the store {store_dir}: "
+        + ", ".join(f"{n} {how}" for how, n in counts.items()),
+        verbose=verbose,
+    )
+    if counts["copy"]:
+        print_info_msg(
+            f"""
+            WARNING: {counts["copy"]} fix files could not be hard linked from the
+            store {store_dir} and were copied instead. The store must be on the
+            same file system as the experiments, and the stored files must be
+            owned by the user running the experiments on systems with
+            fs.protected_hardlinks=1 (see ush/fix_store.py)."""
+        )
+    return counts
+
+
+def parse_args(argv):
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(
+        description="Put fix files into a directory through a shared deduplicated store."
+    )
+
+    parser.add_argument(
+        "-s",
+        "--store-dir",
+        dest="store_dir",
+        required=True,
+        help="Directory of the shared store.",
+    )
+    parser.add_argument(
+        "-o", "--output-dir", dest="output_dir", required=True, help="Target directory."
+    )
+    parser.add_argument("files", nargs="+", help="Files or globbing patterns to place.")
+
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args(sys.argv[1:])
+    populate_from_fix_store(
+        args.store_dir,
+        [(f, os.path.join(args.output_dir, os.path.basename(f))) if not glob.has_magic(f)
+         else (f, args.output_dir) for f in args.files],
+        verbose=True,
+    )
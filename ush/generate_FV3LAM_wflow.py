@@ -31,6 +31,8 @@ from setup import setup
 from set_FV3nml_sfc_climo_filenames import set_FV3nml_sfc_climo_filenames
 from get_crontab_contents import add_crontab_line
 from set_namelist import set_namelist
+from stage_fcst_input import write_fcst_input_template
+from fix_store import populate_from_fix_store
 from check_python_version import check_python_version
 
 # These come from ush/python_utils/workflow-tools
@@ -188,10 +190,28 @@ def generate_FV3LAM_wflow(
         mkdir_vrfy("-p", FIXam)
         mkdir_vrfy("-p", os.path.join(FIXam, "fix_co2_proj"))
 
-        num_files = len(FIXgsm_FILES_TO_COPY_TO_FIXam)
-        for i in range(num_files):
-            fn = f"{FIXgsm_FILES_TO_COPY_TO_FIXam[i]}"
-            cp_vrfy(os.path.join(FIXgsm, fn), os.path.join(FIXam, fn))
+        if FIX_STORE_DIR:
+            # Hard link the files from the shared store, adding those that
+            # are not there yet
+            populate_from_fix_store(
+                FIX_STORE_DIR,
+                [
+                    (os.path.join(FIXgsm, fn), os.path.join(FIXam, fn))
+                    for fn in FIXgsm_FILES_TO_COPY_TO_FIXam
+                ],
+                verbose=verbose,
+            )
+        else:
+            # Copy the files in one batch per subdirectory of FIXam
+            fns_by_subdir = {}
+            for fn in FIXgsm_FILES_TO_COPY_TO_FIXam:
+                fns_by_subdir.setdefault(os.path.dirname(fn), []).append(fn)
+            for subdir, fns in fns_by_subdir.items():
+                cp_vrfy(
+                    [os.path.join(FIXgsm, fn) for fn in fns],
+                    os.path.join(FIXam, subdir),
+                    nthreads=4,
+                )
     #
     # -----------------------------------------------------------------------
     #
@@ -216,6 +236,15 @@ def generate_FV3LAM_wflow(
         if SYMLINK_FIX_FILES:
             ln_vrfy("-fsn", os.path.join(FIXaer, "merra2.aerclim*.nc"), FIXclim)
             ln_vrfy("-fsn", os.path.join(FIXlut, "optics*.dat"), FIXclim)
+        elif FIX_STORE_DIR:
+            populate_from_fix_store(
+                FIX_STORE_DIR,
+                [
+                    (os.path.join(FIXaer, "merra2.aerclim*.nc"), FIXclim),
+                    (os.path.join(FIXlut, "optics*.dat"), FIXclim),
+                ],
+                verbose=verbose,
+            )
         else:
             cp_vrfy(os.path.join(FIXaer, "merra2.aerclim*.nc"), FIXclim)
             cp_vrfy(os.path.join(FIXlut, "optics*.dat"), FIXclim)
@@ -274,6 +303,22 @@ def generate_FV3LAM_wflow(
     #
     # -----------------------------------------------------------------------
     #
+    # Write the template of the links the forecast task creates in each
+    # cycle/member run directory.  The fix files are set up above, so only
+    # the cycle dependent parts are left for the forecast task to fill in.
+    #
+    # -----------------------------------------------------------------------
+    #
+    log_info(
+        f"""
+        Writing the template of the forecast input links:
+          FCST_INPUT_LINKS_FP = '{FCST_INPUT_LINKS_FP}'""",
+        verbose=verbose,
+    )
+    write_fcst_input_template(expt_config, FCST_INPUT_LINKS_FP)
+    #
+    # -----------------------------------------------------------------------
+    #
     # Set parameters in the FV3-LAM namelist file.
     #
     # -----------------------------------------------------------------------
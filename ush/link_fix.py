@@ -5,6 +5,7 @@ import sys
 import argparse
 import re
 import glob
+from functools import lru_cache
 
 from python_utils import (
     import_vars,
@@ -12,6 +13,7 @@ from python_utils import (
     print_info_msg,
     print_err_msg_exit,
     create_symlink_to_file,
+    create_symlinks,
     define_macos_utilities,
     check_var_valid_value,
     flatten_dict,
@@ -21,6 +23,22 @@ from python_utils import (
     load_shell_config,
 )
 
+# Fix files handled by link_fix, e.g. C3357_grid.tile7.halo4.nc,
+# C3357_mosaic.halo6.nc or C3357.facsf.tile7.halo0.nc
+FIX_FILE_REGEX = re.compile(
+    r"^C(?P<res>[0-9]+)[._](?P<field>[A-Za-z0-9_]+?)"
+    r"(?:\.tile(?P<tile>[0-9]+))?\.halo(?P<halo>[0-9]+)\.nc$"
+)
+
+# The file group each non sfc_climo field belongs to
+FIX_FILE_GROUPS = {
+    "mosaic": "grid",
+    "grid": "grid",
+    "oro_data": "orog",
+    "oro_data_ss": "orog",
+    "oro_data_ls": "orog",
+}
+
 
 def link_fix(
     verbose,
@@ -33,6 +51,7 @@ def link_fix(
     nhw,
     run_task,
     sfc_climo_fields,
+    manifest=False,
     **kwargs,
 ):
     """This file defines a function that links fix files to the target
@@ -51,6 +70,8 @@ def link_fix(
         run_task: boolean value indicating whether the task is to be run
                   in the experiment
         climo_fields: list of fields needed for climo
+        manifest: boolean value indicating whether to use the manifest-driven
+                  mode (see link_fix_from_manifest)
 
     Returns:
         a string: resolution
@@ -61,6 +82,20 @@ def link_fix(
     valid_vals_file_group = ["grid", "orog", "sfc_climo"]
     check_var_valid_value(file_group, valid_vals_file_group)
 
+    if manifest:
+        return link_fix_from_manifest(
+            verbose=verbose,
+            file_group=file_group,
+            source_dir=source_dir,
+            target_dir=target_dir,
+            ccpp_phys_suite=ccpp_phys_suite,
+            constants=constants,
+            dot_or_uscore=dot_or_uscore,
+            nhw=nhw,
+            run_task=run_task,
+            sfc_climo_fields=sfc_climo_fields,
+        )
+
     # Decompress the constants needed below.
     nh0 = constants["NH0"]
     nh3 = constants["NH3"]
@@ -376,6 +411,221 @@ def link_fix(
     return res
 
 
+@lru_cache(maxsize=None)
+def _scan_fix_dir(source_dir, mtime_ns):
+    """Scan a fix file directory once. The modification time of the
+    directory is part of the cache key so that a directory that changed
+    since the last call is scanned again.
+
+    Returns:
+        a dict mapping (group, resolution, halo, field) to the set of file
+        names found for it
+    """
+    index = {}
+    with os.scandir(source_dir) as entries:
+        for entry in entries:
+            match = FIX_FILE_REGEX.match(entry.name)
+            if not match:
+                continue
+            field = match.group("field")
+            group = FIX_FILE_GROUPS.get(field, "sfc_climo")
+            key = (group, match.group("res"), int(match.group("halo")), field)
+            index.setdefault(key, set()).add(entry.name)
+    return index
+
+
+def scan_fix_dir(source_dir):
+    """Build the index of the fix files available in source_dir.
+
+    Args:
+        source_dir: the path to a directory containing fix files
+    Returns:
+        a dict mapping (group, resolution, halo, field) to the set of file
+        names found for it
+    """
+    return _scan_fix_dir(source_dir, os.stat(source_dir).st_mtime_ns)
+
+
+def fix_file_plan(
+    file_group,
+    ccpp_phys_suite,
+    constants,
+    dot_or_uscore,
+    nhw,
+    sfc_climo_fields,
+):
+    """Get the fix files needed for one file group. See link_fix for the
+    reason each of them is needed.
+
+    Returns:
+        a list of (field, halo, file name pattern) tuples where the pattern
+        contains the "{res}" placeholder for the resolution
+    """
+    nh0 = constants["NH0"]
+    nh3 = constants["NH3"]
+    nh4 = constants["NH4"]
+    tile_rgnl = constants["TILE_RGNL"]
+
+    if file_group == "grid":
+        plan = [
+            ("mosaic", halo, f"C{{res}}{dot_or_uscore}mosaic.halo{halo}.nc")
+            for halo in (nhw, nh4, nh3)
+        ]
+        plan += [
+            ("grid", halo, f"C{{res}}{dot_or_uscore}grid.tile{tile_rgnl}.halo{halo}.nc")
+            for halo in (nhw, nh3, nh4)
+        ]
+    elif file_group == "orog":
+        fields = [("oro_data", nh0), ("oro_data", nh4)]
+        if ccpp_phys_suite in [
+            "FV3_RAP",
+            "FV3_HRRR",
+            "FV3_GFS_v15_thompson_mynn_lam3km",
+            "FV3_GFS_v17_p8",
+        ]:
+            fields += [("oro_data_ss", nh0), ("oro_data_ls", nh0)]
+        plan = [
+            (field, halo, f"C{{res}}{dot_or_uscore}{field}.tile{tile_rgnl}.halo{halo}.nc")
+            for field, halo in fields
+        ]
+    elif file_group == "sfc_climo":
+        plan = [
+            (field, halo, f"C{{res}}.{field}.tile{tile_rgnl}.halo{halo}.nc")
+            for field in sfc_climo_fields
+            for halo in (nh0, nh4)
+        ]
+    return plan
+
+
+def link_fix_from_manifest(
+    verbose,
+    file_group,
+    source_dir,
+    target_dir,
+    ccpp_phys_suite,
+    constants,
+    dot_or_uscore,
+    nhw,
+    run_task,
+    sfc_climo_fields,
+):
+    """Manifest-driven version of link_fix. The source directory is scanned
+    once into an index of the available fix files, the whole link plan is
+    validated against that index before any link is made, and then all the
+    links are created in one batch, skipping links that are already
+    correct.
+
+    Args: see link_fix
+
+    Returns:
+        a string: resolution
+    """
+
+    tile_rgnl = constants["TILE_RGNL"]
+    nh0 = constants["NH0"]
+    nh4 = constants["NH4"]
+
+    index = scan_fix_dir(source_dir)
+    plan = fix_file_plan(
+        file_group,
+        ccpp_phys_suite,
+        constants,
+        dot_or_uscore,
+        nhw,
+        sfc_climo_fields,
+    )
+    #
+    # Find the resolutions for which each required file is available and make
+    # sure that they are all the same.
+    #
+    resolutions = set()
+    for field, halo, pattern in plan:
+        found = {
+            res
+            for (group, res, halo_, field_), fns in index.items()
+            if (group, halo_, field_) == (FIX_FILE_GROUPS.get(field, "sfc_climo"), halo, field)
+            and pattern.format(res=res) in fns
+        }
+        if not found:
+            print_err_msg_exit(
+                f"""
+                Trying to link files in group: {file_group}
+                No files were found matching the pattern
+                {os.path.join(source_dir, pattern.format(res="*"))}.
+                """
+            )
+        resolutions |= found
+
+    if len(resolutions) > 1:
+        print_err_msg_exit(
+            f"""
+            The resolutions (as obtained from the file names) of the files in
+            group {file_group} in {source_dir} are different:
+              resolutions = {sorted(resolutions)}
+            Please ensure that all files have the same resolution."""
+        )
+    res = resolutions.pop()
+    cres = f"C{res}"
+
+    #
+    # Relative links are used when the pre-processing task was run (see
+    # link_fix). Like "ln --relative", these resolve the target to the
+    # actual file in source_dir.
+    #
+    relative_flag = bool(os.getenv("RELATIVE_LINK_FLAG"))
+    real_target_dir = os.path.realpath(target_dir)
+
+    def link_target(fn, relative):
+        if relative:
+            return os.path.relpath(
+                os.path.realpath(os.path.join(source_dir, fn)), real_target_dir
+            )
+        return os.path.join(source_dir, fn)
+
+    links = []
+    for _, _, pattern in plan:
+        fn = pattern.format(res=res)
+        links.append((link_target(fn, run_task and relative_flag), fn))
+    #
+    # Links without the halo size (and for sfc_climo files, with "tile1"
+    # instead of the regional tile) in their names. These point to the links
+    # created above.
+    #
+    aliases = []
+    if file_group == "grid":
+        aliases.append(
+            (
+                f"{cres}{dot_or_uscore}grid.tile{tile_rgnl}.halo{nh4}.nc",
+                f"{cres}{dot_or_uscore}grid.tile{tile_rgnl}.nc",
+            )
+        )
+    if file_group == "sfc_climo":
+        for field in sfc_climo_fields:
+            aliases.append(
+                (
+                    f"{cres}.{field}.tile{tile_rgnl}.halo{nh4}.nc",
+                    f"{cres}.{field}.tile{tile_rgnl}.nc",
+                )
+            )
+            aliases.append(
+                (
+                    f"{cres}.{field}.tile{tile_rgnl}.halo{nh0}.nc",
+                    f"{cres}.{field}.tile1.nc",
+                )
+            )
+    for fn, alias in aliases:
+        links.append((link_target(fn, True) if relative_flag else fn, alias))
+
+    created = create_symlinks(links, target_dir)
+    print_info_msg(
+        f"Linked {created} of {len(links)} {file_group} files in {target_dir} "
+        f"({len(links) - created} already up to date)",
+        verbose=verbose,
+    )
+
+    return res
+
+
 def parse_args(argv):
     """Parse command line arguments"""
     parser = argparse.ArgumentParser(
@@ -398,6 +648,13 @@ def parse_args(argv):
         help="Path to var_defns file.",
     )
 
+    parser.add_argument(
+        "-m",
+        "--manifest",
+        action="store_true",
+        help="Scan the source directory once and create all links in one batch.",
+    )
+
     return parser.parse_args(argv)
 
 
@@ -417,4 +674,5 @@ if __name__ == "__main__":
         nhw=cfg["grid_params"]["NHW"],
         run_task=True,
         sfc_climo_fields=cfg["fixed_files"]["SFC_CLIMO_FIELDS"],
+        manifest=args.manifest,
     )
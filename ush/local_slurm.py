@@ -0,0 +1,699 @@
+#!/usr/bin/env python3
+
+"""
+A local batch system for machines without one, behind the slurm commands
+that rocoto uses (sbatch, squeue, sacct and scancel, see rocoto_fake_slurm).
+
+A scheduler daemon keeps the jobs in a sqlite database and starts them in
+order of submission as long as the cores and memory they request fit in
+what the machine has left; a job that does not fit holds back the jobs
+after it, except those that fit now and end (by their time limit) before
+it could start.  The commands are thin clients that send their requests to
+the daemon over a Unix socket.  The first command starts the daemon, and
+the daemon stops once it has been idle for a while.
+
+The daemon keeps its database, socket and log in the directory given by
+the LOCAL_SLURM_DIR environment variable (~/.local_slurm by default).  The
+cores and memory (in MB) it hands out are those of the machine, unless set
+with LOCAL_SLURM_CORES and LOCAL_SLURM_MEMORY.
+"""
+
+import os
+import sys
+import argparse
+import fcntl
+import json
+import logging
+import selectors
+import shlex
+import signal
+import socket
+import sqlite3
+import subprocess
+import time
+from datetime import datetime, timezone
+
+DB_FN = "jobs.db"
+SOCKET_FN = "slurm.sock"
+LOCK_FN = "daemon.lock"
+LOG_FN = "daemon.log"
+SCRIPTS_DIR = "scripts"
+# Process information of Linux. Where it does not exist (e.g. macOS), the
+# processes of the jobs are identified by their start time.
+PROC_DIR = "/proc"
+
+# Seconds without jobs or requests after which the daemon stops
+IDLE_TIMEOUT = 600
+# Seconds between checks of the running jobs
+POLL_INTERVAL = 0.5
+# Seconds between SIGTERM and SIGKILL for jobs that are cancelled or time out
+KILL_WAIT = 30
+# Seconds a command waits for a daemon it started
+START_TIMEOUT = 30
+# Seconds between the starts of the daemon by a command waiting for it
+RESTART_INTERVAL = 1
+
+TIME_FMT = "%Y-%m-%d:%H:%M:%S"
+PARTITION = "linux"
+ACTIVE_STATES = ("PENDING", "RUNNING")
+
+JOB_COLUMNS = (
+    "id", "name", "user", "cwd", "output", "error", "cores", "memory",
+    "time_limit", "submit", "start", "end", "exit_code", "state", "pid",
+)
+
+
+def state_dir():
+    """Get the directory of the daemon."""
+    return os.environ.get("LOCAL_SLURM_DIR") or os.path.expanduser("~/.local_slurm")
+
+
+def machine_resources():
+    """Get the cores and memory (in MB) the daemon hands out."""
+    cores = os.environ.get("LOCAL_SLURM_CORES") or os.cpu_count() or 1
+    memory = os.environ.get("LOCAL_SLURM_MEMORY") or (
+        os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES") // 2**20
+    )
+    return int(cores), int(memory)
+
+
+def parse_time(value):
+    """Convert a slurm time limit ("minutes", "minutes:seconds",
+    "hours:minutes:seconds", "days-hours", "days-hours:minutes" or
+    "days-hours:minutes:seconds") to seconds; None means no limit."""
+    if value is None or value.upper() in ("INFINITE", "UNLIMITED"):
+        return None
+    days = 0
+    if "-" in value:
+        days, value = value.split("-", 1)
+        parts = [int(part) for part in value.split(":")]
+        parts += [0] * (3 - len(parts))
+    else:
+        parts = [int(part) for part in value.split(":")]
+        parts = {1: [0, parts[0], 0], 2: [0] + parts}.get(len(parts), parts)
+    hours, minutes, seconds = parts
+    return ((int(days) * 24 + hours) * 60 + minutes) * 60 + seconds
+
+
+def parse_memory(value):
+    """Convert a slurm memory size (in MB unless it has a K, M, G or T
+    suffix) to MB."""
+    if not value:
+        return 0
+    units = {"K": 2**-10, "M": 1, "G": 2**10, "T": 2**20}
+    scale = units.get(value[-1].upper())
+    if scale is None:
+        return int(value)
+    return int(float(value[:-1]) * scale)
+
+
+def job_options_parser():
+    """Get the parser of the sbatch options; options that do not matter to a
+    local job are accepted and ignored."""
+    parser = argparse.ArgumentParser(prog="sbatch", allow_abbrev=False)
+    parser.add_argument("-J", "--job-name", default=None)
+    parser.add_argument("-o", "--output", default=None)
+    parser.add_argument("-e", "--error", default=None)
+    parser.add_argument("-t", "--time", default=None)
+    parser.add_argument("-D", "--chdir", default=None)
+    parser.add_argument("-N", "--nodes", default="1")
+    parser.add_argument("-n", "--ntasks", type=int, default=None)
+    parser.add_argument("--ntasks-per-node", "--tasks-per-node", type=int, default=None)
+    parser.add_argument("-c", "--cpus-per-task", type=int, default=1)
+    parser.add_argument("--mem", default=None)
+    parser.add_argument("--mem-per-cpu", default=None)
+    for option in (
+        ("-A", "--account"), ("-p", "--partition"), ("-q", "--qos"), ("--export",),
+        ("-C", "--constraint"), ("--reservation",), ("-d", "--dependency"),
+        ("--mail-type",), ("--mail-user",),
+    ):
+        parser.add_argument(*option)
+    parser.add_argument("--exclusive", action="store_true")
+    parser.add_argument("script", nargs="?", default=None)
+    return parser
+
+
+def job_options(script, args):
+    """Get the options of a job from the #SBATCH lines of its script and the
+    command line arguments of sbatch (which take precedence), with its cores
+    and memory worked out from the slurm resource options."""
+    parser = job_options_parser()
+    directives = []
+    for line in script.splitlines():
+        line = line.strip()
+        if line.startswith("#SBATCH"):
+            directives += shlex.split(line[len("#SBATCH"):], comments=True)
+        elif line and not line.startswith("#"):
+            # Like slurm, stop at the first command
+            break
+    opts, _ = parser.parse_known_args(directives)
+    opts, _ = parser.parse_known_args(args, namespace=opts)
+
+    nodes = int(opts.nodes.split("-")[0])
+    ntasks = opts.ntasks or nodes * (opts.ntasks_per_node or 1)
+    cores = ntasks * opts.cpus_per_task
+    if opts.mem is not None:
+        memory = parse_memory(opts.mem) * nodes
+    else:
+        memory = parse_memory(opts.mem_per_cpu) * cores
+    return {
+        "name": opts.job_name or (os.path.basename(opts.script) if opts.script else "sbatch"),
+        "output": opts.output,
+        "error": opts.error,
+        "time_limit": parse_time(opts.time),
+        "chdir": opts.chdir,
+        "cores": cores,
+        "memory": memory,
+    }
+
+
+def job_path(pattern, job):
+    """Get the path of the output or error file of a job from its pattern."""
+    for key, value in (("%j", job["id"]), ("%x", job["name"]), ("%u", job["user"])):
+        pattern = pattern.replace(key, str(value))
+    return os.path.join(job["cwd"], pattern.replace("%%", "%"))
+
+
+class Scheduler:
+    """
+    The scheduler daemon: it keeps the jobs in a sqlite database, runs them
+    within the cores and memory of the machine and answers the requests of
+    the commands.
+
+    Args:
+        directory (str): Directory of the database, socket and scripts
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.cores, self.memory = machine_resources()
+        os.makedirs(os.path.join(directory, SCRIPTS_DIR), exist_ok=True)
+        self.db = sqlite3.connect(os.path.join(directory, DB_FN))
+        self.db.row_factory = sqlite3.Row
+        with self.db:
+            self.db.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id INTEGER PRIMARY KEY, name TEXT, user TEXT, cwd TEXT,
+                    output TEXT, error TEXT, env TEXT, cores INTEGER,
+                    memory INTEGER, time_limit INTEGER, submit REAL, start REAL,
+                    end REAL, exit_code INTEGER, state TEXT, pid INTEGER,
+                    pid_start TEXT);
+                CREATE INDEX IF NOT EXISTS jobs_state ON jobs (state);
+                """
+            )
+            columns = [row["name"] for row in self.db.execute("PRAGMA table_info(jobs)")]
+            if "pid_start" not in columns:
+                # Database of an older daemon
+                self.db.execute("ALTER TABLE jobs ADD COLUMN pid_start TEXT")
+        # Running jobs, by id, as dictionaries of their process, resources
+        # and (for jobs being killed) final state and time of SIGKILL
+        self.running = {}
+        self.changed = True
+        self._recover()
+
+    def _recover(self):
+        """Fail the jobs left running by a previous daemon, which are not
+        tracked anymore. Those still running are killed, but only if their
+        process is still the job: after a crash or a reboot, the pid may
+        belong to another process."""
+        orphans = self.db.execute(
+            "SELECT id, pid, pid_start FROM jobs WHERE state = 'RUNNING'"
+        ).fetchall()
+        for job in orphans:
+            if job["pid"] is not None and \
+                    _is_job_process(job["pid"], job["id"], job["pid_start"]):
+                try:
+                    os.killpg(job["pid"], signal.SIGKILL)
+                except OSError:
+                    pass
+        with self.db:
+            self.db.execute(
+                "UPDATE jobs SET state = 'NODE_FAIL', end = ?, exit_code = 1 "
+                "WHERE state = 'RUNNING'",
+                (time.time(),),
+            )
+        if orphans:
+            logging.warning(f"Failed {len(orphans)} jobs of a previous daemon")
+
+    def _script_path(self, job_id):
+        return os.path.join(self.directory, SCRIPTS_DIR, f"job.{job_id}")
+
+    def submit(self, request):
+        """Queue a job; returns its id."""
+        opts = job_options(request["script"], request["args"])
+        cwd = os.path.join(request["cwd"], opts["chdir"] or "")
+        with self.db:
+            job_id = self.db.execute(
+                "INSERT INTO jobs (name, user, cwd, output, error, env, cores, "
+                "memory, time_limit, submit, state) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 'PENDING')",
+                (
+                    opts["name"], request["env"].get("USER", "user"), cwd,
+                    opts["output"] or "slurm-%j.out", opts["error"],
+                    json.dumps(request["env"]),
+                    # A job larger than the machine would never start; it
+                    # gets the whole machine instead
+                    max(1, min(opts["cores"], self.cores)),
+                    min(opts["memory"], self.memory),
+                    opts["time_limit"], time.time(),
+                ),
+            ).lastrowid
+        with open(self._script_path(job_id), "w", encoding="utf-8") as f:
+            f.write(request["script"])
+        logging.info(f"Submitted job {job_id} ({opts['name']}, {opts['cores']} cores)")
+        self.changed = True
+        return job_id
+
+    def _free(self):
+        """Get the cores and memory not used by the running jobs."""
+        return (
+            self.cores - sum(job["cores"] for job in self.running.values()),
+            self.memory - sum(job["memory"] for job in self.running.values()),
+        )
+
+    def _shadow_time(self, job, now):
+        """Get the earliest time a job that does not fit now can start, from
+        the time limits of the running jobs (None if one has no limit)."""
+        cores, memory = self._free()
+        ends = sorted(
+            (running["start"] + running["time_limit"], running["cores"], running["memory"])
+            for running in self.running.values()
+            if running["time_limit"] is not None
+        )
+        if len(ends) < len(self.running):
+            return None
+        for end, job_cores, job_memory in ends:
+            cores += job_cores
+            memory += job_memory
+            if job["cores"] <= cores and job["memory"] <= memory:
+                return max(end, now)
+        return None
+
+    def schedule(self):
+        """Start the pending jobs that fit, in order of submission, and those
+        that can be backfilled in front of the first job that does not."""
+        if not self.changed:
+            return
+        self.changed = False
+        now = time.time()
+        shadow = None
+        blocked = False
+        for job in self.db.execute(
+            "SELECT * FROM jobs WHERE state = 'PENDING' ORDER BY id"
+        ).fetchall():
+            cores, memory = self._free()
+            if cores <= 0:
+                break
+            fits = job["cores"] <= cores and job["memory"] <= memory
+            if not blocked:
+                if fits:
+                    self._start(job)
+                    continue
+                blocked = True
+                shadow = self._shadow_time(job, now)
+            elif fits and shadow is not None and job["time_limit"] is not None \
+                    and now + job["time_limit"] <= shadow:
+                self._start(job)
+
+    def _start(self, job):
+        """Start a job in its own process group."""
+        job = dict(job)
+        env = json.loads(job["env"])
+        env.update(
+            SLURM_JOB_ID=str(job["id"]), SLURM_JOBID=str(job["id"]),
+            SLURM_JOB_NAME=job["name"], SLURM_SUBMIT_DIR=job["cwd"],
+            SLURM_CPUS_ON_NODE=str(job["cores"]),
+        )
+        now = time.time()
+        try:
+            stdout = open(job_path(job["output"], job), "w", encoding="utf-8")
+            stderr = subprocess.STDOUT
+            if job["error"]:
+                stderr = open(job_path(job["error"], job), "w", encoding="utf-8")
+            try:
+                proc = subprocess.Popen(
+                    ["/bin/bash", self._script_path(job["id"])], cwd=job["cwd"],
+                    env=env, stdin=subprocess.DEVNULL, stdout=stdout, stderr=stderr,
+                    start_new_session=True,
+                )
+            finally:
+                stdout.close()
+                if stderr is not subprocess.STDOUT:
+                    stderr.close()
+        except OSError as error:
+            logging.error(f"Could not start job {job['id']}: {error}")
+            self._finish(job["id"], "FAILED", 1, now)
+            return
+        job.update(proc=proc, start=now, ending=None, kill_time=None)
+        self.running[job["id"]] = job
+        pid_start = None if os.path.isdir(PROC_DIR) else _process_start(proc.pid)
+        with self.db:
+            self.db.execute(
+                "UPDATE jobs SET state = 'RUNNING', start = ?, pid = ?, pid_start = ? "
+                "WHERE id = ?",
+                (now, proc.pid, pid_start, job["id"]),
+            )
+        logging.info(f"Started job {job['id']} (pid {proc.pid})")
+
+    def _finish(self, job_id, state, exit_code, now):
+        with self.db:
+            self.db.execute(
+                "UPDATE jobs SET state = ?, exit_code = ?, end = ? WHERE id = ?",
+                (state, exit_code, now, job_id),
+            )
+        try:
+            os.remove(self._script_path(job_id))
+        except OSError:
+            pass
+        self.changed = True
+        logging.info(f"Job {job_id} ended: {state} ({exit_code})")
+
+    def _kill(self, job, state, now):
+        """Terminate a running job; it is killed if it is still running
+        KILL_WAIT seconds later."""
+        if job["ending"] is None:
+            job.update(ending=state, kill_time=now + KILL_WAIT)
+            self._signal(job, signal.SIGTERM)
+
+    @staticmethod
+    def _signal(job, signum):
+        try:
+            os.killpg(job["proc"].pid, signum)
+        except OSError:
+            pass
+
+    def check(self):
+        """Reap the jobs that ended, and terminate those over their time
+        limit."""
+        now = time.time()
+        for job_id, job in list(self.running.items()):
+            returncode = job["proc"].poll()
+            if returncode is not None:
+                del self.running[job_id]
+                exit_code = returncode if returncode >= 0 else 128 - returncode
+                state = job["ending"] or ("COMPLETED" if returncode == 0 else "FAILED")
+                self._finish(job_id, state, exit_code, now)
+            elif job["kill_time"] is not None and now > job["kill_time"]:
+                self._signal(job, signal.SIGKILL)
+            elif job["time_limit"] is not None and now > job["start"] + job["time_limit"]:
+                self._kill(job, "TIMEOUT", now)
+
+    def cancel(self, job_ids):
+        """Cancel jobs, pending or running."""
+        now = time.time()
+        for job_id in job_ids:
+            if job_id in self.running:
+                self._kill(self.running[job_id], "CANCELLED", now)
+        pending = [job_id for job_id in job_ids if job_id not in self.running]
+        for job_id in pending:
+            if self.db.execute(
+                "SELECT 1 FROM jobs WHERE id = ? AND state = 'PENDING'", (job_id,)
+            ).fetchone():
+                self._finish(job_id, "CANCELLED", 0, now)
+
+    def query(self, job_ids=None, since=None):
+        """Get jobs as dictionaries of JOB_COLUMNS: the given ones, those
+        submitted since a time, or all pending and running jobs."""
+        columns = ", ".join(JOB_COLUMNS)
+        if job_ids is None and since is not None:
+            rows = self.db.execute(
+                f"SELECT {columns} FROM jobs WHERE submit >= ? ORDER BY id", (since,)
+            ).fetchall()
+        elif job_ids is None:
+            rows = self.db.execute(
+                f"SELECT {columns} FROM jobs WHERE state IN (?, ?) ORDER BY id",
+                ACTIVE_STATES,
+            ).fetchall()
+        else:
+            rows = []
+            # Stay below the limit on the number of variables of a statement
+            for i in range(0, len(job_ids), 500):
+                chunk = job_ids[i:i + 500]
+                rows += self.db.execute(
+                    f"SELECT {columns} FROM jobs WHERE id IN ({','.join('?' * len(chunk))})",
+                    chunk,
+                ).fetchall()
+        return [dict(row) for row in rows]
+
+    def handle(self, request):
+        """Answer a request of a command."""
+        command = request["command"]
+        if command == "submit":
+            return {"id": self.submit(request)}
+        if command == "cancel":
+            self.cancel(request["ids"])
+            return {}
+        if command == "query":
+            return {"jobs": self.query(request.get("ids"), request.get("since"))}
+        raise ValueError(f"Unknown command {command}")
+
+    def idle(self):
+        return not self.running and not self.query()
+
+
+def _process_start(pid):
+    """Get the start time of a process as printed by ps, which is the same
+    on Linux and macOS (None if the process is gone)."""
+    try:
+        start = subprocess.run(
+            ["ps", "-o", "lstart=", "-p", str(pid)],
+            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, check=False,
+        ).stdout.strip()
+    except OSError:
+        return None
+    return start or None
+
+
+def _is_job_process(pid, job_id, pid_start=None):
+    """Check that a process is the script of a job, from its environment
+    (False if it can not be read, e.g. the process is gone). Without
+    PROC_DIR, the start time of the process must be pid_start, the one
+    recorded when the job started."""
+    if not os.path.isdir(PROC_DIR):
+        return pid_start is not None and _process_start(pid) == pid_start
+    try:
+        with open(os.path.join(PROC_DIR, str(pid), "environ"), "rb") as f:
+            environ = f.read().split(b"\0")
+    except OSError:
+        return False
+    return f"SLURM_JOB_ID={job_id}".encode() in environ
+
+
+def serve(directory):
+    """Run the scheduler daemon until it has been idle for IDLE_TIMEOUT
+    seconds. Only one daemon runs per directory."""
+    os.makedirs(directory, exist_ok=True)
+    lock = open(os.path.join(directory, LOCK_FN), "a", encoding="utf-8")
+    try:
+        fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        # Another daemon is running
+        return
+
+    scheduler = Scheduler(directory)
+    socket_path = os.path.join(directory, SOCKET_FN)
+    if os.path.exists(socket_path):
+        os.remove(socket_path)
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(socket_path)
+    server.listen(64)
+    selector = selectors.DefaultSelector()
+    selector.register(server, selectors.EVENT_READ)
+    logging.info(f"Serving {scheduler.cores} cores and {scheduler.memory} MB on {socket_path}")
+
+    last_active = time.time()
+    try:
+        while True:
+            for _ in selector.select(POLL_INTERVAL):
+                connection, _ = server.accept()
+                with connection:
+                    _answer(scheduler, connection)
+                last_active = time.time()
+            scheduler.check()
+            scheduler.schedule()
+            if scheduler.running:
+                last_active = time.time()
+            elif time.time() - last_active > IDLE_TIMEOUT and scheduler.idle():
+                break
+    finally:
+        os.remove(socket_path)
+        server.close()
+        # A command that finds no socket while the lock is still held starts
+        # a daemon that exits at once; it starts another one (see request())
+        lock.close()
+    logging.info("Stopping after being idle")
+
+
+def _answer(scheduler, connection):
+    connection.settimeout(10)
+    try:
+        with connection.makefile("rb") as f:
+            request = json.loads(f.readline())
+        try:
+            response = scheduler.handle(request)
+        except Exception as error:  # pylint: disable=broad-except
+            logging.exception("Failed request")
+            response = {"error": str(error)}
+        connection.sendall(json.dumps(response).encode() + b"\n")
+    except (OSError, ValueError) as error:
+        logging.error(f"Bad connection: {error}")
+
+
+def _start_daemon(directory):
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, LOG_FN), "a", encoding="utf-8") as log:
+        subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), "daemon"],
+            stdin=subprocess.DEVNULL, stdout=log, stderr=subprocess.STDOUT,
+            start_new_session=True,
+        )
+
+
+def request(message):
+    """Send a request to the daemon, starting it if it is not running, and
+    return its response."""
+    directory = state_dir()
+    socket_path = os.path.join(directory, SOCKET_FN)
+    deadline = None
+    next_start = 0
+    while True:
+        client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            client.connect(socket_path)
+            with client:
+                client.sendall(json.dumps(message).encode() + b"\n")
+                with client.makefile("rb") as f:
+                    line = f.readline()
+            if line:
+                break
+            # Closed without an answer by a daemon that was stopping
+        except (FileNotFoundError, ConnectionRefusedError, ConnectionResetError):
+            client.close()
+        now = time.time()
+        if deadline is None:
+            deadline = now + START_TIMEOUT
+        elif now > deadline:
+            raise RuntimeError(f"The local batch system did not start; see {directory}/{LOG_FN}")
+        if now >= next_start:
+            # A daemon that is stopping holds the lock until it is gone, and
+            # the one started meanwhile exits at once, so start it again
+            _start_daemon(directory)
+            next_start = now + RESTART_INTERVAL
+        time.sleep(0.1)
+    response = json.loads(line)
+    if "error" in response:
+        raise RuntimeError(response["error"])
+    return response
+
+
+def _format_time(timestamp):
+    if timestamp is None:
+        return "N/A"
+    return datetime.fromtimestamp(timestamp, timezone.utc).strftime(TIME_FMT)
+
+
+def _parse_start_time(value):
+    """Convert the --starttime of sacct to a timestamp; jobs are listed since
+    midnight by default, like slurm does, and all of them if the time is not
+    understood."""
+    if value is None:
+        return datetime.now().replace(hour=0, minute=0, second=0, microsecond=0).timestamp()
+    for fmt in ("%Y-%m-%dT%H:%M:%S", "%Y-%m-%dT%H:%M", "%Y-%m-%d", "%m/%d/%y"):
+        try:
+            return datetime.strptime(value, fmt).timestamp()
+        except ValueError:
+            pass
+    return 0
+
+
+def _listed_jobs(args, history=False):
+    """Get the jobs listed by squeue (pending and running jobs) and sacct
+    (history=True, jobs submitted since --starttime); jobs given with --jobs
+    are listed whatever their state, with state UNKNOWN if they do not
+    exist."""
+    parser = argparse.ArgumentParser(allow_abbrev=False)
+    parser.add_argument("-j", "--jobs", action="append")
+    parser.add_argument("-S", "--starttime", default=None)
+    opts, _ = parser.parse_known_args(args)
+    job_ids = None
+    if opts.jobs:
+        job_ids = [int(job_id) for jobs in opts.jobs for job_id in jobs.split(",") if job_id]
+    since = _parse_start_time(opts.starttime) if history else None
+    jobs = request({"command": "query", "ids": job_ids, "since": since})["jobs"]
+    if job_ids is None:
+        return jobs
+    found = {job["id"]: job for job in jobs}
+    unknown = dict.fromkeys(JOB_COLUMNS)
+    unknown.update(name=None, user=os.environ.get("USER", "user"), cores=1, state="UNKNOWN")
+    return [found.get(job_id, dict(unknown, id=job_id)) for job_id in job_ids]
+
+
+def _job_fields(job):
+    end = job["end"]
+    if end is None and job["start"] is not None and job["time_limit"] is not None:
+        end = job["start"] + job["time_limit"]
+    return {
+        "id": job["id"], "user": job["user"], "name": job["name"] or job["id"],
+        "submit": _format_time(job["submit"]), "start": _format_time(job["start"]),
+        "end": _format_time(end), "cores": job["cores"], "exit_code": job["exit_code"] or 0,
+        "state": job["state"],
+    }
+
+
+def sbatch(args):
+    """Submit a job script, read from the file given on the command line or
+    from standard input."""
+    opts, _ = job_options_parser().parse_known_args(args)
+    if opts.script:
+        with open(opts.script, "r", encoding="utf-8") as f:
+            script = f.read()
+    else:
+        script = sys.stdin.read()
+    response = request(
+        {
+            "command": "submit", "script": script, "args": args,
+            "cwd": os.getcwd(), "env": dict(os.environ),
+        }
+    )
+    print(f"Submitted batch job {response['id']}")
+
+
+def squeue(args):
+    """List jobs, the way rocoto reads squeue."""
+    fmt = "%-40s%-40s%-10s%-20s%-30s%-30s%-30s%-30s%-10s%-30s%-200s"
+    print(fmt % ("JOBID", "USER", "CPUS", "PARTITION", "SUBMIT_TIME", "START_TIME",
+                 "END_TIME", "PRIORITY", "EXIT_CODE", "STATE", "NAME"))
+    for job in _listed_jobs(args):
+        f = _job_fields(job)
+        print(fmt % (f["id"], f["user"], f["cores"], PARTITION, f["submit"], f["start"],
+                     f["end"], 0.1, f["exit_code"], f["state"], f["name"]))
+
+
+def sacct(args):
+    """List jobs, the way rocoto reads sacct."""
+    print("JobID|User|JobName|Partition|Priority|Submit|Start|End|NCPUS|ExitCode|State")
+    for job in _listed_jobs(args, history=True):
+        f = _job_fields(job)
+        print(f"{f['id']}|{str(f['user'])[:30]}|{str(f['name'])[:30]}|{PARTITION}|0.1|"
+              f"{f['submit']}|{f['start']}|{f['end']}|{f['cores']}|{f['exit_code']}|{f['state']}")
+
+
+def scancel(args):
+    """Cancel jobs."""
+    request({"command": "cancel", "ids": [int(arg) for arg in args if not arg.startswith("-")]})
+
+
+COMMANDS = {"sbatch": sbatch, "squeue": squeue, "sacct": sacct, "scancel": scancel}
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "daemon":
+        logging.basicConfig(
+            level=logging.INFO, format="%(asctime)s %(levelname)-8s %(message)s"
+        )
+        serve(state_dir())
+    elif len(sys.argv) > 1 and sys.argv[1] in COMMANDS:
+        COMMANDS[sys.argv[1]](sys.argv[2:])
+    else:
+        sys.exit(f"Usage: {sys.argv[0]} daemon|{'|'.join(COMMANDS)} [args]")
@@ -0,0 +1,15 @@
+from .basemap import (
+    background_key,
+    load_background,
+    render_background,
+    save_background,
+    set_background,
+)
+from .cache import save_arrays
+from .fields import PRODUCT_FIELDS, plot_fields
+from .follow import file_complete, follow_files
+from .geometry import grid_geometry, grid_key, wind_rotation
+from .grib_index import GribReader, read_inventory
+from .lod import decimate, decimate_mesh, lod_factor
+from .png import PNG_MODES, PngWriter, crop_box, encode_png, render_figure
+from .smoothing import SMOOTHING_METHODS, gaussian_smooth, map_region
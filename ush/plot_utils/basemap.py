@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+
+"""
+Cache the background of the plotting maps.
+
+Drawing the map background is one of the most expensive steps of making a
+plot: the shaded relief raster is reprojected to the map projection and the
+coastlines, states, borders and lakes are clipped and drawn every time a
+figure is saved.  The background only depends on the map (projection,
+extent, size of the axes and resolution), so it is drawn once, kept as RGBA
+images in a cache directory and drawn with the data of all later plots as
+images that need no reprojection.
+"""
+
+import os
+import hashlib
+import logging
+
+import numpy as np
+
+from .cache import save_arrays
+
+# The layers of a map background and the zorder they are drawn at. The
+# raster image is drawn underneath everything else. Map features are drawn
+# over filled plots and under contour lines, as cartopy draws them.
+BACKGROUND_LAYERS = {"image": 0, "features": 1.5}
+
+
+def background_key(fig, ax, extent, dpi, sources=()):
+    """Get the key of the background of a map in the cache.
+
+    Args:
+        fig: the figure of the map
+        ax: the map axes (projection and extent already set)
+        extent: the extent of the map, as given to set_extent()
+        dpi: resolution the plots are saved at
+        sources: anything else the background depends on (e.g. the
+                 location and resolution of the map data)
+    Returns:
+        the key, a hex digest
+    """
+    projection = getattr(ax, "projection", None)
+    params = [
+        projection.proj4_init if projection is not None else None,
+        [round(float(v), 6) for v in extent],
+        [round(float(v), 6) for v in fig.get_size_inches()],
+        [round(float(v), 6) for v in ax.get_position(original=True).bounds],
+        int(dpi),
+        [str(s) for s in sources],
+    ]
+    return hashlib.sha1(repr(params).encode("utf-8")).hexdigest()
+
+
+def _cache_path(cache_dir, key):
+    return os.path.join(cache_dir, f"background_{key}.npz")
+
+
+def load_background(cache_dir, key):
+    """Get a cached background.
+
+    Returns:
+        the background (see set_background()), or None if it is not in the
+        cache (or there is no cache)
+    """
+    if not cache_dir:
+        return None
+    path = _cache_path(cache_dir, key)
+    try:
+        with np.load(path) as layers:
+            return {name: layers[name] for name in BACKGROUND_LAYERS}
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def save_background(cache_dir, key, background):
+    """Save a background to the cache (see save_arrays()). Failing to write
+    the cache is not an error."""
+    if not cache_dir:
+        return
+    try:
+        save_arrays(_cache_path(cache_dir, key), background)
+    except OSError as e:
+        logging.warning(f"Could not cache the map background in {cache_dir}: {e}")
+
+
+def render_background(fig, ax, dpi, transparent=False):
+    """Draw a figure and get the part of it covered by the map axes.
+
+    Args:
+        fig: the figure, with only a layer of the map background drawn on
+             the axes
+        ax: the map axes
+        dpi: resolution the plots are saved at
+        transparent: leave out the figure and axes backgrounds, the frame of
+                     the axes and the other axes of the figure, so that
+                     only what is drawn on the axes is opaque
+    Returns:
+        the RGBA image of the axes, as a (rows, columns, 4) uint8 array
+    """
+    hidden = []
+    if transparent:
+        hidden = [fig.patch, ax.patch] + list(ax.spines.values())
+        hidden += [other for other in fig.axes if other is not ax]
+        hidden = [artist for artist in hidden if artist.get_visible()]
+    fig_dpi = fig.dpi
+    fig.set_dpi(dpi)
+    for artist in hidden:
+        artist.set_visible(False)
+    try:
+        fig.canvas.draw()
+        buf = np.asarray(fig.canvas.buffer_rgba())
+        bbox = ax.get_window_extent().frozen()
+    finally:
+        fig.set_dpi(fig_dpi)
+        for artist in hidden:
+            artist.set_visible(True)
+    height = buf.shape[0]
+    x0, x1 = int(round(bbox.x0)), int(round(bbox.x1))
+    y0, y1 = int(round(height - bbox.y1)), int(round(height - bbox.y0))
+    return np.array(buf[y0:y1, x0:x1])
+
+
+def set_background(ax, background):
+    """Draw a background over the whole map axes.
+
+    Args:
+        ax: the map axes
+        background: dictionary with the RGBA images of the layers of the
+                    background (see BACKGROUND_LAYERS), as returned by
+                    render_background()
+    Returns:
+        the image artists
+    """
+    x0, x1 = ax.get_xlim()
+    y0, y1 = ax.get_ylim()
+    return [
+        ax.imshow(
+            background[name],
+            origin="upper",
+            extent=(x0, x1, y0, y1),
+            transform=ax.transData,
+            interpolation="nearest",
+            aspect=ax.get_aspect(),
+            zorder=zorder,
+        )
+        for name, zorder in BACKGROUND_LAYERS.items()
+    ]
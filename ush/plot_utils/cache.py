@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+
+"""
+Files of the cache directory of the plotting scripts.
+
+The cache is shared by all the plotting processes (and tasks) of an
+experiment, which may read a file while another one writes it.
+"""
+
+import os
+import tempfile
+
+import numpy as np
+
+
+def save_arrays(path, arrays):
+    """Save arrays to a .npz file of the cache.
+
+    The file is written under a temporary name in the same directory and
+    renamed, so that processes reading the cache at the same time never see
+    a partial file. The temporary file is removed if writing it fails.
+
+    Args:
+        path: path of the file
+        arrays: dictionary of the arrays to save, by name
+    Raises:
+        OSError: the file could not be written
+    """
+    cache_dir = os.path.dirname(path)
+    os.makedirs(cache_dir, exist_ok=True)
+    fd, tmp_fp = tempfile.mkstemp(dir=cache_dir, suffix=".npz.tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            np.savez(f, **arrays)
+        os.replace(tmp_fp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_fp)
+        except OSError:
+            pass
+        raise
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+
+"""
+The GRIB2 fields read by the plotting scripts, and the products plotted
+from them.
+"""
+
+# Products in plotting order, with the fields each of them is plotted from.
+# Only the fields of the products being plotted are read.
+PRODUCT_FIELDS = {
+    "slp": ("slp",),
+    "2mt": ("tmp2m",),
+    "2mdew": ("dew2m",),
+    "10mwind": ("u10m", "v10m"),
+    "sfcape": ("cape", "cin"),
+    "500": ("z500", "vort500", "u500", "v500"),
+    "250wind": ("u250", "v250"),
+    "qpf": ("qpf",),
+    "refc": ("refc",),
+    "uh25": ("maxuh25", "minuh25"),
+}
+
+
+def plot_fields(fhr, products=None):
+    """Get the GRIB keys that select each field plotted at a forecast hour,
+    in the form expected by GribReader.
+
+    Args:
+        fhr: forecast hour
+        products: names of the products to plot (see PRODUCT_FIELDS), None
+                  for all of them
+    Returns:
+        dict mapping field names to GRIB keys
+    Raises:
+        ValueError if a product is unknown
+    """
+    fields = {
+        "slp": {"name": "Pressure reduced to MSL", "inventory": ":PRMSL:"},
+        "tmp2m": {"name": "2 metre temperature", "inventory": ":TMP:2 m above ground:"},
+        "dew2m": {
+            "name": "2 metre dewpoint temperature",
+            "inventory": ":DPT:2 m above ground:",
+        },
+        "u10m": {
+            "name": "10 metre U wind component",
+            "inventory": ":UGRD:10 m above ground:",
+        },
+        "v10m": {
+            "name": "10 metre V wind component",
+            "inventory": ":VGRD:10 m above ground:",
+        },
+        "cape": {
+            "name": "Convective available potential energy",
+            "typeOfLevel": "surface",
+            "inventory": ":CAPE:surface:",
+        },
+        "cin": {
+            "name": "Convective inhibition",
+            "typeOfLevel": "surface",
+            "inventory": ":CIN:surface:",
+        },
+        "z500": {"name": "Geopotential Height", "level": 500, "inventory": ":HGT:500 mb:"},
+        "vort500": {"name": "Absolute vorticity", "level": 500, "inventory": ":ABSV:500 mb:"},
+        "u500": {"name": "U component of wind", "level": 500, "inventory": ":UGRD:500 mb:"},
+        "v500": {"name": "V component of wind", "level": 500, "inventory": ":VGRD:500 mb:"},
+        "u250": {"name": "U component of wind", "level": 250, "inventory": ":UGRD:250 mb:"},
+        "v250": {"name": "V component of wind", "level": 250, "inventory": ":VGRD:250 mb:"},
+        "qpf": {
+            "name": "Total Precipitation",
+            "lengthOfTimeRange": fhr,
+            "inventory": ":APCP:surface:",
+        },
+        "refc": {
+            "name": "Maximum/Composite radar reflectivity",
+            "inventory": ":REFC:entire atmosphere",
+        },
+    }
+    if fhr > 0:
+        fields["maxuh25"] = {
+            "stepType": "max",
+            "parameterName": "199",
+            "topLevel": 5000,
+            "bottomLevel": 2000,
+            "inventory": ":MXUPHL:5000-2000 m above ground:",
+        }
+        fields["minuh25"] = {
+            "stepType": "min",
+            "parameterName": "200",
+            "topLevel": 5000,
+            "bottomLevel": 2000,
+            "inventory": ":MNUPHL:5000-2000 m above ground:",
+        }
+    if products is None:
+        return fields
+    unknown = set(products) - set(PRODUCT_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown products {sorted(unknown)}, must be in {list(PRODUCT_FIELDS)}")
+    names = {name for product in products for name in PRODUCT_FIELDS[product]}
+    return {name: keys for name, keys in fields.items() if name in names}
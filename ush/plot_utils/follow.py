@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+
+"""
+Follow the output of a running forecast.
+
+In follow mode the plotting scripts start before post has written all the
+forecast hours, and plot each hour as soon as its post output file is
+complete.  Directories are watched with inotify when the inotify_simple
+package is available, and polled otherwise.
+"""
+
+import os
+import time
+import logging
+
+try:
+    import inotify_simple
+except ImportError:
+    inotify_simple = None
+
+
+class _Watcher:
+    """Wait for files to be written to directories. The names of the files
+    closed after writing or moved into the directories are collected in
+    written. Without inotify, waiting just sleeps."""
+
+    def __init__(self, dirs):
+        self.written = set()
+        self._inotify = None
+        self._dirs = {}
+        if inotify_simple is None:
+            return
+        try:
+            self._inotify = inotify_simple.INotify()
+            mask = inotify_simple.flags.CLOSE_WRITE | inotify_simple.flags.MOVED_TO
+            for path in dirs:
+                self._dirs[self._inotify.add_watch(path, mask)] = path
+        except OSError as e:
+            # e.g. the directory does not exist yet or there are too many
+            # watches
+            logging.info(f"Polling for files instead of watching them: {e}")
+            self.close()
+
+    def wait(self, seconds):
+        if self._inotify is None:
+            time.sleep(seconds)
+            return
+        for event in self._inotify.read(timeout=int(seconds * 1000)):
+            self.written.add(os.path.join(self._dirs[event.wd], event.name))
+
+    def close(self):
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
+
+
+def file_complete(path, stable=30.0, written=()):
+    """Check whether a file is complete: its index file (path + ".idx")
+    exists, it is in written, or it has not been modified for stable
+    seconds."""
+    if os.path.exists(path + ".idx"):
+        return True
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return False
+    if st.st_size == 0:
+        return False
+    return path in written or time.time() - st.st_mtime >= stable
+
+
+def follow_files(paths, interval=10.0, stable=30.0, timeout=3600.0, check=None):
+    """Wait for files to be complete (see file_complete()) and yield them
+    as they are, in the order they complete.
+
+    Args:
+        paths: the files
+        interval: seconds between checks of the files (the longest time
+                  before a file that is written is seen)
+        stable: seconds without modifications after which a file is complete
+        timeout: seconds to wait for the next file
+        check: function called before each wait for files, which can stop
+               following by raising an exception
+    Raises:
+        TimeoutError if no file is complete within timeout seconds
+    """
+    pending = list(paths)
+    watcher = _Watcher(sorted({os.path.dirname(os.path.abspath(p)) for p in pending}))
+    try:
+        last = time.monotonic()
+        while pending:
+            complete = [
+                p
+                for p in pending
+                if file_complete(os.path.abspath(p), stable, watcher.written)
+            ]
+            for path in complete:
+                pending.remove(path)
+                yield path
+            if complete:
+                last = time.monotonic()
+            if not pending:
+                break
+            if time.monotonic() - last > timeout:
+                raise TimeoutError(
+                    f"No new complete file in {timeout} seconds, still waiting for {pending}"
+                )
+            if check is not None:
+                check()
+            watcher.wait(interval)
+    finally:
+        watcher.close()
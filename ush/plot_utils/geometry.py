@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+
+"""
+Geometry of the grid of the post output files.
+
+The plots need the lat/lon of the grid points (for contours and wind
+barbs), the lat/lon of the corners of the grid cells (for pcolormesh) and
+the angles to rotate grid relative winds to earth relative winds.  All of
+these only depend on the grid, which is the same for every forecast hour of
+a run, so they are computed once per grid, saved to a cache directory and
+loaded from there by every plotting process.  Grids are identified by a hash
+of their grid definition section.
+"""
+
+import os
+import hashlib
+import logging
+
+import numpy as np
+
+from .cache import save_arrays
+
+# Arrays of the geometry of a grid
+GEOMETRY_ARRAYS = ("lat", "lon", "lat_shift", "lon_shift", "sinx", "cosx")
+
+# Scalar parameters of the geometry of a grid
+GEOMETRY_PARAMS = ("Lat0", "Lon0", "dx")
+
+# Geometries already used by this process
+_geometries = {}
+
+
+def grid_key(grid):
+    """Get the key of the geometry of a grid: a hash of the grid definition
+    section (section 3) of a GRIB2 message.
+
+    Args:
+        grid: a GRIB message (pygrib) on the grid
+    Returns:
+        the key, a hex digest
+    """
+    msg = grid.tostring()
+    if msg[:4] == b"GRIB" and msg[7] == 2:
+        pos = 16
+        while pos + 5 <= len(msg) and msg[pos : pos + 4] != b"7777":
+            length = int.from_bytes(msg[pos : pos + 4], "big")
+            if length < 5:
+                break
+            if msg[pos + 4] == 3:
+                return hashlib.sha1(msg[pos : pos + length]).hexdigest()
+            pos += length
+    # Not GRIB2 (or a malformed message): use the grid parameters instead
+    params = sorted(grid.projparams.items())
+    params += [grid.latlons()[0].shape]
+    params += [grid[key] for key in ("latitudeOfFirstGridPointInDegrees",
+                                     "longitudeOfFirstGridPointInDegrees")]
+    return hashlib.sha1(repr(params).encode("utf-8")).hexdigest()
+
+
+def wind_rotation(true_lat, lov_lon, earth_lons, proj="lcc"):
+    """Get the sine and cosine of the angles that rotate grid relative winds
+    to earth relative winds.
+
+    Args:
+        true_lat: true latitude of the projection (degrees)
+        lov_lon: LoV of the projection (degrees)
+        earth_lons: earth relative longitudes of the grid points (degrees)
+        proj: map projection, "lcc" or a polar stereographic projection
+    Returns:
+        (sin, cos) tuple of arrays shaped as earth_lons
+    """
+    if lov_lon > 0.0:
+        lov_lon = lov_lon - 360.0
+    dtr = np.pi / 180.0  # Degrees to radians
+
+    # Lambert cone constant (one for polar stereographic projections)
+    if proj.lower() == "lcc":
+        rotcon_p = np.sin(true_lat * dtr)
+    elif proj.lower() in ["stere", "spstere", "npstere"]:
+        rotcon_p = 1.0
+    else:
+        raise ValueError(f"Unsupported map projection: {proj.lower()} for wind rotation.")
+
+    angles = rotcon_p * (earth_lons - lov_lon) * dtr
+    return np.sin(angles), np.cos(angles)
+
+
+def compute_geometry(grid):
+    """Compute the geometry of a grid.
+
+    Args:
+        grid: a GRIB message (pygrib) on the grid
+    Returns:
+        dictionary with the unshifted (lat, lon) arrays for contours and wind
+        barbs, the shifted (lat_shift, lon_shift) arrays for pcolormesh, the
+        sine and cosine of the wind rotation angles (sinx, cosx), the
+        projection parameters Lat0 and Lon0 and the grid spacing dx
+    """
+    # Imported here so that the other plotting utilities can be used
+    # without pyproj
+    import pyproj  # pylint: disable=import-outside-toplevel
+
+    # Unshifted grid for contours and wind barbs
+    lat, lon = grid.latlons()
+
+    # Shift grid for pcolormesh
+    lat1 = grid["latitudeOfFirstGridPointInDegrees"]
+    lon1 = grid["longitudeOfFirstGridPointInDegrees"]
+    if grid.valid_key("Nx"):
+        nx = grid["Nx"]
+        ny = grid["Ny"]
+    else:
+        nx = grid["Ni"]
+        ny = grid["Nj"]
+    dx = grid["DxInMetres"]
+    dy = grid["DyInMetres"]
+    pj = pyproj.Proj(grid.projparams)
+    llcrnrx, llcrnry = pj(lon1, lat1)
+    llcrnrx = llcrnrx - (dx / 2.0)
+    llcrnry = llcrnry - (dy / 2.0)
+    x = llcrnrx + dx * np.arange(nx)
+    y = llcrnry + dy * np.arange(ny)
+    x, y = np.meshgrid(x, y)
+    lon_shift, lat_shift = pj(x, y, inverse=True)
+
+    Lat0 = grid["LaDInDegrees"]
+    Lon0 = grid["LoVInDegrees"]
+    sinx, cosx = wind_rotation(Lat0, Lon0, lon, "lcc")
+
+    return {
+        "lat": lat,
+        "lon": lon,
+        "lat_shift": lat_shift,
+        "lon_shift": lon_shift,
+        "sinx": sinx,
+        "cosx": cosx,
+        "Lat0": Lat0,
+        "Lon0": Lon0,
+        "dx": dx,
+    }
+
+
+def _load_geometry(path):
+    try:
+        with np.load(path) as arrays:
+            geometry = {name: arrays[name] for name in GEOMETRY_ARRAYS}
+            geometry.update((name, arrays[name].item()) for name in GEOMETRY_PARAMS)
+    except (OSError, ValueError, KeyError):
+        return None
+    return geometry
+
+
+def _save_geometry(path, geometry):
+    """Save a geometry to the cache (see save_arrays()). Failing to write
+    the cache is not an error."""
+    try:
+        save_arrays(path, geometry)
+    except OSError as e:
+        logging.warning(f"Could not cache the grid geometry in {os.path.dirname(path)}: {e}")
+
+
+def grid_geometry(grid, cache_dir=None):
+    """Get the geometry of a grid (see compute_geometry()). It is taken
+    from this process' geometries or the cache directory if it is there,
+    and computed (and cached) otherwise. The returned arrays are shared and
+    must not be modified.
+
+    Args:
+        grid: a GRIB message (pygrib) on the grid
+        cache_dir: directory of cached geometries (None for no cache)
+    Returns:
+        dictionary with the geometry of the grid
+    """
+    key = grid_key(grid)
+    if key in _geometries:
+        return _geometries[key]
+
+    path = os.path.join(cache_dir, f"geometry_{key}.npz") if cache_dir else None
+    geometry = _load_geometry(path) if path else None
+    if geometry is None:
+        geometry = compute_geometry(grid)
+        if path:
+            _save_geometry(path, geometry)
+    _geometries[key] = geometry
+    return geometry
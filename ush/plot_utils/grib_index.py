@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+
+"""
+Read selected fields from a GRIB2 file.
+
+pygrib's select() scans the whole file every time it is called, so reading
+a dozen fields from a post output file with hundreds of messages scans it a
+dozen times.  GribReader finds the messages of all the fields it is asked
+for in a single pass over the file and decodes only those messages.  When
+the wgrib2 inventory (.idx) written by the prdgen task is present, the
+candidate messages are located from it and read directly from a memory map
+of the file, so the other messages are not even read.
+"""
+
+import os
+import mmap
+import logging
+
+# GRIB keys that a field may be selected by
+INDEX_KEYS = (
+    "name",
+    "shortName",
+    "parameterName",
+    "typeOfLevel",
+    "level",
+    "topLevel",
+    "bottomLevel",
+    "stepType",
+    "lengthOfTimeRange",
+)
+
+
+def _message_keys(msg, keys, cache):
+    """Get the values of the given GRIB keys of a message, None for keys
+    the message does not have. Values are cached in the given dict."""
+    for key in keys:
+        if key not in cache:
+            cache[key] = msg[key] if msg.valid_key(key) else None
+    return cache
+
+
+def _matches(msg_keys, criteria):
+    return all(msg_keys[k] == v for k, v in criteria.items())
+
+
+def read_inventory(idx_fp):
+    """Read a wgrib2 inventory (the output of "wgrib2 -s").
+
+    Args:
+        idx_fp: path to the inventory file
+    Returns:
+        list of (byte offset, inventory line) tuples, one per message, or
+        None if the inventory lists submessages, which are not supported
+    """
+    inventory = []
+    with open(idx_fp, "r", encoding="utf-8") as f:
+        for line in f:
+            fields = line.rstrip("\n").split(":")
+            if len(fields) < 3:
+                continue
+            if "." in fields[0]:
+                return None
+            inventory.append((int(fields[1]), line.rstrip("\n")))
+    return inventory
+
+
+class GribReader:
+    """Fields of one GRIB2 file, indexed in a single pass.
+
+    Args:
+        path: path to the GRIB2 file
+        fields: dict mapping field names to the GRIB keys that select them
+                (as given to pygrib's select()). The optional "inventory"
+                entry is a string found in the wgrib2 inventory line of the
+                message (e.g. ":TMP:2 m above ground:"), used to locate the
+                message through the .idx file.
+        use_idx: locate messages through the .idx file if it is up to date
+    """
+
+    def __init__(self, path, fields, use_idx=True):
+        # Imported here so that the other plotting utilities can be used
+        # without pygrib
+        import pygrib  # pylint: disable=import-outside-toplevel
+
+        self._pygrib = pygrib
+        self.path = path
+        self.fields = {}
+        self.inventory = {}
+        for name, spec in fields.items():
+            spec = dict(spec)
+            self.inventory[name] = spec.pop("inventory", None)
+            unknown = set(spec) - set(INDEX_KEYS)
+            if unknown:
+                raise ValueError(f"Field {name} is selected by unsupported keys {unknown}")
+            self.fields[name] = spec
+
+        self._messages = {}
+        self._values = {}
+        self._grid_message = None
+
+        idx_fp = f"{path}.idx"
+        pending = list(self.fields)
+        if use_idx and os.path.exists(idx_fp) and (
+            os.path.getmtime(idx_fp) >= os.path.getmtime(path)
+        ):
+            pending = self._index_from_inventory(idx_fp, pending)
+        if pending or self._grid_message is None:
+            self._index_by_scan(pending)
+
+    def _index_from_inventory(self, idx_fp, pending):
+        """Locate the messages of the fields through a wgrib2 inventory.
+
+        Returns:
+            the names of the fields that could not be located this way
+        """
+        inventory = read_inventory(idx_fp)
+        size = os.path.getsize(self.path)
+        if not inventory or inventory[-1][0] >= size:
+            return pending
+        ends = [offset for offset, _ in inventory[1:]] + [size]
+
+        with open(self.path, "rb") as f, mmap.mmap(
+            f.fileno(), 0, access=mmap.ACCESS_READ
+        ) as mm:
+
+            decoded = {}
+
+            def message(i):
+                if i not in decoded:
+                    start = inventory[i][0]
+                    decoded[i] = (self._pygrib.fromstring(mm[start : ends[i]]), {})
+                return decoded[i]
+
+            self._grid_message = message(0)[0]
+            not_found = []
+            for name in pending:
+                pattern = self.inventory[name]
+                criteria = self.fields[name]
+                found = False
+                if pattern:
+                    for i, (_, line) in enumerate(inventory):
+                        if pattern not in line:
+                            continue
+                        msg, cache = message(i)
+                        if _matches(_message_keys(msg, criteria, cache), criteria):
+                            self._messages[name] = msg
+                            found = True
+                            break
+                if not found:
+                    not_found.append(name)
+
+        logging.debug(
+            f"Decoded {len(decoded)} of {len(inventory)} messages of {self.path} "
+            f"using its inventory"
+        )
+        return not_found
+
+    def _index_by_scan(self, pending):
+        """Locate the messages of the fields by reading the headers of all
+        the messages of the file once. Fields that are not found are left
+        out of the index."""
+        keys = set()
+        for name in pending:
+            keys.update(self.fields[name])
+        pending = list(pending)
+
+        grbs = self._pygrib.open(self.path)
+        try:
+            for msg in grbs:
+                if self._grid_message is None:
+                    self._grid_message = msg
+                if not pending:
+                    break
+                cache = _message_keys(msg, keys, {})
+                for name in list(pending):
+                    if _matches(cache, self.fields[name]):
+                        self._messages[name] = msg
+                        pending.remove(name)
+        finally:
+            grbs.close()
+
+    def __contains__(self, name):
+        return name in self._messages
+
+    @property
+    def grid_message(self):
+        """The first message of the file, for the grid definition."""
+        return self._grid_message
+
+    def message(self, name):
+        """Get the message of a field.
+
+        Raises:
+            KeyError if the field is not in the file
+        """
+        if name not in self._messages:
+            raise KeyError(f"Field {name} was not found in {self.path}")
+        return self._messages[name]
+
+    def values(self, name):
+        """Get the decoded values of a field. Values are decoded the first
+        time they are asked for; the returned array must not be modified.
+
+        Raises:
+            KeyError if the field is not in the file
+        """
+        if name not in self._values:
+            self._values[name] = self.message(name).values
+        return self._values[name]
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+
+"""
+Level of detail of the plotted fields.
+
+On 3-km grids a pcolormesh of a field has many more grid cells than the
+saved plot has pixels, so most of the time spent drawing it is spent on
+cells that end up sharing a pixel.  Fields are decimated to about the
+resolution of the plot before they are drawn: each block of grid cells
+covering at most one pixel is replaced by one cell.  The value of the new
+cell is the mean of the block for smooth fields, and the extreme of the
+block for fields whose extremes matter (reflectivity, updraft helicity,
+precipitation), so that small features are not smoothed away.
+"""
+
+import numpy as np
+
+# Ways of reducing a block of grid cells to one value
+REDUCTIONS = ("mean", "max", "min", "absmax")
+
+
+def lod_factor(ax, dx, dpi):
+    """Get the decimation factor of the fields plotted on map axes: the
+    number of grid cells along each side of the blocks that fit in one
+    pixel of the saved plot.
+
+    Args:
+        ax: the map axes (with data coordinates in meters, as for cartopy
+            projections)
+        dx: grid spacing of the fields (meters)
+        dpi: resolution the plot is saved at
+    Returns:
+        the factor, 1 if the grid is not finer than the pixels
+    """
+    x0, x1 = ax.get_xlim()
+    width = ax.get_window_extent().width * dpi / ax.figure.dpi
+    if width <= 0 or dx <= 0:
+        return 1
+    return max(1, int(abs(x1 - x0) / width // dx))
+
+
+def decimate(field, factor, how="mean"):
+    """Reduce each factor x factor block of a 2D field to one value. Rows
+    and columns that do not fill a whole block are dropped.
+
+    Args:
+        field: the 2D array (masked arrays are supported)
+        factor: the size of the blocks
+        how: "mean", "max", "min" or "absmax" (the value of largest
+             magnitude, keeping its sign)
+    Returns:
+        the decimated field
+    """
+    if how not in REDUCTIONS:
+        raise ValueError(f"Unknown reduction {how}, must be one of {REDUCTIONS}")
+    if factor <= 1:
+        return field
+    ny, nx = (n // factor for n in np.shape(field))
+    blocks = field[: ny * factor, : nx * factor].reshape(ny, factor, nx, factor)
+    if how == "mean":
+        return blocks.mean(axis=(1, 3))
+    if how == "max":
+        return blocks.max(axis=(1, 3))
+    if how == "min":
+        return blocks.min(axis=(1, 3))
+    bmax = blocks.max(axis=(1, 3))
+    bmin = blocks.min(axis=(1, 3))
+    where = np.ma.where if np.ma.isMaskedArray(blocks) else np.where
+    return where(-bmin > bmax, bmin, bmax)
+
+
+def decimate_mesh(x, y, field, factor, how="mean"):
+    """Decimate a field and its grid for pcolormesh. The grid of the
+    decimated field is made of the first corner of each block, so that each
+    quad spans the source cells of its block.
+
+    Args:
+        x, y: 2D coordinates of the corners of the grid cells, the first
+              corner of each cell (same shape as field)
+        field: the 2D field
+        factor: the size of the blocks
+        how: reduction of the field (see decimate())
+    Returns:
+        (x, y, field) tuple of the decimated arrays
+    """
+    if factor <= 1:
+        return x, y, field
+    ny, nx = (n // factor for n in np.shape(field))
+    rows = slice(0, ny * factor, factor)
+    cols = slice(0, nx * factor, factor)
+    return x[rows, cols], y[rows, cols], decimate(field, factor, how)
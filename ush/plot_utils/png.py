@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+
+"""
+Save figures as PNG files.
+
+Saving a figure with savefig(bbox_inches="tight") draws it twice (once to
+find the bounding box of the plot and once to save it), and the plots used
+to be encoded twice more (once by matplotlib and once by PIL, after
+decoding the first PNG).  Here the figure is drawn once, the image is taken
+from the Agg buffer and cropped to a bounding box that is found once per
+kind of plot, and it is encoded once, in a background thread so that the
+next figure can be drawn in the meantime.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from PIL import Image
+
+# Kinds of PNG files: 24-bit RGB, or 8-bit with an adaptive palette of 256
+# colors (much smaller files)
+PNG_MODES = ("rgb", "palette")
+
+
+def crop_box(fig, dpi, pad_inches=0.1):
+    """Get the tight bounding box of a drawn figure, as savefig() finds it
+    for bbox_inches="tight".
+
+    Args:
+        fig: the figure, drawn at dpi
+        dpi: resolution the figure is drawn at
+        pad_inches: padding around the bounding box
+    Returns:
+        (x0, y0, x1, y1) tuple of the box in pixels of the figure buffer
+        (rows counted from the top)
+    """
+    bbox = fig.get_tightbbox(fig.canvas.get_renderer()).padded(pad_inches)
+    width, height = fig.canvas.get_width_height()
+    # Same size as the image saved by savefig(), which truncates it
+    x0 = round(bbox.x0 * dpi)
+    x1 = x0 + int(bbox.width * dpi)
+    y1 = height - round(bbox.y0 * dpi)
+    y0 = y1 - int(bbox.height * dpi)
+    return max(0, x0), max(0, y0), min(width, x1), min(height, y1)
+
+
+def render_figure(fig, dpi, box=None):
+    """Draw a figure and get the part of it inside a crop box.
+
+    Args:
+        fig: the figure
+        dpi: resolution to draw the figure at
+        box: the crop box (see crop_box()), None to find it
+    Returns:
+        (image, box) tuple of the RGBA image, as a (rows, columns, 4) uint8
+        array, and the crop box
+    """
+    fig_dpi = fig.dpi
+    fig.set_dpi(dpi)
+    try:
+        fig.canvas.draw()
+        if box is None:
+            box = crop_box(fig, dpi)
+        buf = np.asarray(fig.canvas.buffer_rgba())
+        x0, y0, x1, y1 = box
+        # The buffer is reused by the next draw, so the image is copied
+        image = np.array(buf[y0:y1, x0:x1])
+    finally:
+        fig.set_dpi(fig_dpi)
+    return image, box
+
+
+def encode_png(filename, image, mode="rgb"):
+    """Write an RGBA image to a PNG file, without its alpha channel.
+
+    Args:
+        filename: path of the file
+        image: the image, as returned by render_figure()
+        mode: kind of PNG file (see PNG_MODES)
+    """
+    im = Image.fromarray(image, "RGBA").convert("RGB")
+    if mode == "palette":
+        im = im.convert("P", palette=Image.ADAPTIVE)
+    im.save(filename, format="PNG")
+
+
+class PngWriter:
+    """Write PNG files in a background thread. One file is written at a
+    time: saving a file waits for the previous one, and raises the error
+    writing it if there was one, as an OSError naming that file.
+
+    Args:
+        mode: kind of PNG files (see PNG_MODES)
+    """
+
+    def __init__(self, mode="rgb"):
+        if mode not in PNG_MODES:
+            raise ValueError(f"Unknown PNG mode {mode}, must be one of {PNG_MODES}")
+        self.mode = mode
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._pending = None
+
+    def save(self, filename, image):
+        """Start writing an image (see encode_png()) to a file."""
+        self.wait()
+        self._pending = (filename,
+                         self._executor.submit(encode_png, filename, image, self.mode))
+
+    def wait(self):
+        """Wait for the file being written."""
+        pending, self._pending = self._pending, None
+        if pending is not None:
+            filename, future = pending
+            try:
+                future.result()
+            except Exception as error:
+                raise OSError(f"Could not write {filename}: {error}") from error
+
+    def close(self):
+        """Wait for the file being written and stop the thread."""
+        try:
+            self.wait()
+        finally:
+            self._executor.shutdown()
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+
+"""
+Gaussian smoothing of the plotted fields.
+
+The contours of sea level pressure and 500 mb height are drawn from fields
+smoothed with wide Gaussian filters (standard deviations of 7 to 14 grid
+points).  A direct (separable) filter costs a number of operations per grid
+point that grows with the width of the filter, while a convolution through
+FFTs costs the same for any width, so wide filters are applied with FFTs.
+Boundaries are handled as by scipy.ndimage.gaussian_filter() (mode
+"reflect"), so the results are the same up to rounding.  When only part of
+the grid is shown on a map, only that part and a halo of the width of the
+filter are smoothed.
+"""
+
+import numpy as np
+
+# Ways of applying the filters
+SMOOTHING_METHODS = ("auto", "direct", "fft")
+
+# Standard deviation (grid points) from which "auto" applies filters with
+# FFTs
+FFT_MIN_SIGMA = 6.0
+
+# Filters are truncated at this many standard deviations, as by scipy
+TRUNCATE = 4.0
+
+# Transfer functions of the filters, per padded shape and standard deviation
+_transfers = {}
+
+
+def _radius(sigma):
+    return int(TRUNCATE * sigma + 0.5)
+
+
+def _fast_len(n):
+    """Get the smallest length not less than n with no prime factor larger
+    than 5, for which FFTs are fast."""
+    while True:
+        m = n
+        for p in (2, 3, 5):
+            while m % p == 0:
+                m //= p
+        if m == 1:
+            return n
+        n += 1
+
+
+def _transfer(shape, sigma):
+    """Get the transfer function of a filter for real FFTs of the given
+    shape. Transfer functions are cached, so the filters of fields on the
+    same grid are only computed once."""
+    key = (shape, sigma)
+    if key not in _transfers:
+        radius = _radius(sigma)
+        x = np.arange(-radius, radius + 1)
+        weights = np.exp(-0.5 * (x / sigma) ** 2)
+        weights /= weights.sum()
+        kernels = []
+        for n in shape:
+            # The kernel wrapped around so that it is centered on index 0
+            kernel = np.zeros(n)
+            kernel[: radius + 1] = weights[radius:]
+            kernel[n - radius :] = weights[:radius]
+            kernels.append(kernel)
+        _transfers[key] = (
+            np.fft.fft(kernels[0])[:, None] * np.fft.rfft(kernels[1])[None, :]
+        )
+    return _transfers[key]
+
+
+def _fft_smooth(field, sigma):
+    radius = _radius(sigma)
+    ny, nx = field.shape[-2:]
+    pad = [(0, 0)] * (field.ndim - 2) + [(radius, radius)] * 2
+    # numpy's "symmetric" padding is scipy's "reflect" mode
+    padded = np.pad(field, pad, mode="symmetric")
+    # The filtered values of the field only depend on the padded field, so
+    # the circular convolution of the FFTs gives them exactly
+    shape = (_fast_len(ny + 2 * radius), _fast_len(nx + 2 * radius))
+    spectrum = np.fft.rfft2(padded, s=shape) * _transfer(shape, sigma)
+    smoothed = np.fft.irfft2(spectrum, s=shape)
+    return smoothed[..., radius : radius + ny, radius : radius + nx]
+
+
+def gaussian_smooth(field, sigma, region=None, method="auto"):
+    """Smooth a field with a Gaussian filter, as
+    scipy.ndimage.gaussian_filter(field, sigma) does.
+
+    Args:
+        field: 2D array, or stack of 2D arrays that are smoothed separately
+               (masked values are smoothed as they are)
+        sigma: standard deviation of the filter (grid points)
+        region: (rows, columns) tuple of slices (with start and stop) of the
+                part of the field that is needed (see map_region()), None
+                for all of it
+        method: "direct", "fft" or "auto" (FFTs for wide filters)
+    Returns:
+        the smoothed field, masked outside the region if one is given
+    """
+    if method not in SMOOTHING_METHODS:
+        raise ValueError(
+            f"Unknown smoothing method {method}, must be one of {SMOOTHING_METHODS}"
+        )
+    field = np.asarray(field)
+
+    if region is not None:
+        # Smooth the region and a halo of the width of the filter, which is
+        # all the filtered values of the region depend on
+        radius = _radius(sigma)
+        rows, cols = region
+        ny, nx = field.shape[-2:]
+        r0, r1 = max(0, rows.start - radius), min(ny, rows.stop + radius)
+        c0, c1 = max(0, cols.start - radius), min(nx, cols.stop + radius)
+        smoothed = gaussian_smooth(field[..., r0:r1, c0:c1], sigma, method=method)
+        result = np.ma.masked_all(field.shape, dtype=smoothed.dtype)
+        result[..., rows, cols] = smoothed[
+            ..., rows.start - r0 : rows.stop - r0, cols.start - c0 : cols.stop - c0
+        ]
+        return result
+
+    if method == "auto":
+        method = "fft" if sigma >= FFT_MIN_SIGMA else "direct"
+    if method == "direct":
+        # Imported here so that the other plotting utilities can be used
+        # without scipy
+        from scipy import ndimage  # pylint: disable=import-outside-toplevel
+
+        sigmas = (0,) * (field.ndim - 2) + (sigma, sigma)
+        return ndimage.gaussian_filter(field, sigmas)
+    smoothed = _fft_smooth(field, sigma)
+    if np.issubdtype(field.dtype, np.floating):
+        smoothed = smoothed.astype(field.dtype, copy=False)
+    return smoothed
+
+
+def map_region(ax, lon, lat, crs):
+    """Get the part of a grid that is shown on a map.
+
+    Args:
+        ax: the map axes (cartopy)
+        lon, lat: 2D coordinates of the grid points
+        crs: the coordinate system of lon and lat (e.g. ccrs.PlateCarree())
+    Returns:
+        (rows, columns) tuple of slices of the smallest block of the grid
+        with all the points on the map and one point around them (for
+        contours leaving the map), None if no point is on the map
+    """
+    points = ax.projection.transform_points(crs, np.asarray(lon), np.asarray(lat))
+    x0, x1 = sorted(ax.get_xlim())
+    y0, y1 = sorted(ax.get_ylim())
+    x, y = points[..., 0], points[..., 1]
+    inside = (x >= x0) & (x <= x1) & (y >= y0) & (y <= y1)
+    rows = np.nonzero(inside.any(axis=1))[0]
+    cols = np.nonzero(inside.any(axis=0))[0]
+    if rows.size == 0:
+        return None
+    ny, nx = inside.shape
+    return (
+        slice(max(0, int(rows[0]) - 1), min(ny, int(rows[-1]) + 2)),
+        slice(max(0, int(cols[0]) - 1), min(nx, int(cols[-1]) + 2)),
+    )
@@ -1,7 +1,7 @@
 from .misc import uppercase, lowercase, find_pattern_in_str, find_pattern_in_file
 from .check_for_preexist_dir_file import check_for_preexist_dir_file
 from .check_var_valid_value import check_var_valid_value
-from .create_symlink_to_file import create_symlink_to_file
+from .create_symlink_to_file import create_symlink_to_file, create_symlinks
 from .define_macos_utilities import define_macos_utilities
 from .environment import (
     str_to_date,
@@ -10,6 +10,7 @@ from .environment import (
     type_to_str,
     list_to_str,
     str_to_list,
+    strs_to_types,
     set_env_var,
     get_env_var,
     import_vars,
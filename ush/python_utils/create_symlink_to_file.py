@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 
 import os
+from concurrent.futures import ThreadPoolExecutor
 
 from .print_input_args import print_input_args
 from .print_msg import print_err_msg_exit
@@ -51,3 +52,60 @@ def create_symlink_to_file(target, symlink, relative=True):
             relative_flag = f"{RELATIVE_LINK_FLAG}"
 
     ln_vrfy(f"-sf {relative_flag} {target} {symlink}")
+
+
+def _replace_symlink(target, symlink):
+    """Point symlink to target unless it already does. The link is created
+    under a temporary name and atomically moved in place, so it is never
+    missing while it is being replaced.
+
+    Returns:
+        True if the link was created or replaced
+    """
+    try:
+        if os.readlink(symlink) == target:
+            return False
+    except OSError:
+        pass
+    tmp = f"{symlink}.tmp{os.getpid()}"
+    if os.path.lexists(tmp):
+        os.remove(tmp)
+    os.symlink(target, tmp)
+    os.replace(tmp, symlink)
+    return True
+
+
+def create_symlinks(links, target_dir, nthreads=1):
+    """Create a batch of symbolic links in target_dir in one process. All
+    targets are checked before any link is made. Links that already point to
+    the right target are left alone.
+
+    Args:
+        links: list of (target, symlink) tuples where symlink is a path
+               relative to target_dir and target is the content of the link
+               (absolute, or relative to the directory of the link)
+        target_dir: the directory where the links are created
+        nthreads: number of threads creating links. On metadata-heavy
+                  parallel file systems a few threads hide the latency of
+                  each call.
+    Returns:
+        the number of links that were created or replaced
+    """
+
+    links = [(target, os.path.join(target_dir, symlink)) for target, symlink in links]
+    symlinks = {os.path.normpath(symlink) for _, symlink in links}
+    for target, symlink in links:
+        target_fp = os.path.normpath(os.path.join(os.path.dirname(symlink), target))
+        if not (os.path.exists(target_fp) or target_fp in symlinks):
+            print_err_msg_exit(
+                f"""
+                Cannot create symlink to specified target file because the latter does
+                not exist or is not a file:
+                    target = '{target_fp}'"""
+            )
+
+    if nthreads > 1:
+        with ThreadPoolExecutor(max_workers=nthreads) as executor:
+            created = executor.map(lambda link: _replace_symlink(*link), links)
+            return sum(created)
+    return sum(_replace_symlink(target, symlink) for target, symlink in links)
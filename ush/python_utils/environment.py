@@ -1,11 +1,38 @@
 #!/usr/bin/env python3
 
 import os
+import re
 import inspect
 import shlex
 from datetime import datetime, date
+from functools import lru_cache
 from types import ModuleType
 
+# Size of the memoization caches used by str_to_type and str_to_list. Config
+# files repeat a small vocabulary of values (TRUE, FALSE, paths, dates), so a
+# few thousand entries cover a full var_defns file many times over.
+_CONVERSION_CACHE_SIZE = 8192
+
+# Classify a (quote-stripped) string with a single regex match instead of
+# trying every conversion in sequence
+_TYPE_RE = re.compile(
+    r"(?P<true>(?i:true|yes|yeah))"
+    r"|(?P<false>(?i:false|no|nope))"
+    r"|(?P<none>None|null)"
+    r"|(?P<date>[0-9]{8}|[0-9]{10}|[0-9]{12}|[0-9]{14})"
+    r"|(?P<int>[+-]?[0-9]+)"
+    r"|(?P<float>[+-]?(?:[0-9]+\.?[0-9]*|\.[0-9]+)(?:[eE][+-]?[0-9]+)?)"
+    r"|(?P<str>(?!\s*[+-]?(?i:inf|infinity|nan)\s*\Z)\D*)"
+)
+
+# A bash/python array body made only of whitespace separated plain or simply
+# quoted tokens. Anything fancier (escapes, adjacent quoted pieces) goes
+# through shlex.
+_SIMPLE_ARRAY_RE = re.compile(
+    r"""\s*(?:(?:"[^"\\]*"|'[^']*'|[^\s"'\\]+)(?:\s+|\Z))*"""
+)
+_ARRAY_TOKEN_RE = re.compile(r"""(?:"([^"\\]*)"|'([^']*)'|(\S+))""")
+
 
 def str_to_date(s):
     """Get python datetime object from string.
@@ -31,6 +58,28 @@ def str_to_date(s):
     return v
 
 
+def _digits_to_date(s):
+    """Get python datetime object from a string of 8, 10, 12 or 14 digits
+    without going through strptime.
+
+    Args:
+        s: a string matching YYYYMMDD[HH[MM[SS]]]
+    Returns:
+        datetime object or None if the digits do not form a valid date
+    """
+    try:
+        return datetime(
+            int(s[0:4]),
+            int(s[4:6]),
+            int(s[6:8]),
+            int(s[8:10] or 0),
+            int(s[10:12] or 0),
+            int(s[12:14] or 0),
+        )
+    except ValueError:
+        return None
+
+
 def date_to_str(d, format="%Y%m%d%H%M"):
     """Get string from python datetime object.
     By default it converts to YYYYMMDDHHMM format unless
@@ -58,35 +107,53 @@ def str_to_type(s, return_string=0):
     Returns:
         a float, int, boolean, datetime, or the string itself when all else fails
     """
-    s = s.strip("\"'")
-    if return_string != 1:
-        if s.lower() in ["true", "yes", "yeah"]:
-            return True
-        if s.lower() in ["false", "no", "nope"]:
-            return False
-        if s in ["None", "null"]:
-            return None
-        v = str_to_date(s)
+    return _str_to_type(s.strip("\"'"), return_string)
+
+
+@lru_cache(maxsize=_CONVERSION_CACHE_SIZE)
+def _str_to_type(s, return_string):
+    """Memoized body of str_to_type for an already quote-stripped string.
+    Only immutable values are returned, so cached results can be shared."""
+    if return_string == 1:
+        return s
+    m = _TYPE_RE.fullmatch(s)
+    kind = m.lastgroup if m else None
+    if kind == "str":
+        return s
+    if kind == "true":
+        return True
+    if kind == "false":
+        return False
+    if kind == "none":
+        return None
+    if kind == "date":
+        v = _digits_to_date(s)
         if v is not None:
             if return_string == 2:
                 return s
             return v
-        # int
-        try:
-            v = int(s)
-            # treat integers that start with 0 as string
-            if len(s) > 1 and s[0] == "0":
-                return s
-            else:
-                return v
-        except:
-            pass
-        # float
-        try:
-            v = float(s)
-            return v
-        except:
-            pass
+        kind = "int"
+    if kind == "int":
+        # treat integers that start with 0 as string
+        if len(s) > 1 and s[0] == "0":
+            return s
+        return int(s)
+    if kind == "float":
+        return float(s)
+    # Uncommon spellings (surrounding whitespace, underscores, inf/nan ...)
+    # fall back to the builtin parsers
+    try:
+        v = int(s)
+        # treat integers that start with 0 as string
+        if len(s) > 1 and s[0] == "0":
+            return s
+        return v
+    except ValueError:
+        pass
+    try:
+        return float(s)
+    except ValueError:
+        pass
     return s
 
 
@@ -145,27 +212,55 @@ def str_to_list(v, return_string=0):
 
     if not isinstance(v, str):
         return v
+    v = _str_to_list(v, return_string)
+    # Hand out a fresh list each time since callers may modify it
+    if isinstance(v, tuple):
+        return list(v)
+    return v
+
+
+@lru_cache(maxsize=_CONVERSION_CACHE_SIZE)
+def _str_to_list(v, return_string):
+    """Memoized body of str_to_list. Arrays are returned as tuples."""
     v = v.strip()
     if not v:
         return None
     if (v[0] == "(" and v[-1] == ")") or (v[0] == "[" and v[-1] == "]"):
         v = v[1:-1]
         v = v.replace(",", " ")
-        tokens = shlex.split(v)
-        lst = []
-        for itm in tokens:
-            itm = itm.strip()
-            if itm == "":
-                continue
-            # bash arrays could be stored with indices ([0]=hello ...)
-            if "=" in itm:
-                idx = itm.find("=")
-                itm = itm[idx + 1 :]
-            lst.append(str_to_type(itm, return_string))
-        return lst
+        if _SIMPLE_ARRAY_RE.fullmatch(v):
+            tokens = [
+                a or b or c for a, b, c in _ARRAY_TOKEN_RE.findall(v)
+            ]
+        else:
+            tokens = shlex.split(v)
+        return tuple(strs_to_types(tokens, return_string))
     return str_to_type(v, return_string)
 
 
+def strs_to_types(tokens, return_string=0):
+    """Convert a sequence of strings in bulk with str_to_type. Empty tokens
+    are dropped and bash array indices ([0]=hello ...) are removed.
+
+    Args:
+        tokens: an iterable of strings
+        return_string: see str_to_type
+    Returns:
+        a list of converted values
+    """
+    lst = []
+    for itm in tokens:
+        itm = itm.strip()
+        if itm == "":
+            continue
+        # bash arrays could be stored with indices ([0]=hello ...)
+        if "=" in itm:
+            idx = itm.find("=")
+            itm = itm[idx + 1 :]
+        lst.append(_str_to_type(itm.strip("\"'"), return_string))
+    return lst
+
+
 def set_env_var(param, value):
     """Set an environment variable
 
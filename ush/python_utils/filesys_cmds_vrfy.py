@@ -1,8 +1,21 @@
 #!/usr/bin/env python3
 
 import os
+import re
+import errno
+import glob
+import shutil
+from concurrent.futures import ThreadPoolExecutor
 from .print_msg import print_err_msg_exit
 
+# Characters that make the shell do more than split words and expand globs.
+# Commands containing any of them are run by the shell as before.
+SHELL_SPECIAL_CHARS = set("$`~;&|<>(){}\\")
+
+# Parts of a shell word: single or double quoted text, unquoted text, or
+# the blanks between words
+_WORD_PART_RE = re.compile(r"""'([^']*)'|"([^"]*)"|([^\s'"]+)|(\s+)""")
+
 
 def cmd_vrfy(cmd, *args):
     """Execute system command
@@ -21,8 +34,185 @@ def cmd_vrfy(cmd, *args):
     return ret
 
 
-def cp_vrfy(*args):
-    return cmd_vrfy("cp", *args)
+def _split_words(arg):
+    """Split a string into shell words, without any shell special character
+    (see SHELL_SPECIAL_CHARS).
+
+    Returns:
+        a list of (word, pattern) tuples, where pattern is the word as a
+        globbing pattern: the quoted parts of the word are escaped so that
+        they are matched literally
+    Raises:
+        ValueError: a quote is not closed
+    """
+
+    words = []
+    word = pattern = None
+    pos = 0
+    while pos < len(arg):
+        match = _WORD_PART_RE.match(arg, pos)
+        if match is None:
+            raise ValueError(f"No closing quotation in: {arg}")
+        pos = match.end()
+        single, double, unquoted, _ = match.groups()
+        if match.lastindex == 4:
+            if word is not None:
+                words.append((word, pattern))
+            word = pattern = None
+            continue
+        word = word or ""
+        pattern = pattern or ""
+        if unquoted is not None:
+            word += unquoted
+            pattern += unquoted
+        else:
+            quoted = single if single is not None else double
+            word += quoted
+            pattern += glob.escape(quoted)
+    if word is not None:
+        words.append((word, pattern))
+    return words
+
+
+def parse_cmd_args(*args):
+    """Split the arguments of a file system command the way the shell would.
+    Arguments may be strings holding several shell words (e.g. "-rf dir")
+    or lists of paths. Globbing patterns in the unquoted parts of the words
+    are expanded; like the shell, a pattern that matches nothing is kept as
+    is. Paths given in lists are used as they are.
+
+    Args:
+        *args: the arguments of the command
+    Returns:
+        a (set of option characters, set of long options, list of operands)
+        tuple, or None if the arguments need a shell
+    """
+
+    words = []
+    for arg in args:
+        if isinstance(arg, (list, tuple)):
+            words += [("path", str(a), None) for a in arg]
+            continue
+        arg = str(arg)
+        if SHELL_SPECIAL_CHARS & set(arg):
+            return None
+        words += [("word", w, pattern) for w, pattern in _split_words(arg)]
+
+    opts = set()
+    long_opts = set()
+    operands = []
+    end_of_opts = False
+    for kind, word, pattern in words:
+        if kind == "word" and not end_of_opts and word.startswith("-"):
+            if word == "--":
+                end_of_opts = True
+            elif word.startswith("--"):
+                long_opts.add(word)
+            else:
+                opts.update(word[1:])
+            continue
+        matches = []
+        if kind == "word" and glob.has_magic(pattern):
+            matches = sorted(glob.glob(pattern))
+        operands += matches or [word]
+    return opts, long_opts, operands
+
+
+def _native(cmd, args, supported_opts, supported_long_opts=()):
+    """Parse the arguments of a command that is implemented natively.
+
+    Returns:
+        (opts, long_opts, operands), or None if the command has to be run
+        by the shell instead
+    """
+    parsed = parse_cmd_args(*args)
+    if parsed is None:
+        return None
+    opts, long_opts, operands = parsed
+    if not opts <= set(supported_opts) or not long_opts <= set(supported_long_opts):
+        return None
+    return parsed
+
+
+def _fail(cmd, args, err=None):
+    """Report a failed file system command like cmd_vrfy does"""
+    cmd = f"{cmd} " + " ".join([str(a) for a in args])
+    reason = f"\n{err}" if err else ""
+    print_err_msg_exit(f"System call '{cmd}' failed.{reason}")
+
+
+def _destination(operands, cmd, args):
+    """Split operands into sources and destination, and check that several
+    sources go to a directory."""
+    if len(operands) < 2:
+        _fail(cmd, args, "Missing destination operand.")
+    srcs, dest = operands[:-1], operands[-1]
+    if len(srcs) > 1 and not os.path.isdir(dest):
+        _fail(cmd, args, f"Target '{dest}' is not a directory.")
+    return srcs, dest
+
+
+def _run_batch(func, pairs, nthreads):
+    """Apply func to each (src, dst) pair, optionally in a thread pool."""
+    if nthreads > 1 and len(pairs) > 1:
+        with ThreadPoolExecutor(max_workers=nthreads) as executor:
+            list(executor.map(lambda pair: func(*pair), pairs))
+    else:
+        for src, dst in pairs:
+            func(src, dst)
+
+
+def cp_vrfy(*args, nthreads=1):
+    """Copy files (and directories with -r) like "cp". Sources can be given
+    as a list of paths, and with nthreads > 1 they are copied in parallel,
+    which helps with large files on parallel file systems.
+
+    Supports -r/-R, -p, -f and -L; anything else is run by the shell. As
+    with GNU cp, symbolic links are copied as links when copying
+    recursively, unless -L is given.
+    """
+    parsed = _native("cp", args, "rRpfL")
+    if parsed is None:
+        return cmd_vrfy("cp", *args)
+    opts, _, operands = parsed
+    srcs, dest = _destination(operands, "cp", args)
+    copy_function = shutil.copy2 if "p" in opts else shutil.copy
+    recursive = bool({"r", "R"} & opts)
+
+    pairs = []
+    for src in srcs:
+        dst = dest
+        if os.path.isdir(dest):
+            dst = os.path.join(dest, os.path.basename(src.rstrip(os.sep)))
+        if os.path.isdir(src) and not recursive:
+            _fail("cp", args, f"Omitting directory '{src}'.")
+        pairs.append((src, dst))
+
+    def copy(src, dst):
+        if recursive and "L" not in opts and os.path.islink(src):
+            if os.path.isdir(dst) and not os.path.islink(dst):
+                raise IsADirectoryError(
+                    errno.EISDIR, "Cannot overwrite directory with non-directory", dst
+                )
+            if os.path.lexists(dst):
+                os.remove(dst)
+            os.symlink(os.readlink(src), dst)
+        elif os.path.isdir(src):
+            shutil.copytree(
+                src,
+                dst,
+                copy_function=copy_function,
+                symlinks="L" not in opts,
+                dirs_exist_ok=True,
+            )
+        else:
+            copy_function(src, dst)
+
+    try:
+        _run_batch(copy, pairs, nthreads)
+    except OSError as e:
+        _fail("cp", args, e)
+    return 0
 
 
 def rsync_vrfy(*args):
@@ -30,19 +220,121 @@ def rsync_vrfy(*args):
 
 
 def mv_vrfy(*args):
-    return cmd_vrfy("mv", *args)
+    """Move files and directories like "mv". Supports -f; anything else is
+    run by the shell, as are moves onto an existing directory, which GNU mv
+    replaces only if it is empty."""
+    parsed = _native("mv", args, "f")
+    if parsed is None:
+        return cmd_vrfy("mv", *args)
+    _, _, operands = parsed
+    srcs, dest = _destination(operands, "mv", args)
+    pairs = []
+    for src in srcs:
+        dst = dest
+        if os.path.isdir(dest):
+            dst = os.path.join(dest, os.path.basename(src.rstrip(os.sep)))
+            # shutil.move() would move src into it instead
+            if os.path.isdir(dst):
+                return cmd_vrfy("mv", *args)
+        pairs.append((src, dst))
+    try:
+        for src, dst in pairs:
+            shutil.move(src, dst)
+    except OSError as e:
+        _fail("mv", args, e)
+    return 0
 
 
 def rm_vrfy(*args):
-    return cmd_vrfy("rm", *args)
+    """Remove files (and directories with -r) like "rm". Supports -r/-R
+    and -f; anything else is run by the shell."""
+    parsed = _native("rm", args, "rRf")
+    if parsed is None:
+        return cmd_vrfy("rm", *args)
+    opts, _, operands = parsed
+    force = "f" in opts
+    try:
+        for path in operands:
+            if not os.path.lexists(path):
+                if force:
+                    continue
+                _fail("rm", args, f"Cannot remove '{path}': No such file or directory.")
+            if os.path.isdir(path) and not os.path.islink(path):
+                if not ({"r", "R"} & opts):
+                    _fail("rm", args, f"Cannot remove '{path}': Is a directory.")
+                shutil.rmtree(path)
+            else:
+                os.remove(path)
+    except OSError as e:
+        _fail("rm", args, e)
+    return 0
 
 
 def ln_vrfy(*args):
-    return cmd_vrfy("ln", *args)
+    """Create links like "ln". Supports -s, -f, -n and -r/--relative;
+    anything else is run by the shell."""
+    parsed = _native("ln", args, "sfnrT", ["--relative"])
+    if parsed is None:
+        return cmd_vrfy("ln", *args)
+    opts, long_opts, operands = parsed
+    if len(operands) == 1:
+        operands.append(".")
+    srcs, dest = _destination(operands, "ln", args)
+    relative = "r" in opts or "--relative" in long_opts
+    symbolic = "s" in opts
+
+    # With -n (or -T), a symlink to a directory is not followed and is
+    # replaced instead of linked into.
+    dest_is_dir = os.path.isdir(dest)
+    if ({"n", "T"} & opts) and os.path.islink(dest):
+        dest_is_dir = False
+    if "T" in opts:
+        dest_is_dir = False
+
+    try:
+        for src in srcs:
+            link = dest
+            if dest_is_dir:
+                link = os.path.join(dest, os.path.basename(src.rstrip(os.sep)))
+            target = src
+            if relative:
+                target = os.path.relpath(
+                    os.path.realpath(src),
+                    os.path.realpath(os.path.dirname(os.path.abspath(link))),
+                )
+            if os.path.lexists(link):
+                if "f" not in opts:
+                    _fail("ln", args, f"Failed to create link '{link}': File exists.")
+                if os.path.isdir(link) and not os.path.islink(link):
+                    _fail("ln", args, f"Cannot overwrite directory '{link}'.")
+                os.remove(link)
+            if symbolic:
+                os.symlink(target, link)
+            else:
+                os.link(src, link)
+    except OSError as e:
+        _fail("ln", args, e)
+    return 0
 
 
 def mkdir_vrfy(*args):
-    return cmd_vrfy("mkdir", *args)
+    """Create directories like "mkdir". Supports -p; anything else is run
+    by the shell."""
+    parsed = _native("mkdir", args, "p")
+    if parsed is None:
+        return cmd_vrfy("mkdir", *args)
+    opts, _, operands = parsed
+    if not operands:
+        _fail("mkdir", args, "Missing operand.")
+    try:
+        for path in operands:
+            if "p" in opts:
+                os.makedirs(path, exist_ok=True)
+            else:
+                os.mkdir(path)
+    except OSError as e:
+        _fail("mkdir", args, e)
+    return 0
 
 
 def cd_vrfy(*args):
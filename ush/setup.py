@@ -1432,6 +1432,7 @@ def setup(USHdir, user_config_fn="config.yaml", debug: bool = False):
                 nhw=grid_params["NHW"],
                 run_task=False,
                 sfc_climo_fields=fixed_files["SFC_CLIMO_FIELDS"],
+                manifest=True,
             )
             if not res_in_fixlam_filenames:
                 res_in_fixlam_filenames = res_in_fns
@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+
+"""
+Stage the links that the forecast model needs in its run directory (DATA)
+and in the INPUT subdirectory of it.
+
+Everything that does not change from one cycle/member to the next (the
+FIXlam grid and orography files, the FIXam files and the MERRA2 climatology
+files) is resolved once, when the experiment is generated, into a template
+file in the experiment directory.  The run_fcst task then only fills in the
+few cycle/member dependent placeholders and creates all the links from a
+single process instead of calling the create_symlink_to_file bash function
+(and forking ln) for each of them.
+"""
+
+import os
+import sys
+import argparse
+import glob
+from textwrap import dedent
+
+from python_utils import (
+    cfg_to_yaml_str,
+    create_symlinks,
+    find_pattern_in_str,
+    load_config_file,
+    load_shell_config,
+    print_err_msg_exit,
+    print_info_msg,
+)
+
+# Physics suites that need the orography statistics files for the gravity
+# wave drag parameterization
+OROG_STATS_SUITES = [
+    "FV3_RAP",
+    "FV3_HRRR",
+    "FV3_GFS_v15_thompson_mynn_lam3km",
+    "FV3_GFS_v17_p8",
+]
+
+
+def create_fcst_input_template(expt_config):
+    """Build the template of the links needed by the forecast task.
+
+    The target of each link may contain the placeholders {CRES}, {grid_fn},
+    {INPUT_DATA}, {NET}, {cycle}, {dot_ensmem} and, for the lateral boundary
+    condition files, {fhr}; these are filled in by stage_fcst_input().  The
+    "relative" entry of a link is either a boolean or the path to a
+    directory, in which case a relative link is made only if that directory
+    exists when the links are staged.
+
+    Args:
+        expt_config: dictionary of experiment settings as returned by setup()
+    Returns:
+        a dictionary with the template
+    """
+
+    workflow = expt_config["workflow"]
+    constants = expt_config["constants"]
+    exptdir = workflow["EXPTDIR"]
+    fixlam = workflow["FIXlam"]
+    cres_uscore = f"{{CRES}}{workflow['DOT_OR_USCORE']}"
+    tile = constants["TILE_RGNL"]
+    nh0 = constants["NH0"]
+    nh3 = constants["NH3"]
+    nh4 = constants["NH4"]
+
+    def link(symlink, target, relative=False, optional=False):
+        entry = {"symlink": symlink, "target": target, "relative": relative}
+        if optional:
+            entry["optional"] = True
+        return entry
+
+    #
+    # Grid and (filtered) orography files. Relative links are used when the
+    # grid and orography are generated within the experiment directory.
+    #
+    grid_relative = os.path.join(exptdir, "grid")
+    orog_relative = os.path.join(exptdir, "orog")
+    links = [
+        link(
+            "INPUT/grid_spec.nc",
+            f"{fixlam}/{cres_uscore}mosaic.halo{nh3}.nc",
+            grid_relative,
+        ),
+        link("INPUT/{grid_fn}", f"{fixlam}/{{grid_fn}}", grid_relative),
+        link(
+            f"INPUT/grid.tile{tile}.halo{nh4}.nc",
+            f"{fixlam}/{cres_uscore}grid.tile{tile}.halo{nh4}.nc",
+            grid_relative,
+        ),
+        link(
+            "INPUT/oro_data.nc",
+            f"{fixlam}/{cres_uscore}oro_data.tile{tile}.halo{nh0}.nc",
+            orog_relative,
+        ),
+        link(
+            f"INPUT/oro_data.tile{tile}.halo{nh4}.nc",
+            f"{fixlam}/{cres_uscore}oro_data.tile{tile}.halo{nh4}.nc",
+            orog_relative,
+        ),
+    ]
+    if workflow["CCPP_PHYS_SUITE"] in OROG_STATS_SUITES:
+        for file_id in ["ss", "ls"]:
+            links.append(
+                link(
+                    f"INPUT/oro_data_{file_id}.nc",
+                    f"{fixlam}/{cres_uscore}oro_data_{file_id}.tile{tile}.halo{nh0}.nc",
+                    orog_relative,
+                )
+            )
+    #
+    # Initial condition and surface files
+    #
+    prefix = "{INPUT_DATA}/{NET}.{cycle}{dot_ensmem}"
+    links += [
+        link("INPUT/gfs_data.nc", f"{prefix}.gfs_data.tile{tile}.halo{nh0}.nc"),
+        link("INPUT/sfc_data.nc", f"{prefix}.sfc_data.tile{tile}.halo{nh0}.nc"),
+        link("INPUT/gfs_ctrl.nc", f"{prefix}.gfs_ctrl.nc"),
+    ]
+    if expt_config["cpl_aqm_parm"]["CPL_AQM"]:
+        links += [
+            link("INPUT/NEXUS_Expt.nc", f"{prefix}.NEXUS_Expt.nc"),
+            link("INPUT/PT.nc", f"{prefix}.PT.nc", optional=True),
+        ]
+    #
+    # FIXam files. In community mode FIXam is a directory of actual files
+    # under the experiment directory, so use relative links.
+    #
+    fixam_relative = not workflow["SYMLINK_FIX_FILES"]
+    regex_search = "^[ ]*([^| ]+)[ ]*[|][ ]*([^| ]+)[ ]*$"
+    for mapping in expt_config["fixed_files"]["CYCLEDIR_LINKS_TO_FIXam_FILES_MAPPING"]:
+        symlink, target = find_pattern_in_str(regex_search, mapping)
+        links.append(
+            link(symlink, os.path.join(workflow["FIXam"], target), fixam_relative)
+        )
+    #
+    # MERRA2 aerosol climatology data files and lookup table for optics
+    # properties. FIXclim has already been populated at this point.
+    #
+    if expt_config["task_run_fcst"]["USE_MERRA_CLIMO"]:
+        for f_nm_path in sorted(glob.glob(os.path.join(workflow["FIXclim"], "*"))):
+            f_nm = os.path.basename(f_nm_path)
+            pre_f = f_nm.split(".")[0]
+            if pre_f == "merra2":
+                mnth = find_pattern_in_str(r"2014\.m(.*)\.nc", f_nm)[0]
+                symlink = f"aeroclim.m{mnth}.nc"
+            else:
+                symlink = f"{pre_f}.dat"
+            links.append(link(symlink, f_nm_path, fixam_relative))
+
+    lbcs = link(
+        f"INPUT/gfs_bndy.tile{tile}.{{fhr}}.nc",
+        f"{prefix}.gfs_bndy.tile{tile}.f{{fhr}}.nc",
+    )
+    lbcs["interval_hrs"] = expt_config["task_get_extrn_lbcs"]["LBC_SPEC_INTVL_HRS"]
+
+    return {"links": links, "lbcs": lbcs}
+
+
+def write_fcst_input_template(expt_config, template_fp):
+    """Write the template built by create_fcst_input_template() to a file."""
+
+    template = create_fcst_input_template(expt_config)
+    with open(template_fp, "w", encoding="utf-8") as f:
+        f.write(cfg_to_yaml_str(template))
+
+
+def stage_fcst_input(
+    template_fp,
+    data,
+    fcst_len_hrs,
+    nthreads=1,
+    relative_links=True,
+    verbose=False,
+    path_to_defns=None,
+    **placeholders,
+):
+    """Create all the links of a forecast run directory from a template.
+
+    Args:
+        template_fp: path to the template written at experiment generation
+        path_to_defns: path to the var_defns file the template is built from
+                       if template_fp does not exist (experiments generated
+                       before the template was written)
+        data: the run directory of the forecast (DATA)
+        fcst_len_hrs: forecast length of this cycle in hours
+        nthreads: number of threads creating the links
+        relative_links: set to False to make only absolute links, as when
+                        RELATIVE_LINK_FLAG is empty
+        verbose: print a summary when done
+        placeholders: values of CRES, grid_fn, INPUT_DATA, NET, cycle and
+                      dot_ensmem
+    Returns:
+        the number of links that were created or replaced
+    """
+
+    if os.path.exists(template_fp) or not path_to_defns:
+        template = load_config_file(template_fp)
+    else:
+        template = create_fcst_input_template(load_shell_config(path_to_defns))
+
+    entries = list(template["links"])
+    lbcs = template["lbcs"]
+    for fhr in range(0, fcst_len_hrs + 1, lbcs["interval_hrs"]):
+        entries.append(
+            {
+                "symlink": lbcs["symlink"].replace("{fhr}", f"{fhr:03d}"),
+                "target": lbcs["target"].replace("{fhr}", f"{fhr:03d}"),
+                "relative": lbcs["relative"],
+            }
+        )
+
+    links = []
+    for entry in entries:
+        try:
+            symlink = entry["symlink"].format(**placeholders)
+            target = entry["target"].format(**placeholders)
+        except KeyError as e:
+            print_err_msg_exit(
+                f"""
+                Placeholder {e} in the forecast input template
+                  template_fp = '{template_fp}'
+                was not given a value."""
+            )
+        if entry.get("optional") and not os.path.exists(target):
+            continue
+        relative = entry["relative"]
+        if isinstance(relative, str):
+            relative = os.path.isdir(relative)
+        if relative and relative_links:
+            # Same as "ln --relative"
+            target = os.path.relpath(
+                os.path.realpath(target),
+                os.path.realpath(os.path.dirname(os.path.join(data, symlink))),
+            )
+        links.append((target, symlink))
+
+    created = create_symlinks(links, data, nthreads)
+    print_info_msg(
+        dedent(
+            f"""
+            Staged {len(links)} links in the forecast run directory
+              DATA = '{data}'
+            ({len(links) - created} already up to date)"""
+        ),
+        verbose=verbose,
+    )
+    return created
+
+
+def parse_args(argv):
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(
+        description="Create the links needed in a forecast run directory."
+    )
+
+    parser.add_argument(
+        "-t",
+        "--template",
+        dest="template_fp",
+        required=True,
+        help="Path to the template written at experiment generation.",
+    )
+    parser.add_argument(
+        "-p",
+        "--path-to-defns",
+        dest="path_to_defns",
+        help="Path to var_defns file, to build the template from if it does not exist.",
+    )
+    parser.add_argument(
+        "-d", "--data", required=True, help="Forecast run directory (DATA)."
+    )
+    parser.add_argument(
+        "--fcst-len-hrs",
+        dest="fcst_len_hrs",
+        type=int,
+        required=True,
+        help="Forecast length of this cycle in hours.",
+    )
+    parser.add_argument(
+        "-n",
+        "--nthreads",
+        type=int,
+        default=1,
+        help="Number of threads creating links.",
+    )
+    parser.add_argument(
+        "--relative-link-flag",
+        dest="relative_link_flag",
+        default="--relative",
+        help="Value of RELATIVE_LINK_FLAG. Relative links are not made if empty.",
+    )
+    parser.add_argument("--cres", required=True, help="C-resolution (CRES).")
+    parser.add_argument(
+        "--grid-fn",
+        dest="grid_fn",
+        required=True,
+        help="Name of the halo-3 grid file referenced by the mosaic file.",
+    )
+    parser.add_argument(
+        "--input-data",
+        dest="input_data",
+        required=True,
+        help="Directory of the IC/LBC files (INPUT_DATA).",
+    )
+    parser.add_argument("--net", required=True, help="Model name (NET).")
+    parser.add_argument("--cycle", required=True, help="Cycle string, e.g. t00z.")
+    parser.add_argument(
+        "--dot-ensmem",
+        dest="dot_ensmem",
+        default="",
+        help="Ensemble member suffix, e.g. .mem001.",
+    )
+    parser.add_argument(
+        "-v", "--verbose", action="store_true", help="Print a summary."
+    )
+
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args(sys.argv[1:])
+    stage_fcst_input(
+        template_fp=args.template_fp,
+        data=args.data,
+        fcst_len_hrs=args.fcst_len_hrs,
+        nthreads=args.nthreads,
+        relative_links=bool(args.relative_link_flag),
+        verbose=args.verbose,
+        path_to_defns=args.path_to_defns,
+        CRES=args.cres,
+        grid_fn=args.grid_fn,
+        INPUT_DATA=args.input_data,
+        NET=args.net,
+        cycle=args.cycle,
+        dot_ensmem=args.dot_ensmem,
+    )